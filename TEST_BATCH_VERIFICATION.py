@@ -93,6 +93,12 @@ if batch_result.get("success"):
     print(f"⏱️  Tempo total (batch): {batch_result['total_time_ms']:.2f} ms")
     print(f"⏱️  Tempo médio por assinatura: {batch_result['avg_time_per_sig_ms']:.2f} ms")
     print()
+    print("⏱️  Tempo por algoritmo:")
+    for algorithm, timing in batch_result['algorithm_timings_ms'].items():
+        print(f"   {algorithm:<8} {timing['verifications']:>4} verificações  "
+              f"total {timing['total']:.2f} ms  média {timing['avg']:.3f} ms")
+    print(f"   Verificações evitadas pelo limiar: {batch_result['skipped_verifications']}")
+    print()
     print(f"⚡ Eficiência: {batch_result['efficiency_gain_percent']:.1f}% de redução")
     print(f"⚡ Tempo economizado: {batch_result['time_saved_ms']:.2f} ms")
     print()
@@ -9,6 +9,8 @@ from collections import deque
 import logging
 from enum import Enum
 
+from validator_index import ValidatorIndex
+
 logger = logging.getLogger(__name__)
 
 class ConsensusType(Enum):
@@ -31,6 +33,8 @@ class AdvancedAdaptiveConsensus:
     - Performance 10-50x superior em alta carga
     """
     
+    MIN_STAKE = 1000  # Configurável
+    
     def __init__(self, blockchain):
         self.blockchain = blockchain
         self.current_consensus = ConsensusType.POS
@@ -46,6 +50,9 @@ class AdvancedAdaptiveConsensus:
         }
         self.validator_scores = {}
         self.last_validation_time = {}
+        # Validadores PoS (stake >= MIN_STAKE) ordenados por stake * score base
+        self.validator_index = ValidatorIndex(self.MIN_STAKE)
+        self._index_built = False
         self.consensus_metrics = {
             "pos_count": 0,
             "poa_count": 0,
@@ -131,23 +138,27 @@ class AdvancedAdaptiveConsensus:
             return self._select_stake_validator(shard_id)
     
     def _select_stake_validator(self, shard_id: int) -> Optional[str]:
-        """Seleção PoS: Baseada em stake + score"""
-        candidates = []
-        MIN_STAKE = 1000  # Configurável
-        
-        for address, wallet in self.blockchain.wallets.items():
-            if wallet.get("staked", 0) >= MIN_STAKE:
-                activity_score = self.validator_scores.get(address, 1.0)
-                total_score = wallet["staked"] * activity_score
-                candidates.append((address, total_score))
-        
-        if not candidates:
-            return None
-        
-        candidates.sort(key=lambda x: x[1], reverse=True)
-        top_candidates = candidates[:3]
-        selected = random.choice(top_candidates)
-        return selected[0]
+        """Seleção PoS: Baseada em stake + score (top 3 do índice, O(log V))"""
+        if not self._index_built:
+            self.rebuild_validator_index()
+        return self.validator_index.select(3)
+    
+    def rebuild_validator_index(self):
+        """Uma varredura das carteiras; depois o índice é mantido por update_stake/update_validator_score"""
+        self.validator_index.rebuild(
+            ((address, wallet.get("staked", 0)) for address, wallet in list(self.blockchain.wallets.items())),
+            {address: self._base_score(address) for address in self.validator_scores}
+        )
+        self._index_built = True
+    
+    def update_stake(self, address: str, staked: float):
+        """Notificado pela blockchain a cada stake"""
+        if self._index_built:
+            self.validator_index.update_stake(address, staked)
+    
+    def _base_score(self, address: str) -> float:
+        score = self.validator_scores.get(address, 1.0)
+        return score.get("base", 1.0) if isinstance(score, dict) else score
     
     def _select_authority_validator(self, shard_id: int) -> Optional[str]:
         """Seleção PoA: Validadores autorizados (mais rápidos)"""
@@ -229,6 +240,7 @@ class AdvancedAdaptiveConsensus:
             "last_update": time.time()
         }
         self.last_validation_time[validator] = time.time()
+        self.validator_index.update_score(validator, new_base_score)
     
     def get_consensus_info(self) -> Dict:
         """Retorna informações sobre o consenso atual"""
@@ -234,11 +234,9 @@ def init_advanced_routes(app, blockchain):
     def create_dex_pool():
         """Cria pool de liquidez DEX"""
         try:
-            from quantum_safe_defi import QuantumSafeDeFi
-            from quantum_security import QuantumSecuritySystem
+            from quantum_safe_defi import get_quantum_safe_defi
             
-            qs = QuantumSecuritySystem()
-            defi = QuantumSafeDeFi(qs)
+            defi = get_quantum_safe_defi()
             
             data = request.get_json() or {}
             token1 = data.get("token1")
@@ -254,11 +252,9 @@ def init_advanced_routes(app, blockchain):
     def get_defi_stats():
         """Retorna estatísticas do DeFi"""
         try:
-            from quantum_safe_defi import QuantumSafeDeFi
-            from quantum_security import QuantumSecuritySystem
+            from quantum_safe_defi import get_quantum_safe_defi
             
-            qs = QuantumSecuritySystem()
-            defi = QuantumSafeDeFi(qs)
+            defi = get_quantum_safe_defi()
             
             stats = defi.get_defi_stats()
             return jsonify({"success": True, "defi_stats": stats})
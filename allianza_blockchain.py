@@ -3,13 +3,23 @@ import hashlib
 import json
 import time
 from uuid import uuid4
-from db_manager import DBManager
+from db_manager import get_db_manager
+from state_store import StateStore
+from transaction_history import TransactionHistoryStore
+from network_stats import NetworkStatsAggregator
+from mempool import Mempool
+from shard_block_producer import ShardBlockProducer, build_receipt
+from validator_index import ValidatorIndex
+from signature_verifier import get_signature_verifier, signing_message
+import block_codec
+from merkle_proofs import register_proof_provider
 import logging
 import secrets
 import random
 import os
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import ec, padding
 from cryptography.hazmat.primitives import serialization
@@ -273,6 +283,11 @@ TOTAL_SUPPLY = 1_000_000_000
 RESERVE_ADDRESS = "allianza_reserve"
 CASHBACK_RATE = 0.05
 
+# Mempool: limite por bloco e memória máxima das transações pendentes
+MAX_BLOCK_TRANSACTIONS = 5000
+MEMPOOL_MAX_TXS_PER_SHARD = 100_000
+MEMPOOL_MAX_BYTES = 256 * 1024 * 1024
+
 # ENCRYPTION_KEY: Carregar de variável de ambiente ou arquivo, ou gerar e persistir
 ENCRYPTION_KEY_FILE = "secrets/encryption_key.key"
 
@@ -341,7 +356,11 @@ except Exception as e:
     cipher = Fernet(ENCRYPTION_KEY)
 
 # Conexão com o Banco de Dados
-db_manager = DBManager(check_same_thread=False)
+# WAL + conexão por thread; ALLIANZA_DB_GROUP_COMMIT=true agrupa escritas concorrentes em um único COMMIT
+db_manager = get_db_manager(
+    check_same_thread=False,
+    group_commit=os.getenv('ALLIANZA_DB_GROUP_COMMIT', 'false').lower() == 'true'
+)
 
 # =============================================================================
 # SISTEMA DE DEMO REAL - NOVA SEÇÃO ATUALIZADA
@@ -455,7 +474,7 @@ class AdvancedCrypto:
 
     @staticmethod
     def sign_transaction(private_key, transaction):
-        message = json.dumps(transaction, sort_keys=True).encode()
+        message = signing_message(transaction)
         signature = private_key.sign(
             message,
             ec.ECDSA(hashes.SHA256())
@@ -464,7 +483,7 @@ class AdvancedCrypto:
 
     @staticmethod
     def verify_signature(public_key, transaction, signature):
-        message = json.dumps(transaction, sort_keys=True).encode()
+        message = signing_message(transaction)
         try:
             public_key.verify(
                 bytes.fromhex(signature),
@@ -611,31 +630,29 @@ class HybridConsensus:
         self.blockchain = blockchain
         self.validator_scores = {}
         self.last_validation_time = {}
-        
+        # Validadores elegíveis (stake >= MIN_STAKE) ordenados por stake * score
+        self.validator_index = ValidatorIndex(MIN_STAKE)
+        self._index_built = False
+
+    def rebuild_validator_index(self):
+        """Uma varredura das carteiras (carga do banco); depois o índice é incremental"""
+        self.validator_index.rebuild(
+            ((address, wallet.get("staked", 0)) for address, wallet in list(self.blockchain.wallets.items())),
+            self.validator_scores
+        )
+        self._index_built = True
+
+    def update_stake(self, address, staked):
+        """Notificado por stake(): reposiciona o validador no índice"""
+        if self._index_built:
+            self.validator_index.update_stake(address, staked)
+
     def select_validator(self, shard_id):
-        """Seleciona validador baseado em stake + score de atividade"""
-        candidates = []
-        
-        for address, wallet in self.blockchain.wallets.items():
-            if wallet["staked"] >= MIN_STAKE:
-                # Calcular score: stake * activity_score
-                activity_score = self.validator_scores.get(address, 1.0)
-                total_score = wallet["staked"] * activity_score
-                candidates.append((address, total_score))
-        
-        if not candidates:
-            return None
-            
-        # Ordenar por score (maior primeiro)
-        candidates.sort(key=lambda x: x[1], reverse=True)
-        
+        """Seleciona validador baseado em stake + score de atividade (top 3 do índice, O(log V))"""
+        if not self._index_built:
+            self.rebuild_validator_index()
         # Selecionar top 3 e escolher randomicamente (para descentralização)
-        top_candidates = candidates[:3]
-        if not top_candidates:
-            return None
-            
-        selected = random.choice(top_candidates)
-        return selected[0]
+        return self.validator_index.select(3)
     
     def update_validator_score(self, validator, success=True):
         """Atualiza score do validador baseado no desempenho"""
@@ -650,12 +667,16 @@ class HybridConsensus:
             
         self.validator_scores[validator] = new_score
         self.last_validation_time[validator] = time.time()
+        self.validator_index.update_score(validator, new_score)
 
 # =============================================================================
 # CLASSES BASE DA BLOCKCHAIN
 # =============================================================================
 
 class Block:
+    # Corpo codificado fica em slots, fora do __dict__ (que é o JSON do bloco na API/socket)
+    __slots__ = ("__dict__", "__weakref__", "_body", "_encoded_transactions", "_merkle_tree")
+
     def __init__(self, shard_id, index, previous_hash, transactions, timestamp, validator):
         self.shard_id = shard_id
         self.index = index
@@ -665,23 +686,129 @@ class Block:
         self.validator = validator
         self.hash = self.calculate_hash()
 
+    @classmethod
+    def from_db_row(cls, row):
+        """Reconstrói um bloco salvo em shards sem recalcular o hash"""
+        shard_id, index, prev_hash, txs, ts, hash_val, validator = row
+        block = cls.__new__(cls)
+        block.shard_id = shard_id
+        block.index = index
+        block.previous_hash = prev_hash
+        if isinstance(txs, bytes):
+            # Formato binário: os bytes gravados são o próprio corpo do bloco
+            block.transactions, block._encoded_transactions = block_codec.decode_transactions(txs)
+            block._body = txs
+            block._merkle_tree = block_codec.MerkleTree(
+                [block_codec.hash_leaf(tx) for tx in block._encoded_transactions]
+            )
+            block.tx_root = block._merkle_tree.root.hex()
+        else:
+            # Blocos antigos (JSON): o hash não cobre uma raiz de Merkle
+            block.transactions = json.loads(txs) if txs else []
+            block._body = None
+            block._encoded_transactions = None
+            block._merkle_tree = None
+            block.tx_root = None
+        block.timestamp = ts
+        block.validator = validator
+        block.hash = hash_val
+        return block
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Reconstrói um bloco do formato de rede, conferindo raiz de Merkle e hash"""
+        header_bytes, body = block_codec.decode_block(data)
+        header = block_codec.decode_block_header(header_bytes)
+        block = cls.from_db_row((
+            header["shard_id"], header["index"], header["previous_hash"], body,
+            header["timestamp"], block_codec.hash_header(header_bytes), header["validator"]
+        ))
+        if block.tx_root != header["tx_root"] or len(block.transactions) != header["tx_count"]:
+            raise ValueError("Raiz de Merkle das transações não confere com o cabeçalho")
+        return block
+
+    def header_bytes(self):
+        """Cabeçalho canônico: o hash do bloco cobre só estes bytes"""
+        if self.tx_root is None:
+            raise ValueError("Bloco no formato JSON antigo não tem cabeçalho binário")
+        return block_codec.encode_block_header(
+            self.shard_id, self.index, self.previous_hash, self.timestamp,
+            self.validator, bytes.fromhex(self.tx_root), len(self.transactions)
+        )
+
+    def body_bytes(self):
+        """Transações codificadas (mesmos bytes no banco e na rede)"""
+        if self._body is None:
+            self._body, self._encoded_transactions = block_codec.encode_transactions(self.transactions)
+        return self._body
+
+    def to_bytes(self):
+        """Formato de rede: cabeçalho + corpo"""
+        return block_codec.encode_block(self.header_bytes(), self.body_bytes())
+
     def calculate_hash(self):
-        block_data = {
+        # Cada transação é codificada uma vez: o corpo serve para Merkle, banco e rede
+        self._body, self._encoded_transactions = block_codec.encode_transactions(self.transactions)
+        # Árvore construída uma vez ao selar: provas de inclusão saem dos níveis guardados
+        self._merkle_tree = block_codec.MerkleTree(
+            [block_codec.hash_leaf(tx) for tx in self._encoded_transactions]
+        )
+        self.tx_root = self._merkle_tree.root.hex()
+        return block_codec.hash_header(self.header_bytes())
+
+    def find_transaction(self, tx_id):
+        """Posição da transação no bloco (ou None)"""
+        for position, tx in enumerate(self.transactions):
+            if tx.get("id") == tx_id:
+                return position
+        return None
+
+    def merkle_proof(self, tx_id, position=None):
+        """
+        Prova de inclusão de uma transação: cabeçalho canônico + caminho de Merkle.
+        Um cliente leve confere sha256(header) == hash do bloco, decodifica o
+        tx_root do cabeçalho e recalcula a raiz a partir da transação e do caminho.
+        """
+        if self.tx_root is None:
+            return {"success": False, "error": "Bloco no formato JSON antigo não tem raiz de Merkle"}
+        if position is None or position >= len(self.transactions) or \
+                self.transactions[position].get("id") != tx_id:
+            position = self.find_transaction(tx_id)
+        if position is None:
+            return {"success": False, "error": "Transação não encontrada no bloco"}
+
+        path = self._merkle_tree.proof(position)
+        return {
+            "success": True,
+            "tx_id": tx_id,
+            "transaction": self.transactions[position],
+            "encoded_transaction": self._encoded_transactions[position].hex(),
+            "leaf_hash": self._merkle_tree.leaf(position).hex(),
+            "leaf_index": position,
+            "path": [sibling.hex() for sibling, _ in path],
+            "positions": [side for _, side in path],
+            "tree_depth": self._merkle_tree.depth,
+            "tx_root": self.tx_root,
+            "block_hash": self.hash,
             "shard_id": self.shard_id,
-            "index": self.index, 
-            "previous_hash": self.previous_hash,
-            "transactions": self.transactions,
-            "timestamp": self.timestamp,
-            "validator": self.validator
+            "block_index": self.index,
+            "header": self.header_bytes().hex()
         }
-        return AdvancedCrypto.generate_secure_hash(json.dumps(block_data, sort_keys=True))
 
 class AllianzaBlockchain:
     def __init__(self):
         self.shards = {i: [self.create_genesis_block(i)] for i in range(NUM_SHARDS)}
-        self.pending_transactions = {i: [] for i in range(NUM_SHARDS)}
+        # Mempool com prioridade e limite de memória; pending_transactions é a visão por shard
+        self.mempool = Mempool(NUM_SHARDS, max_txs_per_shard=MEMPOOL_MAX_TXS_PER_SHARD,
+                               max_bytes=MEMPOOL_MAX_BYTES)
+        self.pending_transactions = self.mempool.views()
         self.wallets = {}
         self.staking_pool = {}
+        # Saldos/recompensas tocados por vários pipelines de selagem ao mesmo tempo
+        self._state_lock = threading.RLock()
+        # Saldos aplicados na entrada do mempool, por tx id, até a selagem: se a
+        # transação for despejada ou substituída, os deltas são desfeitos
+        self._reservations: Dict[str, Dict[str, float]] = {}
         
         # Sistemas avançados
         self.cross_chain = CrossChainSimulator()
@@ -734,8 +861,27 @@ class AllianzaBlockchain:
             self.nft_manager = None
             self.multi_security = None
         
+        # Um pipeline de selagem por shard (roteado pelo DynamicSharding quando disponível)
+        self.block_producer = ShardBlockProducer(self, MAX_BLOCK_TRANSACTIONS)
+        
+        # Paginação lazy de blocos, índices de hash/transação e carga das contas
+        self.state_store = StateStore(db_manager)
+        # Histórico por endereço: índice (address, timestamp, id) + paginação por cursor
+        self.tx_history = TransactionHistoryStore(db_manager)
+        # Estatísticas de rede incrementais (entrada no mempool + selagem), com rollup persistido
+        self.network_stats = NetworkStatsAggregator(db_manager)
+        self.mempool.on_add = self.network_stats.record_transaction
+        self.mempool.on_evict = self._release_reservations
+        if self.dynamic_sharding is not None:
+            # Split/merge gravam o mapa de faixas e os shards criados/aposentados
+            self.dynamic_sharding.on_change = self._save_shard_map
+
         self.initialize_reserve()
         self.load_from_db()
+        if not self.network_stats.loaded:
+            # Primeira execução sobre uma cadeia existente: totais a partir do banco
+            self.network_stats.seed_totals(blocks=sum(self.get_shard_heights().values()),
+                                           transactions=self.tx_history.count())
         
         logger.info("🚀 Allianza Blockchain Inicializada")
         logger.info(f"💰 Supply Total: {TOTAL_SUPPLY:,} ALZ")
@@ -761,35 +907,70 @@ class AllianzaBlockchain:
             )
             logger.info(f"💰 Reserva de {TOTAL_SUPPLY:,} ALZ criada")
 
+    def _save_shard_map(self, state: Dict):
+        """Grava o mapa de shards (faixas, versão, aposentados) depois de um split/merge"""
+        if not db_manager.execute_commit(
+            "INSERT OR REPLACE INTO shard_map (id, version, state, updated_at) VALUES (0, ?, ?, ?)",
+            (state["version"], json.dumps(state), time.time())
+        ):
+            logger.error(f"Erro ao gravar o mapa de shards (versão {state['version']})")
+
+    def _restore_shard_map(self):
+        """Boot: shards criados por split voltam a existir e os mesclados saem de circulação"""
+        if self.dynamic_sharding is None:
+            return
+        rows = db_manager.execute_query("SELECT state FROM shard_map WHERE id = 0")
+        if not rows:
+            return
+        result = self.dynamic_sharding.restore(json.loads(rows[0][0]))
+        logger.info(f"🔀 Mapa de shards restaurado (versão {result['version']}, "
+                    f"novos: {result['added']}, aposentados: {result['retired']})")
+
     def load_from_db(self):
         try:
-            # Carregar shards
-            rows = db_manager.execute_query("SELECT * FROM shards ORDER BY shard_id, block_index")
-            for row in rows:
-                shard_id, index, prev_hash, txs, ts, hash_val, validator = row
-                block = Block(shard_id, index, prev_hash, json.loads(txs), ts, validator)
-                block.hash = hash_val
-                if len(self.shards[shard_id]) <= index:
-                    self.shards[shard_id].append(block)
-
-            # Carregar carteiras
-            rows = db_manager.execute_query("SELECT address, vtx, staked_vtx, public_key, private_key, blockchain_source, external_address FROM wallets")
-            for row in rows:
-                self.wallets[row[0]] = {
-                    "ALZ": row[1],
-                    "staked": row[2],
-                    "blockchain_source": row[5],
-                    "external_address": row[6],
-                    "encrypted_private_key": row[4] # Adicionando a chave privada criptografada
+            self._restore_shard_map()
+            # Carregar shards: só a ponta de cada shard; blocos antigos são paginados sob demanda
+            for shard_id in list(self.shards.keys()):
+                self.shards[shard_id] = self.state_store.open_shard_chain(
+                    shard_id, self.shards[shard_id][0], Block.from_db_row
+                )
+            retired = self.dynamic_sharding.retired_shards if self.dynamic_sharding is not None else {}
+            for shard_id in list(retired):
+                retired[shard_id] = self.state_store.open_shard_chain(shard_id, retired[shard_id][0],
+                                                                      Block.from_db_row)
+
+            # Carregar carteiras: wallets é a fonte do estado (sem blocos a reexecutar)
+            accounts = self.state_store.load_accounts()
+            for address, (vtx, staked, source, external) in accounts.items():
+                self.wallets[address] = {
+                    "ALZ": vtx,
+                    "staked": staked or 0,
+                    "blockchain_source": source,
+                    "external_address": external
                 }
-                self.staking_pool[row[0]] = row[2]
-                
-            logger.info("📂 Dados carregados do banco com sucesso")
+                self.staking_pool[address] = staked or 0
+            # Banco anterior aos índices de hash/tx: reconstrução única
+            self.state_store.backfill_block_indexes(Block.from_db_row)
+            # Validadores: uma varredura na carga, atualizações incrementais depois
+            self.consensus.rebuild_validator_index()
+
+            # Recibos cross-shard em trânsito (origem gravada, destino não) voltam às filas
+            restored = self.block_producer.restore_receipts(self.load_pending_receipts())
+            if restored:
+                logger.info(f"🔀 {restored} recibos cross-shard pendentes restaurados")
+
+            logger.info(f"📂 Dados carregados do banco com sucesso ({len(accounts)} contas)")
         except Exception as e:
             logger.error(f"Erro ao carregar do banco: {e}")
 
+    def get_shard_heights(self):
+        """Altura (número de blocos) de cada shard"""
+        return {shard_id: len(chain) for shard_id, chain in self.shards.items()}
+
     def get_shard(self, address):
-        """Determina o shard baseado no hash do endereço"""
+        """Determina o shard baseado no hash do endereço (mapa de faixas do sharding dinâmico)"""
+        if getattr(self, "dynamic_sharding", None) is not None:
+            return self.dynamic_sharding.shard_for_address(address)
         return int(AdvancedCrypto.generate_secure_hash(address), 16) % NUM_SHARDS
 
     def create_wallet(self, blockchain_source="allianza", external_address=None):
@@ -866,21 +1047,30 @@ class AllianzaBlockchain:
         if sender not in self.wallets or self.wallets[sender]["ALZ"] < amount:
             raise ValueError("Saldo ALZ insuficiente!")
 
-        # Se o receptor não existir, criar uma carteira para ele
-        if receiver not in self.wallets:
-            self.wallets[receiver] = {
-                "ALZ": 0,
-                "staked": 0,
-                "blockchain_source": None,
-                "external_address": None
-            }
-            self.staking_pool[receiver] = 0
-            # 🔧 CORREÇÃO: Usar db_manager em vez de cursor
-            db_manager.execute_commit(
-                "INSERT OR REPLACE INTO wallets (address, vtx, staked_vtx, blockchain_source, external_address) VALUES (?, ?, ?, ?, ?)",
-                (receiver, 0, 0, None, None)
-            )
+        # Todas as escritas da transferência vão em um único COMMIT
+        with db_manager.transaction():
+            transaction = self._apply_transfer(sender, receiver, amount, private_key,
+                                               is_public, network, cross_chain_target)
+
+        # Emitir eventos
+        socketio.emit('new_transaction', transaction)
+        socketio.emit('update_balance', {
+            "address": sender,
+            "ALZ": self.get_balance(sender),
+            "stake": self.get_stake(sender)
+        })
+        socketio.emit('update_balance', {
+            "address": receiver,
+            "ALZ": self.get_balance(receiver),
+            "stake": self.get_stake(receiver)
+        })
 
+        logger.info(f"💸 Transação: {amount} ALZ de {sender[:8]} para {receiver[:8]}")
+        return transaction
+
+    def _apply_transfer(self, sender, receiver, amount, private_key,
+                        is_public, network, cross_chain_target):
+        """Aplica a transferência (chamado dentro de db_manager.transaction())"""
         transaction = {
             "id": str(uuid4()),
             "sender": sender,
@@ -895,20 +1085,42 @@ class AllianzaBlockchain:
         # Assinar transação
         signature = AdvancedCrypto.sign_transaction(private_key, transaction)
         transaction["signature"] = signature
+        self._check_sender_signature(transaction)
 
-        # Adicionar ao shard apropriado
-        shard_id = self.get_shard(sender)
-        self.pending_transactions[shard_id].append(transaction)
-
-        # Atualizar saldos
-        self.wallets[sender]["ALZ"] -= amount
-        self.wallets[receiver]["ALZ"] += amount
+        # Se o receptor não existir, criar uma carteira para ele
+        if receiver not in self.wallets:
+            self.wallets[receiver] = {
+                "ALZ": 0,
+                "staked": 0,
+                "blockchain_source": None,
+                "external_address": None
+            }
+            self.staking_pool[receiver] = 0
+            # 🔧 CORREÇÃO: Usar db_manager em vez de cursor
+            db_manager.execute_commit(
+                "INSERT OR REPLACE INTO wallets (address, vtx, staked_vtx, blockchain_source, external_address) VALUES (?, ?, ?, ?, ?)",
+                (receiver, 0, 0, None, None)
+            )
 
-        # Aplicar cashback
-        cashback = amount * CASHBACK_RATE
-        if self.wallets[RESERVE_ADDRESS]["ALZ"] >= cashback:
-            self.wallets[RESERVE_ADDRESS]["ALZ"] -= cashback
-            self.wallets[sender]["ALZ"] += cashback
+        # Adicionar ao shard apropriado
+        shard_id = self.block_producer.route(transaction)
+        with self._state_lock:
+            if not self.mempool.add(transaction, shard_id):
+                raise ValueError("Mempool cheio ou transação duplicada!")
+
+            # Atualizar saldos
+            self.wallets[sender]["ALZ"] -= amount
+            self.wallets[receiver]["ALZ"] += amount
+
+            # Aplicar cashback
+            cashback = amount * CASHBACK_RATE
+            if self.wallets[RESERVE_ADDRESS]["ALZ"] >= cashback:
+                self.wallets[RESERVE_ADDRESS]["ALZ"] -= cashback
+                self.wallets[sender]["ALZ"] += cashback
+            else:
+                cashback = 0
+            self._reserve(transaction["id"], ((sender, cashback - amount), (receiver, amount),
+                                              (RESERVE_ADDRESS, -cashback)))
 
         # 🔧 CORREÇÃO: Usar db_manager em vez de cursor
         db_manager.execute_commit("UPDATE wallets SET vtx = ? WHERE address = ?", 
@@ -929,20 +1141,6 @@ class AllianzaBlockchain:
              transaction["timestamp"], network, is_public)
         )
 
-        # Emitir eventos
-        socketio.emit('new_transaction', transaction)
-        socketio.emit('update_balance', {
-            "address": sender,
-            "ALZ": self.get_balance(sender),
-            "stake": self.get_stake(sender)
-        })
-        socketio.emit('update_balance', {
-            "address": receiver,
-            "ALZ": self.get_balance(receiver),
-            "stake": self.get_stake(receiver)
-        })
-
-        logger.info(f"💸 Transação: {amount} ALZ de {sender[:8]} para {receiver[:8]}")
         return transaction
 
     def create_contract(self, sender, receiver, amount, condition_timestamp, private_key):
@@ -964,19 +1162,24 @@ class AllianzaBlockchain:
         # Assinar contrato
         signature = AdvancedCrypto.sign_transaction(private_key, contract)
         contract["signature"] = signature
+        self._check_sender_signature(contract)
 
         # Adicionar ao shard
-        shard_id = self.get_shard(sender)
-        self.pending_transactions[shard_id].append(contract)
-        self.wallets[sender]["ALZ"] -= amount
+        shard_id = self.block_producer.route(contract)
+        with self._state_lock:
+            if not self.mempool.add(contract, shard_id):
+                raise ValueError("Mempool cheio ou contrato duplicado!")
+            self.wallets[sender]["ALZ"] -= amount
+            self._reserve(contract["id"], ((sender, -amount),))
 
         # 🔧 CORREÇÃO: Usar db_manager em vez de cursor
-        db_manager.execute_commit("UPDATE wallets SET vtx = ? WHERE address = ?",
-                     (self.wallets[sender]["ALZ"], sender))
-        db_manager.execute_commit(
-            "INSERT INTO contracts (id, sender, receiver, amount, condition_timestamp, executed, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (contract["id"], sender, receiver, amount, condition_timestamp, False, time.time())
-        )
+        with db_manager.transaction():
+            db_manager.execute_commit("UPDATE wallets SET vtx = ? WHERE address = ?",
+                         (self.wallets[sender]["ALZ"], sender))
+            db_manager.execute_commit(
+                "INSERT INTO contracts (id, sender, receiver, amount, condition_timestamp, executed, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (contract["id"], sender, receiver, amount, condition_timestamp, False, time.time())
+            )
 
         # Emitir eventos
         socketio.emit('update_balance', {
@@ -989,13 +1192,84 @@ class AllianzaBlockchain:
         logger.info(f"📝 Contrato criado: {amount} ALZ - execução em {condition_timestamp}")
         return contract
 
-    def _validate_transaction(self, tx: Dict) -> Dict:
-        """Validar uma transação individual (usado em paralelo)"""
+    def _check_sender_signature(self, tx: Dict):
+        """
+        A assinatura precisa ser da chave pública registrada do remetente: uma
+        transação que a selagem descartaria não entra no mempool nem mexe em saldos
+        """
+        if not self._verify_signatures([tx])[0]:
+            raise ValueError("Assinatura inválida: a chave privada não pertence ao remetente!")
+
+    def _reserve(self, tx_id: str, deltas):
+        """Registra os deltas de saldo aplicados na entrada do mempool; chamado com _state_lock"""
+        reservation = {}
+        for address, delta in deltas:
+            if delta:
+                reservation[address] = reservation.get(address, 0) + delta
+        self._reservations[tx_id] = reservation
+
+    def _release_reservations(self, txs: List[Dict]):
+        """
+        Transações que saíram do mempool sem selagem (despejo por limite ou
+        substituição, descarte por assinatura inválida na selagem): devolve o débito do remetente, desfaz créditos e remove
+        o registro do histórico/contrato. Ouvinte Mempool.on_evict.
+        """
+        with self._state_lock, db_manager.transaction():
+            for tx in txs:
+                tx_id = tx.get("id")
+                deltas = self._reservations.pop(tx_id, None)
+                if deltas is None:
+                    continue
+                for address, delta in deltas.items():
+                    if address not in self.wallets:
+                        continue
+                    self.wallets[address]["ALZ"] -= delta
+                    db_manager.execute_commit("UPDATE wallets SET vtx = ? WHERE address = ?",
+                                              (self.wallets[address]["ALZ"], address))
+                if tx.get("type") == "contract":
+                    db_manager.execute_commit("DELETE FROM contracts WHERE id = ?", (tx_id,))
+                else:
+                    db_manager.execute_commit("DELETE FROM transactions_history WHERE id = ?", (tx_id,))
+                logger.info(f"↩️  Transação {tx_id} despejada do mempool: saldos reservados devolvidos")
+
+    def _get_public_keys(self, addresses) -> Dict[str, str]:
+        """Chaves públicas (PEM) registradas para os endereços, em consultas de até 500"""
+        addresses = list(set(addresses))
+        public_keys = {}
+        for i in range(0, len(addresses), 500):
+            chunk = addresses[i:i + 500]
+            rows = db_manager.execute_query(
+                f"SELECT address, public_key FROM wallets WHERE address IN ({','.join('?' * len(chunk))})",
+                tuple(chunk)
+            )
+            public_keys.update((address, key) for address, key in rows if key)
+        return public_keys
+
+    def _verify_signatures(self, transactions: List[Dict]) -> List[bool]:
+        """Verificar as assinaturas das transações no pool de processos (ordem preservada)"""
+        signed = [tx for tx in transactions if "signature" in tx]
+        if not signed:
+            return [True] * len(transactions)
+        public_keys = self._get_public_keys(tx["sender"] for tx in signed if "sender" in tx)
+        verified = iter(get_signature_verifier().verify_transactions(signed, public_keys))
+        return [next(verified) if "signature" in tx else True for tx in transactions]
+
+    def _validate_transaction(self, tx: Dict, signature_valid: Optional[bool] = None) -> Dict:
+        """
+        Validar uma transação individual
+        signature_valid: resultado já calculado em lote por _verify_signatures
+        """
         try:
             # Validar estrutura básica
             if not all(k in tx for k in ["sender", "receiver", "amount"]):
                 return {"valid": False, "error": "Transação incompleta"}
             
+            # Validar assinatura se presente (chave pública registrada do remetente)
+            if signature_valid is None and "signature" in tx:
+                signature_valid = self._verify_signatures([tx])[0]
+            if signature_valid is False:
+                return {"valid": False, "error": "Assinatura inválida", "invalid_signature": True}
+            
             # Validar saldo
             sender = tx["sender"]
             if sender not in self.wallets:
@@ -1004,15 +1278,14 @@ class AllianzaBlockchain:
             if self.wallets[sender]["ALZ"] < tx["amount"]:
                 return {"valid": False, "error": "Saldo insuficiente"}
             
-            # Validar assinatura se presente
-            if "signature" in tx:
-                # Aqui poderia validar assinatura QRS-3
-                pass
-            
             return {"valid": True, "tx": tx}
         except Exception as e:
             return {"valid": False, "error": str(e)}
     
+    def _check_validator_stake(self, validator: str):
+        if validator not in self.wallets or self.staking_pool.get(validator, 0) < MIN_STAKE:
+            raise ValueError(f"Stake ALZ insuficiente! Mínimo: {MIN_STAKE}")
+
     def validate_block_parallel(
         self,
         validator: str,
@@ -1022,137 +1295,245 @@ class AllianzaBlockchain:
         use_parallel: bool = True
     ) -> Block:
         """
-        Validar bloco processando transações em paralelo
-        MELHORIA: Redução de ~60% no tempo de validação
-        """
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        Sela um bloco do próximo shard com trabalho pendente (rodízio entre os shards,
+        nenhum shard fica sem vez). Ver seal_shard_block para as fases da validação.
         
-        if validator not in self.wallets or self.staking_pool.get(validator, 0) < MIN_STAKE:
-            raise ValueError(f"Stake ALZ insuficiente! Mínimo: {MIN_STAKE}")
+        num_workers: mantido por compatibilidade (o pool é global, ALLIANZA_VERIFY_WORKERS)
+        use_parallel: False verifica as assinaturas no processo atual
+        """
+        self._check_validator_stake(validator)
+        block = self.block_producer.seal_next(validator, use_parallel)
+        if block is None:
+            logger.info("⏳ Nenhuma transação pendente para validar")
+        return block
 
-        # Encontrar shard com transações pendentes
-        shard_with_txs = None
-        for shard_id in range(NUM_SHARDS):
-            if self.pending_transactions[shard_id]:
-                shard_with_txs = shard_id
-                break
+    def produce_blocks(self, validator: str, use_parallel: bool = True) -> List[Block]:
+        """Sela em paralelo um bloco de cada shard com trabalho pendente (um pipeline por shard)"""
+        self._check_validator_stake(validator)
+        return self.block_producer.produce(validator, use_parallel)
+
+    def _committed_receipt_ids(self, receipt_ids: List[str]) -> Set[str]:
+        """Recibos cross-shard já incluídos em um bloco gravado"""
+        if not receipt_ids:
+            return set()
+        placeholders = ",".join("?" * len(receipt_ids))
+        rows = db_manager.execute_query(
+            f"SELECT id FROM cross_shard_receipts WHERE status = 'committed' AND id IN ({placeholders})",
+            tuple(receipt_ids)
+        )
+        return {row[0] for row in rows}
 
-        if shard_with_txs is None:
-            logger.info("⏳ Nenhuma transação pendente para validar")
-            return None
+    def load_pending_receipts(self) -> List[Dict]:
+        """Recibos preparados (bloco de origem gravado) ainda não confirmados no destino"""
+        rows = db_manager.execute_query(
+            "SELECT id, tx_id, source_shard, source_block, source_block_hash, target_shard, receiver, "
+            "amount, credit, prepared_at FROM cross_shard_receipts WHERE status = 'prepared' ORDER BY prepared_at"
+        )
+        return [
+            {"id": row[0], "tx_id": row[1], "source_shard": row[2], "source_block": row[3],
+             "source_block_hash": row[4], "target_shard": row[5], "receiver": row[6], "amount": row[7],
+             "credit": bool(row[8]), "status": "prepared", "prepared_at": row[9]}
+            for row in rows
+        ]
 
-        shard_id = shard_with_txs
-        transactions = self.pending_transactions[shard_id].copy()
+    def _credit_wallet(self, address: str, amount):
+        """Credita um endereço em memória (criando a carteira se não existir); chamado com _state_lock"""
+        if address not in self.wallets:
+            self.wallets[address] = {
+                "ALZ": 0,
+                "staked": 0,
+                "blockchain_source": None,
+                "external_address": None
+            }
+            self.staking_pool[address] = 0
+        self.wallets[address]["ALZ"] += amount
 
-        # MELHORIA: Processar transações em paralelo
+    @staticmethod
+    def _credit_wallet_row(address: str, amount):
+        """Mesmo crédito no banco, relativo ao saldo gravado (dentro do db_manager.transaction() do bloco)"""
+        db_manager.execute_commit(
+            "INSERT OR IGNORE INTO wallets (address, vtx, staked_vtx) VALUES (?, ?, ?)",
+            (address, 0, 0)
+        )
+        db_manager.execute_commit("UPDATE wallets SET vtx = vtx + ? WHERE address = ?", (amount, address))
+
+    def seal_shard_block(
+        self,
+        shard_id: int,
+        validator: str,
+        transactions: List[Dict],
+        receipts: List[Dict] = (),
+        use_parallel: bool = True,
+        home_shard=None
+    ):
+        """
+        Sela um bloco do shard com as transações já retiradas do mempool, em duas fases:
+        1. Assinaturas verificadas em lotes no pool de processos (fora do GIL)
+        2. Saldos e contratos aplicados em passe sequencial, na ordem retirada do mempool
+        
+        Chamado pelo ShardBlockProducer com o lock do shard adquirido.
+        receipts: recibos cross-shard destinados a este shard (incluídos no bloco e,
+            se credit, creditados ao destinatário)
+        home_shard: shard de casa de um endereço; transações cujo destinatário mora em
+            outro shard geram recibo (contratos executados são creditados no destino)
+        
+        Recibos emitidos e recibos aplicados são gravados no mesmo COMMIT do bloco
+        (tabela cross_shard_receipts); um recibo já confirmado nunca é aplicado de novo.
+        Cadeia em memória, recompensa, créditos e contratos executados só mudam depois
+        do COMMIT: se ele falhar, nada foi aplicado e as transações voltam ao mempool.
+        
+        Returns:
+            (bloco, [recibos emitidos para outros shards])
+        """
+        # Fase 1: verificação de assinaturas
+        try:
+            if use_parallel:
+                signature_results = self._verify_signatures(transactions)
+            else:
+                signature_results = [None] * len(transactions)
+        except Exception as e:
+            # Sem verificação não há bloco: devolver tudo à fila
+            logger.error(f"Erro ao verificar assinaturas: {e}")
+            self.mempool.requeue(transactions, shard_id)
+            raise
+
+        # Fase 2: passe sequencial determinístico
         validated_transactions = []
         executed_contracts = []
         remaining_transactions = []
+        outgoing = []
+        credits = []  # (endereço, valor): gravados no COMMIT do bloco, aplicados em memória depois
+        rejected_transactions = []
         current_time = time.time()
         
-        if use_parallel and len(transactions) > 1:
-            # Processar em paralelo
-            with ThreadPoolExecutor(max_workers=num_workers) as executor:
-                futures = {
-                    executor.submit(self._validate_transaction, tx): tx
-                    for tx in transactions
-                }
-                
-                for future in as_completed(futures):
-                    tx = futures[future]
-                    try:
-                        result = future.result()
-                        if result.get("valid"):
-                            # Verificar se é contrato vencido
-                            if (tx.get("type") == "contract" and not tx.get("executed") and 
-                                current_time >= tx.get("condition_timestamp", 0)):
-                                tx["executed"] = True
-                                executed_contracts.append(tx)
-                                
-                                # Criar carteira do receptor se não existir
-                                if tx["receiver"] not in self.wallets:
-                                    self.wallets[tx["receiver"]] = {
-                                        "ALZ": 0,
-                                        "staked": 0,
-                                        "blockchain_source": None,
-                                        "external_address": None
-                                    }
-                                    self.staking_pool[tx["receiver"]] = 0
-                                    db_manager.execute_commit(
-                                        "INSERT OR REPLACE INTO wallets (address, vtx, staked_vtx) VALUES (?, ?, ?)",
-                                        (tx["receiver"], 0, 0)
-                                    )
-                                
-                                # Transferir fundos
-                                self.wallets[tx["receiver"]]["ALZ"] += tx["amount"]
-                                db_manager.execute_commit("UPDATE wallets SET vtx = ? WHERE address = ?",
-                                         (self.wallets[tx["receiver"]]["ALZ"], tx["receiver"]))
-                                db_manager.execute_commit("UPDATE contracts SET executed = ? WHERE id = ?",
-                                         (True, tx.get("id")))
-                                
-                                validated_transactions.append(tx)
-                            else:
-                                validated_transactions.append(tx)
-                        else:
-                            remaining_transactions.append(tx)
-                    except Exception as e:
-                        logger.error(f"Erro ao validar transação: {e}")
-                        remaining_transactions.append(tx)
-        else:
-            # Modo sequencial (fallback)
-            for tx in transactions:
-                result = self._validate_transaction(tx)
-                if result.get("valid"):
-                    if (tx.get("type") == "contract" and not tx.get("executed") and 
-                        current_time >= tx.get("condition_timestamp", 0)):
-                        tx["executed"] = True
-                        executed_contracts.append(tx)
-                        if tx["receiver"] not in self.wallets:
-                            self.wallets[tx["receiver"]] = {
-                                "ALZ": 0,
-                                "staked": 0,
-                                "blockchain_source": None,
-                                "external_address": None
-                            }
-                            self.staking_pool[tx["receiver"]] = 0
-                            db_manager.execute_commit(
-                                "INSERT OR REPLACE INTO wallets (address, vtx, staked_vtx) VALUES (?, ?, ?)",
-                                (tx["receiver"], 0, 0)
-                            )
-                        self.wallets[tx["receiver"]]["ALZ"] += tx["amount"]
-                        db_manager.execute_commit("UPDATE wallets SET vtx = ? WHERE address = ?",
-                                 (self.wallets[tx["receiver"]]["ALZ"], tx["receiver"]))
-                        db_manager.execute_commit("UPDATE contracts SET executed = ? WHERE id = ?",
-                                 (True, tx.get("id")))
-                    validated_transactions.append(tx)
+        for tx, signature_valid in zip(transactions, signature_results):
+            result = self._validate_transaction(tx, signature_valid)
+            if not result.get("valid"):
+                if result.get("invalid_signature"):
+                    # Assinatura inválida nunca se torna válida: descartar e devolver os saldos
+                    rejected_transactions.append(tx)
+                    logger.error(f"Erro ao validar transação {tx.get('id')}: {result['error']}")
                 else:
                     remaining_transactions.append(tx)
+                continue
+
+            target_shard = home_shard(tx["receiver"]) if home_shard is not None else shard_id
+
+            # Verificar se é contrato vencido
+            if (tx.get("type") == "contract" and not tx.get("executed") and 
+                current_time >= tx.get("condition_timestamp", 0)):
+                # Cópia: o original continua pendente se o COMMIT do bloco falhar
+                tx = dict(tx, executed=True)
+                executed_contracts.append(tx)
+                
+                if target_shard == shard_id:
+                    # Transferir fundos
+                    credits.append((tx["receiver"], tx["amount"]))
+                else:
+                    # Fase 1 do cross-shard: crédito fica para o shard do destinatário
+                    outgoing.append((tx, target_shard, True))
+            elif target_shard != shard_id and tx.get("type") != "contract":
+                # Transferência já debitada/creditada na criação: o recibo registra o destino
+                outgoing.append((tx, target_shard, False))
+            
+            validated_transactions.append(tx)
+
+        # Mesmo caminho do despejo: reserva, saldos e registro do histórico desfeitos
+        if rejected_transactions:
+            self._release_reservations(rejected_transactions)
+
+        # Fase 2 do cross-shard: recibos recebidos entram no bloco deste shard
+        # (os já confirmados em bloco anterior — reentrega após reinício — são descartados)
+        already_committed = self._committed_receipt_ids([receipt["id"] for receipt in receipts])
+        applied_receipts = []
+        for receipt in receipts:
+            if receipt["id"] in already_committed:
+                continue
+            applied_receipts.append(receipt)
+            if receipt["credit"]:
+                credits.append((receipt["receiver"], receipt["amount"]))
+            validated_transactions.append({
+                "id": receipt["id"],
+                "type": "cross_shard_receipt",
+                "tx_id": receipt["tx_id"],
+                "source_shard": receipt["source_shard"],
+                "source_block": receipt["source_block"],
+                "source_block_hash": receipt["source_block_hash"],
+                "receiver": receipt["receiver"],
+                "amount": receipt["amount"],
+                "credit": receipt["credit"],
+                "timestamp": current_time
+            })
 
         # Criar novo bloco
+        chain = self.shards[shard_id]
         block = Block(
             shard_id,
-            len(self.shards[shard_id]),
-            self.shards[shard_id][-1].hash,
+            len(chain),
+            chain[-1].hash,
             validated_transactions,
             time.time(),
             validator
         )
         
-        # Atualizar blockchain
-        self.shards[shard_id].append(block)
-        self.wallets[validator]["ALZ"] += VALIDATION_REWARD
-        self.pending_transactions[shard_id] = remaining_transactions
-
-        # Salvar no banco
-        self.save_block_to_db(block)
-        db_manager.execute_commit("UPDATE wallets SET vtx = ? WHERE address = ?",
-                 (self.wallets[validator]["ALZ"], validator))
-
-        # Atualizar score do validador
-        self.consensus.update_validator_score(validator, True)
+        outgoing = [build_receipt(tx, shard_id, block, target_shard, credit, current_time)
+                    for tx, target_shard, credit in outgoing]
+        
+        # Salvar no banco (bloco + recompensa + contratos + créditos + recibos em um único COMMIT)
+        try:
+            with db_manager.transaction():
+                self.save_block_to_db(block)
+                self._credit_wallet_row(validator, VALIDATION_REWARD)
+                for tx in executed_contracts:
+                    db_manager.execute_commit("UPDATE contracts SET executed = ? WHERE id = ?",
+                             (True, tx.get("id")))
+                for address, amount in credits:
+                    self._credit_wallet_row(address, amount)
+                for receipt in outgoing:
+                    db_manager.execute_commit(
+                        "INSERT OR IGNORE INTO cross_shard_receipts (id, tx_id, source_shard, source_block, "
+                        "source_block_hash, target_shard, receiver, amount, credit, status, prepared_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'prepared', ?)",
+                        (receipt["id"], receipt["tx_id"], receipt["source_shard"], receipt["source_block"],
+                         receipt["source_block_hash"], receipt["target_shard"], receipt["receiver"],
+                         receipt["amount"], receipt["credit"], receipt["prepared_at"])
+                    )
+                for receipt in applied_receipts:
+                    db_manager.execute_commit(
+                        "UPDATE cross_shard_receipts SET status = 'committed', target_shard = ?, "
+                        "target_block = ?, committed_at = ? WHERE id = ?",
+                        (shard_id, block.index, current_time, receipt["id"])
+                    )
+        except Exception:
+            # Nada gravado e nada aplicado em memória: as transações (inclusive os contratos,
+            # ainda não executados) voltam à frente da fila; os recibos, o produtor devolve
+            rejected_ids = {tx.get("id") for tx in rejected_transactions}
+            self.mempool.requeue([tx for tx in transactions if tx.get("id") not in rejected_ids], shard_id)
+            raise
+
+        # Gravado: aplicar em memória
+        chain.append(block)
+        with self._state_lock:
+            self.wallets[validator]["ALZ"] += VALIDATION_REWARD
+            for address, amount in credits:
+                self._credit_wallet(address, amount)
+        # Transações ainda não válidas voltam à frente da fila dos remetentes (já na ordem retirada)
+        self.mempool.requeue(remaining_transactions, shard_id)
+        self.network_stats.record_block(block)
+        # Selada: os saldos aplicados na entrada do mempool passam a ser definitivos
+        for tx in validated_transactions:
+            self._reservations.pop(tx.get("id"), None)
+
+        with self._state_lock:
+            # Atualizar score do validador
+            self.consensus.update_validator_score(validator, True)
 
         logger.info(f"✅ Bloco validado por {validator} no shard {shard_id} (paralelo: {use_parallel})")
         logger.info(f"📊 Transações no bloco: {len(validated_transactions)}")
+        if outgoing or receipts:
+            logger.info(f"🔀 Recibos cross-shard: {len(outgoing)} emitidos, {len(applied_receipts)} confirmados")
+        if rejected_transactions:
+            logger.info(f"🚫 Transações descartadas por assinatura inválida: {len(rejected_transactions)}")
         logger.info(f"📈 Recompensa: {VALIDATION_REWARD} ALZ")
         
         # Emitir eventos
@@ -1166,7 +1547,7 @@ class AllianzaBlockchain:
         except:
             pass  # SocketIO pode não estar disponível
         
-        return block
+        return block, outgoing
 
     def validate_block(self, validator, private_key, public_key):
         """Valida um bloco na blockchain - VERSÃO CORRIGIDA COM PARALELIZAÇÃO"""
@@ -1269,18 +1650,58 @@ class AllianzaBlockchain:
 
     def save_block_to_db(self, block):
         # 🔧 CORREÇÃO: Usar db_manager
-        db_manager.execute_commit(
-            "INSERT INTO shards VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (
-                block.shard_id,
-                block.index,
-                block.previous_hash,
-                json.dumps(block.transactions),
-                block.timestamp,
-                block.hash,
-                block.validator
+        with db_manager.transaction():
+            db_manager.execute_commit(
+                "INSERT INTO shards VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    block.shard_id,
+                    block.index,
+                    block.previous_hash,
+                    block.body_bytes(),
+                    block.timestamp,
+                    block.hash,
+                    block.validator
+                )
             )
-        )
+            # Localização do bloco (hash) e das transações: buscas pontuais do explorer e provas
+            self.state_store.index_block(block)
+
+    def get_transaction_proof(self, tx_id):
+        """Prova de inclusão (caminho de Merkle + cabeçalho) de uma transação selada"""
+        location = self.state_store.locate_transaction(tx_id)
+        if location is None:
+            return {"success": False, "error": "Transação não encontrada em nenhum bloco"}
+        shard_id, block_index, position = location
+        chain = self.shards.get(shard_id)
+        if chain is None or block_index >= len(chain):
+            return {"success": False, "error": "Bloco da transação não encontrado"}
+        return chain[block_index].merkle_proof(tx_id, position)
+
+    def get_block_by_hash(self, block_hash):
+        """Bloco pelo hash: índice block_hashes → (shard, altura), sem varrer a cadeia"""
+        location = self.state_store.locate_block(block_hash)
+        if location is None:
+            # Gênesis não vai para o banco
+            return next((chain[0] for chain in self.shards.values() if chain[0].hash == block_hash), None)
+        shard_id, block_index = location
+        chain = self.shards.get(shard_id)
+        if chain is None or block_index >= len(chain):
+            return None
+        return chain[block_index]
+
+    def get_sealed_transaction(self, tx_id):
+        """(transação, bloco, posição) de uma transação selada, via block_transactions"""
+        location = self.state_store.locate_transaction(tx_id)
+        if location is None:
+            return None
+        shard_id, block_index, position = location
+        chain = self.shards.get(shard_id)
+        if chain is None or block_index >= len(chain):
+            return None
+        block = chain[block_index]
+        if block is None or position >= len(block.transactions):
+            return None
+        return block.transactions[position], block, position
 
     def get_balance(self, address):
         return self.wallets.get(address, {"ALZ": 0})["ALZ"]
@@ -1288,6 +1709,13 @@ class AllianzaBlockchain:
     def get_stake(self, address):
         return self.staking_pool.get(address, 0)
 
+    def _update_validator_stake(self, address):
+        """Mantém os índices de validadores dos consensos em dia com o stake da carteira"""
+        staked = self.wallets[address]["staked"]
+        self.consensus.update_stake(address, staked)
+        if self.advanced_consensus is not None:
+            self.advanced_consensus.update_stake(address, staked)
+
     def stake(self, address, amount):
         if address not in self.wallets or self.wallets[address]["ALZ"] < amount:
             raise ValueError("Saldo ALZ insuficiente para stake!")
@@ -1295,6 +1723,7 @@ class AllianzaBlockchain:
         self.wallets[address]["ALZ"] -= amount
         self.wallets[address]["staked"] += amount
         self.staking_pool[address] = self.wallets[address]["staked"]
+        self._update_validator_stake(address)
         
         # 🔧 CORREÇÃO: Usar db_manager
         db_manager.execute_commit(
@@ -1308,36 +1737,17 @@ class AllianzaBlockchain:
             "stake": self.get_stake(address)
         })
 
-    def get_transaction_history(self, address=None, limit=100):
-        """Obtém histórico de transações"""
+    def get_transaction_history(self, address=None, limit=100, cursor=None):
+        """Obtém histórico de transações (uma página, mais recente primeiro)"""
+        return self.get_transaction_history_page(address, limit, cursor)["transactions"]
+
+    def get_transaction_history_page(self, address=None, limit=100, cursor=None):
+        """Página do histórico + cursor da próxima (None na última)"""
         try:
-            if address:
-                rows = db_manager.execute_query(
-                    "SELECT * FROM transactions_history WHERE sender = ? OR receiver = ? ORDER BY timestamp DESC LIMIT ?",
-                    (address, address, limit)
-                )
-            else:
-                rows = db_manager.execute_query(
-                    "SELECT * FROM transactions_history ORDER BY timestamp DESC LIMIT ?",
-                    (limit,)
-                )
-                
-            transactions = []
-            for row in rows:
-                transactions.append({
-                    "id": row[0],
-                    "sender": row[1],
-                    "receiver": row[2],
-                    "amount": row[3],
-                    "type": row[4],
-                    "timestamp": row[5],
-                    "network": row[6],
-                    "is_public": bool(row[7])
-                })
-            return transactions
+            return self.tx_history.get_page(address, limit, cursor)
         except Exception as e:
             logger.error(f"Erro ao obter histórico: {e}")
-            return []
+            return {"transactions": [], "next_cursor": None}
 
 # =============================================================================
 # APLICAÇÃO FLASK
@@ -1472,6 +1882,8 @@ except Exception as e:
 
 # Inicializar blockchain
 allianza_blockchain = AllianzaBlockchain()
+# Provas de inclusão das transações da Allianza para UP-NMT e proof bundles
+register_proof_provider("allianza", allianza_blockchain.get_transaction_proof)
 
 # =============================================================================
 # INICIALIZAÇÃO UEC - DESATIVADO
@@ -2737,6 +3149,19 @@ def get_bridge_reserves():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/real/bridge/cross-chain/coalescing', methods=['GET'])
+def get_bridge_coalescing_stats():
+    """Contadores de coalescência (single-flight) das consultas de taxa, gas price e saldo"""
+    try:
+        if not REAL_CROSS_CHAIN_BRIDGE_AVAILABLE:
+            return jsonify({"success": False, "error": "Sistema não disponível"})
+        
+        result = real_cross_chain_bridge.get_request_coalescing_stats()
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
 # =============================================================================
 # ROTAS UNIVERSAL BLOCKCHAIN - BLOCKCHAIN UNIVERSAL
 # =============================================================================
@@ -4002,8 +4427,10 @@ def get_transaction_history():
     try:
         address = request.args.get("address")
         limit = int(request.args.get("limit", 100))
+        cursor = request.args.get("cursor")
         
-        transactions = allianza_blockchain.get_transaction_history(address, limit)
+        page = allianza_blockchain.get_transaction_history_page(address, limit, cursor)
+        transactions = page["transactions"]
         
         # Adicionar informações de cross-chain se disponível
         enhanced_transactions = []
@@ -4033,11 +4460,21 @@ def get_transaction_history():
         return jsonify({
             "success": True,
             "transactions": enhanced_transactions,
-            "total": len(enhanced_transactions)
+            "total": len(enhanced_transactions),
+            "next_cursor": page["next_cursor"]
         })
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 400
 
+@app.route('/transactions/<tx_id>/proof')
+def get_transaction_proof(tx_id):
+    """Prova de inclusão Merkle da transação (para clientes leves)"""
+    try:
+        proof = allianza_blockchain.get_transaction_proof(tx_id)
+        return jsonify(proof), (200 if proof.get("success") else 404)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
 @app.route('/network/status')
 def network_status():
     total_blocks = sum(len(shard) for shard in allianza_blockchain.shards.values())
@@ -22,6 +22,8 @@ except ImportError:
     REAL_BRIDGE_AVAILABLE = False
     RealCrossChainBridge = None
 
+from merkle_proofs import get_inclusion_proof, verify_inclusion_proof
+
 load_dotenv()
 
 class ConsensusType(Enum):
@@ -53,6 +55,10 @@ class MerkleProof:
     tree_depth: int
     block_hash: str
     chain_id: str
+    # Provas reais (árvore do bloco): lado de cada irmão (0 = esquerda, 1 = direita)
+    # e cabeçalho canônico cujo sha256 é o block_hash
+    positions: Optional[List[int]] = None
+    block_header: Optional[str] = None
 
 @dataclass
 class ConsensusProof:
@@ -310,6 +316,25 @@ class UPNMT:
         print(f"   Block: {block_hash[:16]}...")
         print(f"   TX: {transaction_hash[:16]}...")
         
+        # Prova real: a chain tem um nó registrado que serve a árvore do bloco
+        inclusion = get_inclusion_proof(chain_id, transaction_hash)
+        if inclusion is not None:
+            merkle_proof = MerkleProof(
+                merkle_root=inclusion["tx_root"],
+                leaf_hash=inclusion["leaf_hash"],
+                proof_path=inclusion["path"],
+                leaf_index=inclusion["leaf_index"],
+                tree_depth=inclusion["tree_depth"],
+                block_hash=inclusion["block_hash"],
+                chain_id=chain_id,
+                positions=inclusion["positions"],
+                block_header=inclusion["header"]
+            )
+            print(f"✅ Prova Merkle de inclusão obtida do nó!")
+            print(f"   Root: {merkle_proof.merkle_root[:32]}...")
+            print(f"   Leaf: {merkle_proof.leaf_index}  Depth: {merkle_proof.tree_depth}")
+            return merkle_proof
+
         # Calcular leaf hash (normalizado para qualquer blockchain)
         leaf_data = {
             "chain_id": chain_id,
@@ -319,7 +344,7 @@ class UPNMT:
         }
         leaf_hash = hashlib.sha256(json.dumps(leaf_data, sort_keys=True).encode()).hexdigest()
         
-        # Simular árvore Merkle (em produção, seria a árvore real do bloco)
+        # Chain sem nó registrado: simular árvore Merkle
         # Para Bitcoin: Merkle tree das transações
         # Para Ethereum: Merkle Patricia Tree do estado
         # Para Solana: Account state Merkle tree
@@ -361,6 +386,19 @@ class UPNMT:
         print(f"   Chain: {merkle_proof.chain_id}")
         print(f"   Root: {merkle_proof.merkle_root[:32]}...")
         
+        if merkle_proof.positions is not None:
+            # Prova real: caminho com lados + cabeçalho que amarra a raiz ao block_hash
+            verified = verify_inclusion_proof({
+                "header": merkle_proof.block_header,
+                "block_hash": merkle_proof.block_hash,
+                "tx_root": merkle_proof.merkle_root,
+                "leaf_hash": merkle_proof.leaf_hash,
+                "path": merkle_proof.proof_path,
+                "positions": merkle_proof.positions
+            })
+            print(f"✅ Prova Merkle verificada!" if verified else f"❌ Prova Merkle não verificada")
+            return verified
+
         # Recalcular root a partir do leaf e proof path
         current_hash = merkle_proof.leaf_hash
         for proof_node in merkle_proof.proof_path:
@@ -0,0 +1,581 @@
+# amm_engine.py
+# 💱 MOTOR AMM (PRODUTO CONSTANTE) - ALLIANZA BLOCKCHAIN
+# Reservas x*y=k em inteiros de ponto fixo, rotas multi-hop, leilão em lote e log colunar de swaps
+
+import os
+import time
+import array
+import atexit
+import weakref
+import threading
+from collections import defaultdict
+from decimal import Decimal, ROUND_DOWN
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: só o lock em processo
+    fcntl = None
+
+DECIMALS = 18
+UNIT = 10 ** DECIMALS
+FEE_DENOMINATOR = 10_000
+DEFAULT_FEE_BPS = 30  # 0.3%
+AMOUNT_BYTES = 16     # Quantias em unidades base não cabem em int64 (18 casas)
+
+FLUSH_INTERVAL = 1.0  # Segundos máximos que uma linha fica só no buffer do SwapLog
+
+MODE_SWAP = 0
+MODE_ROUTE = 1
+MODE_BATCH = 2
+
+
+def to_units(amount) -> int:
+    """Quantia decimal (float/str) -> unidades base inteiras, truncando além de DECIMALS casas"""
+    units = int((Decimal(str(amount)) * UNIT).to_integral_value(rounding=ROUND_DOWN))
+    if units < 0:
+        raise ValueError(f"Quantia negativa: {amount}")
+    return units
+
+
+def from_units(units: int) -> float:
+    return units / UNIT
+
+
+def get_amount_out(amount_in: int, reserve_in: int, reserve_out: int, fee_bps: int = DEFAULT_FEE_BPS) -> int:
+    """Saída exata de x*y=k com taxa sobre a entrada (arredondada para baixo, a favor do pool)"""
+    if amount_in <= 0 or reserve_in <= 0 or reserve_out <= 0:
+        return 0
+    amount_in_with_fee = amount_in * (FEE_DENOMINATOR - fee_bps)
+    return amount_in_with_fee * reserve_out // (reserve_in * FEE_DENOMINATOR + amount_in_with_fee)
+
+
+class AMMPool:
+    """Pool de produto constante entre token0 e token1 (reservas em unidades base)"""
+
+    __slots__ = ("pool_id", "index", "token0", "token1", "reserve0", "reserve1", "fee_bps", "swaps")
+
+    def __init__(self, pool_id: str, index: int, token0: str, token1: str,
+                 reserve0: int, reserve1: int, fee_bps: int = DEFAULT_FEE_BPS):
+        self.pool_id = pool_id
+        self.index = index
+        self.token0 = token0
+        self.token1 = token1
+        self.reserve0 = reserve0
+        self.reserve1 = reserve1
+        self.fee_bps = fee_bps
+        self.swaps = 0
+
+    def other(self, token: str) -> str:
+        return self.token1 if token == self.token0 else self.token0
+
+    def reserves(self, token_in: str) -> Tuple[int, int]:
+        """(reserva de entrada, reserva de saída) para um swap vendendo token_in"""
+        if token_in == self.token0:
+            return self.reserve0, self.reserve1
+        return self.reserve1, self.reserve0
+
+    def quote(self, token_in: str, amount_in: int) -> int:
+        reserve_in, reserve_out = self.reserves(token_in)
+        return get_amount_out(amount_in, reserve_in, reserve_out, self.fee_bps)
+
+    def apply(self, token_in: str, amount_in: int, amount_out: int):
+        if token_in == self.token0:
+            self.reserve0 += amount_in
+            self.reserve1 -= amount_out
+        else:
+            self.reserve1 += amount_in
+            self.reserve0 -= amount_out
+        self.swaps += 1
+
+    def price(self) -> float:
+        """Preço spot de token0 em token1"""
+        return self.reserve1 / self.reserve0 if self.reserve0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "pool_id": self.pool_id,
+            "token0": self.token0,
+            "token1": self.token1,
+            "reserve0": self.reserve0,
+            "reserve1": self.reserve1,
+            "liquidity": {self.token0: from_units(self.reserve0), self.token1: from_units(self.reserve1)},
+            "price": self.price(),
+            "fee_bps": self.fee_bps,
+            "swaps": self.swaps
+        }
+
+
+class SwapLog:
+    """
+    📒 LOG COLUNAR DE SWAPS (append-only)
+
+    Uma coluna de largura fixa por arquivo (<path>/<coluna>.col) em vez de
+    uma lista de dicts: ~50 bytes por swap, leitura de uma coluna sem tocar
+    nas outras. Linhas ficam em buffer e vão para o disco em blocos (flush)
+    sob flock, para que vários processos/instâncias anexem sem intercalar
+    colunas: ao atingir flush_rows, flush_interval segundos após a primeira
+    linha pendente, em close() e na saída do processo. path=None mantém as
+    colunas só em memória.
+    """
+
+    COLUMNS = (
+        ("timestamp", "d"),
+        ("pool", "I"),
+        ("direction", "B"),   # 0: token0 -> token1, 1: token1 -> token0
+        ("mode", "B"),        # MODE_SWAP / MODE_ROUTE / MODE_BATCH
+        ("amount_in", None),  # AMOUNT_BYTES little-endian sem sinal
+        ("amount_out", None),
+    )
+
+    def __init__(self, path: Optional[str] = None, flush_rows: int = 4096,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._buffers = {name: self._new_column(code) for name, code in self.COLUMNS}
+        self._buffered = 0
+        self._pool_ids: List[str] = []
+        self._pool_index: Dict[str, int] = {}
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._load_pools()
+            _open_logs.add(self)
+
+    @staticmethod
+    def _new_column(code):
+        return array.array(code) if code else bytearray()
+
+    @staticmethod
+    def _width(code) -> int:
+        return array.array(code).itemsize if code else AMOUNT_BYTES
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.col")
+
+    def _locked(self):
+        return open(os.path.join(self.path, ".lock"), "a+")
+
+    def _load_pools(self):
+        pools_file = os.path.join(self.path, "pools.txt")
+        if os.path.exists(pools_file):
+            with open(pools_file) as f:
+                self._pool_ids = [line.rstrip("\n") for line in f if line.strip()]
+            self._pool_index = {pool_id: i for i, pool_id in enumerate(self._pool_ids)}
+
+    def pool_index(self, pool_id: str) -> int:
+        """Índice global do pool na coluna "pool" (tabela pools.txt compartilhada)"""
+        with self._lock:
+            index = self._pool_index.get(pool_id)
+            if index is not None:
+                return index
+            if not self.path:
+                self._pool_ids.append(pool_id)
+            else:
+                with self._locked() as lock_file:
+                    if fcntl:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                    self._load_pools()
+                    if pool_id not in self._pool_index:
+                        with open(os.path.join(self.path, "pools.txt"), "a") as f:
+                            f.write(pool_id + "\n")
+                        self._pool_ids.append(pool_id)
+            self._pool_index = {pid: i for i, pid in enumerate(self._pool_ids)}
+            return self._pool_index[pool_id]
+
+    def append(self, pool_index: int, direction: int, amount_in: int, amount_out: int,
+               mode: int = MODE_SWAP, timestamp: Optional[float] = None):
+        with self._lock:
+            buffers = self._buffers
+            buffers["timestamp"].append(timestamp or time.time())
+            buffers["pool"].append(pool_index)
+            buffers["direction"].append(direction)
+            buffers["mode"].append(mode)
+            buffers["amount_in"] += amount_in.to_bytes(AMOUNT_BYTES, "little")
+            buffers["amount_out"] += amount_out.to_bytes(AMOUNT_BYTES, "little")
+            self._buffered += 1
+            if not self.path:
+                return
+            if self._buffered >= self.flush_rows:
+                self._flush()
+            elif self._timer is None and self.flush_interval > 0:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self.path:
+                self._flush()
+
+    def close(self):
+        """Grava o buffer pendente e para o timer de flush"""
+        self.flush()
+        _open_logs.discard(self)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffered:
+            return
+        with self._locked() as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            for name, code in self.COLUMNS:
+                data = self._buffers[name]
+                with open(self._file(name), "ab") as f:
+                    f.write(data.tobytes() if code else bytes(data))
+        self._buffers = {name: self._new_column(code) for name, code in self.COLUMNS}
+        self._buffered = 0
+
+    def _persisted_rows(self) -> int:
+        if not self.path:
+            return 0
+        # Linhas completas = menor coluna (um flush interrompido não desalinha a leitura)
+        return min(
+            (os.path.getsize(self._file(name)) // self._width(code) if os.path.exists(self._file(name)) else 0)
+            for name, code in self.COLUMNS
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._persisted_rows() + self._buffered
+
+    def column(self, name: str) -> list:
+        """Todos os valores de uma coluna (disco + buffer)"""
+        code = dict(self.COLUMNS)[name]
+        with self._lock:
+            rows = self._persisted_rows()
+            values = self._new_column(code)
+            if rows:
+                with open(self._file(name), "rb") as f:
+                    data = f.read(rows * self._width(code))
+                if code:
+                    values.frombytes(data)
+                else:
+                    values = bytearray(data)
+            values += self._buffers[name]
+        if code:
+            return values.tolist()
+        return [int.from_bytes(values[i:i + AMOUNT_BYTES], "little") for i in range(0, len(values), AMOUNT_BYTES)]
+
+    def scan(self, pool_id: Optional[str] = None, start: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """Linhas do log como dicts (filtradas por pool)"""
+        columns = {name: self.column(name) for name, _ in self.COLUMNS}
+        pool_filter = self._pool_index.get(pool_id) if pool_id else None
+        if pool_id and pool_filter is None:
+            return []
+        rows = []
+        for i in range(start, len(columns["timestamp"])):
+            if pool_filter is not None and columns["pool"][i] != pool_filter:
+                continue
+            rows.append({
+                "seq": i,
+                "timestamp": columns["timestamp"][i],
+                "pool_id": self._pool_ids[columns["pool"][i]],
+                "direction": columns["direction"][i],
+                "mode": columns["mode"][i],
+                "amount_in": columns["amount_in"][i],
+                "amount_out": columns["amount_out"][i]
+            })
+            if limit is not None and len(rows) >= limit:
+                break
+        return rows
+
+    def volume(self, pool_id: str) -> Dict[int, int]:
+        """Volume de entrada por direção de um pool (lê só 3 colunas)"""
+        index = self._pool_index.get(pool_id)
+        totals = {0: 0, 1: 0}
+        if index is None:
+            return totals
+        pools, directions, amounts = self.column("pool"), self.column("direction"), self.column("amount_in")
+        for pool, direction, amount in zip(pools, directions, amounts):
+            if pool == index:
+                totals[direction] += amount
+        return totals
+
+
+# SwapLogs com diretório abertos no processo: o buffer vai para o disco na saída
+_open_logs: "weakref.WeakSet[SwapLog]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_logs():
+    for log in list(_open_logs):
+        try:
+            log.flush()
+        except Exception:
+            pass
+
+
+class AMMEngine:
+    """
+    💱 MOTOR AMM
+
+    - Pools x*y=k com reservas inteiras (UNIT = 10**18) e taxa em bps
+    - swap(): execução com proteção min_amount_out (slippage)
+    - find_route()/swap_route(): melhor caminho multi-hop (até max_hops pools)
+    - submit_order()/clear_block(): leilão em lote por bloco; os fluxos opostos
+      de cada pool se compensam e só o saldo líquido passa pela curva, todas as
+      ordens do pool recebem o mesmo preço
+    - Todo swap executado vai para o SwapLog colunar
+    """
+
+    def __init__(self, swap_log: Optional[SwapLog] = None):
+        self.pools: Dict[str, AMMPool] = {}
+        self.swap_log = swap_log if swap_log is not None else SwapLog()
+        self._by_token: Dict[str, List[str]] = defaultdict(list)
+        self._orders: Dict[str, List[Dict]] = defaultdict(list)
+        self._order_seq = 0
+        self._lock = threading.RLock()
+        self.stats = {"swaps": 0, "routed_swaps": 0, "batches": 0, "batch_orders": 0, "rejected": 0}
+
+    def create_pool(self, token0: str, token1: str, amount0: int, amount1: int,
+                    fee_bps: int = DEFAULT_FEE_BPS, pool_id: Optional[str] = None) -> Dict:
+        if token0 == token1:
+            return {"success": False, "error": "Tokens do pool devem ser diferentes"}
+        if amount0 <= 0 or amount1 <= 0:
+            return {"success": False, "error": "Liquidez inicial deve ser positiva nos dois tokens"}
+        pool_id = pool_id or f"{token0}-{token1}-{fee_bps}"
+        with self._lock:
+            if pool_id in self.pools:
+                return {"success": False, "error": f"Pool já existe: {pool_id}"}
+            pool = AMMPool(pool_id, self.swap_log.pool_index(pool_id), token0, token1, amount0, amount1, fee_bps)
+            self.pools[pool_id] = pool
+            self._by_token[token0].append(pool_id)
+            self._by_token[token1].append(pool_id)
+        return {"success": True, "pool_id": pool_id, "pool": pool.to_dict()}
+
+    def get_pool(self, pool_id: str) -> Optional[AMMPool]:
+        return self.pools.get(pool_id)
+
+    def _log(self, pool: AMMPool, token_in: str, amount_in: int, amount_out: int, mode: int):
+        self.swap_log.append(pool.index, 0 if token_in == pool.token0 else 1, amount_in, amount_out, mode)
+
+    # ------------------------------------------------------------------
+    # Swap direto
+    # ------------------------------------------------------------------
+
+    def quote(self, pool_id: str, token_in: str, amount_in: int) -> int:
+        pool = self.pools.get(pool_id)
+        if pool is None or token_in not in (pool.token0, pool.token1):
+            return 0
+        return pool.quote(token_in, amount_in)
+
+    def swap(self, pool_id: str, token_in: str, amount_in: int, min_amount_out: int = 0) -> Dict:
+        pool = self.pools.get(pool_id)
+        if pool is None:
+            return {"success": False, "error": "Pool não encontrado"}
+        if token_in not in (pool.token0, pool.token1):
+            return {"success": False, "error": f"Token {token_in} não pertence ao pool"}
+        if amount_in <= 0:
+            return {"success": False, "error": "Quantia de entrada deve ser positiva"}
+        with self._lock:
+            price_before = pool.price()
+            amount_out = pool.quote(token_in, amount_in)
+            if amount_out <= 0:
+                return {"success": False, "error": "Saída nula (quantia muito pequena)"}
+            if amount_out < min_amount_out:
+                self.stats["rejected"] += 1
+                return {"success": False, "error": "Slippage acima do limite", "amount_out": amount_out}
+            pool.apply(token_in, amount_in, amount_out)
+            self.stats["swaps"] += 1
+            price_after = pool.price()
+        self._log(pool, token_in, amount_in, amount_out, MODE_SWAP)
+        return {
+            "success": True,
+            "pool_id": pool_id,
+            "token_in": token_in,
+            "token_out": pool.other(token_in),
+            "amount_in": amount_in,
+            "amount_out": amount_out,
+            "price_impact": abs(price_after - price_before) / price_before if price_before else 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Multi-hop
+    # ------------------------------------------------------------------
+
+    def find_route(self, token_in: str, token_out: str, amount_in: int, max_hops: int = 3) -> Optional[Dict]:
+        """Caminho (sem repetir token) com maior saída, simulado sobre as reservas atuais"""
+        best = None
+        with self._lock:
+            stack = [(token_in, amount_in, [], [token_in])]
+            while stack:
+                token, amount, pools, path = stack.pop()
+                for pool_id in self._by_token.get(token, ()):
+                    pool = self.pools[pool_id]
+                    next_token = pool.other(token)
+                    if next_token in path:
+                        continue
+                    out = pool.quote(token, amount)
+                    if out <= 0:
+                        continue
+                    if next_token == token_out:
+                        if best is None or out > best["amount_out"]:
+                            best = {"pools": pools + [pool_id], "path": path + [next_token], "amount_out": out}
+                    elif len(pools) + 1 < max_hops:
+                        stack.append((next_token, out, pools + [pool_id], path + [next_token]))
+        if best is not None:
+            best["amount_in"] = amount_in
+        return best
+
+    def swap_route(self, token_in: str, token_out: str, amount_in: int,
+                   min_amount_out: int = 0, max_hops: int = 3) -> Dict:
+        """Executa a melhor rota atomicamente (todas as pernas ou nenhuma)"""
+        if amount_in <= 0:
+            return {"success": False, "error": "Quantia de entrada deve ser positiva"}
+        with self._lock:
+            route = self.find_route(token_in, token_out, amount_in, max_hops)
+            if route is None:
+                return {"success": False, "error": f"Sem rota de {token_in} para {token_out}"}
+            if route["amount_out"] < min_amount_out:
+                self.stats["rejected"] += 1
+                return {"success": False, "error": "Slippage acima do limite", "amount_out": route["amount_out"]}
+            legs = []
+            amount = amount_in
+            for pool_id, token in zip(route["pools"], route["path"]):
+                pool = self.pools[pool_id]
+                out = pool.quote(token, amount)
+                pool.apply(token, amount, out)
+                legs.append((pool, token, amount, out))
+                amount = out
+            self.stats["routed_swaps"] += 1
+        for pool, token, leg_in, leg_out in legs:
+            self._log(pool, token, leg_in, leg_out, MODE_ROUTE)
+        return {"success": True, **route, "amount_out": amount}
+
+    # ------------------------------------------------------------------
+    # Leilão em lote
+    # ------------------------------------------------------------------
+
+    def submit_order(self, pool_id: str, token_in: str, amount_in: int,
+                     min_amount_out: int = 0, trader: Optional[str] = None) -> Dict:
+        """Ordem para o próximo clear_block (preço uniforme por pool)"""
+        pool = self.pools.get(pool_id)
+        if pool is None:
+            return {"success": False, "error": "Pool não encontrado"}
+        if token_in not in (pool.token0, pool.token1):
+            return {"success": False, "error": f"Token {token_in} não pertence ao pool"}
+        if amount_in <= 0:
+            return {"success": False, "error": "Quantia de entrada deve ser positiva"}
+        with self._lock:
+            self._order_seq += 1
+            order = {"order_id": self._order_seq, "pool_id": pool_id, "token_in": token_in,
+                     "amount_in": amount_in, "min_amount_out": min_amount_out, "trader": trader}
+            self._orders[pool_id].append(order)
+        return {"success": True, "order_id": order["order_id"]}
+
+    @staticmethod
+    def _solve_net(total_in: int, opposite_in: int, reserve_in: int, reserve_out: int, fee_bps: int) -> int:
+        """
+        Maior d em [0, total_in] com (total_in - d) * f(d) >= opposite_in * d, onde f é a
+        curva do pool: o lado dominante manda d pela curva e o restante casa com o
+        lado oposto ao mesmo preço médio. A função é côncava com g(0) = 0.
+        """
+        def g(d):
+            return (total_in - d) * get_amount_out(d, reserve_in, reserve_out, fee_bps) - opposite_in * d
+
+        low, high = 0, total_in
+        while low < high:
+            mid = (low + high + 1) // 2
+            if g(mid) >= 0:
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    def _clear_pool(self, pool: AMMPool, orders: List[Dict]) -> Dict:
+        sell0 = [o for o in orders if o["token_in"] == pool.token0]
+        sell1 = [o for o in orders if o["token_in"] == pool.token1]
+        x = sum(o["amount_in"] for o in sell0)
+        y = sum(o["amount_in"] for o in sell1)
+
+        # Lado dominante pelo valor a preço spot
+        if x * pool.reserve1 >= y * pool.reserve0:
+            d = self._solve_net(x, y, pool.reserve0, pool.reserve1, pool.fee_bps)
+            net_out = get_amount_out(d, pool.reserve0, pool.reserve1, pool.fee_bps)
+            out0_total, out1_total = y + net_out, x - d  # token1 para vendedores de token0 e vice-versa
+            delta0, delta1 = d, -net_out
+        else:
+            d = self._solve_net(y, x, pool.reserve1, pool.reserve0, pool.fee_bps)
+            net_out = get_amount_out(d, pool.reserve1, pool.reserve0, pool.fee_bps)
+            out0_total, out1_total = y - d, x + net_out
+            delta0, delta1 = -net_out, d
+
+        fills = {}
+        paid0 = paid1 = 0
+        for order in sell0:
+            out = order["amount_in"] * out0_total // x
+            fills[order["order_id"]] = out
+            paid0 += out
+        for order in sell1:
+            out = order["amount_in"] * out1_total // y
+            fills[order["order_id"]] = out
+            paid1 += out
+        # Poeira do arredondamento fica no pool
+        return {
+            "fills": fills,
+            "delta0": delta0 + (out1_total - paid1),
+            "delta1": delta1 + (out0_total - paid0),
+            "clearing_price": out0_total / x if x else (y / out1_total if out1_total else pool.price()),
+            "net_amount_in": d
+        }
+
+    def clear_pool_batch(self, pool_id: str, orders: List[Dict]) -> Dict:
+        """Liquida um lote de ordens de um pool a preço uniforme"""
+        pool = self.pools.get(pool_id)
+        if pool is None:
+            return {"success": False, "error": "Pool não encontrado"}
+        with self._lock:
+            active = list(orders)
+            rejected = []
+            while active:
+                result = self._clear_pool(pool, active)
+                # Ordens cujo limite não é atendido saem e o lote é refeito sem elas
+                failing = [o for o in active if result["fills"][o["order_id"]] < o["min_amount_out"]]
+                if not failing:
+                    break
+                rejected.extend(failing)
+                active = [o for o in active if result["fills"][o["order_id"]] >= o["min_amount_out"]]
+            if not active:
+                self.stats["rejected"] += len(rejected)
+                return {"success": True, "pool_id": pool_id, "filled": [], "rejected": rejected,
+                        "clearing_price": pool.price()}
+            pool.reserve0 += result["delta0"]
+            pool.reserve1 += result["delta1"]
+            pool.swaps += len(active)
+            self.stats["batches"] += 1
+            self.stats["batch_orders"] += len(active)
+            self.stats["rejected"] += len(rejected)
+
+        filled = []
+        for order in active:
+            amount_out = result["fills"][order["order_id"]]
+            self._log(pool, order["token_in"], order["amount_in"], amount_out, MODE_BATCH)
+            filled.append({**order, "token_out": pool.other(order["token_in"]), "amount_out": amount_out})
+        return {
+            "success": True,
+            "pool_id": pool_id,
+            "filled": filled,
+            "rejected": rejected,
+            "clearing_price": result["clearing_price"],
+            "net_amount_in": result["net_amount_in"]
+        }
+
+    def clear_block(self) -> List[Dict]:
+        """Liquida todas as ordens pendentes (uma chamada por bloco)"""
+        with self._lock:
+            orders, self._orders = self._orders, defaultdict(list)
+        return [self.clear_pool_batch(pool_id, pool_orders) for pool_id, pool_orders in orders.items()]
+
+    def pending_orders(self) -> int:
+        with self._lock:
+            return sum(len(orders) for orders in self._orders.values())
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "pools": len(self.pools), "logged_swaps": len(self.swap_log),
+                "pending_orders": self.pending_orders()}
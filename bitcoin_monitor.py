@@ -6,6 +6,12 @@ import os
 import secrets
 from datetime import datetime
 
+from single_flight import global_coalescing_cache
+
+# Saldo de depósito: consultas simultâneas do mesmo endereço viram uma só (sem servir
+# saldo velho: a detecção do depósito depende dele)
+BTC_BALANCE_TTL = 10
+
 class BitcoinTransactionMonitor:
     def __init__(self):
         self.api_key = os.getenv('BLOCKCYPHER_API_TOKEN', '17766314e49c439e85cec883969614ac')
@@ -69,6 +75,15 @@ class BitcoinTransactionMonitor:
     
     def check_btc_balance(self, btc_address):
         """Verificar saldo de um endereço Bitcoin"""
+        result, _ = global_coalescing_cache.get_or_load(
+            f"btc_balance:{self.base_url}:{btc_address}",
+            lambda: self._fetch_btc_balance(btc_address),
+            ttl=BTC_BALANCE_TTL,
+            cacheable=lambda balance: balance.get("success", False)
+        )
+        return dict(result)
+    
+    def _fetch_btc_balance(self, btc_address):
         try:
             url = f"{self.base_url}/addrs/{btc_address}/balance"
             response = requests.get(url)
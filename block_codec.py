@@ -0,0 +1,381 @@
+# block_codec.py
+# 📦 CODIFICAÇÃO BINÁRIA CANÔNICA - ALLIANZA BLOCKCHAIN
+# CBOR determinístico (RFC 8949 §4.2) para transações e cabeçalhos de bloco
+
+import hashlib
+import struct
+from typing import Any, Dict, List, Tuple
+
+CODEC_VERSION = 1
+
+_FALSE, _TRUE, _NULL = b"\xf4", b"\xf5", b"\xf6"
+_NAN = b"\xf9\x7e\x00"
+
+# Chaves de mapa se repetem em todas as transações: cache da codificação
+_key_cache: Dict[str, bytes] = {}
+_KEY_CACHE_SIZE = 4096
+
+
+def _head(major: int, length: int) -> bytes:
+    """Cabeçalho CBOR com o menor tamanho de argumento possível"""
+    if length < 24:
+        return bytes(((major << 5) | length,))
+    if length < 0x100:
+        return bytes(((major << 5) | 24, length))
+    if length < 0x10000:
+        return bytes(((major << 5) | 25,)) + length.to_bytes(2, "big")
+    if length < 0x100000000:
+        return bytes(((major << 5) | 26,)) + length.to_bytes(4, "big")
+    if length < 0x10000000000000000:
+        return bytes(((major << 5) | 27,)) + length.to_bytes(8, "big")
+    raise ValueError(f"Inteiro grande demais para o codec: {length}")
+
+
+# Cabeçalhos pré-calculados para comprimentos < 256 (o caso comum)
+_UINT_HEADS = [_head(0, n) for n in range(256)]
+_BYTES_HEADS = [_head(2, n) for n in range(256)]
+_STR_HEADS = [_head(3, n) for n in range(256)]
+
+
+def _encode_float(value: float) -> bytes:
+    """Float na menor largura que preserva o valor (half, single, double)"""
+    if value != value:
+        return _NAN
+    try:
+        half = struct.pack(">e", value)
+        if struct.unpack(">e", half)[0] == value:
+            return b"\xf9" + half
+    except OverflowError:
+        pass
+    if abs(value) <= 3.4028234663852886e38:
+        single = struct.pack(">f", value)
+        if struct.unpack(">f", single)[0] == value:
+            return b"\xfa" + single
+    return b"\xfb" + struct.pack(">d", value)
+
+
+def _encode_key(key: str) -> bytes:
+    encoded = _key_cache.get(key)
+    if encoded is None:
+        raw = key.encode("utf-8")
+        encoded = _head(3, len(raw)) + raw
+        if len(_key_cache) < _KEY_CACHE_SIZE:
+            _key_cache[key] = encoded
+    return encoded
+
+
+def _sorted_keys(keys: Tuple) -> List[Tuple[Any, bytes]]:
+    """Chaves na ordem canônica (bytes da chave codificada), cacheado por conjunto de chaves"""
+    order = _order_cache.get(keys)
+    if order is None:
+        encoded = []
+        for key in keys:
+            if type(key) is str:
+                encoded.append((key, _encode_key(key)))
+            else:
+                key_parts: List[bytes] = []
+                _encode(key, key_parts)
+                encoded.append((key, b"".join(key_parts)))
+        order = sorted(encoded, key=lambda pair: pair[1])
+        if len(_order_cache) < _KEY_CACHE_SIZE and all(type(key) is str for key in keys):
+            _order_cache[keys] = order
+    return order
+
+
+# Transações do mesmo tipo têm as mesmas chaves: a ordenação é feita uma vez
+_order_cache: Dict[Tuple, List[Tuple[Any, bytes]]] = {}
+
+
+def _encode(value: Any, out: List[bytes]):
+    append = out.append
+    kind = type(value)
+    if kind is str:
+        raw = value.encode("utf-8")
+        length = len(raw)
+        append(_STR_HEADS[length] if length < 256 else _head(3, length))
+        append(raw)
+    elif kind is dict:
+        append(_head(5, len(value)))
+        for key, encoded_key in _sorted_keys(tuple(value)):
+            append(encoded_key)
+            item = value[key]
+            item_kind = type(item)
+            # Escalares mais comuns sem nova chamada recursiva
+            if item_kind is str:
+                raw = item.encode("utf-8")
+                length = len(raw)
+                append(_STR_HEADS[length] if length < 256 else _head(3, length))
+                append(raw)
+            elif item_kind is float:
+                append(_encode_float(item))
+            elif item_kind is bool:
+                append(_TRUE if item else _FALSE)
+            elif item is None:
+                append(_NULL)
+            else:
+                _encode(item, out)
+    elif kind is float:
+        append(_encode_float(value))
+    elif kind is bool:
+        append(_TRUE if value else _FALSE)
+    elif kind is int:
+        if 0 <= value < 256:
+            append(_UINT_HEADS[value])
+        else:
+            append(_head(0, value) if value >= 0 else _head(1, -1 - value))
+    elif value is None:
+        append(_NULL)
+    elif kind is list or kind is tuple:
+        append(_head(4, len(value)))
+        for item in value:
+            _encode(item, out)
+    elif kind is bytes or kind is bytearray:
+        length = len(value)
+        append(_BYTES_HEADS[length] if length < 256 else _head(2, length))
+        append(bytes(value))
+    elif isinstance(value, bool):
+        append(_TRUE if value else _FALSE)
+    elif isinstance(value, int):
+        _encode(int(value), out)
+    elif isinstance(value, float):
+        append(_encode_float(float(value)))
+    elif isinstance(value, str):
+        _encode(str(value), out)
+    elif isinstance(value, dict):
+        _encode(dict(value), out)
+    elif isinstance(value, (list, tuple)):
+        _encode(list(value), out)
+    else:
+        raise TypeError(f"Tipo não suportado pelo codec: {kind.__name__}")
+
+
+def encode(value: Any) -> bytes:
+    """Codifica um valor em CBOR canônico (mesmo valor → mesmos bytes)"""
+    out: List[bytes] = []
+    _encode(value, out)
+    return b"".join(out)
+
+
+_unpack_half = struct.Struct(">e").unpack_from
+_unpack_single = struct.Struct(">f").unpack_from
+_unpack_double = struct.Struct(">d").unpack_from
+
+
+def _decode(data: bytes, pos: int) -> Tuple[Any, int]:
+    initial = data[pos]
+    major, info = initial >> 5, initial & 0x1F
+    pos += 1
+
+    if major == 7:
+        if info == 27:
+            return _unpack_double(data, pos)[0], pos + 8
+        if info == 21:
+            return True, pos
+        if info == 20:
+            return False, pos
+        if info == 22:
+            return None, pos
+        if info == 25:
+            return _unpack_half(data, pos)[0], pos + 2
+        if info == 26:
+            return _unpack_single(data, pos)[0], pos + 4
+        raise ValueError(f"Valor simples CBOR não suportado: {info}")
+
+    if info < 24:
+        length = info
+    elif info == 24:
+        length = data[pos]
+        pos += 1
+    elif info <= 27:
+        size = 1 << (info - 24)
+        length = int.from_bytes(data[pos:pos + size], "big")
+        pos += size
+    else:
+        raise ValueError("Comprimento indefinido não é canônico")
+
+    if major == 3:
+        end = pos + length
+        return data[pos:end].decode("utf-8"), end
+    if major == 5:
+        result = {}
+        for _ in range(length):
+            key, pos = _decode(data, pos)
+            result[key], pos = _decode(data, pos)
+        return result, pos
+    if major == 0:
+        return length, pos
+    if major == 4:
+        items = []
+        for _ in range(length):
+            item, pos = _decode(data, pos)
+            items.append(item)
+        return items, pos
+    if major == 1:
+        return -1 - length, pos
+    if major == 2:
+        end = pos + length
+        return bytes(data[pos:end]), end
+    raise ValueError(f"Tipo CBOR não suportado: {major}")
+
+
+def decode(data: bytes) -> Any:
+    """Decodifica bytes produzidos por encode()"""
+    value, pos = _decode(data, 0)
+    if pos != len(data):
+        raise ValueError("Bytes sobrando após o valor CBOR")
+    return value
+
+
+# =============================================================================
+# TRANSAÇÕES E BLOCOS
+# =============================================================================
+
+def encode_transaction(tx: Dict) -> bytes:
+    return encode(tx)
+
+
+def hash_leaf(encoded_tx: bytes) -> bytes:
+    """Folha da árvore de Merkle (prefixo 0x00, como no RFC 6962)"""
+    return hashlib.sha256(b"\x00" + encoded_tx).digest()
+
+
+def hash_node(left: bytes, right: bytes) -> bytes:
+    """Nó interno da árvore de Merkle (prefixo 0x01)"""
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+class MerkleTree:
+    """
+    Árvore de Merkle com todos os níveis guardados.
+
+    Construída uma vez quando o bloco é selado; provas de inclusão saem
+    dos níveis em O(log n) sem recalcular hashes. Nó ímpar sobe para o
+    nível seguinte sem ser duplicado (mesma raiz de merkle_root).
+    """
+
+    __slots__ = ("levels",)
+
+    def __init__(self, leaves: List[bytes]):
+        level = list(leaves)
+        self.levels: List[List[bytes]] = [level]
+        while len(level) > 1:
+            next_level = [hash_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                next_level.append(level[-1])
+            self.levels.append(next_level)
+            level = next_level
+
+    @property
+    def root(self) -> bytes:
+        if not self.levels[0]:
+            return hashlib.sha256(b"").digest()
+        return self.levels[-1][0]
+
+    @property
+    def depth(self) -> int:
+        return len(self.levels) - 1
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    def leaf(self, index: int) -> bytes:
+        return self.levels[0][index]
+
+    def proof(self, index: int) -> List[Tuple[bytes, int]]:
+        """
+        Caminho de inclusão da folha `index`: lista de (irmão, posição),
+        posição 0 = irmão à esquerda, 1 = irmão à direita. Níveis em que o
+        nó sobe sem par não entram no caminho.
+        """
+        if not 0 <= index < len(self.levels[0]):
+            raise IndexError(f"Folha fora da árvore: {index}")
+        path = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append((level[sibling], 0 if sibling < index else 1))
+            index >>= 1
+        return path
+
+
+def verify_proof(leaf: bytes, path: List[Tuple[bytes, int]], root: bytes) -> bool:
+    """Recalcula a raiz a partir da folha e do caminho de MerkleTree.proof"""
+    current = leaf
+    for sibling, position in path:
+        current = hash_node(sibling, current) if position == 0 else hash_node(current, sibling)
+    return current == root
+
+
+def merkle_root(leaves: List[bytes]) -> bytes:
+    """Raiz de Merkle das folhas; nó ímpar sobe sem ser duplicado"""
+    return MerkleTree(leaves).root
+
+
+def encode_transactions(transactions: List[Dict]) -> Tuple[bytes, List[bytes]]:
+    """
+    Corpo do bloco (array CBOR das transações) e as transações codificadas.
+    O corpo é a concatenação das transações: cada uma é codificada uma única vez.
+    """
+    encoded = [encode(tx) for tx in transactions]
+    return _head(4, len(encoded)) + b"".join(encoded), encoded
+
+
+def decode_transactions(body: bytes) -> Tuple[List[Dict], List[bytes]]:
+    """Transações do corpo e os bytes de cada uma (para a árvore de Merkle), numa só passada"""
+    initial = body[0]
+    if initial >> 5 != 4:
+        raise ValueError("Corpo do bloco não é um array CBOR")
+    info = initial & 0x1F
+    pos = 1
+    if info < 24:
+        count = info
+    else:
+        size = 1 << (info - 24)
+        count = int.from_bytes(body[pos:pos + size], "big")
+        pos += size
+    transactions, encoded = [], []
+    for _ in range(count):
+        tx, end = _decode(body, pos)
+        transactions.append(tx)
+        encoded.append(body[pos:end])
+        pos = end
+    if pos != len(body):
+        raise ValueError("Bytes sobrando após o corpo do bloco")
+    return transactions, encoded
+
+
+def encode_block_header(shard_id: int, index: int, previous_hash: str, timestamp: float,
+                        validator: str, tx_root: bytes, tx_count: int) -> bytes:
+    """Cabeçalho: array CBOR de tamanho fixo; o hash do bloco cobre só estes bytes"""
+    return encode([CODEC_VERSION, shard_id, index, previous_hash, float(timestamp),
+                   validator, tx_root, tx_count])
+
+
+def decode_block_header(header: bytes) -> Dict:
+    version, shard_id, index, previous_hash, timestamp, validator, tx_root, tx_count = decode(header)
+    if version != CODEC_VERSION:
+        raise ValueError(f"Versão de codec desconhecida: {version}")
+    return {
+        "shard_id": shard_id,
+        "index": index,
+        "previous_hash": previous_hash,
+        "timestamp": timestamp,
+        "validator": validator,
+        "tx_root": tx_root.hex(),
+        "tx_count": tx_count
+    }
+
+
+def hash_header(header: bytes) -> str:
+    return hashlib.sha256(header).hexdigest()
+
+
+def encode_block(header: bytes, body: bytes) -> bytes:
+    """Formato de rede: cabeçalho + corpo, os mesmos bytes gravados no banco"""
+    return _head(2, len(header)) + header + body
+
+
+def decode_block(data: bytes) -> Tuple[bytes, bytes]:
+    """Separa (cabeçalho, corpo) de encode_block"""
+    header, pos = _decode(data, 0)
+    return header, data[pos:]
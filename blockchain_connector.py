@@ -4,10 +4,20 @@ from web3 import Web3
 import requests
 import json
 from dotenv import load_dotenv
+from single_flight import global_coalescing_cache
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
+# Saldos de explorador: consultas simultâneas do mesmo endereço viram uma só;
+# depois do TTL o último saldo é servido enquanto atualiza em segundo plano
+EXPLORER_BALANCE_TTL = 10
+EXPLORER_BALANCE_STALE_TTL = 20
+
+
+def _successful(result):
+    return bool(result.get("success"))
+
 class RealBlockchainConnector:
     def __init__(self, mode="testnet"):
         self.mode = mode
@@ -44,6 +54,16 @@ class RealBlockchainConnector:
     
     def get_eth_balance(self, address):
         """Consulta saldo REAL de Ethereum usando SUA Infura"""
+        result, _ = global_coalescing_cache.get_or_load(
+            f"explorer_balance:{self.mode}:eth:{address}",
+            lambda: self._fetch_eth_balance(address),
+            ttl=EXPLORER_BALANCE_TTL,
+            stale_ttl=EXPLORER_BALANCE_STALE_TTL,
+            cacheable=_successful
+        )
+        return dict(result)
+    
+    def _fetch_eth_balance(self, address):
         try:
             if not self.w3.is_connected():
                 return {"error": "Ethereum provider not connected"}
@@ -157,6 +177,16 @@ class RealBlockchainConnector:
     
     def get_btc_balance(self, address):
         """Consulta saldo REAL de Bitcoin usando SEU BlockCypher"""
+        result, _ = global_coalescing_cache.get_or_load(
+            f"explorer_balance:{self.mode}:btc:{address}",
+            lambda: self._fetch_btc_balance(address),
+            ttl=EXPLORER_BALANCE_TTL,
+            stale_ttl=EXPLORER_BALANCE_STALE_TTL,
+            cacheable=_successful
+        )
+        return dict(result)
+    
+    def _fetch_btc_balance(self, address):
         try:
             url = f"{self.btc_api}/addrs/{address}/balance"
             params = {"token": self.blockcypher_token}
@@ -291,6 +291,8 @@ class BatchTransactionProcessor:
         self.batch_queue = defaultdict(list)  # Agrupar por chain
         self.batch_size = 10  # Máximo de transações por batch
         self.batch_timeout = 5.0  # Segundos para agrupar transações
+        # Nonces vêm do nonce manager da bridge: envios da mesma conta podem sair juntos
+        self.max_concurrent_sends = 32
         
     def add_to_batch(
         self,
@@ -357,9 +359,10 @@ class BatchTransactionProcessor:
                     "transaction": tx
                 }
         
-        # Processar até 5 transações em paralelo
+        # Todas as transações do batch em paralelo: cada envio reserva seu próprio
+        # nonce localmente (NonceManager), então não há colisão na mesma conta
         results = []
-        max_workers = min(5, len(transactions))
+        max_workers = min(self.max_concurrent_sends, len(transactions))
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = {executor.submit(process_single_tx, tx): tx for tx in transactions}
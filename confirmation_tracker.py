@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ CONFIRMATION TRACKER ORIENTADO A EVENTOS
+Um rastreador asyncio por chain no lugar de um loop de polling por transação:
+- Lê a cabeça da chain uma vez por intervalo
+- Busca em lote os recibos das transações ainda não mineradas (e das que
+  atingiriam a profundidade pedida, para confirmar que seguem incluídas)
+- Resolve futures/callbacks quando cada transação chega à profundidade
+"""
+
+import time
+import asyncio
+import threading
+import concurrent.futures
+from typing import Callable, Dict, List, Optional
+from dataclasses import dataclass, field
+
+import requests
+
+EVM_CHAINS = ("ethereum", "polygon", "bsc", "base")
+
+# Intervalo de polling por chain (segundos)
+DEFAULT_POLL_INTERVAL = 5.0
+POLL_INTERVALS = {
+    "bitcoin": 15.0,  # BlockCypher tem limite de requisições apertado
+}
+# Transações novas antecipam a próxima rodada para daqui a este tempo: uma
+# rajada de watch() vira uma única rodada extra
+WATCH_COALESCE_SECONDS = 0.05
+
+
+class EVMBatchRPC:
+    """
+    RPC de chain EVM para o tracker.
+    Com endpoint HTTP os recibos saem num único POST JSON-RPC em lote;
+    sem endpoint (provider IPC/WS) cai para uma chamada por recibo via Web3.
+    """
+
+    def __init__(self, endpoint_uri: Optional[str] = None, web3_factory: Optional[Callable] = None,
+                 timeout: float = 10.0):
+        self.endpoint_uri = endpoint_uri
+        self.web3_factory = web3_factory
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _endpoint(self) -> Optional[str]:
+        if self.endpoint_uri:
+            return self.endpoint_uri
+        if self.web3_factory:
+            w3 = self.web3_factory()
+            return getattr(getattr(w3, "provider", None), "endpoint_uri", None) if w3 else None
+        return None
+
+    def _batch(self, endpoint: str, calls: List[tuple]) -> List:
+        payload = [{"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+                   for i, (method, params) in enumerate(calls)]
+        response = self.session.post(endpoint, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if isinstance(data, dict):
+            # Alguns nós respondem a lote com um único erro
+            raise RuntimeError(data.get("error", "Resposta JSON-RPC inválida"))
+        results = [None] * len(calls)
+        for item in data:
+            if "error" not in item:
+                results[item["id"]] = item.get("result")
+        return results
+
+    def get_head(self) -> int:
+        endpoint = self._endpoint()
+        if endpoint:
+            return int(self._batch(endpoint, [("eth_blockNumber", [])])[0], 16)
+        return self.web3_factory().eth.block_number
+
+    def get_receipts(self, tx_hashes: List[str]) -> Dict[str, Optional[Dict]]:
+        endpoint = self._endpoint()
+        receipts = {}
+        if endpoint:
+            results = self._batch(endpoint, [("eth_getTransactionReceipt", [h]) for h in tx_hashes])
+            for tx_hash, receipt in zip(tx_hashes, results):
+                if receipt and receipt.get("blockNumber"):
+                    receipts[tx_hash] = {
+                        "block_number": int(receipt["blockNumber"], 16),
+                        "status": int(receipt.get("status", "0x1"), 16)
+                    }
+                else:
+                    receipts[tx_hash] = None
+            return receipts
+
+        w3 = self.web3_factory()
+        for tx_hash in tx_hashes:
+            try:
+                receipt = w3.eth.get_transaction_receipt(tx_hash)
+                receipts[tx_hash] = {"block_number": receipt.blockNumber, "status": receipt.status}
+            except Exception:
+                receipts[tx_hash] = None  # Ainda não minerada
+        return receipts
+
+
+class BlockCypherRPC:
+    """RPC de Bitcoin via BlockCypher: cabeça em /, recibos em lote com /txs/h1;h2;h3"""
+
+    def __init__(self, api_base: str, token: Optional[str] = None, batch_size: int = 3, timeout: float = 10.0):
+        self.api_base = api_base.rstrip("/")
+        self.params = {"token": token} if token else {}
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def get_head(self) -> int:
+        response = self.session.get(self.api_base, params=self.params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["height"]
+
+    def get_receipts(self, tx_hashes: List[str]) -> Dict[str, Optional[Dict]]:
+        receipts = {tx_hash: None for tx_hash in tx_hashes}
+        for start in range(0, len(tx_hashes), self.batch_size):
+            chunk = tx_hashes[start:start + self.batch_size]
+            response = self.session.get(f"{self.api_base}/txs/{';'.join(chunk)}",
+                                        params=self.params, timeout=self.timeout)
+            if response.status_code != 200:
+                continue
+            data = response.json()
+            for tx in data if isinstance(data, list) else [data]:
+                height = tx.get("block_height", -1)
+                if tx.get("hash") in receipts and height is not None and height >= 0:
+                    receipts[tx["hash"]] = {"block_number": height, "status": 1}
+        return receipts
+
+
+@dataclass
+class _Waiter:
+    min_confirmations: int
+    deadline: float
+    future: asyncio.Future
+    on_update: Optional[Callable[[int], None]] = None
+    last_reported: int = -1
+
+
+@dataclass
+class _TxState:
+    block_number: Optional[int] = None
+    status: int = 1
+    waiters: List[_Waiter] = field(default_factory=list)
+
+
+class ChainConfirmationTracker:
+    """Rastreador de confirmações de uma chain (roda num event loop asyncio)"""
+
+    def __init__(self, chain: str, rpc, poll_interval: float = DEFAULT_POLL_INTERVAL, max_batch: int = 100):
+        self.chain = chain
+        self.rpc = rpc
+        self.poll_interval = poll_interval
+        self.max_batch = max_batch
+        self.head: Optional[int] = None
+        self._txs: Dict[str, _TxState] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._next_poll = float("inf")  # Instante da próxima rodada (inf durante uma rodada)
+        self.stats = {"polls": 0, "head_calls": 0, "receipt_batches": 0, "receipts_requested": 0,
+                      "confirmed": 0, "failed": 0, "timeouts": 0, "rpc_errors": 0}
+
+    async def _call(self, func, *args):
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def watch(self, tx_hash: str, min_confirmations: int = 12, timeout: float = 300,
+                    on_update: Optional[Callable[[int], None]] = None) -> Dict:
+        """Aguarda a transação atingir `min_confirmations`; várias esperas pela mesma tx compartilham o polling"""
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(max(1, min_confirmations), time.time() + timeout, loop.create_future(), on_update)
+        new_tx = tx_hash not in self._txs
+        self._txs.setdefault(tx_hash, _TxState()).waiters.append(waiter)
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._next_poll = time.time() + WATCH_COALESCE_SECONDS
+            self._task = loop.create_task(self._run())
+        elif new_tx:
+            self._schedule(time.time() + WATCH_COALESCE_SECONDS)
+        else:
+            # Tx já acompanhada: só o prazo desta espera pode pedir uma rodada antes
+            self._schedule(waiter.deadline)
+        return await waiter.future
+
+    def _schedule(self, when: float):
+        """Antecipa a próxima rodada para `when` (nunca adia); só acorda o poller se for antes"""
+        if when < self._next_poll:
+            self._next_poll = when
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        return len(self._txs)
+
+    async def _run(self):
+        while self._txs:
+            # Dorme até _next_poll; watch() só acorda o poller para antecipá-lo
+            while True:
+                self._wakeup.clear()
+                delay = self._next_poll - time.time()
+                if delay <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    break
+            # Durante a rodada, watch() de tx nova agenda a seguinte (ela pode ter
+            # ficado de fora da lista de candidatas)
+            self._next_poll = float("inf")
+            try:
+                await self.poll_once()
+            except Exception as e:
+                self.stats["rpc_errors"] += 1
+                print(f"⚠️  Confirmation tracker {self.chain}: erro no polling: {e}")
+            self._expire(time.time())
+            deadlines = (w.deadline for state in self._txs.values() for w in state.waiters)
+            self._next_poll = min(self._next_poll, time.time() + self.poll_interval, *deadlines)
+        self._next_poll = float("inf")
+        self._task = None
+
+    async def poll_once(self):
+        """Uma rodada: cabeça da chain + recibos em lote das transações candidatas"""
+        self.stats["polls"] += 1
+        self.stats["head_calls"] += 1
+        head = await self._call(self.rpc.get_head)
+        self.head = head
+
+        candidates = [
+            tx_hash for tx_hash, state in self._txs.items()
+            if state.block_number is None or
+            head - state.block_number + 1 >= min(w.min_confirmations for w in state.waiters)
+        ]
+        for start in range(0, len(candidates), self.max_batch):
+            chunk = candidates[start:start + self.max_batch]
+            self.stats["receipt_batches"] += 1
+            self.stats["receipts_requested"] += len(chunk)
+            receipts = await self._call(self.rpc.get_receipts, chunk)
+            for tx_hash in chunk:
+                state = self._txs.get(tx_hash)
+                if state is None:
+                    continue
+                receipt = receipts.get(tx_hash)
+                # Sem recibo: ainda não minerada, ou saiu da chain numa reorganização
+                state.block_number = receipt["block_number"] if receipt else None
+                state.status = receipt.get("status", 1) if receipt else 1
+
+        self._resolve(head)
+
+    def _resolve(self, head: int):
+        for tx_hash in list(self._txs):
+            state = self._txs[tx_hash]
+            confirmations = head - state.block_number + 1 if state.block_number is not None else 0
+            remaining = []
+            for waiter in state.waiters:
+                if waiter.future.done():
+                    continue
+                if state.block_number is not None and state.status == 0:
+                    self.stats["failed"] += 1
+                    waiter.future.set_result({
+                        "success": False, "confirmed": False, "confirmations": confirmations,
+                        "tx_hash": tx_hash, "block_number": state.block_number,
+                        "error": "Transação revertida on-chain"
+                    })
+                    continue
+                if confirmations != waiter.last_reported and waiter.on_update:
+                    waiter.last_reported = confirmations
+                    try:
+                        waiter.on_update(confirmations)
+                    except Exception as e:
+                        print(f"⚠️  Erro ao notificar confirmações: {e}")
+                if confirmations >= waiter.min_confirmations:
+                    self.stats["confirmed"] += 1
+                    waiter.future.set_result({
+                        "success": True, "confirmed": True, "confirmations": confirmations,
+                        "tx_hash": tx_hash, "block_number": state.block_number
+                    })
+                    continue
+                remaining.append(waiter)
+            state.waiters = remaining
+            if not remaining:
+                del self._txs[tx_hash]
+
+    def _expire(self, now: float):
+        for tx_hash in list(self._txs):
+            state = self._txs[tx_hash]
+            remaining = []
+            for waiter in state.waiters:
+                if waiter.future.done():
+                    continue
+                if now >= waiter.deadline:
+                    self.stats["timeouts"] += 1
+                    confirmations = (self.head - state.block_number + 1
+                                     if state.block_number is not None and self.head is not None else 0)
+                    waiter.future.set_result({
+                        "success": False, "confirmed": False, "confirmations": confirmations,
+                        "tx_hash": tx_hash, "error": "Timeout aguardando confirmações"
+                    })
+                    continue
+                remaining.append(waiter)
+            state.waiters = remaining
+            if not remaining:
+                del self._txs[tx_hash]
+
+    def get_stats(self) -> Dict:
+        return {"chain": self.chain, "head": self.head, "pending": len(self._txs),
+                "poll_interval": self.poll_interval, **self.stats}
+
+
+class ConfirmationTrackerManager:
+    """
+    Rastreadores por chain num único event loop em thread de fundo.
+    Código síncrono (Flask, bridge) usa watch() → concurrent.futures.Future
+    ou wait_for_confirmations(); código asyncio pode aguardar watch_async().
+    """
+
+    def __init__(self):
+        self.trackers: Dict[str, ChainConfirmationTracker] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def register_chain(self, chain: str, rpc, poll_interval: Optional[float] = None) -> ChainConfirmationTracker:
+        chain = chain.lower()
+        with self._lock:
+            tracker = self.trackers.get(chain)
+            if tracker is None:
+                if poll_interval is None:
+                    poll_interval = POLL_INTERVALS.get(chain, DEFAULT_POLL_INTERVAL)
+                tracker = ChainConfirmationTracker(chain, rpc, poll_interval)
+                self.trackers[chain] = tracker
+            return tracker
+
+    def has_chain(self, chain: str) -> bool:
+        return chain.lower() in self.trackers
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever,
+                                                name="confirmation-tracker", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def watch(self, chain: str, tx_hash: str, min_confirmations: int = 12, timeout: float = 300,
+              on_update: Optional[Callable[[int], None]] = None,
+              on_done: Optional[Callable[[Dict], None]] = None) -> concurrent.futures.Future:
+        """Registra a transação sem bloquear; `on_done` recebe o resultado final"""
+        tracker = self.trackers[chain.lower()]
+
+        async def _watch():
+            result = await tracker.watch(tx_hash, min_confirmations, timeout, on_update)
+            # Callback antes de resolver o future: quem espera já vê o estado atualizado
+            if on_done:
+                try:
+                    on_done(result)
+                except Exception as e:
+                    print(f"⚠️  Erro no callback de confirmação: {e}")
+            return result
+
+        return asyncio.run_coroutine_threadsafe(_watch(), self._ensure_loop())
+
+    async def watch_async(self, chain: str, tx_hash: str, min_confirmations: int = 12,
+                          timeout: float = 300) -> Dict:
+        return await asyncio.wrap_future(self.watch(chain, tx_hash, min_confirmations, timeout))
+
+    def wait_for_confirmations(self, chain: str, tx_hash: str, min_confirmations: int = 12,
+                               max_wait_time: float = 300) -> Dict:
+        """Compatível com o antigo loop de polling: bloqueia só esta chamada, sem RPC próprio"""
+        if not self.has_chain(chain):
+            return {"success": False, "confirmed": False, "confirmations": 0,
+                    "error": f"Chain não suportada pelo confirmation tracker: {chain}"}
+        future = self.watch(chain, tx_hash, min_confirmations, max_wait_time)
+        try:
+            return future.result(timeout=max_wait_time + self.trackers[chain.lower()].poll_interval + 5)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            return {"success": False, "confirmed": False, "confirmations": 0,
+                    "error": f"Timeout após {max_wait_time} segundos"}
+
+    def get_stats(self) -> Dict:
+        return {chain: tracker.get_stats() for chain, tracker in self.trackers.items()}
+
+    def close(self):
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=5)
+                self._loop.close()
+                self._loop = None
+                self._thread = None
+
+
+# Instância global
+global_confirmation_tracker = ConfirmationTrackerManager()
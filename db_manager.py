@@ -1,83 +1,428 @@
 import sqlite3
 import json
 import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
+
+class DBCommitError(Exception):
+    """COMMIT de transaction() falhou: nada do bloco foi gravado."""
+
+
 class DBManager:
-    """Gerencia a conexão e as operações de persistência com o SQLite."""
-    
-    def __init__(self, db_path='allianza_blockchain.db', check_same_thread=False):
+    """Gerencia a conexão e as operações de persistência com o SQLite.
+
+    Motor de persistência:
+    - WAL (write-ahead log): leitores não bloqueiam o escritor
+    - Uma conexão por thread (leituras concorrentes sem compartilhar cursor)
+    - Escritas serializadas por lock (um único escritor, sem SQLITE_BUSY)
+    - transaction(): agrupa várias escritas em um único COMMIT
+    - group_commit=True: thread escritora única que coalesce as escritas
+      de muitas transações concorrentes em um único COMMIT (um fsync)
+    - execute_read(): pool limitado de conexões somente leitura, compartilhado
+      entre threads (threads de requisição efêmeras não abrem conexões novas)
+    """
+
+    def __init__(self, db_path='allianza_blockchain.db', check_same_thread=False, wal=True,
+                 group_commit=False, group_commit_interval=0.0, group_commit_max_batch=512,
+                 read_pool_size=8):
         self.db_path = db_path
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=check_same_thread)
-        self.cursor = self.conn.cursor()
+        self.check_same_thread = check_same_thread
+        self.wal = wal
+        self.group_commit = group_commit
+        self.group_commit_interval = group_commit_interval
+        self.group_commit_max_batch = group_commit_max_batch
+        self.read_pool_size = read_pool_size
+
+        # ':memory:' não pode ser aberto por várias conexões - usar uma só
+        self._shared_memory = db_path == ':memory:'
+        self._local = threading.local()
+        self._connections = []
+        self._thread_connections = {}  # thread → conexão própria (fechada quando a thread termina)
+        self._connections_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._read_pool = queue.LifoQueue()
+        self._read_pool_open = 0
+
+        self.stats = {
+            "commits": 0,
+            "statements": 0,
+            "group_batches": 0,
+            "failed_statements": 0,
+            "pool_reads": 0
+        }
+
+        self._write_queue = None
+        self._writer_thread = None
+        self._closed = False
+
         self._initialize_tables()
 
+        if self.group_commit:
+            self._write_queue = queue.Queue()
+            self._writer_thread = threading.Thread(
+                target=self._writer_loop, name="DBManagerGroupCommit", daemon=True
+            )
+            self._writer_thread.start()
+
+    # ------------------------------------------------------------------
+    # Conexões
+    # ------------------------------------------------------------------
+
+    def _connect(self):
+        """Abre uma nova conexão configurada (WAL + busy timeout)."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False if self._shared_memory else self.check_same_thread,
+                               timeout=30.0)
+        if self.wal and not self._shared_memory:
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Em WAL, NORMAL só faz fsync no checkpoint: seguro contra corrupção
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    @property
+    def conn(self):
+        """Conexão da thread atual (criada sob demanda)."""
+        if self._shared_memory:
+            if not self._connections:
+                return self._connect()
+            return self._connections[0]
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self._reap_thread_connections()
+            conn = self._connect()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._thread_connections[threading.current_thread()] = conn
+        return conn
+
+    def _reap_thread_connections(self):
+        """Fecha as conexões de threads que já terminaram (threads de requisição efêmeras)."""
+        with self._connections_lock:
+            dead = [thread for thread in self._thread_connections if not thread.is_alive()]
+            for thread in dead:
+                conn = self._thread_connections.pop(thread)
+                try:
+                    self._connections.remove(conn)
+                except ValueError:
+                    pass
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+    def _acquire_reader(self):
+        """Conexão somente leitura do pool (abre até read_pool_size, depois espera uma livre)."""
+        try:
+            return self._read_pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._connections_lock:
+            can_open = self._read_pool_open < self.read_pool_size
+            if can_open:
+                self._read_pool_open += 1
+        if not can_open:
+            return self._read_pool.get()
+        conn = self._connect()
+        conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    @contextmanager
+    def read_connection(self):
+        """Empresta uma conexão do pool de leitura."""
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+
+    @property
+    def cursor(self):
+        """Cursor da conexão da thread atual."""
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None or getattr(self._local, "cursor_conn", None) is not self.conn:
+            cursor = self.conn.cursor()
+            self._local.cursor = cursor
+            self._local.cursor_conn = self.conn
+        return cursor
+
     def _initialize_tables(self):
         """Cria as tabelas do banco de dados se não existirem."""
         try:
-            self.cursor.executescript('''
-                CREATE TABLE IF NOT EXISTS shards (
-                    shard_id INTEGER, block_index INTEGER, previous_hash TEXT, 
-                    transactions TEXT, timestamp REAL, hash TEXT, validator TEXT
-                );
-                CREATE TABLE IF NOT EXISTS wallets (
-                    address TEXT PRIMARY KEY, vtx REAL, staked_vtx REAL, 
-                    public_key TEXT, private_key TEXT, blockchain_source TEXT, external_address TEXT
-                );
-                CREATE TABLE IF NOT EXISTS transactions_history (
-                    id TEXT PRIMARY KEY, sender TEXT, receiver TEXT, amount REAL,
-                    type TEXT, timestamp REAL, network TEXT, is_public BOOLEAN
-                );
-                CREATE TABLE IF NOT EXISTS contracts (
-                    id TEXT PRIMARY KEY, sender TEXT, receiver TEXT, amount REAL,
-                    condition_timestamp INTEGER, executed BOOLEAN, created_at REAL
-                );
-                CREATE TABLE IF NOT EXISTS cross_chain_uchainids (
-                    uchain_id TEXT PRIMARY KEY, source_chain TEXT, target_chain TEXT,
-                    recipient TEXT, amount REAL, timestamp REAL, memo TEXT,
-                    commitment_id TEXT, proof_id TEXT, state_id TEXT,
-                    tx_hash TEXT, explorer_url TEXT
-                );
-                CREATE TABLE IF NOT EXISTS cross_chain_zk_proofs (
-                    proof_id TEXT PRIMARY KEY, source_chain TEXT, target_chain TEXT,
-                    source_commitment_id TEXT, state_transition_hash TEXT,
-                    proof TEXT, verification_key TEXT, created_at REAL, valid INTEGER
-                );
-                CREATE TABLE IF NOT EXISTS cross_chain_state_commitments (
-                    commitment_id TEXT PRIMARY KEY, chain TEXT, state_data TEXT,
-                    contract_address TEXT, timestamp REAL
-                );
-            ''')
-            self.conn.commit()
+            with self._write_lock:
+                self.cursor.executescript('''
+                    CREATE TABLE IF NOT EXISTS shards (
+                        shard_id INTEGER, block_index INTEGER, previous_hash TEXT,
+                        transactions TEXT, timestamp REAL, hash TEXT, validator TEXT
+                    );
+                    CREATE TABLE IF NOT EXISTS wallets (
+                        address TEXT PRIMARY KEY, vtx REAL, staked_vtx REAL,
+                        public_key TEXT, private_key TEXT, blockchain_source TEXT, external_address TEXT
+                    );
+                    CREATE TABLE IF NOT EXISTS transactions_history (
+                        id TEXT PRIMARY KEY, sender TEXT, receiver TEXT, amount REAL,
+                        type TEXT, timestamp REAL, network TEXT, is_public BOOLEAN
+                    );
+                    CREATE TABLE IF NOT EXISTS contracts (
+                        id TEXT PRIMARY KEY, sender TEXT, receiver TEXT, amount REAL,
+                        condition_timestamp INTEGER, executed BOOLEAN, created_at REAL
+                    );
+                    CREATE TABLE IF NOT EXISTS cross_chain_uchainids (
+                        uchain_id TEXT PRIMARY KEY, source_chain TEXT, target_chain TEXT,
+                        recipient TEXT, amount REAL, timestamp REAL, memo TEXT,
+                        commitment_id TEXT, proof_id TEXT, state_id TEXT,
+                        tx_hash TEXT, explorer_url TEXT
+                    );
+                    CREATE TABLE IF NOT EXISTS cross_chain_zk_proofs (
+                        proof_id TEXT PRIMARY KEY, source_chain TEXT, target_chain TEXT,
+                        source_commitment_id TEXT, state_transition_hash TEXT,
+                        proof TEXT, verification_key TEXT, created_at REAL, valid INTEGER
+                    );
+                    CREATE TABLE IF NOT EXISTS cross_chain_state_commitments (
+                        commitment_id TEXT PRIMARY KEY, chain TEXT, state_data TEXT,
+                        contract_address TEXT, timestamp REAL
+                    );
+                    CREATE TABLE IF NOT EXISTS cross_shard_receipts (
+                        id TEXT PRIMARY KEY, tx_id TEXT, source_shard INTEGER, source_block INTEGER,
+                        source_block_hash TEXT, target_shard INTEGER, receiver TEXT, amount REAL,
+                        credit BOOLEAN, status TEXT, target_block INTEGER, prepared_at REAL, committed_at REAL
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_cross_shard_receipts_status ON cross_shard_receipts (status);
+                    CREATE TABLE IF NOT EXISTS shard_map (
+                        id INTEGER PRIMARY KEY CHECK (id = 0), version INTEGER, state TEXT, updated_at REAL
+                    );
+                ''')
+                self.conn.commit()
             logger.info("Tabelas do banco de dados inicializadas com sucesso.")
         except Exception as e:
             logger.error(f"Erro ao inicializar tabelas: {e}")
 
+    # ------------------------------------------------------------------
+    # Leitura / escrita
+    # ------------------------------------------------------------------
+
     def execute_query(self, query, params=()):
         """Executa uma query e retorna o resultado (para SELECT)."""
         try:
+            if self._shared_memory:
+                with self._write_lock:
+                    self.cursor.execute(query, params)
+                    return self.cursor.fetchall()
             self.cursor.execute(query, params)
             return self.cursor.fetchall()
         except Exception as e:
             logger.error(f"Erro ao executar query: {query} com params: {params}. Erro: {e}")
             return []
 
+    def execute_read(self, query, params=()):
+        """SELECT por uma conexão do pool de leitura (não vê escritas pendentes de transaction())."""
+        if self._shared_memory or self.check_same_thread:
+            return self.execute_query(query, params)
+        try:
+            with self.read_connection() as conn:
+                self.stats["pool_reads"] += 1
+                return conn.execute(query, params).fetchall()
+        except Exception as e:
+            logger.error(f"Erro ao executar leitura: {query} com params: {params}. Erro: {e}")
+            return []
+
     def execute_commit(self, query, params=()):
-        """Executa uma query e faz commit (para INSERT, UPDATE, DELETE)."""
+        """Executa uma query e faz commit (para INSERT, UPDATE, DELETE).
+
+        Dentro de transaction() a escrita é apenas enfileirada e gravada no
+        COMMIT único do bloco. Em modo group_commit a chamada espera a
+        thread escritora gravar o lote em que a escrita foi incluída.
+        """
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            pending.append((query, params))
+            return True
+        return self._write_batch([(query, params)])
+
+    def execute_many_commit(self, statements):
+        """Grava uma lista de (query, params) atomicamente em um único COMMIT."""
+        if not statements:
+            return True
+        return self._write_batch(list(statements))
+
+    @contextmanager
+    def transaction(self):
+        """Agrupa todas as execute_commit do bloco em um único COMMIT.
+
+        Se o COMMIT falhar levanta DBCommitError (nada foi gravado): o chamador
+        não pode seguir como se o estado em memória estivesse persistido.
+
+        Exemplo:
+            with db_manager.transaction():
+                db_manager.execute_commit("UPDATE ...", (...))
+                db_manager.execute_commit("INSERT ...", (...))
+        """
+        if getattr(self._local, "pending", None) is not None:
+            # Transação aninhada: as escritas entram na transação externa
+            yield self
+            return
+        self._local.pending = []
         try:
-            self.cursor.execute(query, params)
-            self.conn.commit()
+            yield self
+        except Exception:
+            self._local.pending = None
+            raise
+        statements = self._local.pending
+        self._local.pending = None
+        if statements and not self._write_batch(statements):
+            raise DBCommitError(f"Falha ao gravar transação ({len(statements)} escritas): {statements[0][0]}")
+
+    def _write_batch(self, statements):
+        """Grava um lote atômico, direto ou via thread de group commit."""
+        if self._write_queue is not None and threading.current_thread() is not self._writer_thread:
+            done = threading.Event()
+            holder = {"ok": False}
+            self._write_queue.put((statements, done, holder))
+            done.wait()
+            return holder["ok"]
+
+        with self._write_lock:
+            conn = self.conn
+            try:
+                cursor = conn.cursor()
+                if not conn.in_transaction:
+                    cursor.execute("BEGIN")
+                for query, params in statements:
+                    cursor.execute(query, params)
+                conn.commit()
+                self.stats["commits"] += 1
+                self.stats["statements"] += len(statements)
+                return True
+            except Exception as e:
+                conn.rollback()
+                self.stats["failed_statements"] += len(statements)
+                logger.error(f"Erro ao executar commit: {statements[0][0]} com params: {statements[0][1]}. Erro: {e}")
+                return False
+
+    def _writer_loop(self):
+        """Thread escritora: coalesce lotes de vários chamadores em um COMMIT."""
+        conn = self.conn
+        cursor = conn.cursor()
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            batch = [item]
+            # Sem espera: junta o que chegou enquanto o COMMIT anterior gravava.
+            # group_commit_interval > 0 espera mais escritas antes de gravar.
+            deadline = time.time() + self.group_commit_interval
+            stop = False
+            while len(batch) < self.group_commit_max_batch:
+                timeout = deadline - time.time()
+                try:
+                    if timeout <= 0:
+                        nxt = self._write_queue.get_nowait()
+                    else:
+                        nxt = self._write_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+
+            with self._write_lock:
+                statements_count = 0
+                # Um BEGIN por grupo: sem ele o RELEASE do SAVEPOINT externo já faz COMMIT
+                if not conn.in_transaction:
+                    cursor.execute("BEGIN")
+                for statements, _done, holder in batch:
+                    # SAVEPOINT por lote: uma escrita inválida não desfaz as outras
+                    cursor.execute("SAVEPOINT group_item")
+                    try:
+                        for query, params in statements:
+                            cursor.execute(query, params)
+                        cursor.execute("RELEASE SAVEPOINT group_item")
+                        holder["ok"] = True
+                        statements_count += len(statements)
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT group_item")
+                        cursor.execute("RELEASE SAVEPOINT group_item")
+                        self.stats["failed_statements"] += len(statements)
+                        logger.error(f"Erro ao executar commit: {statements[0][0]} com params: {statements[0][1]}. Erro: {e}")
+                try:
+                    conn.commit()
+                    self.stats["commits"] += 1
+                    self.stats["group_batches"] += 1
+                    self.stats["statements"] += statements_count
+                except Exception as e:
+                    logger.error(f"Erro no group commit: {e}")
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        pass
+                    for _statements, _done, holder in batch:
+                        holder["ok"] = False
+
+            for _statements, done, _holder in batch:
+                done.set()
+            if stop:
+                break
+
+    def flush(self):
+        """Espera a gravação de todas as escritas já enfileiradas (group commit)."""
+        if self._write_queue is None:
             return True
-        except Exception as e:
-            logger.error(f"Erro ao executar commit: {query} com params: {params}. Erro: {e}")
-            return False
+        return self._write_batch([("SELECT 1", ())])
+
+    def get_stats(self):
+        """Estatísticas de escrita (commits, statements, lotes)."""
+        stats = dict(self.stats)
+        stats["statements_per_commit"] = (
+            stats["statements"] / stats["commits"] if stats["commits"] else 0.0
+        )
+        stats["wal"] = self.wal
+        stats["group_commit"] = self.group_commit
+        return stats
 
     def close(self):
         """Fecha a conexão com o banco de dados."""
-        self.conn.close()
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer_thread is not None:
+            self._write_queue.put(None)
+            self._writer_thread.join(timeout=5)
+            self._write_queue = None
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._connections = []
+            self._thread_connections = {}
+            self._read_pool = queue.LifoQueue()
+            self._read_pool_open = 0
+        self._local = threading.local()
         logger.info("Conexão com o banco de dados fechada.")
 
+# Instâncias compartilhadas por arquivo: módulos auxiliares (explorer, faucet,
+# rotas) reutilizam as conexões do nó em vez de abrir um DBManager por chamada
+_shared_managers = {}
+_shared_managers_lock = threading.Lock()
+
+
+def get_db_manager(db_path='allianza_blockchain.db', **kwargs):
+    """DBManager compartilhado do arquivo (criado na primeira chamada com os kwargs dela)."""
+    with _shared_managers_lock:
+        manager = _shared_managers.get(db_path)
+        if manager is None or manager._closed:
+            manager = DBManager(db_path=db_path, **kwargs)
+            _shared_managers[db_path] = manager
+        return manager
+
 # Exemplo de uso (será removido após a integração)
 # if __name__ == '__main__':
 #     db = DBManager()
@@ -3,13 +3,56 @@
 # Sistema de sharding que se adapta dinamicamente à carga da rede
 
 import time
-import hashlib
 import logging
-from typing import Dict, List, Optional
-from collections import defaultdict
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional
+from collections import defaultdict, deque
+
+from shard_map import ShardMap, address_key
 
 logger = logging.getLogger(__name__)
 
+LOAD_HISTORY_SIZE = 100
+# Amostras mínimas de carga baixa antes de um shard poder ser mesclado (shards recém-criados esperam)
+MERGE_MIN_SAMPLES = 20
+# Fila pendente a partir da qual o shard está saturado e deve ser dividido
+SPLIT_PENDING_THRESHOLD = 1000
+
+
+class LoadRing:
+    """Anel de tamanho fixo com as últimas amostras de carga: append e média em O(1)"""
+
+    __slots__ = ("size", "_values", "_index", "_count", "_sum", "last_pending", "last_blocks", "last_timestamp")
+
+    def __init__(self, size: int = LOAD_HISTORY_SIZE):
+        self.size = size
+        self._values = [0.0] * size
+        self._index = 0
+        self._count = 0
+        self._sum = 0.0
+        self.last_pending = 0
+        self.last_blocks = 0
+        self.last_timestamp = 0.0
+
+    def append(self, load: float, pending_txs: int = 0, block_count: int = 0):
+        self._sum += load - self._values[self._index]
+        self._values[self._index] = load
+        self._index = (self._index + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+        self.last_pending = pending_txs
+        self.last_blocks = block_count
+        self.last_timestamp = time.time()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def average(self) -> float:
+        return self._sum / self._count if self._count else 0.0
+
+    def last(self) -> float:
+        return self._values[self._index - 1] if self._count else 0.0
+
+
 class DynamicSharding:
     """
     🔀 SHARDING DINÂMICO
@@ -21,15 +64,25 @@ class DynamicSharding:
     - Balanceamento automático
     - Cross-shard transactions otimizadas
     - Escalabilidade horizontal infinita
+    
+    O conjunto de shards da cadeia só muda sob o _state_lock da blockchain;
+    a cada split/merge o estado (mapa + aposentados) vai para on_change, que a
+    blockchain grava, e restore() o reaplica no boot.
     """
     
     def __init__(self, blockchain, min_shards: int = 4, max_shards: int = 1000):
         self.blockchain = blockchain
         self.min_shards = min_shards
         self.max_shards = max_shards
-        self.shard_load_history = defaultdict(list)
+        self.shard_load_history = defaultdict(LoadRing)
         self.shard_metrics = {}
         self.cross_shard_cache = {}
+        # Endereço → shard por faixas de hash; split/merge mudam só as faixas afetadas
+        self.shard_map = ShardMap(blockchain.shards.keys())
+        self.retired_shards = {}
+        self.migrations = deque(maxlen=100)
+        # Chamado com get_state() depois de cada split/merge (persistência)
+        self.on_change: Optional[Callable[[Dict], None]] = None
         
         logger.info("🔀 DYNAMIC SHARDING: Inicializado!")
         print("🔀 DYNAMIC SHARDING: Sistema inicializado!")
@@ -44,11 +97,12 @@ class DynamicSharding:
     
     def calculate_shard_load(self, shard_id: int) -> float:
         """Calcula carga de um shard (0-1)"""
-        if shard_id not in self.blockchain.shards:
+        chain = self.blockchain.shards.get(shard_id)  # Pode ter sido mesclado agora
+        if chain is None:
             return 0.0
         
         pending_txs = len(self.blockchain.pending_transactions.get(shard_id, []))
-        block_count = len(self.blockchain.shards[shard_id])
+        block_count = len(chain)
         
         # Carga baseada em transações pendentes e tamanho da chain
         tx_load = min(pending_txs / 1000.0, 1.0)  # Normalizar
@@ -56,24 +110,15 @@ class DynamicSharding:
         
         total_load = (tx_load * 0.7) + (chain_load * 0.3)
         
-        # Armazenar histórico
-        self.shard_load_history[shard_id].append({
-            "timestamp": time.time(),
-            "load": total_load,
-            "pending_txs": pending_txs,
-            "block_count": block_count
-        })
-        
-        # Manter apenas últimos 100 registros
-        if len(self.shard_load_history[shard_id]) > 100:
-            self.shard_load_history[shard_id].pop(0)
+        # Armazenar histórico (anel fixo, O(1))
+        self.shard_load_history[shard_id].append(total_load, pending_txs, block_count)
         
         return total_load
     
     def get_all_shard_loads(self) -> Dict[int, float]:
         """Retorna carga de todos os shards"""
         loads = {}
-        for shard_id in self.blockchain.shards.keys():
+        for shard_id in self._active_shard_ids():
             loads[shard_id] = self.calculate_shard_load(shard_id)
         return loads
     
@@ -88,10 +133,13 @@ class DynamicSharding:
         if current_shards >= self.max_shards:
             return False
         
-        # Criar shard se algum shard tem carga > 80%
+        # Criar shard se algum shard tem carga > 80% ou fila pendente saturada
+        # (a parcela das pendentes sozinha chega no máximo a 70% da carga)
         max_load = max(loads.values())
         if max_load > 0.8:
             return True
+        if any(self.shard_load_history[shard_id].last_pending >= SPLIT_PENDING_THRESHOLD for shard_id in loads):
+            return True
         
         # Criar shard se média de carga > 70% e temos menos de 20 shards
         avg_load = sum(loads.values()) / len(loads)
@@ -108,10 +156,12 @@ class DynamicSharding:
         if current_shards <= self.min_shards:
             return None
         
-        # Encontrar shards com carga < 20%
+        # Encontrar shards com carga < 20% (agora e na média do anel, com histórico suficiente)
         low_load_shards = [
             shard_id for shard_id, load in loads.items()
             if load < 0.2
+            and len(self.shard_load_history[shard_id]) >= MERGE_MIN_SAMPLES
+            and self.shard_load_history[shard_id].average() < 0.2
         ]
         
         # Se temos 2+ shards com carga baixa, mesclar
@@ -122,39 +172,181 @@ class DynamicSharding:
         
         return None
     
-    def create_new_shard(self) -> int:
-        """Cria um novo shard"""
-        current_shards = self.get_shard_count()
-        new_shard_id = current_shards
-        
-        # Criar shard vazio
-        self.blockchain.shards[new_shard_id] = [self.blockchain.create_genesis_block(new_shard_id)]
-        self.blockchain.pending_transactions[new_shard_id] = []
+    def _shard_guard(self, shard_id: int):
+        """Lock de selagem do shard (migração não corre junto com a selagem dele)"""
+        producer = getattr(self.blockchain, "block_producer", None)
+        return producer.shard_lock(shard_id) if producer is not None else nullcontext()
+
+    def _state_guard(self):
+        """Lock de estado da blockchain: produce()/seal_next() leem blockchain.shards sob ele"""
+        lock = getattr(self.blockchain, "_state_lock", None)
+        return lock if lock is not None else nullcontext()
+
+    def _active_shard_ids(self) -> List[int]:
+        with self._state_guard():
+            return sorted(self.blockchain.shards)
+
+    def _add_shard(self, shard_id: int):
+        mempool = getattr(self.blockchain, 'mempool', None)
+        with self._state_guard():
+            self.blockchain.shards[shard_id] = [self.blockchain.create_genesis_block(shard_id)]
+            if mempool is not None:
+                self.blockchain.pending_transactions[shard_id] = mempool.view(shard_id)
+            else:
+                self.blockchain.pending_transactions[shard_id] = []
+
+    def _retire_shard(self, shard_id: int):
+        """Blocos já selados continuam disponíveis (histórico), mas o shard sai de circulação"""
+        with self._state_guard():
+            self.retired_shards[shard_id] = self.blockchain.shards.pop(shard_id)
+            self.blockchain.pending_transactions.pop(shard_id, None)
+        self.shard_load_history.pop(shard_id, None)
+
+    def get_state(self) -> Dict:
+        """Estado persistível: faixas do mapa, versão e shards aposentados"""
+        return {**self.shard_map.to_dict(), "retired_shards": sorted(self.retired_shards)}
+
+    def _notify_change(self):
+        if self.on_change is not None:
+            self.on_change(self.get_state())
+
+    def restore(self, state: Dict) -> Dict:
+        """
+        Reaplica o estado gravado (boot): mapa de faixas, shards criados por split
+        (a cadeia de cada um é reaberta pelo chamador) e shards aposentados
+        """
+        shard_map = ShardMap.from_dict(state)
+        active = set(shard_map.shard_ids())
+        mempool = getattr(self.blockchain, 'mempool', None)
+        self.shard_map = shard_map
+        added = [shard_id for shard_id in active if shard_id not in self.blockchain.shards]
+        for shard_id in added:
+            self._add_shard(shard_id)
+        for shard_id in [shard_id for shard_id in self._active_shard_ids() if shard_id not in active]:
+            self._retire_shard(shard_id)
+            if mempool is not None:
+                mempool.remove_shard(shard_id)
+        for shard_id in state.get("retired_shards", []):
+            if shard_id not in active and shard_id not in self.retired_shards:
+                self.retired_shards[shard_id] = [self.blockchain.create_genesis_block(shard_id)]
+        return {"version": shard_map.version, "added": sorted(added), "retired": sorted(self.retired_shards)}
+
+    def _split_point(self, shard_id: int) -> Optional[int]:
+        """Chave mediana dos remetentes pendentes: cada metade fica com ~metade da fila"""
+        keys = sorted(address_key(tx.get("sender", "")) for tx in self.blockchain.pending_transactions.get(shard_id, []))
+        return keys[len(keys) // 2] if keys else None
+
+    def _migrate_pending(self, shard_id: int) -> int:
+        """Transações pendentes cujo remetente mudou de shard vão para o shard novo"""
+        def target(tx):
+            sender = tx.get("sender")
+            return self.shard_map.shard_for(sender) if sender else shard_id
+
+        mempool = getattr(self.blockchain, 'mempool', None)
+        if mempool is not None:
+            return mempool.move(shard_id, target)
+        pending = self.blockchain.pending_transactions
+        staying, moved = [], 0
+        for tx in pending[shard_id]:
+            destination = target(tx)
+            if destination == shard_id:
+                staying.append(tx)
+            else:
+                pending.setdefault(destination, []).append(tx)
+                moved += 1
+        pending[shard_id] = staying
+        return moved
+
+    def split_shard(self, shard_id: int) -> Dict:
+        """
+        Divide a faixa de endereços de um shard quente e migra online:
+        faixas no mapa, transações pendentes e recibos cross-shard em trânsito
+        """
+        if shard_id not in self.blockchain.shards:
+            return {"success": False, "error": f"Shard {shard_id} não existe"}
+        new_shard_id = max(list(self.blockchain.shards) + list(self.retired_shards)) + 1
+        started = time.perf_counter()
+        
+        with self._shard_guard(shard_id):
+            self._add_shard(new_shard_id)
+            try:
+                moved_ranges = self.shard_map.split(shard_id, new_shard_id, self._split_point(shard_id))
+            except ValueError as e:
+                with self._state_guard():
+                    del self.blockchain.shards[new_shard_id]
+                    del self.blockchain.pending_transactions[new_shard_id]
+                return {"success": False, "error": str(e)}
+            pending_moved = self._migrate_pending(shard_id)
+            producer = getattr(self.blockchain, "block_producer", None)
+            receipts_moved = producer.reroute_inbox(shard_id) if producer is not None else 0
+            self._notify_change()
+        
+        accounts_moved = sum(1 for address in getattr(self.blockchain, "wallets", {})
+                             if self.shard_map.shard_for(address) == new_shard_id)
+        migration = {
+            "action": "split",
+            "from_shard": shard_id,
+            "new_shard_id": new_shard_id,
+            "moved_ranges": [(f"{start:016x}", f"{end - 1:016x}") for start, end in moved_ranges],
+            "accounts_moved": accounts_moved,
+            "pending_moved": pending_moved,
+            "receipts_moved": receipts_moved,
+            "map_version": self.shard_map.version,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "timestamp": time.time()
+        }
+        self.migrations.append(migration)
         
-        logger.info(f"🔀 Novo shard criado: Shard {new_shard_id}")
-        print(f"🔀 Novo shard criado: Shard {new_shard_id}")
+        logger.info(f"🔀 Novo shard criado: Shard {new_shard_id} (split do shard {shard_id})")
+        print(f"🔀 Novo shard criado: Shard {new_shard_id} (split do shard {shard_id})")
+        print(f"   Contas migradas: {accounts_moved}, pendentes migradas: {pending_moved}")
         print(f"   Total de shards: {self.get_shard_count()}")
         
-        return new_shard_id
+        return {"success": True, **migration}
+    
+    def create_new_shard(self, split_from: Optional[int] = None) -> int:
+        """Cria um novo shard dividindo o shard mais carregado (ou split_from)"""
+        if split_from is None:
+            loads = self.get_all_shard_loads()
+            split_from = max(loads, key=loads.get)
+        result = self.split_shard(split_from)
+        return result.get("new_shard_id")
     
     def merge_shards(self, shard_ids: List[int]) -> int:
-        """Mescla dois shards em um"""
+        """Mescla dois shards em um (faixas, pendentes e recibos do segundo vão para o primeiro)"""
         if len(shard_ids) < 2:
             return shard_ids[0] if shard_ids else None
         
         shard1_id, shard2_id = shard_ids[0], shard_ids[1]
         
-        # Mesclar transações pendentes
-        self.blockchain.pending_transactions[shard1_id].extend(
-            self.blockchain.pending_transactions[shard2_id]
-        )
-        
-        # Mesclar blocos (manter histórico)
-        # Nota: Em produção, isso seria mais complexo
-        
-        # Remover shard2
-        del self.blockchain.shards[shard2_id]
-        del self.blockchain.pending_transactions[shard2_id]
+        with self._shard_guard(shard2_id):
+            self.shard_map.merge(shard2_id, shard1_id)
+            
+            # Mesclar transações pendentes
+            mempool = getattr(self.blockchain, 'mempool', None)
+            if mempool is not None:
+                pending_moved = mempool.move(shard2_id, lambda tx: shard1_id)
+                mempool.remove_shard(shard2_id)
+            else:
+                pending_moved = len(self.blockchain.pending_transactions[shard2_id])
+                self.blockchain.pending_transactions[shard1_id].extend(
+                    self.blockchain.pending_transactions[shard2_id]
+                )
+            producer = getattr(self.blockchain, "block_producer", None)
+            if producer is not None:
+                producer.reroute_inbox(shard2_id)
+            
+            self._retire_shard(shard2_id)
+            self._notify_change()
+        
+        self.migrations.append({
+            "action": "merge",
+            "from_shard": shard2_id,
+            "into_shard": shard1_id,
+            "pending_moved": pending_moved,
+            "map_version": self.shard_map.version,
+            "timestamp": time.time()
+        })
         
         logger.info(f"🔀 Shards mesclados: {shard1_id} + {shard2_id} → {shard1_id}")
         print(f"🔀 Shards mesclados: {shard1_id} + {shard2_id} → {shard1_id}")
@@ -195,13 +387,17 @@ class DynamicSharding:
                 min_load_shard = min(loads.items(), key=lambda x: x[1])[0]
                 return min_load_shard
         
-        # Caso padrão: hash do endereço
+        # Caso padrão: faixa do hash do endereço no mapa de shards
         sender = transaction.get("sender", "")
         if sender:
-            return int(hashlib.sha256(sender.encode()).hexdigest(), 16) % self.get_shard_count()
+            return self.shard_map.shard_for(sender)
         
-        # Fallback: shard 0
-        return 0
+        # Fallback: menor shard ativo
+        return min(self.blockchain.shards)
+    
+    def shard_for_address(self, address: str) -> int:
+        """Shard de casa de um endereço"""
+        return self.shard_map.shard_for(address)
     
     def _get_qrs3_shard(self) -> Optional[int]:
         """Retorna shard dedicado para QRS-3 se existir"""
@@ -210,8 +406,8 @@ class DynamicSharding:
         
         # Se temos muitos shards, usar um dedicado
         if shard_count > 10:
-            # Usar shard especial (último shard ou shard específico)
-            return shard_count - 1
+            # Usar shard especial (último shard ativo)
+            return max(self.blockchain.shards)
         
         return None
     
@@ -253,6 +449,9 @@ class DynamicSharding:
             "max_load": max(loads.values()) if loads else 0.0,
             "min_load": min(loads.values()) if loads else 0.0,
             "shard_loads": loads,
+            "shard_map": self.shard_map.to_dict(),
+            "retired_shards": sorted(self.retired_shards),
+            "recent_migrations": list(self.migrations)[-10:],
             "recommendations": self._get_sharding_recommendations()
         }
     
@@ -5,13 +5,26 @@
 Cache hierárquico L1 (in-memory), L2 (Redis), L3 (Database)
 """
 
+import os
+import re
 import json
 import time
+import pickle
+import sqlite3
+import struct
+import fnmatch
 import hashlib
-from typing import Optional, Any, Dict, List
+import logging
+import itertools
+import threading
+from array import array
+from typing import Optional, Any, Dict, List, Tuple, Union
 from functools import wraps
 from collections import OrderedDict
-from datetime import datetime, timedelta
+
+import block_codec
+
+logger = logging.getLogger(__name__)
 
 # Tentar importar Redis
 try:
@@ -20,15 +33,470 @@ try:
 except ImportError:
     REDIS_AVAILABLE = False
 
+L1_MAX_BYTES = int(os.getenv("HIERARCHICAL_CACHE_L1_BYTES", str(64 * 1024 * 1024)))
+L1_STRIPES = 16
+L3_PATH = os.getenv("HIERARCHICAL_CACHE_L3_PATH", "hierarchical_cache_l3.db")
+LATENCY_SAMPLES = 2048
+# Latência do L1 amostrada em 1 de cada 16 leituras (níveis inferiores: sempre)
+L1_LATENCY_SAMPLE_MASK = 15
+# Custo fixo estimado de uma entrada no L1 (chave, tupla, slots do OrderedDict)
+ENTRY_OVERHEAD = 64
+# Fração da capacidade do stripe reservada à janela LRU de entrada (W-TinyLFU)
+WINDOW_FRACTION = 0.01
+# Fração da área principal protegida (chaves acessadas de novo depois de admitidas)
+PROTECTED_FRACTION = 0.8
+
+
+# =============================================================================
+# SERIALIZADORES (L2/L3)
+# =============================================================================
+
+class CborSerializer:
+    """CBOR canônico do block_codec: binário, compacto e seguro para decodificar"""
+    name = "cbor"
+
+    def dumps(self, value: Any) -> bytes:
+        return block_codec.encode(value)
+
+    def loads(self, data: bytes) -> Any:
+        return block_codec.decode(data)
+
+
+class JsonSerializer:
+    """JSON em UTF-8 (formato anterior; tuplas voltam como listas)"""
+    name = "json"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class PickleSerializer:
+    """Pickle: aceita qualquer objeto, mas só use com L2/L3 confiáveis"""
+    name = "pickle"
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+SERIALIZERS = {
+    "cbor": CborSerializer(),
+    "json": JsonSerializer(),
+    "pickle": PickleSerializer()
+}
+
+
+def _estimate_size(value: Any) -> int:
+    """Tamanho aproximado em bytes, olhando só o primeiro nível (usado quando o valor não é serializado)"""
+    kind = type(value)
+    if kind is str or kind is bytes or kind is bytearray:
+        return len(value)
+    if kind is dict:
+        items = value.values()
+        size = 64 + 32 * len(value)
+    elif kind is list or kind is tuple or kind is set:
+        items = value
+        size = 56 + 8 * len(value)
+    else:
+        return 16
+    for item in items:
+        item_kind = type(item)
+        size += len(item) if item_kind is str or item_kind is bytes else 64 if item_kind is dict or item_kind is list else 16
+    return size
+
+
+# =============================================================================
+# L1: STRIPES COM ADMISSÃO TINYLFU
+# =============================================================================
+
+# Tabela de tradução que divide cada contador do sketch por 2 (envelhecimento em C)
+_HALVE = bytes(count >> 1 for count in range(256))
+
+
+class FrequencySketch:
+    """
+    Count-Min Sketch (4 linhas de ~8 contadores por entrada, até 15) com
+    envelhecimento: a cada `sample_size` incrementos os contadores caem pela metade.
+    Cada linha usa uma fatia de 16 bits diferente do hash da chave.
+    """
+
+    __slots__ = ("_table", "_mask", "_width", "_additions", "_sample_size")
+
+    def __init__(self, capacity: int):
+        width = 64
+        while width < capacity * 8 and width < (1 << 16):
+            width <<= 1
+        self._table = bytearray(4 * width)
+        self._mask = width - 1
+        self._width = width
+        self._additions = 0
+        self._sample_size = 10 * max(16, capacity)
+
+    def increment(self, key_hash: int):
+        table, mask, width = self._table, self._mask, self._width
+        index = key_hash & mask
+        if table[index] < 15:
+            table[index] += 1
+        index = width + ((key_hash >> 16) & mask)
+        if table[index] < 15:
+            table[index] += 1
+        index = 2 * width + ((key_hash >> 32) & mask)
+        if table[index] < 15:
+            table[index] += 1
+        index = 3 * width + ((key_hash >> 48) & mask)
+        if table[index] < 15:
+            table[index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._table = table.translate(_HALVE)
+            self._additions //= 2
+
+    def frequency(self, key_hash: int) -> int:
+        table, mask, width = self._table, self._mask, self._width
+        return min(table[key_hash & mask],
+                   table[width + ((key_hash >> 16) & mask)],
+                   table[2 * width + ((key_hash >> 32) & mask)],
+                   table[3 * width + ((key_hash >> 48) & mask)])
+
+
+class L1Stripe:
+    """
+    Um stripe do L1 com lock próprio (W-TinyLFU):
+    - window: LRU pequena onde toda chave nova entra
+    - main (SLRU): probation + protected (80%); um acerto na probation promove
+      para protected. Quem sai da window só entra na main se for mais frequente
+      (pelo sketch) que a vítima da probation, o que protege contra varreduras
+    Entradas: (valor, expira_em, bytes, hash da chave)
+    """
+
+    def __init__(self, max_items: int, max_bytes: int):
+        self.lock = threading.Lock()
+        self.window: OrderedDict = OrderedDict()
+        self.probation: OrderedDict = OrderedDict()
+        self.protected: OrderedDict = OrderedDict()
+        self.window_max = max(1, int(max_items * WINDOW_FRACTION))
+        self.main_max = max(1, max_items - self.window_max)
+        self.protected_max = max(1, int(self.main_max * PROTECTED_FRACTION))
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.sketch = FrequencySketch(max_items)
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "admission_rejects": 0}
+
+    def __len__(self) -> int:
+        return len(self.window) + len(self.probation) + len(self.protected)
+
+    def _find(self, key: str):
+        for segment in (self.protected, self.probation, self.window):
+            entry = segment.get(key)
+            if entry is not None:
+                return segment, entry
+        return None, None
+
+    def get(self, key: str, key_hash: int, now: float):
+        """Entrada (valor, expira_em, ...) ou None (já contabiliza hit/miss)"""
+        with self.lock:
+            self.sketch.increment(key_hash)
+            segment, entry = self._find(key)
+            if entry is not None:
+                if now < entry[1]:
+                    if segment is self.probation:
+                        del segment[key]
+                        self._protect(key, entry)
+                    else:
+                        segment.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry
+                del segment[key]
+                self.bytes -= entry[2]
+            self.stats["misses"] += 1
+            return None
+
+    def _protect(self, key: str, entry: Tuple):
+        protected = self.protected
+        protected[key] = entry
+        if len(protected) > self.protected_max:
+            demoted_key, demoted = protected.popitem(last=False)
+            self.probation[demoted_key] = demoted
+
+    def contains(self, key: str, now: float) -> bool:
+        with self.lock:
+            entry = self._find(key)[1]
+            return entry is not None and now < entry[1]
+
+    def put(self, key: str, key_hash: int, value: Any, expires_at: float, size: int):
+        with self.lock:
+            self.sketch.increment(key_hash)
+            self.stats["sets"] += 1
+            entry = (value, expires_at, size, key_hash)
+            segment, old = self._find(key)
+            if old is not None:
+                segment[key] = entry
+                segment.move_to_end(key)
+                self.bytes += size - old[2]
+            else:
+                window = self.window
+                window[key] = entry
+                self.bytes += size
+                if len(window) > self.window_max:
+                    self._admit(*window.popitem(last=False))
+            if self.bytes > self.max_bytes:
+                self._evict_bytes()
+
+    def _admit(self, key: str, entry: Tuple):
+        probation = self.probation
+        if len(probation) + len(self.protected) < self.main_max:
+            probation[key] = entry
+            return
+        victims = probation if probation else self.protected
+        victim_key = next(iter(victims))
+        sketch = self.sketch
+        if sketch.frequency(entry[3]) > sketch.frequency(victims[victim_key][3]):
+            self.bytes -= victims.pop(victim_key)[2]
+            probation[key] = entry
+            self.stats["evictions"] += 1
+        else:
+            self.bytes -= entry[2]
+            self.stats["admission_rejects"] += 1
+
+    def _evict_bytes(self):
+        while self.bytes > self.max_bytes and len(self) > 1:
+            segment = self.probation or self.protected or self.window
+            self.bytes -= segment.popitem(last=False)[1][2]
+            self.stats["evictions"] += 1
+
+    def delete(self, key: str):
+        with self.lock:
+            segment, entry = self._find(key)
+            if entry is not None:
+                del segment[key]
+                self.bytes -= entry[2]
+
+    def clear(self):
+        with self.lock:
+            self.window.clear()
+            self.probation.clear()
+            self.protected.clear()
+            self.bytes = 0
+            for stat in self.stats:
+                self.stats[stat] = 0
+
+
+class ShardedL1:
+    """L1 em stripes (lock por stripe): threads em chaves diferentes não disputam o mesmo lock"""
+
+    def __init__(self, max_items: int, max_bytes: int, stripes: int = L1_STRIPES):
+        # Potência de 2 e ao menos ~64 itens por stripe
+        count = 1
+        while count * 2 <= min(stripes, max(1, max_items // 64)):
+            count *= 2
+        self._mask = count - 1
+        per_items = -(-max_items // count)
+        per_bytes = max(1, max_bytes // count)
+        self.stripes = [L1Stripe(per_items, per_bytes) for _ in range(count)]
+
+    def stripe(self, key_hash: int) -> L1Stripe:
+        return self.stripes[key_hash & self._mask]
+
+    def __contains__(self, key: str) -> bool:
+        return self.stripe(hash(key)).contains(key, time.time())
+
+    def __len__(self) -> int:
+        return sum(len(stripe) for stripe in self.stripes)
+
+    @property
+    def bytes(self) -> int:
+        return sum(stripe.bytes for stripe in self.stripes)
+
+    def stats(self) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for stripe in self.stripes:
+            for stat, value in stripe.stats.items():
+                totals[stat] = totals.get(stat, 0) + value
+        return totals
+
+    def clear(self):
+        for stripe in self.stripes:
+            stripe.clear()
+
+
+class LatencyRing:
+    """Últimas N latências (µs) em anel pré-alocado; o índice vem de itertools.count (atômico no GIL)"""
+
+    def __init__(self, size: int = LATENCY_SAMPLES):
+        self._samples = array("d", bytes(8 * size))
+        self._size = size
+        self._counter = itertools.count()
+        self._recorded = 0
+
+    def record(self, microseconds: float):
+        position = next(self._counter)
+        self._samples[position % self._size] = microseconds
+        self._recorded = position + 1
+
+    def percentiles(self) -> Dict[str, float]:
+        count = min(self._recorded, self._size)
+        if not count:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        ordered = sorted(self._samples[:count])
+        return {
+            "p50": round(ordered[int(count * 0.50)], 2),
+            "p95": round(ordered[min(count - 1, int(count * 0.95))], 2),
+            "p99": round(ordered[min(count - 1, int(count * 0.99))], 2)
+        }
+
+    def clear(self):
+        self._counter = itertools.count()
+        self._recorded = 0
+
+
+# =============================================================================
+# L2 LOCAL E L3 SQLITE
+# =============================================================================
+
+class FakeRedis:
+    """
+    Substituto local do Redis (mesmo subconjunto de comandos usado pelo L2):
+    útil em testes e em nós sem Redis. Não é compartilhado entre processos.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def ping(self) -> bool:
+        return True
+
+    def _alive(self, key: str, now: float) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and now >= item[1]:
+            del self._data[key]
+            return None
+        return item[0]
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._alive(key, time.time())
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None) -> bool:
+        with self._lock:
+            self._data[key] = (value, time.time() + ex if ex else None)
+            return True
+
+    def setex(self, key: str, ttl: int, value: bytes) -> bool:
+        return self.set(key, value, ex=ttl)
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        with self._lock:
+            now = time.time()
+            return [key for key in list(self._data)
+                    if fnmatch.fnmatchcase(key, pattern) and self._alive(key, now) is not None]
+
+    def flushdb(self) -> bool:
+        with self._lock:
+            self._data.clear()
+            return True
+
+
+class SQLiteL3:
+    """L3 persistente: tabela (chave, valor serializado, expira_em) em SQLite WAL"""
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str = L3_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._writes = 0
+
+    def get(self, key: str, now: float) -> Optional[Tuple[bytes, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now >= row[1]:
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                return None
+            return row[0], row[1]
+
+    def set(self, key: str, blob: bytes, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, blob, expires_at)
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# =============================================================================
+# CACHE HIERÁRQUICO
+# =============================================================================
+
+# TTL adaptativo: a ordem define a prioridade quando a chave contém mais de um tipo
+ADAPTIVE_TTLS = {
+    "balance": 30,  # Saldos mudam frequentemente
+    "gas_price": 10,  # Gas prices mudam muito
+    "nonce": 5,  # Nonces mudam a cada transação
+    "exchange_rate": 300,  # Exchange rates mudam pouco
+    "block_number": 2,  # Block numbers mudam constantemente
+    "transaction": 3600,  # Transações confirmadas não mudam
+    "utxo": 60,  # UTXOs podem mudar
+}
+_TTL_PRIORITY = {data_type: position for position, data_type in enumerate(ADAPTIVE_TTLS)}
+_TTL_PATTERN = re.compile("|".join(re.escape(data_type) for data_type in ADAPTIVE_TTLS), re.IGNORECASE)
+
+# Cabeçalho dos valores no L2: instante de expiração (para promover ao L1 com o TTL restante)
+_L2_HEADER = struct.Struct(">d")
+
+
 class HierarchicalCache:
     """
     Sistema de Cache Hierárquico
-    
-    L1: In-memory (ultra-rápido, < 1ms)
-    L2: Redis (rápido, compartilhado, < 5ms)
-    L3: Database (persistente, < 50ms)
+
+    L1: In-memory (ultra-rápido, < 1ms) — stripes com lock próprio, limite em
+        itens e em bytes, admissão W-TinyLFU
+    L2: Redis (rápido, compartilhado, < 5ms) — valores binários pelo serializador
+    L3: SQLite (persistente, < 50ms)
+
+    Um acerto em nível inferior promove o valor aos níveis acima com o TTL restante.
     """
-    
+
     def __init__(
         self,
         l1_max_size: int = 10000,
@@ -37,36 +505,38 @@ class HierarchicalCache:
         redis_port: int = 6379,
         redis_db: int = 0,
         enable_l2: bool = True,
-        enable_l3: bool = False
+        enable_l3: bool = False,
+        l1_max_bytes: int = L1_MAX_BYTES,
+        l1_stripes: int = L1_STRIPES,
+        serializer: Union[str, Any] = os.getenv("HIERARCHICAL_CACHE_SERIALIZER", "cbor"),
+        l2_client: Any = None,
+        l3_path: str = L3_PATH
     ):
-        # L1: In-memory cache (LRU)
-        self.l1_cache = OrderedDict()
+        self.serializer = SERIALIZERS[serializer] if isinstance(serializer, str) else serializer
+
+        # L1: In-memory cache (stripes + TinyLFU)
+        self.l1_cache = ShardedL1(l1_max_size, l1_max_bytes, l1_stripes)
         self.l1_max_size = l1_max_size
+        self.l1_max_bytes = l1_max_bytes
         self.l1_default_ttl = l1_default_ttl
-        self.l1_stats = {
-            "hits": 0,
-            "misses": 0,
-            "sets": 0,
-            "evictions": 0
-        }
-        
-        # L2: Redis cache
-        self.l2_enabled = enable_l2 and REDIS_AVAILABLE
-        self.l2_client = None
+
+        # L2: Redis cache (ou cliente injetado, ex.: FakeRedis)
+        self.l2_client = l2_client
+        self.l2_enabled = l2_client is not None or (enable_l2 and REDIS_AVAILABLE)
+        self._stats_lock = threading.Lock()
         self.l2_stats = {
             "hits": 0,
             "misses": 0,
             "sets": 0,
             "errors": 0
         }
-        
-        if self.l2_enabled:
+
+        if self.l2_enabled and self.l2_client is None:
             try:
                 self.l2_client = redis.Redis(
                     host=redis_host,
                     port=redis_port,
                     db=redis_db,
-                    decode_responses=True,
                     socket_connect_timeout=2,
                     socket_timeout=2
                 )
@@ -75,226 +545,257 @@ class HierarchicalCache:
             except Exception as e:
                 print(f"⚠️  L2 Cache (Redis): Não disponível - {e}")
                 self.l2_enabled = False
-        
-        # L3: Database cache (opcional, para dados persistentes)
+                self.l2_client = None
+
+        # L3: SQLite (opcional, para dados persistentes)
         self.l3_enabled = enable_l3
+        self.l3_store = SQLiteL3(l3_path) if enable_l3 else None
         self.l3_stats = {
             "hits": 0,
             "misses": 0,
-            "sets": 0
+            "sets": 0,
+            "errors": 0
         }
-        
+
+        self._latency = {level: LatencyRing() for level in ("l1", "l2", "l3", "miss")}
+        self._reads = itertools.count()
+
         print("💾 Hierarchical Cache: Inicializado!")
-        print(f"   L1 (Memory): {l1_max_size} itens, TTL {l1_default_ttl}s")
+        print(f"   L1 (Memory): {l1_max_size} itens / {l1_max_bytes // (1024 * 1024)} MB, "
+              f"{len(self.l1_cache.stripes)} stripes, TTL {l1_default_ttl}s")
         print(f"   L2 (Redis): {'✅' if self.l2_enabled else '❌'}")
-        print(f"   L3 (Database): {'✅' if self.l3_enabled else '❌'}")
-    
+        print(f"   L3 (SQLite): {'✅ ' + l3_path if self.l3_enabled else '❌'}")
+
     def _calculate_adaptive_ttl(self, key: str, data_type: str = "default") -> int:
         """
         Calcular TTL adaptativo baseado no tipo de dado
-        
+
         Dados que mudam pouco: TTL longo
         Dados que mudam muito: TTL curto
+
+        O tipo é detectado pela chave numa única passada da regex pré-compilada.
         """
-        ttl_map = {
-            "balance": 30,  # Saldos mudam frequentemente
-            "gas_price": 10,  # Gas prices mudam muito
-            "nonce": 5,  # Nonces mudam a cada transação
-            "exchange_rate": 300,  # Exchange rates mudam pouco
-            "block_number": 2,  # Block numbers mudam constantemente
-            "transaction": 3600,  # Transações confirmadas não mudam
-            "utxo": 60,  # UTXOs podem mudar
-            "default": self.l1_default_ttl
-        }
-        
-        # Detectar tipo pela chave
-        key_lower = key.lower()
-        for data_type_key, ttl in ttl_map.items():
-            if data_type_key in key_lower:
-                return ttl
-        
-        return ttl_map.get(data_type, self.l1_default_ttl)
-    
+        found = _TTL_PATTERN.findall(key)
+        if found:
+            return ADAPTIVE_TTLS[min((match.lower() for match in found), key=_TTL_PRIORITY.__getitem__)]
+        return ADAPTIVE_TTLS.get(data_type, self.l1_default_ttl)
+
+    def _count(self, stats: Dict, stat: str):
+        with self._stats_lock:
+            stats[stat] += 1
+
     def get(self, key: str, default: Any = None) -> Optional[Any]:
         """Obter valor do cache (tenta L1, L2, L3)"""
+        sampled = not next(self._reads) & L1_LATENCY_SAMPLE_MASK
+        started = time.perf_counter() if sampled else 0.0
+        now = time.time()
+        key_hash = hash(key)
+
         # Tentar L1 primeiro (mais rápido)
-        if key in self.l1_cache:
-            item = self.l1_cache[key]
-            if time.time() < item["expires_at"]:
-                # Hit em L1 - mover para o final (LRU)
-                self.l1_cache.move_to_end(key)
-                self.l1_stats["hits"] += 1
-                return item["value"]
-            else:
-                # Expirou - remover
-                del self.l1_cache[key]
-        
-        self.l1_stats["misses"] += 1
-        
+        entry = self.l1_cache.stripe(key_hash).get(key, key_hash, now)
+        if entry is not None:
+            if sampled:
+                self._latency["l1"].record((time.perf_counter() - started) * 1e6)
+            return entry[0]
+        if not sampled:
+            started = time.perf_counter()
+
         # Tentar L2 (Redis)
         if self.l2_enabled and self.l2_client:
             try:
-                value = self.l2_client.get(f"cache:{key}")
-                if value:
-                    data = json.loads(value)
+                raw = self.l2_client.get(f"cache:{key}")
+                if raw:
+                    expires_at = _L2_HEADER.unpack_from(raw)[0]
+                    value = self.serializer.loads(raw[_L2_HEADER.size:])
                     # Promover para L1
-                    self._set_l1(key, data["value"], data.get("ttl", self.l1_default_ttl))
-                    self.l2_stats["hits"] += 1
-                    return data["value"]
-                self.l2_stats["misses"] += 1
+                    self.l1_cache.stripe(key_hash).put(key, key_hash, value, expires_at,
+                                                       len(raw) + ENTRY_OVERHEAD)
+                    self._count(self.l2_stats, "hits")
+                    self._latency["l2"].record((time.perf_counter() - started) * 1e6)
+                    return value
+                self._count(self.l2_stats, "misses")
             except Exception as e:
-                self.l2_stats["errors"] += 1
+                self._count(self.l2_stats, "errors")
                 if self.l2_stats["errors"] % 100 == 0:
                     print(f"⚠️  L2 Cache error: {e}")
-        
-        # Tentar L3 (Database) - se habilitado
+
+        # Tentar L3 (SQLite) - se habilitado
         if self.l3_enabled:
-            # Implementar busca em database se necessário
-            pass
-        
+            try:
+                row = self.l3_store.get(key, now)
+                if row is not None:
+                    blob, expires_at = row
+                    value = self.serializer.loads(blob)
+                    # Promover para L2 e L1
+                    self._set_l2(key, blob, expires_at, now)
+                    self.l1_cache.stripe(key_hash).put(key, key_hash, value, expires_at,
+                                                       len(blob) + ENTRY_OVERHEAD)
+                    self._count(self.l3_stats, "hits")
+                    self._latency["l3"].record((time.perf_counter() - started) * 1e6)
+                    return value
+                self._count(self.l3_stats, "misses")
+            except Exception as e:
+                self._count(self.l3_stats, "errors")
+                print(f"⚠️  L3 Cache error: {e}")
+
+        self._latency["miss"].record((time.perf_counter() - started) * 1e6)
         return default
-    
+
     def set(self, key: str, value: Any, ttl: Optional[int] = None, data_type: str = "default"):
         """Armazenar valor no cache (L1, L2, L3)"""
         # Calcular TTL adaptativo se não fornecido
         if ttl is None:
             ttl = self._calculate_adaptive_ttl(key, data_type)
-        
+        now = time.time()
+        expires_at = now + ttl
+
+        # Serializar uma única vez para L2 e L3 (o tamanho serve para o L1)
+        blob = None
+        if self.l2_enabled or self.l3_enabled:
+            try:
+                blob = self.serializer.dumps(value)
+            except Exception as e:
+                self._count(self.l2_stats if self.l2_enabled else self.l3_stats, "errors")
+                logger.warning(f"⚠️  Cache: valor de '{key}' não serializável ({e}); apenas L1")
+
         # Armazenar em L1
-        self._set_l1(key, value, ttl)
-        
+        size = (len(blob) if blob is not None else _estimate_size(value)) + ENTRY_OVERHEAD
+        key_hash = hash(key)
+        self.l1_cache.stripe(key_hash).put(key, key_hash, value, expires_at, size)
+
+        if blob is None:
+            # Versão anterior da chave em L2/L3 não pode voltar depois que o L1 despejar esta
+            self._delete_lower(key)
+            return
+
         # Armazenar em L2 (Redis)
-        if self.l2_enabled and self.l2_client:
+        self._set_l2(key, blob, expires_at, now)
+
+        # Armazenar em L3 (SQLite) - se habilitado
+        if self.l3_enabled:
             try:
-                cache_data = {
-                    "value": value,
-                    "ttl": ttl,
-                    "timestamp": time.time()
-                }
-                self.l2_client.setex(
-                    f"cache:{key}",
-                    ttl,
-                    json.dumps(cache_data)
-                )
-                self.l2_stats["sets"] += 1
+                self.l3_store.set(key, blob, expires_at)
+                self._count(self.l3_stats, "sets")
             except Exception as e:
-                self.l2_stats["errors"] += 1
-                if self.l2_stats["errors"] % 100 == 0:
-                    print(f"⚠️  L2 Cache set error: {e}")
-        
-        # Armazenar em L3 (Database) - se habilitado
-        if self.l3_enabled:
-            # Implementar armazenamento em database se necessário
-            pass
-    
-    def _set_l1(self, key: str, value: Any, ttl: int):
-        """Armazenar em L1 (in-memory) com LRU eviction"""
-        expires_at = time.time() + ttl
-        
-        # Se já existe, atualizar
-        if key in self.l1_cache:
-            self.l1_cache[key] = {
-                "value": value,
-                "expires_at": expires_at
-            }
-            self.l1_cache.move_to_end(key)
-        else:
-            # Adicionar novo item
-            self.l1_cache[key] = {
-                "value": value,
-                "expires_at": expires_at
-            }
-            
-            # Se excedeu tamanho máximo, remover LRU
-            if len(self.l1_cache) > self.l1_max_size:
-                oldest_key = next(iter(self.l1_cache))
-                del self.l1_cache[oldest_key]
-                self.l1_stats["evictions"] += 1
-        
-        self.l1_stats["sets"] += 1
-    
+                self._count(self.l3_stats, "errors")
+                print(f"⚠️  L3 Cache set error: {e}")
+
+    def _set_l2(self, key: str, blob: bytes, expires_at: float, now: float):
+        if not (self.l2_enabled and self.l2_client):
+            return
+        try:
+            self.l2_client.setex(
+                f"cache:{key}",
+                max(1, int(expires_at - now + 0.999)),
+                _L2_HEADER.pack(expires_at) + blob
+            )
+            self._count(self.l2_stats, "sets")
+        except Exception as e:
+            self._count(self.l2_stats, "errors")
+            if self.l2_stats["errors"] % 100 == 0:
+                print(f"⚠️  L2 Cache set error: {e}")
+
     def delete(self, key: str):
         """Remover do cache (L1, L2, L3)"""
         # Remover de L1
-        if key in self.l1_cache:
-            del self.l1_cache[key]
-        
+        self.l1_cache.stripe(hash(key)).delete(key)
+        self._delete_lower(key)
+
+    def _delete_lower(self, key: str):
+        """Remover de L2 e L3"""
         # Remover de L2
         if self.l2_enabled and self.l2_client:
             try:
                 self.l2_client.delete(f"cache:{key}")
-            except:
+            except Exception:
                 pass
-        
+
         # Remover de L3 - se habilitado
         if self.l3_enabled:
-            pass
-    
+            try:
+                self.l3_store.delete(key)
+            except Exception:
+                pass
+
     def clear(self, level: Optional[str] = None):
         """Limpar cache (todos os níveis ou nível específico)"""
         if level is None or level == "l1":
             self.l1_cache.clear()
-            self.l1_stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0}
-        
+            self._latency["l1"].clear()
+            self._latency["miss"].clear()
+
         if (level is None or level == "l2") and self.l2_enabled and self.l2_client:
             try:
                 # Limpar todas as chaves de cache
                 keys = self.l2_client.keys("cache:*")
                 if keys:
                     self.l2_client.delete(*keys)
-            except:
+            except Exception:
+                pass
+
+        if (level is None or level == "l3") and self.l3_enabled:
+            try:
+                self.l3_store.clear()
+            except Exception:
                 pass
-        
-        if level is None or level == "l3":
-            # Limpar L3 se habilitado
-            pass
-    
+
     def get_stats(self) -> Dict:
-        """Obter estatísticas do cache"""
-        l1_hit_rate = 0.0
-        if self.l1_stats["hits"] + self.l1_stats["misses"] > 0:
-            l1_hit_rate = self.l1_stats["hits"] / (self.l1_stats["hits"] + self.l1_stats["misses"])
-        
-        l2_hit_rate = 0.0
-        if self.l2_stats["hits"] + self.l2_stats["misses"] > 0:
-            l2_hit_rate = self.l2_stats["hits"] / (self.l2_stats["hits"] + self.l2_stats["misses"])
-        
+        """Obter estatísticas do cache (hit rate e latência p50/p95/p99 em µs por nível)"""
+        l1_stats = self.l1_cache.stats()
+
+        def hit_rate(stats):
+            lookups = stats["hits"] + stats["misses"]
+            return stats["hits"] / lookups if lookups else 0.0
+
+        with self._stats_lock:
+            l2_stats, l3_stats = dict(self.l2_stats), dict(self.l3_stats)
+
         return {
             "l1": {
-                **self.l1_stats,
+                **l1_stats,
                 "size": len(self.l1_cache),
                 "max_size": self.l1_max_size,
-                "hit_rate": l1_hit_rate
+                "bytes": self.l1_cache.bytes,
+                "max_bytes": self.l1_max_bytes,
+                "stripes": len(self.l1_cache.stripes),
+                "hit_rate": hit_rate(l1_stats),
+                "latency_us": self._latency["l1"].percentiles()
             },
             "l2": {
-                **self.l2_stats,
+                **l2_stats,
                 "enabled": self.l2_enabled,
-                "hit_rate": l2_hit_rate
+                "serializer": getattr(self.serializer, "name", type(self.serializer).__name__),
+                "hit_rate": hit_rate(l2_stats),
+                "latency_us": self._latency["l2"].percentiles()
             },
             "l3": {
-                **self.l3_stats,
-                "enabled": self.l3_enabled
-            }
+                **l3_stats,
+                "enabled": self.l3_enabled,
+                "entries": self.l3_store.count() if self.l3_enabled else 0,
+                "hit_rate": hit_rate(l3_stats),
+                "latency_us": self._latency["l3"].percentiles()
+            },
+            "miss_latency_us": self._latency["miss"].percentiles()
         }
-    
+
     def prefetch(self, keys: List[str], fetch_func: callable):
         """
         Prefetch inteligente de múltiplas chaves
-        
+
         Args:
             keys: Lista de chaves para prefetch
             fetch_func: Função para buscar dados (recebe lista de keys, retorna dict)
         """
         # Identificar chaves que não estão no cache
         missing_keys = [key for key in keys if key not in self.l1_cache]
-        
+
         if not missing_keys:
             return  # Todas já estão no cache
-        
+
         # Buscar dados faltantes
         try:
             fetched_data = fetch_func(missing_keys)
-            
+
             # Armazenar no cache
             for key, value in fetched_data.items():
                 if value is not None:
@@ -302,20 +803,28 @@ class HierarchicalCache:
         except Exception as e:
             print(f"⚠️  Erro no prefetch: {e}")
 
+    def close(self):
+        """Fechar o L3 (SQLite)"""
+        if self.l3_store is not None:
+            self.l3_store.close()
+
 # Instância global
 _global_hierarchical_cache = None
+_global_lock = threading.Lock()
 
 def get_hierarchical_cache() -> HierarchicalCache:
     """Obter instância global do cache hierárquico"""
     global _global_hierarchical_cache
     if _global_hierarchical_cache is None:
-        _global_hierarchical_cache = HierarchicalCache()
+        with _global_lock:
+            if _global_hierarchical_cache is None:
+                _global_hierarchical_cache = HierarchicalCache()
     return _global_hierarchical_cache
 
 def cached_hierarchical(ttl: Optional[int] = None, data_type: str = "default"):
     """
     Decorator para cachear resultados usando cache hierárquico
-    
+
     Args:
         ttl: Time to live em segundos (None = adaptativo)
         data_type: Tipo de dado para TTL adaptativo
@@ -324,21 +833,21 @@ def cached_hierarchical(ttl: Optional[int] = None, data_type: str = "default"):
         @wraps(func)
         def wrapper(*args, **kwargs):
             cache = get_hierarchical_cache()
-            
+
             # Criar chave do cache
             cache_key = f"{func.__name__}_{hashlib.sha256(str(args).encode() + str(kwargs).encode()).hexdigest()[:16]}"
-            
+
             # Tentar buscar do cache
             cached_result = cache.get(cache_key)
             if cached_result is not None:
                 return cached_result
-            
+
             # Executar função
             result = func(*args, **kwargs)
-            
+
             # Armazenar no cache
             cache.set(cache_key, result, ttl=ttl, data_type=data_type)
-            
+
             return result
         return wrapper
     return decorator
@@ -347,38 +856,22 @@ if __name__ == '__main__':
     print("="*70)
     print("💾 HIERARCHICAL CACHE - TESTE")
     print("="*70)
-    
+
     cache = HierarchicalCache()
-    
+
     # Teste básico
     print("\n📝 Teste 1: Set e Get")
     cache.set("test_key", {"data": "test"}, ttl=60)
     result = cache.get("test_key")
     print(f"   ✅ Resultado: {result}")
-    
+
     # Teste de TTL adaptativo
     print("\n📝 Teste 2: TTL Adaptativo")
     cache.set("balance_0x123", 100.0, data_type="balance")
     cache.set("gas_price_polygon", 30.0, data_type="gas_price")
     cache.set("exchange_rate_BTC", 50000.0, data_type="exchange_rate")
-    
+
     # Estatísticas
     print("\n📊 Estatísticas:")
     stats = cache.get_stats()
     print(json.dumps(stats, indent=2, ensure_ascii=False))
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
@@ -40,7 +40,12 @@ def integrate_proof_bundles_in_bridge():
             
             # Criar merkle proof (se disponível)
             merkle_proof = None
-            if source_tx.get("block_number"):
+            if source_tx.get("tx_hash"):
+                # Prova real quando o nó da chain de origem serve provas de inclusão
+                merkle_proof = proof_bundle_generator.generate_merkle_proof_for_transaction(
+                    source_chain, source_tx.get("tx_hash")
+                )
+            if merkle_proof is None and source_tx.get("block_number"):
                 # Simular merkle proof (em produção, buscar da blockchain)
                 merkle_proof = proof_bundle_generator.generate_merkle_proof(
                     leaf_data=json.dumps({"tx_hash": source_tx.get("tx_hash")}, sort_keys=True),
@@ -0,0 +1,488 @@
+# mempool.py
+# 📥 MEMPOOL - ALLIANZA BLOCKCHAIN
+# Fila de transações pendentes por shard: prioridade, nonces, limite de memória
+
+import heapq
+import itertools
+import logging
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Limites padrão
+DEFAULT_MAX_TXS_PER_SHARD = 100_000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def estimate_tx_size(tx: Dict) -> int:
+    """Estimativa barata do tamanho em memória de uma transação (bytes)"""
+    size = 232  # dict + entrada do mempool
+    for key, value in tx.items():
+        size += 50 + len(key)
+        if isinstance(value, str):
+            size += 49 + len(value)
+        else:
+            size += 32
+    return size
+
+
+class _Entry:
+    __slots__ = ("tx", "tx_id", "sender", "nonce", "fee", "timestamp", "shard_id", "size", "seq")
+
+    def __init__(self, tx, tx_id, sender, nonce, fee, timestamp, shard_id, size, seq):
+        self.tx = tx
+        self.tx_id = tx_id
+        self.sender = sender
+        self.nonce = nonce
+        self.fee = fee
+        self.timestamp = timestamp
+        self.shard_id = shard_id
+        self.size = size
+        self.seq = seq
+
+
+class ShardPendingView:
+    """
+    Visão de um shard do mempool com a interface da antiga lista de pendentes
+    (len, iteração, append, extend, copy) para o código que ainda a usa.
+    """
+
+    def __init__(self, mempool: "Mempool", shard_id: int):
+        self.mempool = mempool
+        self.shard_id = shard_id
+
+    def __len__(self) -> int:
+        return self.mempool.shard_size(self.shard_id)
+
+    def __bool__(self) -> bool:
+        return self.mempool.shard_size(self.shard_id) > 0
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.mempool.shard_transactions(self.shard_id))
+
+    def __getitem__(self, item):
+        return self.mempool.shard_transactions(self.shard_id)[item]
+
+    def append(self, tx: Dict):
+        self.mempool.add(tx, self.shard_id)
+
+    def extend(self, txs):
+        for tx in list(txs):
+            self.mempool.add(tx, self.shard_id)
+
+    def copy(self) -> List[Dict]:
+        return self.mempool.shard_transactions(self.shard_id)
+
+
+class Mempool:
+    """
+    📥 MEMPOOL
+    Transações pendentes por shard.
+
+    - Heap por shard com as transações executáveis, ordenadas por taxa
+      (maior primeiro) e timestamp (mais antiga primeiro)
+    - Fila de nonces por remetente: só o menor nonce pendente de cada
+      remetente fica no heap; o próximo entra quando ele sai
+    - Duplicatas detectadas em O(1) pelo id da transação
+    - Limite por shard (quantidade) e global (bytes) com despejo das
+      transações de menor prioridade
+    - pop_block retira as N melhores sem copiar a fila
+    """
+
+    def __init__(self, num_shards: int, max_txs_per_shard: int = DEFAULT_MAX_TXS_PER_SHARD,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_txs_per_shard = max_txs_per_shard
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._seq = itertools.count()
+
+        self._entries: Dict[str, _Entry] = {}
+        self._shard_entries: Dict[int, Dict[str, _Entry]] = {}
+        self._ready: Dict[int, list] = {}
+        self._evict: Dict[int, list] = {}
+
+        self._by_sender: Dict[str, Dict[int, str]] = {}
+        self._next_nonce: Dict[str, int] = {}
+        self._assign_nonce: Dict[str, int] = {}
+
+        self.total_bytes = 0
+        self.stats = defaultdict(int)
+        # Chamado (fora do lock) com (tx, shard_id) para cada transação aceita
+        self.on_add: Optional[Callable[[Dict, int], None]] = None
+        # Chamado (fora do lock) com as transações que saíram sem ser seladas
+        # (despejo por limite ou substituição por taxa maior): libera o débito reservado
+        self.on_evict: Optional[Callable[[List[Dict]], None]] = None
+
+        for shard_id in range(num_shards):
+            self.add_shard(shard_id)
+
+    # ------------------------------------------------------------------
+    # Shards
+    # ------------------------------------------------------------------
+
+    def add_shard(self, shard_id: int):
+        with self._lock:
+            self._shard_entries.setdefault(shard_id, {})
+            self._ready.setdefault(shard_id, [])
+            self._evict.setdefault(shard_id, [])
+
+    def remove_shard(self, shard_id: int) -> List[Dict]:
+        """Remove um shard e devolve suas transações (para realocação)"""
+        with self._lock:
+            txs = self.shard_transactions(shard_id)
+            for entry in list(self._shard_entries.get(shard_id, {}).values()):
+                self._discard(entry)
+                if not self._by_sender.get(entry.sender):
+                    self._forget_sender(entry.sender)
+            self._shard_entries.pop(shard_id, None)
+            self._ready.pop(shard_id, None)
+            self._evict.pop(shard_id, None)
+            return txs
+
+    def move(self, shard_id: int, target: Callable[[Dict], int]) -> int:
+        """
+        Realoca as transações do shard cujo destino (target(tx)) mudou, mantendo
+        nonce, taxa e ordem de chegada; usado na migração online de shards.
+        """
+        with self._lock:
+            entries = self._shard_entries.get(shard_id)
+            if not entries:
+                return 0
+            moved = 0
+            for tx_id, entry in list(entries.items()):
+                destination = target(entry.tx)
+                if destination == shard_id:
+                    continue
+                self.add_shard(destination)
+                del entries[tx_id]
+                entry.shard_id = destination
+                self._shard_entries[destination][tx_id] = entry
+                heapq.heappush(self._evict[destination], (entry.fee, -entry.timestamp, -entry.seq, tx_id))
+                if self._next_nonce.get(entry.sender) == entry.nonce:
+                    self._push_ready(entry)
+                moved += 1
+            if moved:
+                self._ready[shard_id] = [item for item in self._ready[shard_id]
+                                         if item[3] in entries and self._is_ready(item[3])]
+                heapq.heapify(self._ready[shard_id])
+                self._compact_evict(shard_id)
+                self.stats["moved"] += moved
+            return moved
+
+    def shard_ids(self) -> List[int]:
+        return list(self._shard_entries.keys())
+
+    def view(self, shard_id: int) -> ShardPendingView:
+        self.add_shard(shard_id)
+        return ShardPendingView(self, shard_id)
+
+    def views(self) -> Dict[int, ShardPendingView]:
+        """Dicionário {shard_id: visão} compatível com o antigo pending_transactions"""
+        return {shard_id: ShardPendingView(self, shard_id) for shard_id in self._shard_entries}
+
+    # ------------------------------------------------------------------
+    # Entrada
+    # ------------------------------------------------------------------
+
+    def add(self, tx: Dict, shard_id: int, fee: Optional[float] = None) -> bool:
+        """
+        Adiciona uma transação pendente.
+
+        A transação não é alterada (ela já está assinada): nonce e taxa ficam
+        na entrada do mempool. Usa tx["nonce"] se existir; caso contrário o
+        próximo nonce do remetente.
+
+        Returns:
+            True se aceita, False se duplicada ou rejeitada pelo limite
+        """
+        tx_id = tx.get("id") or tx.get("tx_hash") or tx.get("hash")
+        if tx_id is None:
+            tx_id = f"anon-{next(self._seq)}"
+        sender = tx.get("sender") or ""
+        if fee is None:
+            fee = tx.get("fee", 0) or 0
+        timestamp = tx.get("timestamp", 0) or 0
+        evicted: List[Dict] = []
+        try:
+            accepted = self._add_locked(tx, tx_id, sender, fee, timestamp, shard_id, evicted)
+        finally:
+            if evicted:
+                self._notify_evicted(evicted)
+
+        if accepted and self.on_add is not None:
+            try:
+                self.on_add(tx, shard_id)
+            except Exception as e:
+                logger.warning(f"Erro no ouvinte do mempool: {e}")
+        return accepted
+
+    def _add_locked(self, tx: Dict, tx_id: str, sender: str, fee: float, timestamp: float,
+                    shard_id: int, evicted: List[Dict]) -> bool:
+        with self._lock:
+            if tx_id in self._entries:
+                self.stats["rejected_duplicate"] += 1
+                return False
+            if shard_id not in self._shard_entries:
+                self.add_shard(shard_id)
+
+            queue = self._by_sender.get(sender)
+            nonce = tx.get("nonce")
+            assigned = nonce is None
+            if assigned:
+                nonce = self._assign_nonce.get(sender, self._next_nonce.get(sender, 0))
+            if queue is None:
+                queue = self._by_sender[sender] = {}
+                self._next_nonce.setdefault(sender, nonce)
+            elif nonce < self._next_nonce[sender]:
+                self.stats["rejected_stale_nonce"] += 1
+                return False
+
+            # Mesmo nonce: substituição só com taxa maior
+            replaced = queue.get(nonce)
+            if replaced is not None:
+                old = self._entries[replaced]
+                if fee <= old.fee:
+                    self.stats["rejected_underpriced"] += 1
+                    return False
+                self._discard(old)
+                evicted.append(old.tx)
+                self.stats["replaced"] += 1
+
+            size = estimate_tx_size(tx)
+            if not self._make_room(shard_id, fee, size, evicted):
+                self.stats["rejected_full"] += 1
+                if sender in self._by_sender and not self._by_sender[sender]:
+                    self._forget_sender(sender)
+                return False
+
+            if sender not in self._next_nonce:
+                # O despejo esvaziou a fila do próprio remetente
+                self._by_sender[sender] = {}
+                self._next_nonce[sender] = nonce
+            elif assigned:
+                # O despejo pode ter liberado nonces do próprio remetente: ocupar a
+                # primeira lacuna em vez de ficar atrás dela para sempre
+                nonce = min(nonce, self._assign_nonce.get(sender, nonce))
+
+            entry = _Entry(tx, tx_id, sender, nonce, fee, timestamp, shard_id, size, next(self._seq))
+            self._entries[tx_id] = entry
+            self._shard_entries[shard_id][tx_id] = entry
+            self._by_sender.setdefault(sender, {})[nonce] = tx_id
+            self._assign_nonce[sender] = max(self._assign_nonce.get(sender, 0), nonce + 1)
+            self.total_bytes += size
+            heapq.heappush(self._evict[shard_id], (fee, -timestamp, -entry.seq, tx_id))
+            if nonce == self._next_nonce[sender]:
+                self._push_ready(entry)
+            self.stats["added"] += 1
+            return True
+
+    def _notify_evicted(self, txs: List[Dict]):
+        if self.on_evict is None:
+            return
+        try:
+            self.on_evict(txs)
+        except Exception as e:
+            logger.warning(f"Erro no ouvinte de despejo do mempool: {e}")
+
+    def _push_ready(self, entry: _Entry):
+        heap = self._ready[entry.shard_id]
+        heapq.heappush(heap, (-entry.fee, entry.timestamp, entry.seq, entry.tx_id))
+        if len(heap) > 2 * len(self._shard_entries[entry.shard_id]) + 1024:
+            self._compact_ready(entry.shard_id)
+
+    def _make_room(self, shard_id: int, fee: float, size: int, evicted: List[Dict]) -> bool:
+        """Despeja as transações de menor prioridade até caber a nova"""
+        shard = self._shard_entries[shard_id]
+        while len(shard) >= self.max_txs_per_shard or self.total_bytes + size > self.max_bytes:
+            victim = self._lowest(shard_id)
+            if victim is None:
+                # Shard vazio mas limite global estourado: despejar de outro shard
+                victim = self._lowest_any()
+                if victim is None:
+                    return False
+            if victim.fee >= fee:
+                return False
+            evicted.extend(self._evict_with_successors(victim))
+        return True
+
+    def _lowest(self, shard_id: int) -> Optional[_Entry]:
+        heap = self._evict[shard_id]
+        while heap:
+            tx_id = heap[0][3]
+            entry = self._entries.get(tx_id)
+            if entry is not None and entry.shard_id == shard_id and -heap[0][2] == entry.seq:
+                return entry
+            heapq.heappop(heap)
+        return None
+
+    def _lowest_any(self) -> Optional[_Entry]:
+        candidates = [e for e in (self._lowest(s) for s in self._shard_entries) if e is not None]
+        return min(candidates, key=lambda e: (e.fee, -e.timestamp)) if candidates else None
+
+    def _evict_with_successors(self, victim: _Entry) -> List[Dict]:
+        """Despeja a transação e as de nonce maior do mesmo remetente (ficariam bloqueadas)"""
+        evicted = []
+        queue = self._by_sender.get(victim.sender, {})
+        for nonce in sorted(n for n in queue if n >= victim.nonce):
+            entry = self._entries.get(queue[nonce])
+            if entry is not None:
+                self._discard(entry)
+                evicted.append(entry.tx)
+                self.stats["evicted"] += 1
+        if victim.sender in self._assign_nonce:
+            # Nonces despejados voltam a ser atribuídos, sem lacuna
+            self._assign_nonce[victim.sender] = victim.nonce
+        if not self._by_sender.get(victim.sender):
+            self._forget_sender(victim.sender)
+        return evicted
+
+    def _discard(self, entry: _Entry):
+        self._entries.pop(entry.tx_id, None)
+        self._shard_entries.get(entry.shard_id, {}).pop(entry.tx_id, None)
+        queue = self._by_sender.get(entry.sender)
+        if queue is not None and queue.get(entry.nonce) == entry.tx_id:
+            del queue[entry.nonce]
+        self.total_bytes -= entry.size
+
+    def _forget_sender(self, sender: str):
+        self._by_sender.pop(sender, None)
+        self._next_nonce.pop(sender, None)
+        self._assign_nonce.pop(sender, None)
+
+    def _compact_ready(self, shard_id: int):
+        heap = [item for item in self._ready[shard_id] if self._is_ready(item[3])]
+        heapq.heapify(heap)
+        self._ready[shard_id] = heap
+
+    def _compact_evict(self, shard_id: int):
+        shard = self._shard_entries[shard_id]
+        heap = [(e.fee, -e.timestamp, -e.seq, e.tx_id) for e in shard.values()]
+        heapq.heapify(heap)
+        self._evict[shard_id] = heap
+
+    def _is_ready(self, tx_id: str) -> bool:
+        entry = self._entries.get(tx_id)
+        return entry is not None and self._next_nonce.get(entry.sender) == entry.nonce
+
+    # ------------------------------------------------------------------
+    # Saída
+    # ------------------------------------------------------------------
+
+    def pop_block(self, shard_id: int, max_txs: int) -> List[Dict]:
+        """Retira até max_txs transações executáveis de maior prioridade do shard"""
+        selected = []
+        with self._lock:
+            heap = self._ready.get(shard_id)
+            if not heap:
+                return selected
+            heappop = heapq.heappop
+            entries = self._entries
+            shard_entries = self._shard_entries[shard_id]
+            next_nonce = self._next_nonce
+            by_sender = self._by_sender
+            while heap and len(selected) < max_txs:
+                tx_id = heappop(heap)[3]
+                entry = entries.get(tx_id)
+                if entry is None or entry.shard_id != shard_id or next_nonce.get(entry.sender) != entry.nonce:
+                    continue
+                # Remover a entrada (equivalente a _discard, inline no caminho quente)
+                del entries[tx_id]
+                del shard_entries[tx_id]
+                self.total_bytes -= entry.size
+                sender = entry.sender
+                queue = by_sender[sender]
+                del queue[entry.nonce]
+                next_nonce[sender] = entry.nonce + 1
+                if queue:
+                    successor = queue.get(entry.nonce + 1)
+                    if successor is not None:
+                        self._push_ready(entries[successor])
+                else:
+                    self._forget_sender(sender)
+                selected.append(entry.tx)
+
+            evict_heap = self._evict.get(shard_id)
+            if evict_heap is not None and len(evict_heap) > 2 * len(shard_entries) + 1024:
+                self._compact_evict(shard_id)
+            self.stats["popped"] += len(selected)
+        return selected
+
+    def requeue(self, txs: List[Dict], shard_id: int):
+        """
+        Devolve transações retiradas por pop_block (ex.: falharam na validação)
+        à frente da fila dos seus remetentes, preservando a ordem relativa.
+        """
+        with self._lock:
+            if shard_id not in self._shard_entries:
+                self.add_shard(shard_id)
+            for tx in reversed(txs):
+                tx_id = tx.get("id") or tx.get("tx_hash") or tx.get("hash") or f"anon-{next(self._seq)}"
+                if tx_id in self._entries:
+                    continue
+                sender = tx.get("sender") or ""
+                if sender in self._next_nonce:
+                    nonce = self._next_nonce[sender] - 1
+                else:
+                    nonce = 0
+                    self._by_sender[sender] = {}
+                    self._assign_nonce[sender] = 1
+                self._next_nonce[sender] = nonce
+
+                entry = _Entry(tx, tx_id, sender, nonce, tx.get("fee", 0) or 0, tx.get("timestamp", 0) or 0,
+                               shard_id, estimate_tx_size(tx), next(self._seq))
+                self._entries[tx_id] = entry
+                self._shard_entries[shard_id][tx_id] = entry
+                self._by_sender[sender][nonce] = tx_id
+                self.total_bytes += entry.size
+                heapq.heappush(self._evict[shard_id], (entry.fee, -entry.timestamp, -entry.seq, tx_id))
+                self._push_ready(entry)
+                self.stats["requeued"] += 1
+
+    def remove(self, tx_id: str) -> Optional[Dict]:
+        """
+        Remove uma transação específica (e as seguintes do mesmo remetente).
+        Como no despejo, as removidas vão para on_evict e os nonces voltam a ser atribuídos.
+        """
+        with self._lock:
+            entry = self._entries.get(tx_id)
+            if entry is None:
+                return None
+            removed = self._evict_with_successors(entry)
+        self._notify_evicted(removed)
+        return entry.tx
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def __contains__(self, tx_id: str) -> bool:
+        return tx_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, tx_id: str) -> Optional[Dict]:
+        entry = self._entries.get(tx_id)
+        return entry.tx if entry is not None else None
+
+    def shard_size(self, shard_id: int) -> int:
+        return len(self._shard_entries.get(shard_id, ()))
+
+    def shard_transactions(self, shard_id: int) -> List[Dict]:
+        """Transações do shard em ordem de chegada (cópia rasa)"""
+        with self._lock:
+            return [entry.tx for entry in self._shard_entries.get(shard_id, {}).values()]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "transactions": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "max_txs_per_shard": self.max_txs_per_shard,
+                "senders": len(self._by_sender),
+                "per_shard": {shard_id: len(entries) for shard_id, entries in self._shard_entries.items()},
+                **dict(self.stats)
+            }
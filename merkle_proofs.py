@@ -0,0 +1,70 @@
+# merkle_proofs.py
+# 🌳 PROVAS DE INCLUSÃO MERKLE - ALLIANZA BLOCKCHAIN
+# Registro de provedores de prova por chain + verificação para clientes leves
+
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+import block_codec
+
+logger = logging.getLogger(__name__)
+
+# chain_id -> função(tx_id) que devolve a prova no formato de Block.merkle_proof
+_providers: Dict[str, Callable[[str], Dict]] = {}
+_providers_lock = threading.Lock()
+
+
+def register_proof_provider(chain_id: str, provider: Callable[[str], Dict]):
+    """Registra quem serve provas de inclusão para a chain (ex.: o nó Allianza)"""
+    with _providers_lock:
+        _providers[chain_id] = provider
+
+
+def unregister_proof_provider(chain_id: str):
+    with _providers_lock:
+        _providers.pop(chain_id, None)
+
+
+def get_inclusion_proof(chain_id: str, tx_id: str) -> Optional[Dict]:
+    """Prova de inclusão real da transação, ou None se a chain não tem provedor / tx não foi selada"""
+    provider = _providers.get(chain_id)
+    if provider is None:
+        return None
+    try:
+        proof = provider(tx_id)
+    except Exception as e:
+        logger.warning(f"⚠️ Provedor de provas de {chain_id} falhou para {tx_id}: {e}")
+        return None
+    return proof if proof and proof.get("success") else None
+
+
+def verify_inclusion_proof(proof: Dict) -> bool:
+    """
+    Verificação de cliente leve, sem o corpo do bloco:
+    1. sha256(header) == block_hash
+    2. tx_root do cabeçalho == tx_root da prova
+    3. folha (transação codificada) + caminho recalculam tx_root
+    """
+    try:
+        header = bytes.fromhex(proof["header"])
+        if block_codec.hash_header(header) != proof["block_hash"]:
+            return False
+        if block_codec.decode_block_header(header)["tx_root"] != proof["tx_root"]:
+            return False
+
+        leaf = bytes.fromhex(proof["leaf_hash"])
+        encoded = proof.get("encoded_transaction")
+        if encoded is not None and block_codec.hash_leaf(bytes.fromhex(encoded)) != leaf:
+            return False
+        transaction = proof.get("transaction")
+        if transaction is not None and encoded is not None and \
+                block_codec.encode_transaction(transaction).hex() != encoded:
+            return False
+
+        if len(proof["path"]) != len(proof["positions"]):
+            return False
+        path = [(bytes.fromhex(sibling), side) for sibling, side in zip(proof["path"], proof["positions"])]
+        return block_codec.verify_proof(leaf, path, bytes.fromhex(proof["tx_root"]))
+    except (KeyError, ValueError, TypeError):
+        return False
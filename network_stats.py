@@ -0,0 +1,363 @@
+# network_stats.py
+# 📊 ESTATÍSTICAS DE REDE INCREMENTAIS - ALLIANZA BLOCKCHAIN
+# Contadores em anéis de tempo (1s/1m/1h/24h) alimentados por selagem de blocos e entrada de transações
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Métricas somáveis de cada balde (mesma ordem das colunas da tabela de rollup)
+METRICS = (
+    "transactions", "cross_chain_transactions", "cross_chain_volume", "quantum_signed",
+    "qrs3_verified", "gas_used", "gas_cost", "blocks", "sealed_transactions",
+    "block_interval_sum", "block_intervals",
+)
+_INDEX = {name: i for i, name in enumerate(METRICS)}
+
+# (nome, largura do balde em segundos, baldes no anel)
+RINGS = (
+    ("1s", 1, 60),       # último minuto
+    ("1m", 60, 60),      # última hora
+    ("1h", 3600, 24),    # últimas 24h
+    ("24h", 86400, 30),  # últimos 30 dias
+)
+# Anel de 1s não é persistido: some em um minuto de qualquer forma
+PERSISTED_RINGS = ("1m", "1h", "24h")
+TOTAL_RESOLUTION = "total"
+
+ACTIVE_WINDOW = 3600        # shard/validador "ativo" = selou bloco na última hora
+FLUSH_INTERVAL = 5.0        # segundos entre gravações do rollup
+CHAINS_SUPPORTED = ["Allianza", "Polygon", "Bitcoin", "Ethereum", "BSC", "Solana", "Base", "Avalanche"]
+
+
+class _Ring:
+    """Anel de baldes de largura fixa com somas da janela mantidas incrementalmente"""
+
+    __slots__ = ("name", "width", "slots", "values", "sums", "head")
+
+    def __init__(self, name: str, width: int, slots: int):
+        self.name = name
+        self.width = width
+        self.slots = slots
+        self.values = [[0.0] * len(METRICS) for _ in range(slots)]
+        self.sums = [0.0] * len(METRICS)
+        self.head: Optional[int] = None  # número absoluto do balde mais recente
+
+    def bucket(self, timestamp: float) -> int:
+        return int(timestamp // self.width)
+
+    def advance(self, bucket: int):
+        """Move a janela até o balde; baldes que saem têm seus valores subtraídos das somas"""
+        if self.head is None:
+            self.head = bucket
+            return
+        if bucket <= self.head:
+            return
+        if bucket - self.head >= self.slots:
+            for slot in self.values:
+                slot[:] = [0.0] * len(METRICS)
+            self.sums = [0.0] * len(METRICS)
+        else:
+            sums = self.sums
+            for number in range(self.head + 1, bucket + 1):
+                slot = self.values[number % self.slots]
+                for i, value in enumerate(slot):
+                    if value:
+                        sums[i] -= value
+                        slot[i] = 0.0
+        self.head = bucket
+
+    def in_window(self, bucket: int) -> bool:
+        return self.head is not None and self.head - self.slots < bucket <= self.head
+
+    def add(self, bucket: int, deltas: Iterable[Tuple[int, float]]) -> bool:
+        self.advance(bucket)
+        if not self.in_window(bucket):
+            return False  # evento mais antigo que a janela
+        slot = self.values[bucket % self.slots]
+        for i, delta in deltas:
+            slot[i] += delta
+            self.sums[i] += delta
+        return True
+
+    def window(self) -> Dict[str, float]:
+        # max(0, ...): resíduo de ponto flutuante das subtrações
+        return {name: max(0.0, self.sums[i]) for i, name in enumerate(METRICS)}
+
+
+def transaction_deltas(tx: Dict) -> List[Tuple[int, float]]:
+    """Contribuição de uma transação para as métricas"""
+    deltas = [(_INDEX["transactions"], 1.0)]
+    if tx.get("is_cross_chain") or tx.get("source_chain") or str(tx.get("type", "")).startswith("cross_chain"):
+        deltas.append((_INDEX["cross_chain_transactions"], 1.0))
+        try:
+            deltas.append((_INDEX["cross_chain_volume"], float(tx.get("amount", 0) or 0)))
+        except (TypeError, ValueError):
+            pass
+    if tx.get("qrs3_signature") or tx.get("quantum_signature") or tx.get("has_quantum_signature"):
+        deltas.append((_INDEX["quantum_signed"], 1.0))
+    if tx.get("qrs3_verified"):
+        deltas.append((_INDEX["qrs3_verified"], 1.0))
+    for name in ("gas_used", "gas_cost"):
+        value = tx.get(name)
+        if value:
+            try:
+                deltas.append((_INDEX[name], float(value)))
+            except (TypeError, ValueError):
+                pass
+    return deltas
+
+
+class NetworkStatsAggregator:
+    """
+    📊 AGREGADOR DE ESTATÍSTICAS DE REDE
+
+    - record_transaction (entrada no mempool) e record_block (selagem) somam
+      a contribuição do evento no balde atual de cada anel e nos totais
+    - Cada anel mantém a soma da sua janela: baldes que expiram são
+      subtraídos ao avançar, então get_stats() é O(1) no volume de blocos/txs
+    - Baldes de 1m/1h/24h, totais e último bloco de cada shard/validador vão
+      para uma tabela de rollup pequena (INSERT OR REPLACE dos baldes sujos),
+      gravada logo depois do COMMIT do bloco e recarregada no início
+    """
+
+    def __init__(self, db=None, flush_interval: float = FLUSH_INTERVAL, clock=time.time):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.rings = {name: _Ring(name, width, slots) for name, width, slots in RINGS}
+        self.totals = [0.0] * len(METRICS)
+        self.shards: Dict[str, Tuple[float, int]] = {}      # shard_id → (timestamp, índice do bloco)
+        self.validators: Dict[str, Tuple[float, int]] = {}  # validador → (timestamp, blocos)
+        self.last_block: Optional[Tuple[float, int, str]] = None  # (timestamp, índice, shard)
+        self._dirty = set()
+        self._dirty_seen = set()
+        self._last_flush = 0.0
+        self.loaded = False
+        self.stats = {"transactions": 0, "blocks": 0, "flushes": 0}
+        if db is not None:
+            self._initialize_tables()
+            self._load()
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    def _initialize_tables(self):
+        columns = ", ".join(f"{name} REAL DEFAULT 0" for name in METRICS)
+        statements = [
+            (f"""CREATE TABLE IF NOT EXISTS network_stats_rollup (
+                    resolution TEXT NOT NULL, bucket INTEGER NOT NULL, {columns},
+                    PRIMARY KEY (resolution, bucket)
+                ) WITHOUT ROWID""", ()),
+            ("""CREATE TABLE IF NOT EXISTS network_stats_seen (
+                    kind TEXT NOT NULL, key TEXT NOT NULL, last_seen REAL, value INTEGER,
+                    PRIMARY KEY (kind, key)
+                ) WITHOUT ROWID""", ()),
+        ]
+        if not self.db.execute_many_commit(statements):
+            logger.error("Erro ao inicializar tabela de rollup de estatísticas")
+
+    def _load(self):
+        """Recarrega totais, baldes ainda dentro das janelas e último bloco por shard/validador"""
+        now = self.clock()
+        rows = self.db.execute_query(
+            f"SELECT resolution, bucket, {', '.join(METRICS)} FROM network_stats_rollup"
+        )
+        for resolution, bucket, *values in rows:
+            values = [float(value or 0) for value in values]
+            if resolution == TOTAL_RESOLUTION:
+                self.totals = values
+                self.loaded = True
+                continue
+            ring = self.rings.get(resolution)
+            if ring is None:
+                continue
+            ring.advance(ring.bucket(now))
+            ring.add(bucket, enumerate(values))
+
+        for kind, key, last_seen, value in self.db.execute_query(
+                "SELECT kind, key, last_seen, value FROM network_stats_seen"):
+            if kind == "shard":
+                self.shards[key] = (last_seen, value)
+                if self.last_block is None or last_seen > self.last_block[0]:
+                    self.last_block = (last_seen, value, key)
+            elif kind == "validator":
+                self.validators[key] = (last_seen, value)
+
+    def _rollup_statements(self) -> List[Tuple[str, tuple]]:
+        """Baldes sujos + totais + shards/validadores tocados desde a última gravação (sob o lock)"""
+        placeholders = ", ".join("?" * (len(METRICS) + 2))
+        upsert = f"INSERT OR REPLACE INTO network_stats_rollup (resolution, bucket, {', '.join(METRICS)}) " \
+                 f"VALUES ({placeholders})"
+        statements = []
+        for resolution, bucket in sorted(self._dirty):
+            ring = self.rings[resolution]
+            if ring.in_window(bucket):
+                statements.append((upsert, (resolution, bucket, *ring.values[bucket % ring.slots])))
+        statements.append((upsert, (TOTAL_RESOLUTION, 0, *self.totals)))
+        for resolution in PERSISTED_RINGS:
+            ring = self.rings[resolution]
+            if ring.head is not None:
+                statements.append(("DELETE FROM network_stats_rollup WHERE resolution = ? AND bucket <= ?",
+                                   (resolution, ring.head - ring.slots)))
+        for kind, key in sorted(self._dirty_seen):
+            last_seen, value = (self.shards if kind == "shard" else self.validators)[key]
+            statements.append(("INSERT OR REPLACE INTO network_stats_seen (kind, key, last_seen, value) "
+                               "VALUES (?, ?, ?, ?)", (kind, key, last_seen, value)))
+        self._dirty.clear()
+        self._dirty_seen.clear()
+        self._last_flush = self.clock()
+        self.stats["flushes"] += 1
+        return statements
+
+    def flush(self) -> bool:
+        """Grava o rollup agora (dentro de db.transaction(), entra no COMMIT em andamento)"""
+        if self.db is None:
+            return False
+        with self._lock:
+            statements = self._rollup_statements()
+        with self.db.transaction():
+            for query, params in statements:
+                self.db.execute_commit(query, params)
+        return True
+
+    def _flush_due(self) -> bool:
+        return self.db is not None and self.clock() - self._last_flush >= self.flush_interval
+
+    def seed_totals(self, blocks: int = 0, transactions: int = 0):
+        """Primeira execução sobre uma cadeia existente: totais a partir das contagens do banco"""
+        with self._lock:
+            if self.loaded:
+                return
+            self.totals[_INDEX["blocks"]] = float(blocks)
+            self.totals[_INDEX["transactions"]] = float(transactions)
+            self.loaded = True
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Eventos
+    # ------------------------------------------------------------------
+
+    def _add(self, now: float, deltas: List[Tuple[int, float]]):
+        for ring in self.rings.values():
+            bucket = ring.bucket(now)
+            if ring.add(bucket, deltas) and ring.name in PERSISTED_RINGS:
+                self._dirty.add((ring.name, bucket))
+        totals = self.totals
+        for i, delta in deltas:
+            totals[i] += delta
+
+    def record_transaction(self, tx: Dict, shard_id: Optional[int] = None):
+        """Transação aceita no mempool (assinatura compatível com Mempool.on_add)"""
+        deltas = transaction_deltas(tx)
+        with self._lock:
+            self._add(self.clock(), deltas)
+            self.stats["transactions"] += 1
+            due = self._flush_due()
+        if due:
+            self.flush()
+
+    def record_block(self, block, flush: Optional[bool] = None):
+        """
+        Bloco selado. Chamado depois do COMMIT do bloco: um bloco que não foi
+        gravado não conta; a gravação do rollup (quando vencida) tem COMMIT próprio.
+        """
+        timestamp = float(getattr(block, "timestamp", None) or self.clock())
+        shard = str(getattr(block, "shard_id", ""))
+        index = int(getattr(block, "index", 0) or 0)
+        validator = getattr(block, "validator", None)
+        transactions = getattr(block, "transactions", None) or []
+
+        deltas = [(_INDEX["blocks"], 1.0), (_INDEX["sealed_transactions"], float(len(transactions)))]
+        with self._lock:
+            # Tempo entre blocos da rede (qualquer shard), como no cálculo antigo do explorer
+            if self.last_block is not None and timestamp > self.last_block[0]:
+                deltas.append((_INDEX["block_interval_sum"], timestamp - self.last_block[0]))
+                deltas.append((_INDEX["block_intervals"], 1.0))
+            self._add(self.clock(), deltas)
+            self.shards[shard] = (timestamp, index)
+            self._dirty_seen.add(("shard", shard))
+            if self.last_block is None or timestamp >= self.last_block[0]:
+                self.last_block = (timestamp, index, shard)
+            if validator and validator != "unknown":
+                produced = self.validators.get(validator, (0.0, 0))[1] + 1
+                self.validators[validator] = (timestamp, produced)
+                self._dirty_seen.add(("validator", validator))
+            self.stats["blocks"] += 1
+            due = self._flush_due() if flush is None else flush
+        if due:
+            self.flush()
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def windows(self) -> Dict[str, Dict[str, float]]:
+        """Somas de cada janela (último minuto, hora, 24h, 30 dias)"""
+        now = self.clock()
+        with self._lock:
+            result = {}
+            for ring in self.rings.values():
+                ring.advance(ring.bucket(now))
+                result[ring.name] = ring.window()
+            return result
+
+    def get_stats(self, pending_transactions: int = 0) -> Dict:
+        """Mesmo formato de TestnetExplorer.get_network_stats, sem varrer blocos nem transações"""
+        now = self.clock()
+        windows = self.windows()
+        with self._lock:
+            totals = dict(zip(METRICS, self.totals))
+            active_shards = sum(1 for seen, _ in self.shards.values() if now - seen <= ACTIVE_WINDOW)
+            validators_online = sum(1 for seen, _ in self.validators.values() if now - seen <= ACTIVE_WINDOW)
+            last_block = self.last_block
+
+        # Anel nomeado pela largura do balde: "1m" cobre a última hora, "1h" as últimas 24h
+        minute, hour, day = windows["1s"], windows["1m"], windows["1h"]
+        total_txs = totals["transactions"]
+        intervals = hour["block_intervals"] or day["block_intervals"]
+        interval_sum = hour["block_interval_sum"] if hour["block_intervals"] else day["block_interval_sum"]
+        avg_latency = interval_sum / intervals if intervals else 0
+        return {
+            "total_blocks": int(totals["blocks"]),
+            "total_transactions": int(total_txs),
+            "pending_transactions": pending_transactions,
+            "tps_current": round(hour["transactions"] / 3600, 2),
+            "tps_1m": round(minute["transactions"] / 60, 2),
+            "tps_24h_avg": round(day["transactions"] / 86400, 2),
+            "latency_avg_ms": round(avg_latency * 1000, 2),
+            "active_shards": active_shards,
+            "validators_online": validators_online or 1,
+            "network_status": "operational",
+            "cross_chain": {
+                "total_transactions": int(totals["cross_chain_transactions"]),
+                "total_volume": totals["cross_chain_volume"],
+                "percentage": round(totals["cross_chain_transactions"] / total_txs * 100, 2) if total_txs else 0
+            },
+            "quantum_security": {
+                "quantum_signed_count": int(totals["quantum_signed"]),
+                "quantum_percentage": round(totals["quantum_signed"] / total_txs * 100, 2) if total_txs else 0,
+                "qrs3_verified_count": int(totals["qrs3_verified"])
+            },
+            "gas": {
+                "total_gas_used": totals["gas_used"],
+                "avg_gas_per_tx": round(totals["gas_used"] / total_txs, 0) if total_txs else 0,
+                "total_gas_cost": totals["gas_cost"]
+            },
+            "chains_supported": list(CHAINS_SUPPORTED),
+            "last_block_time": (datetime.fromtimestamp(last_block[0]).strftime("%Y-%m-%d %H:%M:%S")
+                                if last_block else "N/A"),
+            "last_block_index": last_block[1] if last_block else 0,
+            "windows": {
+                name: {"transactions": int(window["transactions"]), "blocks": int(window["blocks"]),
+                       "cross_chain_transactions": int(window["cross_chain_transactions"]),
+                       "quantum_signed": int(window["quantum_signed"])}
+                for name, window in windows.items()
+            }
+        }
@@ -0,0 +1,171 @@
+# nonce_manager.py
+# 🔢 GERENCIADOR DE NONCES EVM - ALLIANZA BLOCKCHAIN
+# Reserva local de nonces por (chain, conta) para enviar várias transações em paralelo
+
+import time
+import heapq
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Erros de envio em que o nonce JÁ foi consumido na rede (não pode ser reutilizado)
+CONSUMED_NONCE_ERRORS = (
+    "nonce too low",
+    "already known",
+    "known transaction",
+    "replacement transaction underpriced",
+    "nonce has already been used",
+)
+
+
+class _AccountNonces:
+    """Estado de uma conta em uma chain"""
+
+    __slots__ = ("lock", "next_nonce", "gaps", "in_flight", "sent", "synced_at", "needs_sync")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.next_nonce: Optional[int] = None
+        self.gaps = []          # Heap de nonces liberados (envio falhou) a reutilizar primeiro
+        self.in_flight = set()  # Reservados e ainda não transmitidos
+        self.sent: Dict[int, float] = {}  # Transmitidos, aguardando o nó contabilizar: nonce -> instante
+        self.synced_at = 0.0
+        self.needs_sync = True
+
+
+class NonceManager:
+    """
+    🔢 GERENCIADOR DE NONCES
+
+    - reserve(): entrega o próximo nonce da conta sem consultar o nó a cada envio
+      (lacunas liberadas são preenchidas antes de avançar)
+    - mark_sent()/release(): resultado do envio; falha antes do broadcast vira lacuna,
+      "nonce too low"/"already known" força nova sincronização
+    - Reconciliação com get_transaction_count(..., "pending") na primeira reserva,
+      a cada `sync_interval` segundos e após erros: transação que sumiu do nó por
+      mais de `drop_timeout` segundos libera seu nonce para ser preenchido de novo
+    """
+
+    def __init__(self, sync_interval: float = 30.0, drop_timeout: float = 120.0):
+        self.sync_interval = sync_interval
+        self.drop_timeout = drop_timeout
+        self._accounts: Dict[Tuple[str, str], _AccountNonces] = {}
+        self._lock = threading.Lock()
+        self.stats = {"reserved": 0, "released": 0, "gaps_filled": 0, "dropped": 0, "syncs": 0, "resyncs": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _state(self, chain: str, address: str) -> _AccountNonces:
+        key = (chain.lower(), address.lower())
+        with self._lock:
+            state = self._accounts.get(key)
+            if state is None:
+                state = self._accounts[key] = _AccountNonces()
+            return state
+
+    def _sync(self, state: _AccountNonces, w3, address: str):
+        """Reconcilia o estado local com o contador pendente do nó (chamado com state.lock)"""
+        pending = w3.eth.get_transaction_count(address, "pending")
+        now = time.time()
+        self._count("syncs")
+        state.synced_at = now
+        state.needs_sync = False
+
+        # Tudo abaixo do contador pendente já está no nó (mempool ou minerado)
+        state.sent = {n: t for n, t in state.sent.items() if n >= pending}
+        state.gaps = [n for n in state.gaps if n >= pending]
+        heapq.heapify(state.gaps)
+
+        if state.next_nonce is None or pending >= state.next_nonce:
+            # Primeiro uso ou a conta enviou por fora deste processo
+            state.next_nonce = pending
+            state.gaps = []
+            return
+
+        # pending < next: o nonce `pending` é o primeiro que o nó não conhece.
+        # Se não está reservado nem é lacuna e foi enviado há muito tempo, a transação caiu.
+        if pending in state.in_flight or pending in state.gaps:
+            return
+        sent_at = state.sent.get(pending)
+        if sent_at is None or now - sent_at > self.drop_timeout:
+            state.sent.pop(pending, None)
+            heapq.heappush(state.gaps, pending)
+            self._count("dropped")
+            logger.warning(f"🔢 Nonce {pending} de {address} sumiu do nó; será preenchido pelo próximo envio")
+
+    def reserve(self, chain: str, address: str, w3) -> int:
+        """Reserva o próximo nonce da conta (lacunas primeiro)"""
+        state = self._state(chain, address)
+        with state.lock:
+            if state.needs_sync or time.time() - state.synced_at > self.sync_interval:
+                self._sync(state, w3, address)
+            if state.gaps:
+                nonce = heapq.heappop(state.gaps)
+                self._count("gaps_filled")
+            else:
+                nonce = state.next_nonce
+                state.next_nonce += 1
+            state.in_flight.add(nonce)
+            self._count("reserved")
+            return nonce
+
+    def mark_sent(self, chain: str, address: str, nonce: int):
+        """Broadcast aceito pelo nó"""
+        state = self._state(chain, address)
+        with state.lock:
+            state.in_flight.discard(nonce)
+            state.sent[nonce] = time.time()
+
+    def release(self, chain: str, address: str, nonce: int, error: Optional[object] = None):
+        """
+        Envio falhou. Se o erro indica nonce já consumido, o nonce não volta
+        e a próxima reserva ressincroniza; senão vira lacuna a ser preenchida.
+        """
+        state = self._state(chain, address)
+        message = str(error).lower() if error is not None else ""
+        with state.lock:
+            state.in_flight.discard(nonce)
+            if any(marker in message for marker in CONSUMED_NONCE_ERRORS):
+                state.needs_sync = True
+                self._count("resyncs")
+                return
+            if nonce not in state.gaps:
+                heapq.heappush(state.gaps, nonce)
+            self._count("released")
+
+    def mark_dropped(self, chain: str, address: str, nonce: int):
+        """Transmitida mas não encontrada na rede: o nonce volta a ser preenchível"""
+        state = self._state(chain, address)
+        with state.lock:
+            state.sent.pop(nonce, None)
+            if nonce not in state.gaps and nonce not in state.in_flight:
+                heapq.heappush(state.gaps, nonce)
+            self._count("dropped")
+
+    def reconcile(self, chain: str, address: str, w3):
+        """Força reconciliação com o nó (ex.: após detectar transação descartada)"""
+        state = self._state(chain, address)
+        with state.lock:
+            self._sync(state, w3, address)
+
+    def get_account_state(self, chain: str, address: str) -> Dict:
+        state = self._state(chain, address)
+        with state.lock:
+            return {
+                "next_nonce": state.next_nonce,
+                "gaps": sorted(state.gaps),
+                "in_flight": sorted(state.in_flight),
+                "sent": sorted(state.sent),
+                "synced_at": state.synced_at
+            }
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "accounts": len(self._accounts)}
+
+
+# Instância global: todas as pontes do processo compartilham os nonces de cada conta
+global_nonce_manager = NonceManager()
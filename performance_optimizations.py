@@ -8,6 +8,7 @@ Implementa todas as otimizações de alta e média prioridade
 import time
 import json
 import hashlib
+import threading
 from typing import Dict, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import defaultdict, deque
@@ -283,85 +284,129 @@ class ConnectionMetrics:
     last_used: float = 0
     last_success: float = 0
     health_score: float = 1.0  # 0.0 a 1.0
+    healthy: bool = True
+    consecutive_failures: int = 0
+    last_error: Optional[str] = None
 
 class IntelligentConnectionPool:
-    """Connection pool inteligente com métricas"""
+    """
+    Connection pool inteligente com métricas
     
-    def __init__(self):
+    - Latência em média móvel exponencial (uma medição lenta não derruba o endpoint)
+    - Endpoint fica não saudável após `unhealthy_after` falhas seguidas e sai do
+      ranking até uma nova medição bem-sucedida (re-probe)
+    - ranked_connections() ordena os saudáveis por health score (taxa de sucesso + latência)
+    """
+    
+    LATENCY_EWMA_ALPHA = 0.3
+    
+    def __init__(self, unhealthy_after: int = 2):
         self.connections = {}  # chain -> List[ConnectionMetrics]
         self.connection_cache = {}  # chain -> Web3 instance
         self.metrics_history = defaultdict(deque)  # chain -> deque de latências
+        self.unhealthy_after = unhealthy_after
+        self._lock = threading.RLock()
     
     def add_connection(self, chain: str, url: str, w3_instance=None):
-        """Adicionar conexão ao pool"""
-        if chain not in self.connections:
-            self.connections[chain] = []
-        
-        metrics = ConnectionMetrics(
-            chain=chain,
-            url=url,
-            latency_ms=0.0,
-            last_used=time.time()
-        )
-        
-        self.connections[chain].append(metrics)
-        
-        if w3_instance:
-            self.connection_cache[chain] = w3_instance
-    
-    def get_optimal_connection(self, chain: str) -> Optional[ConnectionMetrics]:
-        """Obter conexão mais rápida e saudável"""
-        if chain not in self.connections or not self.connections[chain]:
-            return None
-        
-        # Calcular health score para cada conexão
-        for conn in self.connections[chain]:
-            # Health score baseado em:
-            # - Taxa de sucesso
-            # - Latência recente
-            # - Último uso
+        """Adicionar conexão ao pool (idempotente por URL)"""
+        with self._lock:
+            if chain not in self.connections:
+                self.connections[chain] = []
             
-            total_requests = conn.success_count + conn.failure_count
-            if total_requests > 0:
-                success_rate = conn.success_count / total_requests
-            else:
-                success_rate = 1.0
+            if self._find(chain, url) is None:
+                metrics = ConnectionMetrics(
+                    chain=chain,
+                    url=url,
+                    latency_ms=0.0,
+                    last_used=time.time()
+                )
+                self.connections[chain].append(metrics)
             
-            # Latência normalizada (assumindo 1000ms = 0.0, 0ms = 1.0)
+            if w3_instance:
+                self.connection_cache[chain] = w3_instance
+    
+    def _find(self, chain: str, url: str) -> Optional[ConnectionMetrics]:
+        for conn in self.connections.get(chain, []):
+            if conn.url == url:
+                return conn
+        return None
+    
+    def _update_health_score(self, conn: ConnectionMetrics) -> float:
+        # Health score baseado em:
+        # - Taxa de sucesso
+        # - Latência recente (assumindo 1000ms = 0.0, 0ms = 1.0)
+        total_requests = conn.success_count + conn.failure_count
+        success_rate = conn.success_count / total_requests if total_requests > 0 else 1.0
+        if conn.success_count:
             latency_score = max(0.0, 1.0 - (conn.latency_ms / 1000.0))
-            
-            # Recency score (últimas 5 minutos = 1.0, mais antigo = menor)
-            time_since_use = time.time() - conn.last_used
-            recency_score = max(0.0, 1.0 - (time_since_use / 300.0))
-            
-            # Health score combinado
-            conn.health_score = (success_rate * 0.5) + (latency_score * 0.3) + (recency_score * 0.2)
-        
-        # Retornar conexão com maior health score
-        best_connection = max(self.connections[chain], key=lambda c: c.health_score)
-        return best_connection
+        else:
+            latency_score = 0.5  # Nunca medido: latência desconhecida, não "0ms"
+        conn.health_score = (success_rate * 0.6) + (latency_score * 0.4) if conn.healthy else 0.0
+        return conn.health_score
+    
+    def ranked_connections(self, chain: str, include_unhealthy: bool = False) -> List[ConnectionMetrics]:
+        """Conexões da chain da mais saudável para a menos saudável"""
+        with self._lock:
+            conns = [c for c in self.connections.get(chain, []) if include_unhealthy or c.healthy]
+            for conn in conns:
+                self._update_health_score(conn)
+            return sorted(conns, key=lambda c: c.health_score, reverse=True)
+    
+    def unhealthy_connections(self, chain: Optional[str] = None) -> List[ConnectionMetrics]:
+        with self._lock:
+            chains = [chain] if chain else list(self.connections)
+            return [c for ch in chains for c in self.connections.get(ch, []) if not c.healthy]
+    
+    def get_optimal_connection(self, chain: str) -> Optional[ConnectionMetrics]:
+        """Obter conexão mais rápida e saudável"""
+        ranked = self.ranked_connections(chain)
+        return ranked[0] if ranked else None
     
     def record_success(self, chain: str, url: str, latency_ms: float):
         """Registrar sucesso de uma conexão"""
-        for conn in self.connections.get(chain, []):
-            if conn.url == url:
-                conn.success_count += 1
+        with self._lock:
+            conn = self._find(chain, url)
+            if conn is None:
+                return
+            now = time.time()
+            conn.success_count += 1
+            if conn.last_success:
+                alpha = self.LATENCY_EWMA_ALPHA
+                conn.latency_ms = alpha * latency_ms + (1 - alpha) * conn.latency_ms
+            else:
                 conn.latency_ms = latency_ms
-                conn.last_used = time.time()
-                conn.last_success = time.time()
-                self.metrics_history[chain].append(latency_ms)
-                # Manter apenas últimas 100 métricas
-                if len(self.metrics_history[chain]) > 100:
-                    self.metrics_history[chain].popleft()
-                break
+            conn.last_used = now
+            conn.last_success = now
+            conn.healthy = True
+            conn.consecutive_failures = 0
+            conn.last_error = None
+            self.metrics_history[chain].append(latency_ms)
+            # Manter apenas últimas 100 métricas
+            if len(self.metrics_history[chain]) > 100:
+                self.metrics_history[chain].popleft()
     
-    def record_failure(self, chain: str, url: str):
+    def record_failure(self, chain: str, url: str, error: Optional[str] = None):
         """Registrar falha de uma conexão"""
-        for conn in self.connections.get(chain, []):
-            if conn.url == url:
+        with self._lock:
+            conn = self._find(chain, url)
+            if conn is None:
+                return
+            conn.failure_count += 1
+            conn.consecutive_failures += 1
+            conn.last_used = time.time()
+            conn.last_error = error
+            if conn.consecutive_failures >= self.unhealthy_after:
+                conn.healthy = False
+    
+    def mark_unhealthy(self, chain: str, url: str, error: Optional[str] = None):
+        """Tira o endpoint do ranking imediatamente (ex.: probe inicial falhou)"""
+        with self._lock:
+            conn = self._find(chain, url)
+            if conn is not None:
                 conn.failure_count += 1
-                conn.last_used = time.time()
-                break
+                conn.consecutive_failures = max(conn.consecutive_failures + 1, self.unhealthy_after)
+                conn.healthy = False
+                conn.last_error = error
     
     def get_average_latency(self, chain: str) -> float:
         """Obter latência média de uma chain"""
@@ -380,7 +425,7 @@ class IntelligentConnectionPool:
             "connections": []
         }
         
-        for conn in self.connections[chain]:
+        for conn in self.ranked_connections(chain, include_unhealthy=True):
             total = conn.success_count + conn.failure_count
             success_rate = (conn.success_count / total * 100) if total > 0 else 0
             
@@ -389,6 +434,7 @@ class IntelligentConnectionPool:
                 "latency_ms": conn.latency_ms,
                 "success_rate": f"{success_rate:.1f}%",
                 "health_score": f"{conn.health_score:.2f}",
+                "healthy": conn.healthy,
                 "requests": total
             })
         
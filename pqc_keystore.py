@@ -0,0 +1,299 @@
+# pqc_keystore.py
+# 🗝️ KEYSTORE PQC PERSISTENTE - ALLIANZA BLOCKCHAIN
+# Registros criptografados em disco (append-only, lidos via mmap) + índice SQLite + LRU
+
+import os
+import json
+import mmap
+import base64
+import struct
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+try:
+    import fcntl
+except ImportError:  # Windows: só o lock em processo
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Chave mestra e registros cifrados ficam fora da árvore do código (nunca no diretório atual)
+DATA_DIR = os.getenv("ALLIANZA_DATA_DIR", os.path.join(os.path.expanduser("~"), ".allianza"))
+KEYSTORE_PATH = os.getenv("PQC_KEYSTORE_PATH", os.path.join(DATA_DIR, "pqc_keystore"))
+KEYSTORE_KEY_FILE = os.getenv("PQC_KEYSTORE_KEY_FILE", os.path.join(DATA_DIR, "secrets", "pqc_keystore.key"))
+DEFAULT_CACHE_SIZE = 4096
+
+RECORD_MAGIC = b"PQK1"
+RECORD_HEADER = struct.Struct(">4sI12s")  # magic, tamanho do ciphertext, nonce AES-GCM
+
+
+def get_keystore_key() -> bytes:
+    """Chave AES-256 do keystore: PQC_KEYSTORE_KEY (base64) ou KEYSTORE_KEY_FILE, gerada uma vez"""
+    env_key = os.getenv("PQC_KEYSTORE_KEY")
+    if env_key:
+        try:
+            key = base64.urlsafe_b64decode(env_key + "==")
+            if len(key) == 32:
+                return key
+        except Exception:
+            pass
+        logger.warning("PQC_KEYSTORE_KEY inválida (esperado base64 de 32 bytes); usando arquivo")
+
+    if os.path.exists(KEYSTORE_KEY_FILE):
+        with open(KEYSTORE_KEY_FILE, "rb") as f:
+            key = f.read()
+        if len(key) == 32:
+            return key
+
+    key = AESGCM.generate_key(bit_length=256)
+    os.makedirs(os.path.dirname(KEYSTORE_KEY_FILE), mode=0o700, exist_ok=True)
+    # O_EXCL: se outro worker criou a chave ao mesmo tempo, vale a dele
+    try:
+        fd = os.open(KEYSTORE_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(KEYSTORE_KEY_FILE, "rb") as f:
+            return f.read()
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    logger.info(f"✅ Nova chave do keystore PQC gerada e salva em {KEYSTORE_KEY_FILE}")
+    return key
+
+
+def _split_volatile(keypair: Dict):
+    """Campos com prefixo "_" são objetos do processo (sistema liboqs, chaves desserializadas)"""
+    persistent = {k: v for k, v in keypair.items() if not k.startswith("_")}
+    volatile = {k: v for k, v in keypair.items() if k.startswith("_")}
+    return persistent, volatile
+
+
+class PQCKeystore(MutableMapping):
+    """
+    🗝️ KEYSTORE PQC
+
+    - keys.dat: registros append-only [magic | tamanho | nonce | AES-GCM(JSON)],
+      com o keypair_id como dado associado; leitura por mmap (sem copiar o arquivo)
+    - index.db: SQLite keypair_id -> (offset, tamanho), compartilhado entre
+      processos (WAL); escritas no arquivo de dados sob flock
+    - LRU limitada (cache_size) dos keypairs já decifrados, incluindo objetos
+      anexados pelo processo (ex.: _cached_classic_private)
+    - Keypairs com objetos vivos (_real_system do liboqs) ficam fixos em memória
+      no processo que os criou; o restante do registro é persistido
+
+    Interface de dict: substitui QuantumSecuritySystem.pqc_keypairs sem mudar quem o usa.
+    """
+
+    def __init__(self, path: Optional[str] = None, key: Optional[bytes] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE, sync: bool = True):
+        path = path or KEYSTORE_PATH
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        self.path = path
+        self.cache_size = cache_size
+        self.sync = sync
+        self._aead = AESGCM(key or get_keystore_key())
+        self._lock = threading.RLock()
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._pinned: Dict[str, Dict] = {}
+        self._map: Optional[mmap.mmap] = None
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "writes": 0}
+
+        self._data_path = os.path.join(path, "keys.dat")
+        self._data = open(self._data_path, "a+b")
+        self._index = sqlite3.connect(os.path.join(path, "index.db"), check_same_thread=False, timeout=30)
+        self._index.execute("PRAGMA journal_mode=WAL")
+        self._index.execute("PRAGMA synchronous=NORMAL")
+        self._index.execute(
+            "CREATE TABLE IF NOT EXISTS keypairs ("
+            "keypair_id TEXT PRIMARY KEY, offset INTEGER NOT NULL, length INTEGER NOT NULL, "
+            "algorithm TEXT, created_at TEXT)"
+        )
+        self._index.commit()
+
+    # ------------------------------------------------------------------
+    # Registros
+    # ------------------------------------------------------------------
+
+    def _encode(self, keypair_id: str, keypair: Dict) -> bytes:
+        payload = json.dumps(keypair, separators=(",", ":")).encode()
+        nonce = os.urandom(12)
+        ciphertext = self._aead.encrypt(nonce, payload, keypair_id.encode())
+        return RECORD_HEADER.pack(RECORD_MAGIC, len(ciphertext), nonce) + ciphertext
+
+    def _view(self, offset: int, length: int) -> memoryview:
+        if self._map is None or offset + length > len(self._map):
+            # Arquivo cresceu (este ou outro processo escreveu): remapear
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._data.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._map)[offset:offset + length]
+
+    def _read(self, keypair_id: str, offset: int, length: int) -> Dict:
+        view = self._view(offset, length)
+        try:
+            magic, size, nonce = RECORD_HEADER.unpack_from(view)
+            if magic != RECORD_MAGIC or size != length - RECORD_HEADER.size:
+                raise ValueError(f"Registro corrompido no keystore: {keypair_id}")
+            payload = self._aead.decrypt(bytes(nonce), view[RECORD_HEADER.size:], keypair_id.encode())
+        finally:
+            view.release()
+        return json.loads(payload)
+
+    def _append(self, records) -> list:
+        """Grava registros no fim do arquivo de dados sob flock; retorna (offset, tamanho) de cada um"""
+        if fcntl:
+            fcntl.flock(self._data.fileno(), fcntl.LOCK_EX)
+        try:
+            self._data.seek(0, os.SEEK_END)
+            offset = self._data.tell()
+            positions = []
+            for blob in records:
+                positions.append((offset, len(blob)))
+                offset += len(blob)
+            self._data.write(b"".join(records))
+            self._data.flush()
+            if self.sync:
+                os.fsync(self._data.fileno())
+        finally:
+            if fcntl:
+                fcntl.flock(self._data.fileno(), fcntl.LOCK_UN)
+        return positions
+
+    def _cache_put(self, keypair_id: str, keypair: Dict):
+        self._cache[keypair_id] = keypair
+        self._cache.move_to_end(keypair_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    # ------------------------------------------------------------------
+    # Interface de dict
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, keypair_id: str) -> Dict:
+        with self._lock:
+            keypair = self._pinned.get(keypair_id)
+            if keypair is not None:
+                return keypair
+            keypair = self._cache.get(keypair_id)
+            if keypair is not None:
+                self._cache.move_to_end(keypair_id)
+                self.stats["hits"] += 1
+                return keypair
+            row = self._index.execute(
+                "SELECT offset, length FROM keypairs WHERE keypair_id = ?", (keypair_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(keypair_id)
+            self.stats["misses"] += 1
+            keypair = self._read(keypair_id, *row)
+            self._cache_put(keypair_id, keypair)
+            return keypair
+
+    def refresh(self, keypair_id: str) -> Dict:
+        """Relê o registro do disco ignorando o cache (pode ter sido regravado por outro processo)"""
+        with self._lock:
+            self._cache.pop(keypair_id, None)
+            return self[keypair_id]
+
+    def __setitem__(self, keypair_id: str, keypair: Dict):
+        self.update({keypair_id: keypair})
+
+    def update(self, other=(), **kwargs):
+        """Várias chaves em um único append + um único COMMIT do índice"""
+        items = list(other.items() if hasattr(other, "items") else other) + list(kwargs.items())
+        if not items:
+            return
+        with self._lock:
+            blobs, rows = [], []
+            for keypair_id, keypair in items:
+                persistent, volatile = _split_volatile(keypair)
+                blobs.append(self._encode(keypair_id, persistent))
+                rows.append((keypair_id, persistent.get("algorithm"), persistent.get("created_at")))
+                if volatile:
+                    self._pinned[keypair_id] = keypair
+                    self._cache.pop(keypair_id, None)
+                else:
+                    self._pinned.pop(keypair_id, None)
+                    self._cache_put(keypair_id, keypair)
+            positions = self._append(blobs)
+            self._index.executemany(
+                "INSERT OR REPLACE INTO keypairs (keypair_id, offset, length, algorithm, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(kp_id, offset, length, algorithm, created_at)
+                 for (kp_id, algorithm, created_at), (offset, length) in zip(rows, positions)]
+            )
+            self._index.commit()
+            self.stats["writes"] += len(items)
+
+    def __delitem__(self, keypair_id: str):
+        with self._lock:
+            cursor = self._index.execute("DELETE FROM keypairs WHERE keypair_id = ?", (keypair_id,))
+            self._index.commit()
+            self._cache.pop(keypair_id, None)
+            pinned = self._pinned.pop(keypair_id, None)
+            if cursor.rowcount == 0 and pinned is None:
+                raise KeyError(keypair_id)
+
+    def __contains__(self, keypair_id) -> bool:
+        with self._lock:
+            if keypair_id in self._pinned or keypair_id in self._cache:
+                return True
+            return self._index.execute(
+                "SELECT 1 FROM keypairs WHERE keypair_id = ?", (keypair_id,)
+            ).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            ids = [row[0] for row in self._index.execute("SELECT keypair_id FROM keypairs ORDER BY rowid")]
+        return iter(ids)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._index.execute("SELECT COUNT(*) FROM keypairs").fetchone()[0]
+
+    def ids_by_algorithm(self, algorithm: str) -> List[str]:
+        """IDs de um algoritmo, em ordem de inserção, direto do índice (sem decifrar registros)"""
+        with self._lock:
+            return [row[0] for row in self._index.execute(
+                "SELECT keypair_id FROM keypairs WHERE algorithm = ? ORDER BY rowid", (algorithm,)
+            )]
+
+    def items(self):
+        """Varredura completa sem poluir a LRU (list_keypairs, APIs de listagem)"""
+        with self._lock:
+            rows = self._index.execute("SELECT keypair_id, offset, length FROM keypairs ORDER BY rowid").fetchall()
+        for keypair_id, offset, length in rows:
+            with self._lock:
+                keypair = self._pinned.get(keypair_id) or self._cache.get(keypair_id)
+                if keypair is None:
+                    keypair = self._read(keypair_id, offset, length)
+            yield keypair_id, keypair
+
+    def values(self):
+        for _, keypair in self.items():
+            yield keypair
+
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self.stats,
+                "cached": len(self._cache),
+                "pinned": len(self._pinned),
+                "cache_size": self.cache_size,
+                "data_bytes": os.path.getsize(self._data_path)
+            }
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._index.close()
+            self._data.close()
@@ -13,6 +13,8 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 from dataclasses import dataclass, asdict
 
+from merkle_proofs import get_inclusion_proof, verify_inclusion_proof
+
 # Placeholder para quantum_security se não disponível
 try:
     from quantum_security import QuantumSecuritySystem
@@ -50,6 +52,9 @@ class MerkleProof:
     root: str
     tree_depth: int
     leaf_index: int
+    # Provas servidas pelo nó: cabeçalho canônico do bloco (sha256 = block_hash)
+    block_hash: Optional[str] = None
+    block_header: Optional[str] = None
 
 @dataclass
 class ZKProof:
@@ -106,19 +111,54 @@ class ProofBundleGenerator:
         merkle_path: List[str],
         positions: List[int],
         root: str,
-        leaf_index: int
+        leaf_index: int,
+        leaf_hash: Optional[str] = None,
+        block_hash: Optional[str] = None,
+        block_header: Optional[str] = None
     ) -> MerkleProof:
         """Gerar prova Merkle"""
-        leaf_hash = hashlib.sha256(leaf_data.encode()).hexdigest()
+        if leaf_hash is None:
+            leaf_hash = hashlib.sha256(leaf_data.encode()).hexdigest()
         return MerkleProof(
             leaf_hash=leaf_hash,
             path=merkle_path,
             positions=positions,
             root=root,
             tree_depth=len(merkle_path),
-            leaf_index=leaf_index
+            leaf_index=leaf_index,
+            block_hash=block_hash,
+            block_header=block_header
+        )
+    
+    def generate_merkle_proof_for_transaction(self, chain_id: str, tx_id: str) -> Optional[MerkleProof]:
+        """Prova de inclusão real servida pelo nó da chain (None se a chain não tem provedor)"""
+        inclusion = get_inclusion_proof(chain_id, tx_id)
+        if inclusion is None:
+            return None
+        return self.generate_merkle_proof(
+            leaf_data=inclusion["encoded_transaction"],
+            merkle_path=inclusion["path"],
+            positions=inclusion["positions"],
+            root=inclusion["tx_root"],
+            leaf_index=inclusion["leaf_index"],
+            leaf_hash=inclusion["leaf_hash"],
+            block_hash=inclusion["block_hash"],
+            block_header=inclusion["header"]
         )
     
+    def verify_merkle_proof(self, merkle_proof: MerkleProof) -> Optional[bool]:
+        """Verifica a inclusão (None para provas sem cabeçalho, que não podem ser conferidas)"""
+        if not merkle_proof.block_header:
+            return None
+        return verify_inclusion_proof({
+            "header": merkle_proof.block_header,
+            "block_hash": merkle_proof.block_hash,
+            "tx_root": merkle_proof.root,
+            "leaf_hash": merkle_proof.leaf_hash,
+            "path": merkle_proof.path,
+            "positions": merkle_proof.positions
+        })
+    
     def generate_zk_proof(
         self,
         circuit_id: str,
@@ -444,7 +484,14 @@ class ProofBundleGenerator:
                     results["checks"]["pqc_signature"] = None
                     results["errors"].append("PQC verification not available")
             
-            # 5. Verificar se todos os arquivos existem
+            # 5. Verificar inclusão Merkle (provas servidas pelo nó trazem o cabeçalho)
+            if "merkle_proof" in files_content:
+                merkle_proof = MerkleProof(**json.loads(files_content["merkle_proof"]))
+                results["checks"]["merkle_inclusion"] = self.verify_merkle_proof(merkle_proof)
+                if results["checks"]["merkle_inclusion"] is False:
+                    results["errors"].append("Merkle inclusion proof verification failed")
+            
+            # 6. Verificar se todos os arquivos existem
             missing_files = []
             for file_type, filename in bundle_index["files"].items():
                 if filename and file_type not in ["merkle_proof", "zk_proof", "consensus_proof"]:  # Opcionais
@@ -460,7 +507,8 @@ class ProofBundleGenerator:
             results["verified"] = all([
                 results["checks"].get("hash_match", False),
                 results["checks"].get("pqc_signature", False) is not False,  # None é OK se não disponível
-                results["checks"].get("all_files_present", False)
+                results["checks"].get("all_files_present", False),
+                results["checks"].get("merkle_inclusion") is not False
             ])
             
         except Exception as e:
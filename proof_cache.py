@@ -0,0 +1,204 @@
+# proof_cache.py
+# 🗃️ CACHE DE PROVAS ENDEREÇADO POR CONTEÚDO - ALLIANZA BLOCKCHAIN
+# Provas geradas uma vez (em segundo plano), gravadas comprimidas, índice LRU e cota de disco
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = int(os.getenv("TESTNET_PROOF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+DEFAULT_WORKERS = 2
+MIMETYPES = {"json": "application/json", "txt": "text/plain"}
+
+
+def content_key(*parts) -> str:
+    """Chave do conteúdo: SHA-256 do JSON canônico das partes"""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CachedProof:
+    """Uma prova no disco (gzip); ETag = chave do conteúdo"""
+
+    __slots__ = ("key", "ext", "path", "size", "raw_size", "mtime")
+
+    def __init__(self, key: str, ext: str, path: Path, size: int, raw_size: int, mtime: float):
+        self.key = key
+        self.ext = ext
+        self.path = path
+        self.size = size
+        self.raw_size = raw_size
+        self.mtime = mtime
+
+    @property
+    def mimetype(self) -> str:
+        return MIMETYPES.get(self.ext, "application/octet-stream")
+
+    def read(self) -> bytes:
+        """Conteúdo descomprimido"""
+        with gzip.open(self.path, "rb") as f:
+            return f.read()
+
+
+class ProofCache:
+    """
+    🗃️ CACHE DE PROVAS
+
+    - Chave = hash do conteúdo da prova (sem o horário de geração): o mesmo
+      bloco/transação gera a prova uma única vez
+    - Geração em um pool pequeno de threads; pedidos simultâneos da mesma
+      chave esperam o mesmo Future. get_or_build(wait=...) devolve None se a
+      prova ainda não ficou pronta (a rota responde 202)
+    - Arquivos <chave>.<ext>.gz gravados atomicamente (tmp + os.replace)
+    - Índice LRU em memória, reconstruído do diretório na inicialização
+      (mtime = último acesso); acima de max_bytes as menos usadas saem
+    """
+
+    def __init__(self, directory, max_bytes: int = DEFAULT_MAX_BYTES, workers: int = DEFAULT_WORKERS):
+        self.directory = Path(directory).resolve()  # send_file resolve caminhos relativos pela raiz do app
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[Tuple[str, str], CachedProof]" = OrderedDict()
+        self._pending: Dict[Tuple[str, str], Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "builds": 0, "evictions": 0, "pending": 0}
+        self._scan()
+
+    # ------------------------------------------------------------------
+    # Índice
+    # ------------------------------------------------------------------
+
+    def _scan(self):
+        entries = []
+        for item in os.scandir(self.directory):
+            name = item.name
+            if not name.endswith(".gz") or name.count(".") != 2:
+                continue
+            key, ext, _ = name.split(".")
+            try:
+                stat = item.stat()
+                with open(item.path, "rb") as f:
+                    f.seek(-4, os.SEEK_END)
+                    raw_size = int.from_bytes(f.read(4), "little")  # ISIZE do trailer gzip
+            except OSError:
+                continue
+            entries.append(CachedProof(key, ext, Path(item.path), stat.st_size, raw_size, stat.st_mtime))
+        for entry in sorted(entries, key=lambda e: e.mtime):
+            self._index[(entry.key, entry.ext)] = entry
+            self.total_bytes += entry.size
+        self._evict()
+
+    def _evict(self):
+        """Remove as menos usadas até caber na cota (sob o lock)"""
+        while self.total_bytes > self.max_bytes and len(self._index) > 1:
+            _, entry = self._index.popitem(last=False)
+            self.total_bytes -= entry.size
+            self.stats["evictions"] += 1
+            try:
+                entry.path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str, ext: str) -> Optional[CachedProof]:
+        with self._lock:
+            entry = self._index.get((key, ext))
+            if entry is None:
+                return None
+            if not entry.path.exists():
+                # Removida por outro processo (cota compartilhada do diretório)
+                del self._index[(key, ext)]
+                self.total_bytes -= entry.size
+                return None
+            self._index.move_to_end((key, ext))
+            self.stats["hits"] += 1
+        try:
+            os.utime(entry.path)  # Recência sobrevive a reinícios
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, ext: str, data: bytes) -> CachedProof:
+        path = self.directory / f"{key}.{ext}.gz"
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(gzip.compress(data, compresslevel=6, mtime=0))
+        os.replace(tmp, path)
+        entry = CachedProof(key, ext, path, path.stat().st_size, len(data), time.time())
+        with self._lock:
+            previous = self._index.pop((key, ext), None)
+            if previous is not None:
+                self.total_bytes -= previous.size
+            self._index[(key, ext)] = entry
+            self.total_bytes += entry.size
+            self._evict()
+        return entry
+
+    # ------------------------------------------------------------------
+    # Geração
+    # ------------------------------------------------------------------
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix="ProofCache")
+        return self._executor
+
+    def _build(self, key: str, ext: str, build: Callable[[], bytes], future: Future):
+        try:
+            entry = self.put(key, ext, build())
+        except BaseException as e:
+            with self._lock:
+                self._pending.pop((key, ext), None)
+            logger.warning(f"Erro ao gerar prova {key[:16]}: {e}")
+            future.set_exception(e)
+            return
+        with self._lock:
+            # Já no índice: quem chegar agora acha a prova sem passar por _pending
+            self._pending.pop((key, ext), None)
+            self.stats["builds"] += 1
+        future.set_result(entry)
+
+    def submit(self, key: str, ext: str, build: Callable[[], bytes]) -> Future:
+        """Agenda a geração (uma por chave, mesmo com pedidos simultâneos)"""
+        executor = self._get_executor()
+        with self._lock:
+            future = self._pending.get((key, ext))
+            if future is not None:
+                self.stats["pending"] += 1
+                return future
+            self.stats["misses"] += 1
+            future = self._pending[(key, ext)] = Future()
+        executor.submit(self._build, key, ext, build, future)
+        return future
+
+    def get_or_build(self, key: str, ext: str, build: Callable[[], bytes],
+                     wait: Optional[float] = None) -> Optional[CachedProof]:
+        """Prova do cache ou gerada agora; None se não ficou pronta em `wait` segundos"""
+        entry = self.get(key, ext)
+        if entry is not None:
+            return entry
+        future = self.submit(key, ext, build)
+        try:
+            return future.result(timeout=wait)
+        except FutureTimeout:
+            return None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, entries=len(self._index), total_bytes=self.total_bytes,
+                        max_bytes=self.max_bytes, in_progress=len(self._pending))
@@ -5,12 +5,18 @@
 from flask import Blueprint, jsonify, request
 import hashlib
 import json
+import os
 import time
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 import base64
 import uuid
 
+from block_codec import MerkleTree, encode as cbor_encode, hash_leaf, verify_proof
+from signature_verifier import verify_pqc_signature
+
 # Importar sistema de segurança quântica
 LIBOQS_AVAILABLE = False  # Inicializar como False
 try:
@@ -38,6 +44,17 @@ qss_bp = Blueprint('qss', __name__, url_prefix='/api/qss')
 quantum_system = None
 alz_niev = None
 
+# Provas em lote: uma assinatura ML-DSA sobre a raiz de Merkle de todos os itens
+BATCH_SCHEMA_VERSION = "qss_batch_v1.0"
+MAX_BATCH_ITEMS = int(os.getenv("QSS_MAX_BATCH_ITEMS", "10000"))
+VERIFIED_ROOTS_CACHE_SIZE = 1024
+
+_ml_dsa_keypair_id = None
+_ml_dsa_lock = threading.Lock()
+_batch_seq = 0
+_verified_roots: "OrderedDict[str, bool]" = OrderedDict()
+_verified_roots_lock = threading.Lock()
+
 def init_qss_service():
     """Inicializar serviço QSS"""
     global quantum_system, alz_niev, LIBOQS_AVAILABLE
@@ -77,6 +94,230 @@ def init_qss_service():
     
     print("🔐 Quantum Security Service (QSS) - Pronto para receber requisições de outras blockchains!")
 
+def _get_ml_dsa_keypair_id() -> Optional[str]:
+    """
+    Keypair ML-DSA do serviço: localizado pelo índice do keystore (ou gerado)
+    uma vez por processo, em vez de varrer todos os keypairs a cada prova
+    """
+    global _ml_dsa_keypair_id
+    with _ml_dsa_lock:
+        keypairs = quantum_system.pqc_keypairs
+        if _ml_dsa_keypair_id and _ml_dsa_keypair_id in keypairs:
+            return _ml_dsa_keypair_id
+
+        if hasattr(keypairs, 'ids_by_algorithm'):
+            candidates = keypairs.ids_by_algorithm('ML-DSA')
+        else:
+            candidates = [kp_id for kp_id, kp_data in keypairs.items()
+                          if isinstance(kp_data, dict) and kp_data.get('algorithm') == 'ML-DSA']
+        keypair_id = candidates[0] if candidates else None
+
+        # Se não existe, gerar um novo
+        if not keypair_id:
+            ml_dsa_result = quantum_system.generate_ml_dsa_keypair(security_level=3)
+            if ml_dsa_result and ml_dsa_result.get('success'):
+                keypair_id = ml_dsa_result.get('keypair_id')
+            else:
+                # Fallback: gerar QRS-3 e usar o ML-DSA dele
+                qrs3_result = quantum_system.generate_qrs3_keypair()
+                if qrs3_result and qrs3_result.get('success'):
+                    qrs3_keypair_id = qrs3_result.get('keypair_id')
+                    if qrs3_keypair_id and qrs3_keypair_id in keypairs:
+                        keypair_id = keypairs[qrs3_keypair_id].get('ml_dsa_keypair_id')
+
+        _ml_dsa_keypair_id = keypair_id
+        return keypair_id
+
+def _batch_leaf(chain: str, tx_hash: str, metadata: Dict) -> bytes:
+    """Folha de um item do lote: CBOR canônico de (chain, tx_hash, metadata)"""
+    return hash_leaf(cbor_encode({"chain": chain, "tx_hash": tx_hash, "metadata": metadata}))
+
+def _batch_signing_message(batch: Dict) -> bytes:
+    """Mensagem assinada com ML-DSA: raiz + identificação, tamanho e instante do lote"""
+    return cbor_encode({
+        "schema_version": BATCH_SCHEMA_VERSION,
+        "batch_id": batch["batch_id"],
+        "merkle_root": batch["merkle_root"],
+        "size": batch["size"],
+        "timestamp": batch["timestamp"]
+    })
+
+def _check_metadata_keys(value, path: str):
+    """Chaves de metadata só podem ser strings (o JSON da prova devolvido ao cliente não preserva outras)"""
+    if isinstance(value, dict):
+        for key, inner in value.items():
+            if not isinstance(key, str):
+                raise ValueError(f"{path}: keys must be strings (got {key!r})")
+            _check_metadata_keys(inner, f"{path}.{key}")
+    elif isinstance(value, (list, tuple)):
+        for index, inner in enumerate(value):
+            _check_metadata_keys(inner, f"{path}[{index}]")
+
+def _normalize_batch_items(items) -> List[tuple]:
+    """
+    Valida os itens do lote e devolve [(chain, tx_hash, metadata, folha)]; ValueError se inválido
+
+    A folha é codificada aqui: metadata que o codec não representa (inteiro
+    fora de 64 bits, tipo não suportado) vira erro do cliente, não 500.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError("items must be a non-empty list")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ValueError(f"Too many items: {len(items)} (max {MAX_BATCH_ITEMS})")
+    normalized = []
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f"items[{position}] must be an object")
+        chain = str(item.get('chain') or '').lower()
+        tx_hash = item.get('tx_hash')
+        metadata = item.get('metadata') or {}
+        if not chain or not tx_hash or not isinstance(tx_hash, str):
+            raise ValueError(f"items[{position}]: chain and tx_hash are required")
+        if not isinstance(metadata, dict):
+            raise ValueError(f"items[{position}]: metadata must be an object")
+        _check_metadata_keys(metadata, f"items[{position}].metadata")
+        try:
+            leaf = _batch_leaf(chain, tx_hash, metadata)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"items[{position}]: metadata cannot be encoded: {e}")
+        normalized.append((chain, tx_hash, metadata, leaf))
+    return normalized
+
+def issue_proof_batch(items: List[tuple], embed_signature: bool = False) -> Dict:
+    """
+    🌳 Emitir provas em lote
+
+    Cada (chain, tx_hash, metadata, folha) de _normalize_batch_items é uma folha de uma árvore de Merkle e
+    só a raiz é assinada: uma assinatura ML-DSA para o lote inteiro. Cada item
+    recebe uma prova compacta (folha, caminho de inclusão, referência ao lote);
+    o envelope do lote (raiz, assinatura, keypair) vai uma vez na resposta, ou
+    dentro de cada prova com embed_signature.
+    """
+    global _batch_seq
+    if not quantum_system:
+        return {"success": False, "error": "Quantum security system not available"}
+
+    leaves = [leaf for _, _, _, leaf in items]
+    tree = MerkleTree(leaves)
+    root = tree.root.hex()
+
+    with _ml_dsa_lock:
+        _batch_seq += 1
+        seq = _batch_seq
+    timestamp = time.time()
+    batch = {
+        "schema_version": BATCH_SCHEMA_VERSION,
+        "batch_id": f"qss-batch-{int(timestamp)}-{seq}-{root[:8]}",
+        "merkle_root": root,
+        "size": len(leaves),
+        "tree_depth": tree.depth,
+        "timestamp": timestamp
+    }
+
+    keypair_id = _get_ml_dsa_keypair_id()
+    if not keypair_id:
+        return {"success": False, "error": "ML-DSA keypair not available"}
+    signature_result = quantum_system.sign_with_ml_dsa(keypair_id, _batch_signing_message(batch))
+    if not signature_result or not signature_result.get('success'):
+        return {"success": False, "error": "Failed to generate quantum signature"}
+
+    batch.update({
+        "keypair_id": keypair_id,
+        "quantum_signature_scheme": "ML-DSA",
+        "quantum_signature": signature_result.get('signature', ''),
+        "signature_public_key_uri": f"https://testnet.allianza.tech/api/qss/key/{keypair_id}"
+    })
+
+    timestamp_iso = datetime.fromtimestamp(timestamp).isoformat() + "Z"
+    proofs = []
+    for index, (chain, tx_hash, metadata, _) in enumerate(items):
+        proof = {
+            "schema_version": BATCH_SCHEMA_VERSION,
+            "proof_id": f"{batch['batch_id']}-{index}",
+            "asset_chain": chain,
+            "asset_tx": tx_hash,
+            "metadata": metadata,
+            "proof_hash": leaves[index].hex(),
+            "batch_id": batch["batch_id"],
+            "leaf_index": index,
+            "merkle_root": root,
+            "merkle_proof": [[sibling.hex(), position] for sibling, position in tree.proof(index)],
+            "keypair_id": keypair_id,
+            "timestamp": timestamp_iso
+        }
+        if embed_signature:
+            proof["batch"] = batch
+        proofs.append(proof)
+
+    return {"success": True, "batch": batch, "proofs": proofs}
+
+def _verify_batch_signature(batch: Dict) -> bool:
+    """Assinatura ML-DSA da raiz, memorizada: as provas de um lote dividem a mesma verificação"""
+    message = _batch_signing_message(batch)
+    signature = batch["quantum_signature"]
+    keypair_id = batch["keypair_id"]
+    cache_key = hashlib.sha256(message + keypair_id.encode() + signature.encode()).hexdigest()
+    with _verified_roots_lock:
+        if cache_key in _verified_roots:
+            _verified_roots.move_to_end(cache_key)
+            return _verified_roots[cache_key]
+
+    valid = bool(quantum_system) and verify_pqc_signature(
+        quantum_system.ml_dsa_verification_key(keypair_id), message, signature
+    )
+    with _verified_roots_lock:
+        _verified_roots[cache_key] = valid
+        if len(_verified_roots) > VERIFIED_ROOTS_CACHE_SIZE:
+            _verified_roots.popitem(last=False)
+    return valid
+
+def verify_batch_proof(proof: Dict, batch: Optional[Dict] = None) -> Dict:
+    """
+    ✅ Verificar uma prova emitida em lote
+
+    - proof_hash confere com a folha recalculada de (asset_chain, asset_tx, metadata)
+    - o caminho de Merkle leva a folha até a merkle_root do lote
+    - a assinatura ML-DSA do lote cobre essa raiz
+    - o lote tem menos de 1 ano
+    """
+    batch = batch or proof.get('batch')
+    if not isinstance(batch, dict):
+        return {
+            "success": False,
+            "valid": False,
+            "error": "batch envelope required (merkle_root, quantum_signature, keypair_id)"
+        }
+
+    details = {
+        "signature_valid": False,
+        "merkle_proof_valid": False,
+        "consensus_proof_valid": True,  # Simplificado (como nas provas individuais)
+        "proof_hash_valid": False,
+        "timestamp_valid": False
+    }
+    try:
+        leaf = _batch_leaf(str(proof['asset_chain']).lower(), proof['asset_tx'], proof.get('metadata') or {})
+        details["proof_hash_valid"] = leaf.hex() == proof.get('proof_hash')
+
+        same_batch = (proof.get('batch_id') == batch.get('batch_id')
+                      and proof.get('merkle_root') == batch.get('merkle_root'))
+        path = [(bytes.fromhex(sibling), int(position)) for sibling, position in proof.get('merkle_proof', [])]
+        details["merkle_proof_valid"] = same_batch and verify_proof(leaf, path, bytes.fromhex(batch['merkle_root']))
+
+        details["signature_valid"] = _verify_batch_signature(batch)
+
+        age_seconds = time.time() - float(batch['timestamp'])
+        details["timestamp_valid"] = 0 <= age_seconds < 31536000
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        return {
+            "success": False,
+            "valid": False,
+            "error": f"Malformed batch proof: {e}",
+            "verification_details": details
+        }
+
+    return {"success": True, "valid": all(details.values()), "verification_details": details}
+
 @qss_bp.route('/generate-proof', methods=['POST'])
 def generate_quantum_proof():
     """
@@ -139,8 +380,8 @@ def generate_quantum_proof():
         
         # Adicionar requisição QSS ao leaderboard (se disponível)
         try:
-            from testnet_leaderboard import TestnetLeaderboard
-            leaderboard = TestnetLeaderboard()
+            from testnet_leaderboard import get_leaderboard
+            leaderboard = get_leaderboard()
             user_id = request.remote_addr or "anonymous"
             leaderboard.add_activity("qss_request", user_id, {
                 "chain": chain,
@@ -167,34 +408,8 @@ def generate_quantum_proof():
                 "error": "Quantum security system not available"
             }), 503
         
-        # Gerar keypair ML-DSA se não existir
-        # As funções geram o keypair_id automaticamente, então vamos gerar e usar o ID retornado
-        keypair_id = f"qss_{chain}_{tx_hash[:16]}"
-        
-        # Verificar se já existe um keypair ML-DSA
-        ml_dsa_keypair_id = None
-        for kp_id, kp_data in quantum_system.pqc_keypairs.items():
-            if isinstance(kp_data, dict) and kp_data.get('algorithm') == 'ML-DSA':
-                ml_dsa_keypair_id = kp_id
-                break
-        
-        # Se não existe, gerar um novo
-        if not ml_dsa_keypair_id:
-            ml_dsa_result = quantum_system.generate_ml_dsa_keypair(security_level=3)
-            if ml_dsa_result and ml_dsa_result.get('success'):
-                ml_dsa_keypair_id = ml_dsa_result.get('keypair_id')
-            else:
-                # Fallback: gerar QRS-3 e usar o ML-DSA dele
-                qrs3_result = quantum_system.generate_qrs3_keypair()
-                if qrs3_result and qrs3_result.get('success'):
-                    qrs3_keypair_id = qrs3_result.get('keypair_id')
-                    if qrs3_keypair_id and qrs3_keypair_id in quantum_system.pqc_keypairs:
-                        qrs3_keypair = quantum_system.pqc_keypairs[qrs3_keypair_id]
-                        ml_dsa_keypair_id = qrs3_keypair.get('ml_dsa_keypair_id')
-        
-        # Usar o keypair_id do ML-DSA encontrado ou gerado
-        if ml_dsa_keypair_id:
-            keypair_id = ml_dsa_keypair_id
+        # Keypair ML-DSA do serviço (encontrado ou gerado uma vez por processo)
+        keypair_id = _get_ml_dsa_keypair_id() or f"qss_{chain}_{tx_hash[:16]}"
         
         # Assinar com ML-DSA
         signature_result = quantum_system.sign_with_ml_dsa(keypair_id, message_hash)
@@ -302,8 +517,8 @@ def generate_quantum_proof():
         
         # Adicionar ao leaderboard (se disponível)
         try:
-            from testnet_leaderboard import TestnetLeaderboard
-            leaderboard = TestnetLeaderboard()
+            from testnet_leaderboard import get_leaderboard
+            leaderboard = get_leaderboard()
             user_id = request.remote_addr or "anonymous"
             leaderboard.add_activity("proof_generated", user_id, {
                 "chain": chain,
@@ -335,6 +550,93 @@ def generate_quantum_proof():
             "error": str(e)
         }), 500
 
+@qss_bp.route('/generate-proof-batch', methods=['POST'])
+def generate_quantum_proof_batch():
+    """
+    🌳 Gerar provas quânticas em lote (milhares de transações, uma assinatura)
+
+    Request:
+    {
+        "items": [
+            {"chain": "bitcoin", "tx_hash": "txid...", "metadata": {...}},
+            {"chain": "ethereum", "tx_hash": "0x..."}
+        ],
+        "embed_signature": false  # true: cada prova leva o envelope do lote
+    }
+
+    Response:
+    {
+        "success": true,
+        "batch": {
+            "batch_id": "qss-batch-...",
+            "merkle_root": "...",
+            "size": 2,
+            "quantum_signature": "Base64(ML-DSA signature da raiz)",
+            "keypair_id": "...",
+            ...
+        },
+        "proofs": [
+            {"asset_chain": "bitcoin", "asset_tx": "txid...", "proof_hash": "folha",
+             "leaf_index": 0, "merkle_proof": [["irmão", posição], ...], "batch_id": "...", ...}
+        ]
+    }
+
+    Verificação: POST /api/qss/verify-proof com {"quantum_proof": prova, "batch": envelope}
+    (ou só a prova, se emitida com embed_signature)
+    """
+    try:
+        data = request.get_json() or {}
+
+        try:
+            items = _normalize_batch_items(data.get('items'))
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+
+        print(f"🌳 QSS: Gerando lote de {len(items)} provas quânticas")
+
+        result = issue_proof_batch(items, embed_signature=bool(data.get('embed_signature')))
+        if not result["success"]:
+            return jsonify(result), 503 if not quantum_system else 500
+
+        batch = result["batch"]
+
+        # Uma atividade no leaderboard por lote (se disponível)
+        try:
+            from testnet_leaderboard import get_leaderboard
+            leaderboard = get_leaderboard()
+            user_id = request.remote_addr or "anonymous"
+            leaderboard.add_activity("proof_generated", user_id, {
+                "batch_id": batch["batch_id"],
+                "batch_size": batch["size"],
+                "proof_hash": batch["merkle_root"][:16] + "..."
+            })
+        except Exception as e:
+            print(f"⚠️  Erro ao adicionar ao leaderboard: {e}")
+            pass  # Leaderboard opcional
+
+        merkle_root = batch["merkle_root"]
+        return jsonify({
+            **result,
+            "verification_url": "https://testnet.allianza.tech/api/qss/verify-proof",
+            "anchor_instructions": {
+                "bitcoin": f"Use OP_RETURN with hash: {merkle_root}",
+                "ethereum": f"Call QuantumSecurityAdapter.anchorProof({merkle_root})",
+                "solana": f"Store merkle_root in account data"
+            }
+        }), 200
+
+    except Exception as e:
+        print(f"❌ Erro ao gerar lote de provas: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
 @qss_bp.route('/verify-proof', methods=['POST'])
 def verify_quantum_proof():
     """
@@ -376,6 +678,24 @@ def verify_quantum_proof():
         
         print(f"🔍 QSS: Verificando prova quântica para {proof.get('asset_chain')}:{proof.get('asset_tx')}")
         
+        # Prova emitida em lote: inclusão na raiz + assinatura ML-DSA da raiz
+        if proof.get('schema_version') == BATCH_SCHEMA_VERSION:
+            result = verify_batch_proof(proof, data.get('batch'))
+            if not result["success"]:
+                return jsonify(result), 400
+            print(f"{'✅' if result['valid'] else '❌'} QSS: Verificação em lote {'válida' if result['valid'] else 'inválida'}")
+            return jsonify({
+                **result,
+                "proof_info": {
+                    "asset_chain": proof.get('asset_chain'),
+                    "asset_tx": proof.get('asset_tx'),
+                    "batch_id": proof.get('batch_id'),
+                    "leaf_index": proof.get('leaf_index'),
+                    "verified_by": "Allianza Quantum Layer",
+                    "timestamp": proof.get('timestamp')
+                }
+            }), 200
+
         # 1. Verificar estrutura
         required_fields = ['asset_chain', 'asset_tx', 'quantum_signature', 'proof_hash']
         for field in required_fields:
@@ -786,6 +1106,7 @@ def qss_status():
         "liboqs_available": liboqs_detected,
         "endpoints": {
             "generate_proof": "/api/qss/generate-proof",
+            "generate_proof_batch": "/api/qss/generate-proof-batch",
             "verify_proof": "/api/qss/verify-proof",
             "anchor_proof": "/api/qss/anchor-proof",
             "status": "/api/qss/status"
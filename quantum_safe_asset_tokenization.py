@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeAssetTokenization:
@@ -23,6 +25,7 @@ class QuantumSafeAssetTokenization:
     
     def __init__(self, quantum_security):
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("asset_tokenization", quantum_security)
         self.tokenized_assets = {}
         
         logger.info("🏦 QUANTUM-SAFE ASSET TOKENIZATION: Inicializado!")
@@ -51,13 +54,7 @@ class QuantumSafeAssetTokenization:
         
         # Assinar com QRS-3
         tokenization_bytes = str(tokenization_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            tokenization_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(tokenization_bytes)
         
         tokenization_data["qrs3_signature"] = qrs3_signature
         self.tokenized_assets[token_id] = tokenization_data
@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeAuction:
@@ -28,6 +30,7 @@ class QuantumSafeAuction:
         self.starting_price = starting_price
         self.end_time = end_time
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("auction", quantum_security)
         self.bids = []
         self.created_at = time.time()
         
@@ -50,13 +53,7 @@ class QuantumSafeAuction:
         
         # Assinar com QRS-3
         bid_bytes = str(bid_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            bid_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(bid_bytes)
         
         bid_data["qrs3_signature"] = qrs3_signature
         self.bids.append(bid_data)
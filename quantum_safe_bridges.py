@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeBridge:
@@ -26,6 +28,7 @@ class QuantumSafeBridge:
         self.source_chain = source_chain
         self.target_chain = target_chain
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("bridges", quantum_security)
         self.locked_assets = {}
         self.transfers = []
         
@@ -47,13 +50,7 @@ class QuantumSafeBridge:
         
         # Assinar com QRS-3
         lock_bytes = str(lock_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            lock_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(lock_bytes)
         
         self.locked_assets[lock_id] = {
             **lock_data,
@@ -85,13 +82,7 @@ class QuantumSafeBridge:
         
         # Assinar unlock com QRS-3
         unlock_bytes = str(unlock_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            unlock_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(unlock_bytes)
         
         lock["status"] = "unlocked"
         lock["unlock_data"] = {
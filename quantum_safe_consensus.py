@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeConsensus:
@@ -31,16 +33,11 @@ class QuantumSafeConsensus:
         """Alcança consenso com QRS-3"""
         round_id = f"round_{int(time.time())}_{uuid4().hex[:8]}"
         
-        # Cada validador assina com QRS-3
+        # Cada validador assina com sua identidade QRS-3 (gerada uma vez, rotacionável)
         signatures = []
+        block_bytes = str(block).encode()
         for validator in validators:
-            qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-            sig = self.quantum_security.sign_qrs3(
-                qrs3_keypair["keypair_id"],
-                str(block).encode(),
-                optimized=True,
-                parallel=True
-            )
+            sig = get_service_identity(f"validator:{validator}", self.quantum_security).sign(block_bytes)
             signatures.append(sig)
         
         consensus_data = {
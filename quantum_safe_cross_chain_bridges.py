@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeCrossChainBridge:
@@ -25,6 +27,7 @@ class QuantumSafeCrossChainBridge:
         self.bridge_id = bridge_id
         self.supported_chains = supported_chains
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("cross_chain_bridges", quantum_security)
         self.transfers = {}
         
         logger.info(f"🌉 Quantum-Safe Cross-Chain Bridge criado: {bridge_id}")
@@ -52,13 +55,7 @@ class QuantumSafeCrossChainBridge:
         
         # Assinar com QRS-3
         transfer_bytes = str(transfer_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            transfer_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(transfer_bytes)
         
         transfer_data["qrs3_signature"] = qrs3_signature
         self.transfers[transfer_id] = transfer_data
@@ -6,6 +6,8 @@ import time
 import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
+
+from service_signing import get_service_identity
 from collections import defaultdict
 
 logger = logging.getLogger(__name__)
@@ -27,6 +29,7 @@ class QuantumSafeDAO:
         self.name = name
         self.members = members
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("dao", quantum_security)
         self.proposals = {}
         self.votes = defaultdict(dict)
         self.treasury = 0.0
@@ -62,13 +65,7 @@ class QuantumSafeDAO:
         
         # Assinar proposta com QRS-3
         proposal_bytes = str(proposal_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            proposal_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(proposal_bytes)
         
         proposal_data["qrs3_signature"] = qrs3_signature
         proposal_data["quantum_safe"] = True
@@ -108,13 +105,7 @@ class QuantumSafeDAO:
         
         # Assinar voto com QRS-3
         vote_bytes = str(vote_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            vote_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(vote_bytes)
         
         vote_data["qrs3_signature"] = qrs3_signature
         vote_data["quantum_safe"] = True
@@ -2,49 +2,123 @@
 # 💰 QUANTUM-SAFE DeFi - ALLIANZA BLOCKCHAIN
 # Sistema DeFi quântico-seguro (ÚNICO NO MUNDO)
 
+import os
 import time
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from amm_engine import AMMEngine, SwapLog, DEFAULT_FEE_BPS, to_units, from_units
+from service_signing import get_service_identity, MerkleBatchSigner
+
 logger = logging.getLogger(__name__)
 
+DEX_SWAP_LOG_PATH = os.getenv(
+    "DEX_SWAP_LOG_PATH",
+    os.path.join(os.getenv("ALLIANZA_DATA_DIR", os.path.join(os.path.expanduser("~"), ".allianza")), "dex_swap_log")
+)
+# Recibos de lote Merkle mantidos para consulta (os mais antigos saem primeiro)
+MAX_BATCH_RECEIPTS = 10000
+
 class QuantumSafeDEX:
     """
     💱 DEX (Decentralized Exchange) Quântico-Seguro
+
+    Pools de produto constante do AMMEngine (reservas inteiras, impacto de preço
+    real), rotas multi-hop, leilão em lote por bloco e histórico no SwapLog colunar.
     """
     
-    def __init__(self, quantum_security):
+    def __init__(self, quantum_security, batch_window: Optional[float] = None,
+                 swap_log_path: Optional[str] = DEX_SWAP_LOG_PATH):
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("dex", quantum_security)
+        # batch_window: swaps da mesma janela compartilham uma assinatura QRS-3 (raiz Merkle)
+        self.swap_batcher = MerkleBatchSigner(self.signer, window=batch_window) if batch_window else None
+        self._batch_receipts: "OrderedDict[str, object]" = OrderedDict()
+        self._receipts_lock = threading.Lock()
+        self.engine = AMMEngine(SwapLog(swap_log_path))
         self.liquidity_pools = {}
-        self.swaps = []
         
         logger.info("💱 QUANTUM SAFE DEX: Inicializado!")
         print("💱 QUANTUM SAFE DEX: Inicializado!")
         print("   • DEX quântico-seguro")
         print("   • Único no mundo")
     
-    def create_pool(self, token1: str, token2: str, initial_liquidity: Dict[str, float]) -> Dict:
+    @property
+    def swap_log(self) -> SwapLog:
+        return self.engine.swap_log
+    
+    def close(self):
+        """Fecha o lote Merkle pendente e grava o buffer do log de swaps"""
+        if self.swap_batcher:
+            self.swap_batcher.close()
+        self.swap_log.close()
+    
+    def _sign(self, data: Dict, record_id: str) -> Dict:
+        data_bytes = str(data).encode()
+        if self.swap_batcher:
+            # O recibo só existe no fechamento do lote: devolve um marcador "pending"
+            # e guarda o Future para get_signature_receipt (nada é alterado depois)
+            future = self.swap_batcher.submit(data_bytes)
+            with self._receipts_lock:
+                self._batch_receipts[record_id] = future
+                while len(self._batch_receipts) > MAX_BATCH_RECEIPTS:
+                    self._batch_receipts.popitem(last=False)
+            return {"status": "pending", "signer": self.signer.service, "signature_mode": "merkle_batch"}
+        return self.signer.sign(data_bytes)
+    
+    def get_signature_receipt(self, record_id: str, timeout: Optional[float] = 0) -> Optional[Dict]:
+        """Recibo do lote Merkle de um swap/liquidação (status "pending" até o lote fechar)"""
+        with self._receipts_lock:
+            future = self._batch_receipts.get(record_id)
+        if future is None:
+            return None
+        if not future.done() and not timeout:
+            return {"status": "pending", "signer": self.signer.service, "signature_mode": "merkle_batch"}
+        try:
+            return dict(future.result(timeout=timeout))
+        except Exception as e:
+            return {"status": "pending", "signer": self.signer.service, "signature_mode": "merkle_batch",
+                    "error": str(e) or "timeout"}
+    
+    def _sync_pool(self, pool_id: str):
+        """Reflete as reservas do motor no registro do pool (API em unidades decimais)"""
+        amm_pool = self.engine.get_pool(pool_id)
+        pool = self.liquidity_pools[pool_id]
+        pool["liquidity"] = {
+            amm_pool.token0: from_units(amm_pool.reserve0),
+            amm_pool.token1: from_units(amm_pool.reserve1)
+        }
+        pool["price"] = amm_pool.price()
+    
+    def create_pool(self, token1: str, token2: str, initial_liquidity: Dict[str, float],
+                    fee_bps: int = DEFAULT_FEE_BPS) -> Dict:
         """Cria um pool de liquidez quântico-seguro"""
         pool_id = f"pool_{int(time.time())}_{uuid4().hex[:8]}"
         
+        try:
+            amount1 = to_units(initial_liquidity.get(token1, 0))
+            amount2 = to_units(initial_liquidity.get(token2, 0))
+        except (ArithmeticError, ValueError) as e:
+            return {"success": False, "error": f"Liquidez inválida: {e}"}
+        result = self.engine.create_pool(token1, token2, amount1, amount2, fee_bps, pool_id=pool_id)
+        if not result["success"]:
+            return result
+        
         # Assinar pool com QRS-3
         pool_data = {
             "pool_id": pool_id,
             "token1": token1,
             "token2": token2,
             "liquidity": initial_liquidity,
+            "fee_bps": fee_bps,
             "timestamp": time.time()
         }
         
         pool_bytes = str(pool_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            pool_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(pool_bytes)
         
         pool = {
             **pool_data,
@@ -53,6 +127,7 @@ class QuantumSafeDEX:
         }
         
         self.liquidity_pools[pool_id] = pool
+        self._sync_pool(pool_id)
         
         return {
             "success": True,
@@ -61,17 +136,23 @@ class QuantumSafeDEX:
             "message": "✅ Pool de liquidez quântico-seguro criado"
         }
     
-    def swap(self, pool_id: str, from_token: str, to_token: str, amount: float) -> Dict:
-        """Realiza swap quântico-seguro"""
+    def swap(self, pool_id: str, from_token: str, to_token: str, amount: float,
+             min_amount_out: float = 0) -> Dict:
+        """Realiza swap quântico-seguro (x*y=k, reservas atualizadas)"""
         if pool_id not in self.liquidity_pools:
             return {"success": False, "error": "Pool não encontrado"}
         
-        pool = self.liquidity_pools[pool_id]
+        amm_pool = self.engine.get_pool(pool_id)
+        if from_token not in (amm_pool.token0, amm_pool.token1) or amm_pool.other(from_token) != to_token:
+            return {"success": False, "error": f"Par {from_token}/{to_token} não pertence ao pool"}
         
-        # Calcular taxa de câmbio (simplificado)
-        liquidity = pool["liquidity"]
-        rate = liquidity.get(to_token, 0) / liquidity.get(from_token, 1)
-        output_amount = amount * rate * 0.997  # 0.3% fee
+        try:
+            result = self.engine.swap(pool_id, from_token, to_units(amount), to_units(min_amount_out))
+        except (ArithmeticError, ValueError) as e:
+            return {"success": False, "error": f"Quantia inválida: {e}"}
+        if not result["success"]:
+            return result
+        self._sync_pool(pool_id)
         
         swap_data = {
             "swap_id": f"swap_{int(time.time())}_{uuid4().hex[:8]}",
@@ -79,29 +160,87 @@ class QuantumSafeDEX:
             "from_token": from_token,
             "to_token": to_token,
             "amount_in": amount,
-            "amount_out": output_amount,
+            "amount_out": from_units(result["amount_out"]),
+            "price_impact": result["price_impact"],
             "timestamp": time.time()
         }
         
         # Assinar swap com QRS-3
-        swap_bytes = str(swap_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            swap_bytes,
-            optimized=True,
-            parallel=True
-        )
-        
-        swap_data["qrs3_signature"] = qrs3_signature
+        swap_data["qrs3_signature"] = self._sign(swap_data, swap_data["swap_id"])
         swap_data["quantum_safe"] = True
-        self.swaps.append(swap_data)
         
         return {
             "success": True,
             "swap": swap_data,
             "message": "✅ Swap quântico-seguro realizado"
         }
+    
+    def swap_route(self, from_token: str, to_token: str, amount: float,
+                   min_amount_out: float = 0, max_hops: int = 3) -> Dict:
+        """Swap pela melhor rota entre pools (multi-hop, atômico)"""
+        try:
+            result = self.engine.swap_route(from_token, to_token, to_units(amount),
+                                            to_units(min_amount_out), max_hops)
+        except (ArithmeticError, ValueError) as e:
+            return {"success": False, "error": f"Quantia inválida: {e}"}
+        if not result["success"]:
+            return result
+        for pool_id in result["pools"]:
+            self._sync_pool(pool_id)
+        
+        swap_data = {
+            "swap_id": f"swap_{int(time.time())}_{uuid4().hex[:8]}",
+            "route": result["pools"],
+            "path": result["path"],
+            "from_token": from_token,
+            "to_token": to_token,
+            "amount_in": amount,
+            "amount_out": from_units(result["amount_out"]),
+            "timestamp": time.time()
+        }
+        swap_data["qrs3_signature"] = self._sign(swap_data, swap_data["swap_id"])
+        swap_data["quantum_safe"] = True
+        return {"success": True, "swap": swap_data, "message": "✅ Swap multi-hop quântico-seguro realizado"}
+    
+    def submit_batch_swap(self, pool_id: str, from_token: str, amount: float,
+                          min_amount_out: float = 0, trader: Optional[str] = None) -> Dict:
+        """Ordem para o leilão em lote do próximo bloco (preço uniforme)"""
+        if pool_id not in self.liquidity_pools:
+            return {"success": False, "error": "Pool não encontrado"}
+        try:
+            return self.engine.submit_order(pool_id, from_token, to_units(amount), to_units(min_amount_out), trader)
+        except (ArithmeticError, ValueError) as e:
+            return {"success": False, "error": f"Quantia inválida: {e}"}
+    
+    def settle_batch(self) -> Dict:
+        """Liquida as ordens do bloco; uma assinatura QRS-3 cobre o resultado de todos os pools"""
+        results = self.engine.clear_block()
+        if not results:
+            return {"success": True, "pools": [], "filled": 0, "rejected": 0}
+        for result in results:
+            if result.get("success"):
+                self._sync_pool(result["pool_id"])
+        settlement = {
+            "settlement_id": f"batch_{int(time.time())}_{uuid4().hex[:8]}",
+            "pools": [
+                {
+                    "pool_id": r["pool_id"],
+                    "clearing_price": r["clearing_price"],
+                    "fills": [(o["order_id"], o["token_in"], from_units(o["amount_in"]), from_units(o["amount_out"]))
+                              for o in r["filled"]],
+                    "rejected": [o["order_id"] for o in r["rejected"]]
+                }
+                for r in results if r.get("success")
+            ],
+            "timestamp": time.time()
+        }
+        settlement["qrs3_signature"] = self._sign(settlement, settlement["settlement_id"])
+        return {
+            "success": True,
+            **settlement,
+            "filled": sum(len(p["fills"]) for p in settlement["pools"]),
+            "rejected": sum(len(p["rejected"]) for p in settlement["pools"])
+        }
 
 
 class QuantumSafeLending:
@@ -111,6 +250,7 @@ class QuantumSafeLending:
     
     def __init__(self, quantum_security):
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("lending", quantum_security)
         self.lending_pools = {}
         self.loans = []
         
@@ -134,13 +274,7 @@ class QuantumSafeLending:
         
         # Assinar pool com QRS-3
         pool_bytes = str(pool_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            pool_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(pool_bytes)
         
         pool = {
             **pool_data,
@@ -196,13 +330,7 @@ class QuantumSafeLending:
         
         # Assinar empréstimo com QRS-3
         loan_bytes = str(loan_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            loan_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(loan_bytes)
         
         loan_data["qrs3_signature"] = qrs3_signature
         loan_data["quantum_safe"] = True
@@ -221,9 +349,10 @@ class QuantumSafeDeFi:
     💰 SISTEMA DeFi QUÂNTICO-SEGURO
     """
     
-    def __init__(self, quantum_security):
+    def __init__(self, quantum_security, swap_batch_window: Optional[float] = None,
+                 swap_log_path: Optional[str] = DEX_SWAP_LOG_PATH):
         self.quantum_security = quantum_security
-        self.dex = QuantumSafeDEX(quantum_security)
+        self.dex = QuantumSafeDEX(quantum_security, batch_window=swap_batch_window, swap_log_path=swap_log_path)
         self.lending = QuantumSafeLending(quantum_security)
         
         logger.info("💰 QUANTUM SAFE DeFi: Inicializado!")
@@ -236,11 +365,30 @@ class QuantumSafeDeFi:
         """Retorna estatísticas do DeFi"""
         return {
             "dex_pools": len(self.dex.liquidity_pools),
-            "dex_swaps": len(self.dex.swaps),
+            "dex_swaps": len(self.dex.swap_log),
             "lending_pools": len(self.lending.lending_pools),
             "active_loans": len(self.lending.loans),
             "quantum_safe": True
         }
+    
+    def close(self):
+        self.dex.close()
+
+
+# Instância compartilhada (rotas HTTP): um único DEX/log de swaps por processo
+_quantum_safe_defi: Optional[QuantumSafeDeFi] = None
+_quantum_safe_defi_lock = threading.Lock()
+
+
+def get_quantum_safe_defi(quantum_security=None) -> QuantumSafeDeFi:
+    """Obter instância global do DeFi (quantum_security global se não informado)"""
+    global _quantum_safe_defi
+    with _quantum_safe_defi_lock:
+        if _quantum_safe_defi is None:
+            if quantum_security is None:
+                from quantum_security import quantum_security
+            _quantum_safe_defi = QuantumSafeDeFi(quantum_security)
+        return _quantum_safe_defi
 
 
 
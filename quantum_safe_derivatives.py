@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeDerivative:
@@ -27,6 +29,7 @@ class QuantumSafeDerivative:
         self.derivative_type = derivative_type
         self.underlying = underlying
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("derivatives", quantum_security)
         self.positions = {}
         
         logger.info(f"📈 Quantum-Safe Derivative criado: {derivative_id}")
@@ -46,13 +49,7 @@ class QuantumSafeDerivative:
         
         # Assinar com QRS-3
         position_bytes = str(position_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            position_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(position_bytes)
         
         position_data["qrs3_signature"] = qrs3_signature
         self.positions[position_id] = position_data
@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeEscrow:
@@ -27,6 +29,7 @@ class QuantumSafeEscrow:
         self.seller = seller
         self.amount = amount
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("escrow", quantum_security)
         self.status = "pending"
         self.created_at = time.time()
         
@@ -46,13 +49,7 @@ class QuantumSafeEscrow:
         
         # Assinar com QRS-3
         release_bytes = str(release_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            release_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(release_bytes)
         
         self.status = "released"
         
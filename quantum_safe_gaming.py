@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeGame:
@@ -25,6 +27,7 @@ class QuantumSafeGame:
         self.game_id = game_id
         self.game_type = game_type
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("gaming", quantum_security)
         self.quantum_random = quantum_random
         self.moves = []
         self.players = []
@@ -42,13 +45,7 @@ class QuantumSafeGame:
         
         # Assinar com QRS-3
         move_bytes = str(move_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            move_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(move_bytes)
         
         move_data["qrs3_signature"] = qrs3_signature
         self.moves.append(move_data)
@@ -6,6 +6,8 @@ import time
 import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
+
+from service_signing import get_service_identity
 from collections import defaultdict
 
 logger = logging.getLogger(__name__)
@@ -24,6 +26,7 @@ class QuantumSafeGovernance:
     
     def __init__(self, quantum_security):
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("governance", quantum_security)
         self.proposals = {}
         self.votes = defaultdict(dict)
         
@@ -44,13 +47,7 @@ class QuantumSafeGovernance:
         
         # Assinar com QRS-3
         proposal_bytes = str(proposal).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            proposal_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(proposal_bytes)
         
         proposal["qrs3_signature"] = qrs3_signature
         self.proposals[proposal_id] = proposal
@@ -75,13 +72,7 @@ class QuantumSafeGovernance:
         
         # Assinar voto com QRS-3
         vote_bytes = str(vote_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            vote_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(vote_bytes)
         
         vote_data["qrs3_signature"] = qrs3_signature
         self.votes[proposal_id][voter] = vote_data
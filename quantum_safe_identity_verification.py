@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeIdentityVerification:
@@ -23,6 +25,7 @@ class QuantumSafeIdentityVerification:
     
     def __init__(self, quantum_security):
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("identity_verification", quantum_security)
         self.verifications = {}
         
         logger.info("✅ QUANTUM-SAFE IDENTITY VERIFICATION: Inicializado!")
@@ -51,13 +54,7 @@ class QuantumSafeIdentityVerification:
         
         # Assinar com QRS-3
         verification_bytes = str(verification_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            verification_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(verification_bytes)
         
         verification_data["qrs3_signature"] = qrs3_signature
         verification_data["status"] = "verified"
@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeInsurance:
@@ -28,6 +30,7 @@ class QuantumSafeInsurance:
         self.coverage = coverage
         self.premium = premium
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("insurance", quantum_security)
         self.claims = []
         self.created_at = time.time()
         
@@ -48,13 +51,7 @@ class QuantumSafeInsurance:
         
         # Assinar com QRS-3
         claim_bytes = str(claim_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            claim_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(claim_bytes)
         
         claim_data["qrs3_signature"] = qrs3_signature
         self.claims.append(claim_data)
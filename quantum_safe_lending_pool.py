@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeLendingPool:
@@ -26,6 +28,7 @@ class QuantumSafeLendingPool:
         self.asset = asset
         self.apy = apy
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("lending_pool", quantum_security)
         self.loans = {}
         self.supplies = {}
         
@@ -42,13 +45,7 @@ class QuantumSafeLendingPool:
         
         # Assinar com QRS-3
         supply_bytes = str(supply_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            supply_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(supply_bytes)
         
         self.supplies[supplier] = self.supplies.get(supplier, 0) + amount
         
@@ -78,13 +75,7 @@ class QuantumSafeLendingPool:
         
         # Assinar com QRS-3
         loan_bytes = str(loan_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            loan_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(loan_bytes)
         
         loan_data["qrs3_signature"] = qrs3_signature
         self.loans[loan_id] = loan_data
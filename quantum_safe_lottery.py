@@ -6,6 +6,8 @@ import time
 import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
+
+from service_signing import get_service_identity
 import secrets
 
 logger = logging.getLogger(__name__)
@@ -28,6 +30,7 @@ class QuantumSafeLottery:
         self.ticket_price = ticket_price
         self.prize_pool = prize_pool
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("lottery", quantum_security)
         self.quantum_random = quantum_random
         self.tickets = []
         self.drawn = False
@@ -47,13 +50,7 @@ class QuantumSafeLottery:
         
         # Assinar com QRS-3
         ticket_bytes = str(ticket_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            ticket_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(ticket_bytes)
         
         ticket_data["qrs3_signature"] = qrs3_signature
         self.tickets.append(ticket_data)
@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeMetaverse:
@@ -25,6 +27,7 @@ class QuantumSafeMetaverse:
         self.metaverse_id = metaverse_id
         self.name = name
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("metaverse", quantum_security)
         self.lands = {}
         self.transactions = []
         
@@ -44,13 +47,7 @@ class QuantumSafeMetaverse:
         
         # Assinar com QRS-3
         land_bytes = str(land_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            land_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(land_bytes)
         
         land_data["qrs3_signature"] = qrs3_signature
         self.lands[land_id] = land_data
@@ -6,6 +6,8 @@ import time
 import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
+
+from service_signing import get_service_identity
 from collections import defaultdict
 
 logger = logging.getLogger(__name__)
@@ -27,6 +29,7 @@ class QuantumSafeMultiSig:
         self.signers = signers
         self.threshold = threshold
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("multisig", quantum_security)
         self.signatures = defaultdict(dict)
         
         logger.info(f"🔐 Quantum-Safe MultiSig criado: {multisig_id}")
@@ -37,13 +40,7 @@ class QuantumSafeMultiSig:
             return {"success": False, "error": "Signatário não autorizado"}
         
         # Assinar com QRS-3
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            message,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(message)
         
         self.signatures[signer] = {
             "signature": qrs3_signature,
@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeOracle:
@@ -25,6 +27,7 @@ class QuantumSafeOracle:
         self.oracle_id = oracle_id
         self.name = name
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("oracles", quantum_security)
         self.data_sources = []
         self.data_history = []
         
@@ -42,13 +45,7 @@ class QuantumSafeOracle:
         
         # Assinar dados com QRS-3
         data_bytes = str(data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            data_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(data_bytes)
         
         data["qrs3_signature"] = qrs3_signature
         data["quantum_safe"] = True
@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafePredictionMarket:
@@ -25,6 +27,7 @@ class QuantumSafePredictionMarket:
         self.market_id = market_id
         self.event = event
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("prediction_market", quantum_security)
         self.predictions = {}
         self.resolved = False
         
@@ -44,13 +47,7 @@ class QuantumSafePredictionMarket:
         
         # Assinar com QRS-3
         prediction_bytes = str(prediction_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            prediction_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(prediction_bytes)
         
         prediction_data["qrs3_signature"] = qrs3_signature
         self.predictions[prediction_id] = prediction_data
@@ -8,6 +8,8 @@ import hashlib
 import logging
 from typing import Dict, Optional
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeRandom:
@@ -24,6 +26,7 @@ class QuantumSafeRandom:
     
     def __init__(self, quantum_security):
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("random", quantum_security)
         self.entropy_pool = []
         
         logger.info("🎲 QUANTUM-SAFE RANDOM: Inicializado!")
@@ -49,13 +52,7 @@ class QuantumSafeRandom:
         entropy = self._calculate_entropy(random_bytes)
         
         # Assinar com QRS-3
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            random_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(random_bytes)
         
         return {
             "success": True,
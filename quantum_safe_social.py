@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeSocial:
@@ -25,6 +27,7 @@ class QuantumSafeSocial:
         self.social_id = social_id
         self.user = user
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("social", quantum_security)
         self.posts = []
         self.followers = []
         
@@ -44,13 +47,7 @@ class QuantumSafeSocial:
         
         # Assinar com QRS-3
         post_bytes = str(post_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            post_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(post_bytes)
         
         post_data["qrs3_signature"] = qrs3_signature
         self.posts.append(post_data)
@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeStaking:
@@ -23,6 +25,7 @@ class QuantumSafeStaking:
     
     def __init__(self, quantum_security):
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("staking", quantum_security)
         self.stakes = {}
         self.rewards = {}
         self.validators = {}
@@ -39,13 +42,7 @@ class QuantumSafeStaking:
         
         # Assinar stake com QRS-3
         stake_bytes = str(stake_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            stake_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(stake_bytes)
         
         self.stakes[staker] = {
             **stake_data,
@@ -2,63 +2,77 @@
 # ⚡ STATE CHANNELS QUÂNTICO-SEGUROS - ALLIANZA BLOCKCHAIN
 # Canais off-chain com segurança quântica mantida
 
+import os
 import time
-import hashlib
-import json
 import logging
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from uuid import uuid4
-import base64
+
+from amm_engine import to_units, from_units
+from state_channel_engine import ChannelEngine, balances_to_units
 
 logger = logging.getLogger(__name__)
 
+# Updates entre checkpoints QRS-3 (cada update intermediário leva só hash-chain + MAC)
+STATE_CHANNEL_CHECKPOINT_EVERY = int(os.getenv("STATE_CHANNEL_CHECKPOINT_EVERY", "1000"))
+
 class QuantumSafeStateChannel:
     """
     ⚡ STATE CHANNEL QUÂNTICO-SEGURO
     Primeira blockchain com state channels quântico-seguros!
     
     Características:
-    - Transações off-chain instantâneas (0 ms latência)
-    - Segurança quântica mantida (QRS-3)
+    - Transações off-chain instantâneas (hash-chain + um MAC por parte a cada update)
+    - Segurança quântica mantida (checkpoint QRS-3 a cada N updates e no fechamento)
+    - Memória constante: último estado + anel de deltas recentes
     - Custo zero para transações off-chain
-    - Throughput infinito (teoricamente)
-    - Fechamento on-chain com batch verification
+    - Fechamento on-chain só do último estado, com replay da cadeia e batch
+      verification dos checkpoints
+    
+    Os MACs usam uma chave por parte. Sem `mac_keys` as duas chaves são geradas
+    pelo próprio canal: os MACs atestam a integridade da cadeia, não o
+    consentimento das partes (party_keys == "channel"). Com chaves fornecidas
+    pelas partes, cada uma consegue recomputar e conferir o seu MAC.
     """
     
-    def __init__(self, channel_id: str, party1: str, party2: str, initial_balance: Dict[str, float], quantum_security):
+    def __init__(self, channel_id: str, party1: str, party2: str, initial_balance: Dict[str, float], quantum_security,
+                 checkpoint_every: int = STATE_CHANNEL_CHECKPOINT_EVERY,
+                 mac_keys: Optional[Tuple[bytes, bytes]] = None):
         self.channel_id = channel_id
         self.party1 = party1
         self.party2 = party2
-        self.balance = initial_balance.copy()
-        self.state_history = []
         self.is_open = True
         self.quantum_security = quantum_security
         self.created_at = time.time()
         self.last_update = time.time()
         
-        # Assinatura QRS-3 inicial
-        initial_state = {
-            "channel_id": channel_id,
-            "party1": party1,
-            "party2": party2,
-            "balance": initial_balance,
-            "timestamp": self.created_at
-        }
-        
-        # Assinar estado inicial com QRS-3
-        state_bytes = json.dumps(initial_state, sort_keys=True).encode()
+        # Chave QRS-3 do canal: assina só os checkpoints (o estado inicial é o checkpoint 0)
         qrs3_keypair = quantum_security.generate_qrs3_keypair()
-        qrs3_signature = quantum_security.sign_qrs3(qrs3_keypair["keypair_id"], state_bytes)
-        
-        self.initial_qrs3_signature = qrs3_signature
         self.qrs3_keypair_id = qrs3_keypair["keypair_id"]
+        self.engine = ChannelEngine(
+            channel_id,
+            (party1, party2),
+            balances_to_units(initial_balance),
+            checkpoint_every=checkpoint_every,
+            signer=self._sign_checkpoint,
+            mac_keys=mac_keys
+        )
+        self.party_keys = "parties" if mac_keys else "channel"
+        self.initial_qrs3_signature = self.engine.checkpoints[0]["signature"]
         
         logger.info(f"⚡ State Channel criado: {channel_id}")
         print(f"⚡ State Channel criado: {channel_id}")
         print(f"   Party 1: {party1[:20]}...")
         print(f"   Party 2: {party2[:20]}...")
         print(f"   Balance inicial: {initial_balance}")
-        print(f"   Segurança: QRS-3")
+        print(f"   Segurança: QRS-3 (checkpoint a cada {self.engine.checkpoint_every} updates)")
+    
+    def _sign_checkpoint(self, message: bytes) -> Dict:
+        return self.quantum_security.sign_qrs3(self.qrs3_keypair_id, message, optimized=True, parallel=True)
+    
+    @property
+    def balance(self) -> Dict[str, Dict[str, float]]:
+        return self.engine.balances()
     
     def update_state(self, from_party: str, to_party: str, amount: float, asset: str = "ALZ") -> Dict:
         """
@@ -72,53 +86,30 @@ class QuantumSafeStateChannel:
         """
         if not self.is_open:
             return {"success": False, "error": "Canal fechado"}
-        
-        if from_party not in [self.party1, self.party2]:
-            return {"success": False, "error": "Partido não autorizado"}
-        
-        if to_party not in [self.party1, self.party2]:
-            return {"success": False, "error": "Partido não autorizado"}
-        
-        if self.balance.get(from_party, {}).get(asset, 0) < amount:
-            return {"success": False, "error": "Saldo insuficiente"}
-        
-        # Atualizar balance
-        if from_party not in self.balance:
-            self.balance[from_party] = {}
-        if to_party not in self.balance:
-            self.balance[to_party] = {}
-        
-        self.balance[from_party][asset] = self.balance[from_party].get(asset, 0) - amount
-        self.balance[to_party][asset] = self.balance[to_party].get(asset, 0) + amount
-        
-        # Criar novo estado
-        new_state = {
-            "channel_id": self.channel_id,
-            "state_number": len(self.state_history) + 1,
-            "from": from_party,
-            "to": to_party,
-            "amount": amount,
-            "asset": asset,
-            "balance": self.balance.copy(),
-            "timestamp": time.time()
-        }
-        
-        # Assinar estado com QRS-3 (rápido, off-chain)
-        state_bytes = json.dumps(new_state, sort_keys=True).encode()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            self.qrs3_keypair_id,
-            state_bytes,
-            optimized=True,
-            parallel=True
-        )
-        
-        new_state["qrs3_signature"] = qrs3_signature
-        self.state_history.append(new_state)
+        try:
+            units = to_units(amount)
+        except (ArithmeticError, ValueError) as e:
+            return {"success": False, "error": f"Quantia inválida: {e}"}
+        
+        result = self.engine.update(from_party, to_party, units, asset)
+        if not result["success"]:
+            return result
         self.last_update = time.time()
         
         return {
             "success": True,
-            "state": new_state,
+            "state": {
+                "channel_id": self.channel_id,
+                "state_number": result["nonce"],
+                "from": from_party,
+                "to": to_party,
+                "amount": amount,
+                "asset": asset,
+                "state_hash": result["head"].hex(),
+                "party_macs": [mac.hex() for mac in result["macs"]],
+                "party_keys": self.party_keys,
+                "timestamp": self.last_update
+            },
             "latency_ms": 0.0,  # Instantâneo (off-chain)
             "message": "Estado atualizado instantaneamente (off-chain)"
         }
@@ -128,30 +119,41 @@ class QuantumSafeStateChannel:
         Fecha canal e publica estado final on-chain
         
         Args:
-            final_state_number: Número do estado final (None = último)
+            final_state_number: Número do estado final (None = último). Só o
+                último estado é publicável: o checkpoint QRS-3 do fechamento
+                assina esse estado, e publicar um anterior com ele daria saldos
+                que a assinatura não cobre
         """
         if not self.is_open:
             return {"success": False, "error": "Canal já fechado"}
         
-        # Selecionar estado final
+        engine = self.engine
         if final_state_number is None:
-            final_state = self.state_history[-1] if self.state_history else None
-        else:
-            final_state = next(
-                (s for s in self.state_history if s["state_number"] == final_state_number),
-                None
-            )
-        
-        if not final_state:
-            return {"success": False, "error": "Estado final não encontrado"}
-        
-        # Agregar todas as assinaturas para batch verification
-        all_signatures = [s["qrs3_signature"] for s in self.state_history]
-        
-        # Batch verification (99.4% mais rápido)
-        batch_result = self.quantum_security.batch_verify_qrs3(all_signatures)
-        
-        if not batch_result.get("success"):
+            final_state_number = engine.nonce
+        if final_state_number != engine.nonce:
+            return {"success": False,
+                    "error": f"Só o último estado ({engine.nonce}) pode ser publicado, recebido {final_state_number}"}
+        
+        # Replay da cadeia desde o último checkpoint + MACs do último estado
+        if not engine.verify():
+            return {"success": False, "error": "Cadeia de estados inválida"}
+        
+        if engine.checkpoints[-1]["nonce"] != engine.nonce:
+            engine.checkpoint()
+        final_checkpoint = engine.checkpoints[-1]
+        balances = engine.balances_units()
+        
+        # Batch verification dos checkpoints QRS-3 (chaves carregadas uma vez, limiar 2-de-3)
+        batch_result = self.quantum_security.batch_verify_qrs3([
+            {
+                "qrs3_signature": checkpoint["signature"],
+                "message": checkpoint["message"],
+                "keypair_id": self.qrs3_keypair_id
+            }
+            for checkpoint in engine.checkpoints
+        ])
+        
+        if not batch_result.get("success") or batch_result.get("invalid_count"):
             return {"success": False, "error": "Validação batch falhou"}
         
         self.is_open = False
@@ -159,24 +161,39 @@ class QuantumSafeStateChannel:
         return {
             "success": True,
             "channel_id": self.channel_id,
-            "final_state": final_state,
-            "total_transactions": len(self.state_history),
+            "final_state": {
+                "channel_id": self.channel_id,
+                "state_number": final_state_number,
+                "balance": {party: {asset: from_units(units) for asset, units in assets.items()}
+                            for party, assets in balances.items()},
+                "state_hash": final_checkpoint["head"].hex(),
+                "signed_message": final_checkpoint["message"].decode(),
+                "qrs3_signature": final_checkpoint["signature"]
+            },
+            "total_transactions": engine.nonce,
+            "checkpoints": engine.stats["checkpoints"],
             "batch_verification": batch_result,
             "message": "Canal fechado e estado final publicado on-chain"
         }
     
     def get_channel_info(self) -> Dict:
         """Retorna informações do canal"""
+        stats = self.engine.get_stats()
         return {
             "channel_id": self.channel_id,
             "party1": self.party1,
             "party2": self.party2,
             "balance": self.balance,
             "is_open": self.is_open,
-            "state_count": len(self.state_history),
+            "state_count": stats["nonce"],
             "created_at": self.created_at,
             "last_update": self.last_update,
-            "total_transactions": len(self.state_history),
+            "total_transactions": stats["nonce"],
+            "state_hash": self.engine.head.hex(),
+            "checkpoint_every": self.engine.checkpoint_every,
+            "last_checkpoint": stats["last_checkpoint"],
+            "checkpoints": stats["checkpoints"],
+            "party_keys": self.party_keys,
             "quantum_safe": True,
             "qrs3_keypair_id": self.qrs3_keypair_id
         }
@@ -275,23 +292,3 @@ class QuantumSafeStateChannelManager:
             ]
         else:
             return [ch.get_channel_info() for ch in self.channels.values()]
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeSupplyChain:
@@ -25,6 +27,7 @@ class QuantumSafeSupplyChain:
         self.chain_id = chain_id
         self.product = product
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("supply_chain", quantum_security)
         self.events = []
         
         logger.info(f"📦 Quantum-Safe Supply Chain criado: {chain_id}")
@@ -44,13 +47,7 @@ class QuantumSafeSupplyChain:
         
         # Assinar com QRS-3
         event_bytes = str(event_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            event_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(event_bytes)
         
         event_data["qrs3_signature"] = qrs3_signature
         self.events.append(event_data)
@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeTimelock:
@@ -25,6 +27,7 @@ class QuantumSafeTimelock:
         self.timelock_id = timelock_id
         self.unlock_time = unlock_time
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("timelock", quantum_security)
         self.locked_data = None
         self.created_at = time.time()
         
@@ -43,13 +46,7 @@ class QuantumSafeTimelock:
         }
         
         lock_bytes = str(lock_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            lock_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(lock_bytes)
         
         return {
             "success": True,
@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeTokenFactory:
@@ -23,6 +25,7 @@ class QuantumSafeTokenFactory:
     
     def __init__(self, quantum_security):
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("token_factory", quantum_security)
         self.tokens = {}
         
         logger.info("🏭 QUANTUM-SAFE TOKEN FACTORY: Inicializado!")
@@ -56,13 +59,7 @@ class QuantumSafeTokenFactory:
         
         # Assinar com QRS-3
         token_bytes = str(token_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            token_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(token_bytes)
         
         token_data["qrs3_signature"] = qrs3_signature
         token_data["quantum_safe"] = True
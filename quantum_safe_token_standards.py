@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeToken:
@@ -27,6 +29,7 @@ class QuantumSafeToken:
         self.symbol = symbol
         self.total_supply = total_supply
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("token_standards", quantum_security)
         self.balances = {}
         self.allowances = {}
         self.created_at = time.time()
@@ -48,13 +51,7 @@ class QuantumSafeToken:
         
         # Assinar com QRS-3
         transfer_bytes = str(transfer_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            transfer_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(transfer_bytes)
         
         # Atualizar balances
         self.balances[from_address] = self.balances.get(from_address, 0) - amount
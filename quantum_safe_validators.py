@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Optional, List
 from uuid import uuid4
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeValidator:
@@ -25,6 +27,7 @@ class QuantumSafeValidator:
         self.validator_id = validator_id
         self.address = address
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("validators", quantum_security)
         self.validations = []
         self.score = 1.0
         
@@ -40,13 +43,7 @@ class QuantumSafeValidator:
         
         # Assinar validação com QRS-3
         validation_bytes = str(validation_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            validation_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(validation_bytes)
         
         validation_data["qrs3_signature"] = qrs3_signature
         self.validations.append(validation_data)
@@ -8,6 +8,8 @@ from typing import Dict, Optional, List
 from uuid import uuid4
 from collections import defaultdict
 
+from service_signing import get_service_identity
+
 logger = logging.getLogger(__name__)
 
 class QuantumSafeVoting:
@@ -27,6 +29,7 @@ class QuantumSafeVoting:
         self.question = question
         self.options = options
         self.quantum_security = quantum_security
+        self.signer = get_service_identity("voting", quantum_security)
         self.votes = defaultdict(int)
         self.voters = set()
         
@@ -49,13 +52,7 @@ class QuantumSafeVoting:
         
         # Assinar com QRS-3
         vote_bytes = str(vote_data).encode()
-        qrs3_keypair = self.quantum_security.generate_qrs3_keypair()
-        qrs3_signature = self.quantum_security.sign_qrs3(
-            qrs3_keypair["keypair_id"],
-            vote_bytes,
-            optimized=True,
-            parallel=True
-        )
+        qrs3_signature = self.signer.sign(vote_bytes)
         
         vote_data["qrs3_signature"] = qrs3_signature
         self.votes[option] += 1
@@ -29,6 +29,8 @@ from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305, AESGCM
 import base64
 
+from pqc_keystore import PQCKeystore
+
 # Tentar importar bibliotecas PQC reais (se disponíveis)
 try:
     from cryptography.hazmat.primitives.asymmetric import x25519, x448
@@ -45,7 +47,8 @@ except ImportError:
 class QuantumSecuritySystem:
     """Sistema de Segurança Quântica de Ponta - Melhor do Mercado"""
     
-    def __init__(self):
+    def __init__(self, keystore: Optional[PQCKeystore] = None):
+        """keystore: PQCKeystore a usar (testes passam um em diretório temporário)"""
         # MELHORIA CRÍTICA: Detectar automaticamente bibliotecas PQC reais
         self.real_pqc_available = False
         self.real_pqc_system = None
@@ -76,8 +79,9 @@ class QuantumSecuritySystem:
             "real_implementation": self.real_pqc_available  # NOVO: Flag de implementação real
         }
         
-        # Chaves PQC armazenadas
-        self.pqc_keypairs = {}
+        # Chaves PQC armazenadas: keystore criptografado em disco, compartilhado entre
+        # processos, com LRU limitada em memória (interface de dict)
+        self.pqc_keypairs = keystore if keystore is not None else PQCKeystore()
         self.shared_secrets = {}
         self.quantum_keys = {}
         
@@ -1475,16 +1479,82 @@ class QuantumSecuritySystem:
     # 11. BATCH VERIFICATION - OTIMIZAÇÃO DE ESCALABILIDADE
     # =========================================================================
     
-    def batch_verify_qrs3(self, signatures: List[Dict]) -> Dict:
+    def ml_dsa_verification_key(self, keypair_id: Optional[str]) -> Optional[Dict]:
+        """
+        Material de verificação de um keypair ML-DSA (formato de signature_verifier):
+        {"mode": "real", algorithm, public_key} ou {"mode": "simulated", secrets}
+        """
+        ml_dsa_keypair = self.pqc_keypairs.get(keypair_id) if keypair_id else None
+        if not ml_dsa_keypair:
+            return None
+        if ml_dsa_keypair.get("implementation") == "REAL (liboqs-python)":
+            algorithm = ml_dsa_keypair.get("algorithm", "")
+            return {
+                "mode": "real",
+                "algorithm": algorithm[algorithm.find("(") + 1:-1] if "(" in algorithm else "Dilithium3",
+                "public_key": ml_dsa_keypair["public_key"]
+            }
+        if "private_key" not in ml_dsa_keypair:
+            return None
+        return {"mode": "simulated", "secrets": [ml_dsa_keypair["private_key"].encode()]}
+    
+    def _qrs3_verification_keys(self, keypair_id: str) -> Optional[Dict]:
+        """
+        Material de verificação de um keypair QRS-3/QRS-2, serializável para os workers
+        - ecdsa: chave pública PEM
+        - ml_dsa / sphincs: {"mode": "real", algorithm, public_key} (liboqs)
+          ou {"mode": "simulated", secrets} (assinatura simulada = hash com a chave privada)
+        """
+        qrs3 = self.pqc_keypairs.get(keypair_id)
+        if not qrs3 or "classic_public_key" not in qrs3:
+            return None
+        
+        keys = {
+            "ecdsa": qrs3["classic_public_key"],
+            "ml_dsa": self.ml_dsa_verification_key(qrs3.get("ml_dsa_keypair_id")),
+            "sphincs": None
+        }
+        
+        sphincs_id = qrs3.get("sphincs_keypair_id")
+        sphincs_keypair = self.pqc_keypairs.get(sphincs_id) if sphincs_id else None
+        if sphincs_keypair:
+            if sphincs_keypair.get("implementation") == "real" and "_real_system" in sphincs_keypair:
+                real_id = sphincs_keypair.get("_real_keypair_id", sphincs_id)
+                stored = sphincs_keypair["_real_system"].pqc_keypairs.get(real_id, {})
+                keys["sphincs"] = {
+                    "mode": "real",
+                    "algorithm": stored.get("keypair_data", {}).get("variant", "SPHINCS+-SHA2-128f-simple"),
+                    "public_key": sphincs_keypair["public_key"]
+                }
+            elif "private_key" in sphincs_keypair:
+                # _sign_sphincs_internal usa a string base64; sign_with_sphincs, os bytes decodificados
+                keys["sphincs"] = {
+                    "mode": "simulated",
+                    "secrets": [
+                        sphincs_keypair["private_key"].encode(),
+                        base64.b64decode(sphincs_keypair["private_key"])
+                    ]
+                }
+            else:
+                keys["sphincs"] = {"mode": "simulated", "secrets": [hashlib.sha3_512(sphincs_id.encode()).digest()]}
+        
+        return keys
+    
+    def batch_verify_qrs3(self, signatures: List[Dict], threshold: int = 2) -> Dict:
         """
         Verificar múltiplas assinaturas QRS-3 em lote
-        Reduz overhead computacional em ~40%
+        
+        - Agrupa por keypair: chaves carregadas uma vez por grupo
+        - ECDSA, ML-DSA e SPHINCS+ verificados no pool de processos
+        - Para cada item, a verificação para quando o limiar (2 de 3) está decidido
+        - Tempos medidos por algoritmo
         
         Args:
             signatures: Lista de dicionários com:
                 - qrs3_signature: Dict com classic_signature, ml_dsa_signature, sphincs_signature
                 - message: bytes
                 - keypair_id: str
+            threshold: assinaturas válidas necessárias por item
         
         Returns:
             Dict com resultados da verificação em lote
@@ -1493,88 +1563,96 @@ class QuantumSecuritySystem:
             if not signatures:
                 return {"success": False, "error": "Lista de assinaturas vazia"}
             
-            start_time = time.time()
-            results = []
-            valid_count = 0
-            invalid_count = 0
+            from signature_verifier import get_signature_verifier, QRS3_COMPONENTS
+            
+            start_time = time.perf_counter()
+            results = [None] * len(signatures)
             
-            # Processar todas as assinaturas
+            # 1. Agrupar por keypair e carregar as chaves uma vez por grupo
+            groups = {}
             for i, sig_data in enumerate(signatures):
-                qrs3_sig = sig_data.get("qrs3_signature", {})
-                message = sig_data.get("message", b"")
                 keypair_id = sig_data.get("keypair_id", "")
-                
-                # Verificar cada componente do QRS-3
-                validations = {
-                    "ecdsa": False,
-                    "ml_dsa": False,
-                    "sphincs": False
-                }
-                
-                # 1. Verificar ECDSA (se presente)
-                if qrs3_sig.get("classic_signature"):
-                    try:
-                        # Em produção, validaria real
-                        validations["ecdsa"] = True
-                    except:
-                        validations["ecdsa"] = False
-                
-                # 2. Verificar ML-DSA (se presente)
-                if qrs3_sig.get("ml_dsa_signature"):
-                    try:
-                        # Em produção, validaria real
-                        validations["ml_dsa"] = True
-                    except:
-                        validations["ml_dsa"] = False
-                
-                # 3. Verificar SPHINCS+ (se presente)
-                if qrs3_sig.get("sphincs_signature"):
-                    try:
-                        # Em produção, validaria real
-                        validations["sphincs"] = True
-                    except:
-                        validations["sphincs"] = False
-                
-                # QRS-3 é válido se pelo menos 2 de 3 assinaturas são válidas
-                valid_count_sig = sum(1 for v in validations.values() if v)
-                is_valid = valid_count_sig >= 2
-                
-                if is_valid:
-                    valid_count += 1
-                else:
-                    invalid_count += 1
-                
-                results.append({
-                    "index": i,
-                    "keypair_id": keypair_id,
-                    "valid": is_valid,
-                    "validations": validations,
-                    "valid_count": valid_count_sig,
-                    "redundancy_level": 3 if validations["sphincs"] else 2
-                })
+                message = sig_data.get("message", b"")
+                if isinstance(message, str):
+                    message = message.encode()
+                if keypair_id not in groups:
+                    groups[keypair_id] = (self._qrs3_verification_keys(keypair_id), [])
+                keys, items = groups[keypair_id]
+                if keys is None:
+                    results[i] = {
+                        "index": i,
+                        "keypair_id": keypair_id,
+                        "valid": False,
+                        "validations": {name: None for name, _ in QRS3_COMPONENTS},
+                        "valid_count": 0,
+                        "redundancy_level": 0,
+                        "error": "Keypair não encontrado"
+                    }
+                    continue
+                items.append((i, message, sig_data.get("qrs3_signature") or {}))
+            key_loading_time = time.perf_counter() - start_time
+            
+            # 2. Verificar grupos no pool
+            outputs = get_signature_verifier().verify_qrs3_groups(
+                [(keys, items) for keys, items in groups.values() if keys is not None and items],
+                threshold=threshold
+            )
+            
+            timings = {name: 0.0 for name, _ in QRS3_COMPONENTS}
+            counts = {name: 0 for name, _ in QRS3_COMPONENTS}
+            skipped = 0
+            for output in outputs:
+                skipped += output["skipped"]
+                for name in timings:
+                    timings[name] += output["timings"][name]
+                    counts[name] += output["counts"][name]
+                for index, validations, valid_count_sig in output["results"]:
+                    sig_data = signatures[index]
+                    qrs3_sig = sig_data.get("qrs3_signature") or {}
+                    results[index] = {
+                        "index": index,
+                        "keypair_id": sig_data.get("keypair_id", ""),
+                        "valid": valid_count_sig >= threshold,
+                        "validations": validations,
+                        "valid_count": valid_count_sig,
+                        "redundancy_level": 3 if qrs3_sig.get("sphincs_signature") else 2
+                    }
             
-            total_time = (time.time() - start_time) * 1000  # ms
-            avg_time_per_sig = total_time / len(signatures) if signatures else 0
+            total_time = (time.perf_counter() - start_time) * 1000  # ms
+            valid_count = sum(1 for r in results if r["valid"])
+            invalid_count = len(results) - valid_count
             
-            # Comparação: verificação individual seria ~150ms por assinatura
-            # Batch verification reduz para ~90ms por assinatura (40% de redução)
-            individual_time_estimate = len(signatures) * 150
-            time_saved = individual_time_estimate - total_time
-            efficiency_gain = (time_saved / individual_time_estimate * 100) if individual_time_estimate > 0 else 0
+            # Tempo de CPU medido nas verificações vs tempo de parede do lote
+            verification_time = sum(timings.values()) * 1000
+            time_saved = max(verification_time - total_time, 0.0)
+            efficiency_gain = (time_saved / verification_time * 100) if verification_time > 0 else 0
             
             return {
                 "success": True,
                 "total_signatures": len(signatures),
                 "valid_count": valid_count,
                 "invalid_count": invalid_count,
-                "success_rate": (valid_count / len(signatures) * 100) if signatures else 0,
+                "success_rate": valid_count / len(signatures) * 100,
                 "total_time_ms": total_time,
-                "avg_time_per_sig_ms": avg_time_per_sig,
+                "avg_time_per_sig_ms": total_time / len(signatures),
+                "key_loading_time_ms": key_loading_time * 1000,
+                "verification_time_ms": verification_time,
+                "algorithm_timings_ms": {
+                    name: {
+                        "total": timings[name] * 1000,
+                        "verifications": counts[name],
+                        "avg": timings[name] * 1000 / counts[name] if counts[name] else 0.0
+                    }
+                    for name in timings
+                },
+                "skipped_verifications": skipped,
+                "keypairs": len(groups),
+                "threshold": threshold,
                 "efficiency_gain_percent": efficiency_gain,
                 "time_saved_ms": time_saved,
                 "results": results,
                 "message": f"✅ Batch verification concluída: {valid_count}/{len(signatures)} válidas",
-                "optimization": f"⚡ Redução de {efficiency_gain:.1f}% no tempo de verificação"
+                "optimization": f"⚡ {skipped} verificações evitadas pelo limiar {threshold}-de-3"
             }
             
         except Exception as e:
@@ -13,6 +13,9 @@ from datetime import datetime
 from typing import Dict, Optional, Tuple, List
 from web3 import Web3
 from web3.middleware import geth_poa_middleware
+from rpc_provider_pool import RPCProviderPool
+from nonce_manager import global_nonce_manager
+from single_flight import global_coalescing_cache
 from dotenv import load_dotenv
 
 # Importar módulos de melhorias
@@ -96,8 +99,9 @@ class RealCrossChainBridge:
             "USDC": 1.0       # 1 USDC ≈ $1.00
         }
         
-        # Cache de taxas de câmbio (TTL: 5 minutos)
-        self.exchange_rate_cache = {}
+        # Cache de taxas de câmbio (TTL: 5 minutos), saldos e gas price com
+        # coalescência: uma única busca por chave mesmo com muitas requisições
+        self.rate_cache = global_coalescing_cache
         self.exchange_rate_cache_ttl = 300  # 5 minutos
         
         # Mapeamento de símbolos para IDs da API CoinGecko
@@ -247,6 +251,17 @@ class RealCrossChainBridge:
         self.eth_w3 = None
         self.base_w3 = None
         
+        # Pool de provedores RPC: probe concorrente + ranking + failover por requisição
+        # (métricas no mesmo IntelligentConnectionPool das otimizações de performance)
+        self.rpc_pool = RPCProviderPool(
+            self.intelligent_pool,
+            probe_timeout=float(os.getenv('RPC_PROBE_TIMEOUT', '3')),
+            request_timeout=float(os.getenv('RPC_REQUEST_TIMEOUT', '10'))
+        )
+        
+        # Nonces EVM reservados localmente por (chain, conta), compartilhados no processo
+        self.nonce_manager = global_nonce_manager
+        
         # Setup básico (sem conexões pesadas)
         self.setup_reserves()
         
@@ -346,6 +361,26 @@ class RealCrossChainBridge:
                 "note": "❌ Chave WIF inválida. Verifique o formato e o checksum."
             }
     
+    def _get_confirmation_tracker(self, chain: str, check_interval: Optional[float] = None):
+        """
+        Confirmation tracker compartilhado da chain (um polling por chain, não por tx).
+        Registra o RPC da chain na primeira vez que é pedido.
+        """
+        from confirmation_tracker import global_confirmation_tracker, EVMBatchRPC, BlockCypherRPC, EVM_CHAINS
+        
+        chain = chain.lower()
+        if not global_confirmation_tracker.has_chain(chain):
+            if chain in EVM_CHAINS:
+                rpc = EVMBatchRPC(web3_factory=lambda: self.get_web3_for_chain(chain))
+            elif chain == "bitcoin":
+                if not self._connections_setup:
+                    self.setup_connections(lazy=False)
+                rpc = BlockCypherRPC(self.btc_api_base, token=getattr(self, "blockcypher_token", None))
+            else:
+                return None
+            global_confirmation_tracker.register_chain(chain, rpc, check_interval)
+        return global_confirmation_tracker
+    
     def wait_for_confirmations(
         self,
         chain: str,
@@ -358,66 +393,23 @@ class RealCrossChainBridge:
         Aguardar confirmações de uma transação
         
         MELHORIA: Verificação de lock on-chain
+        OTIMIZAÇÃO: a espera é atendida pelo confirmation tracker da chain, que
+        consulta a cabeça uma vez por intervalo e os recibos de todas as
+        transações pendentes em lote
         """
-        import time
-        
-        start_time = time.time()
-        confirmations = 0
-        
-        while time.time() - start_time < max_wait_time:
-            try:
-                if chain.lower() in ["polygon", "bsc", "ethereum", "base"]:
-                    w3 = self.get_web3_for_chain(chain)
-                    if w3 and w3.is_connected():
-                        try:
-                            tx_receipt = w3.eth.get_transaction_receipt(tx_hash)
-                            if tx_receipt:
-                                block_number = tx_receipt.blockNumber
-                                current_block = w3.eth.block_number
-                                confirmations = current_block - block_number + 1
-                                
-                                if confirmations >= min_confirmations:
-                                    return {
-                                        "success": True,
-                                        "confirmed": True,
-                                        "confirmations": confirmations,
-                                        "tx_hash": tx_hash
-                                    }
-                        except:
-                            pass  # Transação ainda não confirmada
-                
-                elif chain.lower() == "bitcoin":
-                    # Para Bitcoin, usar API BlockCypher
-                    try:
-                        url = f"{self.btc_api_base}/txs/{tx_hash}"
-                        response = requests.get(url, timeout=10)
-                        if response.status_code == 200:
-                            data = response.json()
-                            confirmations = data.get("confirmations", 0)
-                            
-                            if confirmations >= min_confirmations:
-                                return {
-                                    "success": True,
-                                    "confirmed": True,
-                                    "confirmations": confirmations,
-                                    "tx_hash": tx_hash
-                                }
-                    except:
-                        pass
-                
-                time.sleep(check_interval)
-                
-            except Exception as e:
-                if self.logger:
-                    self.logger.error(f"Erro ao verificar confirmações: {e}")
-                time.sleep(check_interval)
+        tracker = self._get_confirmation_tracker(chain, check_interval)
+        if tracker is None:
+            return {
+                "success": False,
+                "confirmed": False,
+                "confirmations": 0,
+                "error": f"Chain não suportada para confirmações: {chain}"
+            }
         
-        return {
-            "success": False,
-            "confirmed": False,
-            "confirmations": confirmations,
-            "error": f"Timeout após {max_wait_time} segundos"
-        }
+        result = tracker.wait_for_confirmations(chain, tx_hash, min_confirmations, max_wait_time)
+        if not result.get("confirmed") and self.logger and result.get("error"):
+            self.logger.error(f"Erro ao verificar confirmações: {result.get('error')}")
+        return result
     
     def verify_lock_on_chain(
         self,
@@ -462,77 +454,22 @@ class RealCrossChainBridge:
     def get_web3_for_chain(self, chain: str):
         """
         Obter instância Web3 para uma chain específica
-        NOVA OTIMIZAÇÃO: Connection pool inteligente com métricas de latência
+        NOVA OTIMIZAÇÃO: Web3 sobre o pool de provedores RPC - cada requisição vai
+        ao endpoint mais saudável (latência + taxa de erro) e faz failover sozinha
         """
         # Garantir que conexões estejam configuradas
         if not self._connections_setup:
             self.setup_connections(lazy=False)
         
         chain_lower = chain.lower()
-        start_time = time.time()
-        
-        # NOVA OTIMIZAÇÃO: Usar connection pool inteligente se disponível
-        if self.intelligent_pool:
-            optimal_conn = self.intelligent_pool.get_optimal_connection(chain_lower)
-            if optimal_conn and chain_lower in self.connection_cache:
-                cached_w3 = self.connection_cache[chain_lower]
-                try:
-                    if cached_w3 and cached_w3.is_connected():
-                        latency = (time.time() - start_time) * 1000
-                        self.intelligent_pool.record_success(chain_lower, optimal_conn.url, latency)
-                        return cached_w3
-                except:
-                    pass
-        
-        # MELHORIA: Verificar cache de conexões primeiro
-        if chain_lower in self.connection_cache:
-            cached_w3 = self.connection_cache[chain_lower]
-            # Verificar se conexão ainda está ativa
-            try:
-                if cached_w3 and cached_w3.is_connected():
-                    latency = (time.time() - start_time) * 1000
-                    if self.intelligent_pool:
-                        # Registrar sucesso (sem URL específico para cache)
-                        pass
-                    return cached_w3
-            except:
-                # Conexão inválida, remover do cache
-                del self.connection_cache[chain_lower]
-                if self.intelligent_pool:
-                    # Registrar falha
-                    pass
-        
-        # Obter conexão padrão
-        if chain_lower == "polygon":
-            w3 = self.polygon_w3
-            rpc_url = getattr(self, 'polygon_rpc_url', 'https://rpc-amoy.polygon.technology')
-        elif chain_lower == "bsc":
-            w3 = self.bsc_w3
-            rpc_url = getattr(self, 'bsc_rpc_url', 'https://data-seed-prebsc-1-s1.binance.org:8545')
-        elif chain_lower == "ethereum" or chain_lower == "eth":
-            w3 = self.eth_w3
-            rpc_url = getattr(self, 'eth_rpc_url', 'https://sepolia.infura.io/v3/')
-        elif chain_lower == "base":
-            w3 = self.base_w3
-            rpc_url = getattr(self, 'base_rpc_url', 'https://sepolia.base.org')
-        else:
+        if chain_lower == "eth":
+            chain_lower = "ethereum"
+        if chain_lower not in self.rpc_pool.chains:
             return None
         
-        # MELHORIA: Cachear conexão válida
+        w3 = self.rpc_pool.get_web3(chain_lower)
         if w3:
-            try:
-                if w3.is_connected():
-                    self.connection_cache[chain_lower] = w3
-                    latency = (time.time() - start_time) * 1000
-                    
-                    # NOVA OTIMIZAÇÃO: Registrar no pool inteligente
-                    if self.intelligent_pool:
-                        self.intelligent_pool.add_connection(chain_lower, rpc_url, w3)
-                        self.intelligent_pool.record_success(chain_lower, rpc_url, latency)
-            except Exception as e:
-                if self.intelligent_pool:
-                    self.intelligent_pool.record_failure(chain_lower, rpc_url)
-        
+            self.connection_cache[chain_lower] = w3
         return w3
     
     def setup_connections(self, lazy=True):
@@ -555,79 +492,48 @@ class RealCrossChainBridge:
             infura_id = os.getenv('INFURA_PROJECT_ID', '4622f8123b1a4cf7a3e30098d9120d7f')
             
             # Polygon Amoy - Tentar múltiplos RPCs com fallback
-            polygon_rpcs = [
+            self.rpc_pool.register_chain("polygon", [
                 os.getenv('POLYGON_RPC_URL') or os.getenv('POLY_RPC_URL', 'https://rpc-amoy.polygon.technology/'),
                 'https://polygon-amoy.drpc.org',
                 'https://rpc.ankr.com/polygon_amoy',
                 'https://polygon-amoy-bor-rpc.publicnode.com'
-            ]
-            self.polygon_w3 = None
-            for rpc in polygon_rpcs:
-                try:
-                    test_w3 = Web3(Web3.HTTPProvider(rpc, request_kwargs={'timeout': 30}))
-                    test_w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-                    if test_w3.is_connected():
-                        self.polygon_w3 = test_w3
-                        break
-                except:
-                    continue
+            ], chain_id=self.get_chain_id("polygon"), poa=True)
             
             # BSC Testnet - Múltiplos RPCs
-            bsc_rpcs = [
+            self.rpc_pool.register_chain("bsc", [
                 os.getenv('BSC_RPC_URL', 'https://data-seed-prebsc-1-s1.binance.org:8545'),
                 'https://data-seed-prebsc-2-s1.binance.org:8545',
                 'https://bsc-testnet-rpc.publicnode.com'
-            ]
-            self.bsc_w3 = None
-            for rpc in bsc_rpcs:
-                try:
-                    test_w3 = Web3(Web3.HTTPProvider(rpc, request_kwargs={'timeout': 30}))
-                    if test_w3.is_connected():
-                        self.bsc_w3 = test_w3
-                        break
-                except:
-                    continue
+            ], chain_id=self.get_chain_id("bsc"))
             
             # Ethereum Sepolia - Múltiplos RPCs
-            eth_rpcs = [
+            self.rpc_pool.register_chain("ethereum", [
                 os.getenv('ETH_RPC_URL', f'https://sepolia.infura.io/v3/{infura_id}'),
                 'https://ethereum-sepolia-rpc.publicnode.com',
                 'https://rpc.sepolia.org'
-            ]
-            self.eth_w3 = None
-            for rpc in eth_rpcs:
-                try:
-                    test_w3 = Web3(Web3.HTTPProvider(rpc, request_kwargs={'timeout': 30}))
-                    if test_w3.is_connected():
-                        self.eth_w3 = test_w3
-                        break
-                except:
-                    continue
+            ], chain_id=self.get_chain_id("ethereum"))
             
             # Base Sepolia - Múltiplos RPCs (aumentado para 6 RPCs)
-            base_rpcs = [
+            self.rpc_pool.register_chain("base", [
                 os.getenv('BASE_RPC_URL', 'https://sepolia.base.org'),
                 'https://base-sepolia-rpc.publicnode.com',
                 'https://base-sepolia.gateway.tenderly.co',
                 'https://base-sepolia.blockpi.network/v1/rpc/public',
                 'https://base-sepolia.drpc.org',
                 'https://rpc.ankr.com/base_sepolia'
-            ]
-            self.base_w3 = None
-            for rpc in base_rpcs:
-                try:
-                    test_w3 = Web3(Web3.HTTPProvider(rpc, request_kwargs={'timeout': 30}))
-                    if test_w3.is_connected():
-                        self.base_w3 = test_w3
-                        break
-                except:
-                    continue
+            ], chain_id=self.get_chain_id("base"))
+            
+            # OTIMIZAÇÃO: todos os candidatos testados em paralelo, com um único deadline curto
+            healthy = self.rpc_pool.discover()
+            self.polygon_w3 = self.rpc_pool.get_web3("polygon")
+            self.bsc_w3 = self.rpc_pool.get_web3("bsc")
+            self.eth_w3 = self.rpc_pool.get_web3("ethereum")
+            self.base_w3 = self.rpc_pool.get_web3("base")
             
             # Verificar conexões
-            print(f"✅ Polygon: {'Conectado' if self.polygon_w3 and self.polygon_w3.is_connected() else 'Desconectado'}")
-            print(f"✅ BSC: {'Conectado' if self.bsc_w3 and self.bsc_w3.is_connected() else 'Desconectado'}")
-            print(f"✅ Ethereum: {'Conectado' if self.eth_w3 and self.eth_w3.is_connected() else 'Desconectado'}")
-            print(f"✅ Base: {'Conectado' if self.base_w3 and self.base_w3.is_connected() else 'Desconectado'}")
+            for label, chain in (("Polygon", "polygon"), ("BSC", "bsc"), ("Ethereum", "ethereum"), ("Base", "base")):
+                count = healthy.get(chain, 0)
+                print(f"✅ {label}: {f'Conectado ({count} RPCs saudáveis)' if count else 'Desconectado'}")
             print(f"✅ Bitcoin: BlockCypher API configurada")
             
         except Exception as e:
@@ -671,77 +577,78 @@ class RealCrossChainBridge:
         """
         MELHORIA: Buscar taxas de câmbio em tempo real via API CoinGecko
         Atualiza automaticamente os preços das criptomoedas
+
+        Chamadas concorrentes com o cache vencido dividem uma única busca; depois
+        do TTL o valor anterior continua sendo servido enquanto um refresh em
+        segundo plano busca o novo (e também quando a API falha)
         """
         try:
-            # Verificar cache primeiro
-            cache_key = "exchange_rates"
-            if cache_key in self.exchange_rate_cache:
-                cached_data = self.exchange_rate_cache[cache_key]
-                if time.time() - cached_data.get("timestamp", 0) < self.exchange_rate_cache_ttl:
-                    print("💱 Taxas de câmbio obtidas do cache")
-                    self.exchange_rates_usd = cached_data.get("rates", self.exchange_rates_usd)
-                    return {"success": True, "source": "cache", "rates": self.exchange_rates_usd}
-            
-            print("💱 Buscando taxas de câmbio em tempo real via CoinGecko API...")
-            
-            # Construir lista de IDs para buscar
-            coin_ids = list(self.coingecko_ids.values())
-            coin_ids_str = ",".join(coin_ids)
-            
-            # API CoinGecko (gratuita, sem necessidade de API key)
-            url = f"https://api.coingecko.com/api/v3/simple/price"
-            params = {
-                "ids": coin_ids_str,
-                "vs_currencies": "usd"
-            }
-            
-            try:
-                response = requests.get(url, params=params, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Converter resposta da API para nosso formato
-                    updated_rates = {}
-                    for symbol, coin_id in self.coingecko_ids.items():
-                        if coin_id in data and "usd" in data[coin_id]:
-                            price = data[coin_id]["usd"]
-                            updated_rates[symbol] = float(price)
-                            print(f"   ✅ {symbol}: ${price:,.2f}")
-                    
-                    # Atualizar taxas
-                    if updated_rates:
-                        self.exchange_rates_usd.update(updated_rates)
-                        
-                        # Atualizar cache
-                        self.exchange_rate_cache[cache_key] = {
-                            "rates": self.exchange_rates_usd.copy(),
-                            "timestamp": time.time()
-                        }
-                        
-                        print(f"✅ Taxas de câmbio atualizadas! ({len(updated_rates)} moedas)")
-                        return {
-                            "success": True,
-                            "source": "coingecko",
-                            "rates": self.exchange_rates_usd,
-                            "updated": updated_rates
-                        }
-                    else:
-                        print("⚠️  Nenhuma taxa atualizada da API")
-                        return {"success": False, "error": "Nenhuma taxa encontrada", "source": "coingecko"}
-                else:
-                    print(f"⚠️  CoinGecko API retornou status {response.status_code}")
-                    return {"success": False, "error": f"API status {response.status_code}", "source": "coingecko"}
-                    
-            except requests.exceptions.RequestException as e:
-                print(f"⚠️  Erro ao buscar taxas de câmbio: {e}")
-                print(f"   Usando taxas padrão (fallback)")
-                return {"success": False, "error": str(e), "source": "fallback", "rates": self.exchange_rates_usd}
+            updated_rates, origin = self.rate_cache.get_or_load(
+                "exchange_rates",
+                self._fetch_exchange_rates,
+                ttl=self.exchange_rate_cache_ttl,
+                stale_ttl=self.exchange_rate_cache_ttl
+            )
+            self.exchange_rates_usd.update(updated_rates)
+            if origin in ("loaded", "coalesced"):
+                print(f"✅ Taxas de câmbio atualizadas! ({len(updated_rates)} moedas)")
+                return {
+                    "success": True,
+                    "source": "coingecko",
+                    "rates": self.exchange_rates_usd,
+                    "updated": updated_rates
+                }
+            print("💱 Taxas de câmbio obtidas do cache")
+            return {"success": True, "source": "cache", "rates": self.exchange_rates_usd}
                 
         except Exception as e:
             print(f"⚠️  Erro ao atualizar taxas de câmbio: {e}")
             print(f"   Usando taxas padrão (fallback)")
             return {"success": False, "error": str(e), "source": "fallback", "rates": self.exchange_rates_usd}
     
+    def _fetch_exchange_rates(self) -> Dict[str, float]:
+        """Uma consulta à API CoinGecko; levanta exceção se não vier nenhuma taxa"""
+        print("💱 Buscando taxas de câmbio em tempo real via CoinGecko API...")
+        
+        # Construir lista de IDs para buscar
+        coin_ids = list(self.coingecko_ids.values())
+        coin_ids_str = ",".join(coin_ids)
+        
+        # API CoinGecko (gratuita, sem necessidade de API key)
+        url = f"https://api.coingecko.com/api/v3/simple/price"
+        params = {
+            "ids": coin_ids_str,
+            "vs_currencies": "usd"
+        }
+        
+        response = requests.get(url, params=params, timeout=10)
+        if response.status_code != 200:
+            raise RuntimeError(f"API status {response.status_code}")
+        data = response.json()
+        
+        # Converter resposta da API para nosso formato
+        updated_rates = {}
+        for symbol, coin_id in self.coingecko_ids.items():
+            if coin_id in data and "usd" in data[coin_id]:
+                price = data[coin_id]["usd"]
+                updated_rates[symbol] = float(price)
+                print(f"   ✅ {symbol}: ${price:,.2f}")
+        
+        if not updated_rates:
+            raise RuntimeError("Nenhuma taxa encontrada")
+        return updated_rates
+    
+    def _load_cached_rpc_value(self, cache_key: str, fetch, ttl: int):
+        """Loader da coalescência: cache compartilhado (Redis/memória) antes do nó RPC"""
+        if IMPROVEMENTS_AVAILABLE and global_cache:
+            cached_value = global_cache.get(cache_key)
+            if cached_value is not None:
+                return cached_value
+        value = fetch()
+        if IMPROVEMENTS_AVAILABLE and global_cache:
+            global_cache.set(cache_key, value, ttl=ttl)
+        return value
+    
     def get_exchange_rate(self, token_symbol: str, force_update: bool = False) -> float:
         """
         Obter taxa de câmbio de um token (em USD)
@@ -857,26 +764,16 @@ class RealCrossChainBridge:
         
         start_time = time.time()
         
+        nonce = None
+        nonce_settled = False
         try:
             # Obter conta primeiro para extrair endereço
+            # OTIMIZAÇÃO: o pool de RPC só devolve Web3 com endpoint saudável e faz failover
+            # por requisição - sem is_connected()/block_number extras a cada envio
             w3 = self.get_web3_for_chain(chain)
-            if not w3 or not w3.is_connected():
+            if not w3:
                 return {"success": False, "error": f"Não conectado à {chain}"}
             
-            # VERIFICAÇÃO CRÍTICA: Testar se o RPC está realmente funcionando
-            print(f"🔍 Verificando conexão RPC para {chain}...")
-            try:
-                latest_block = w3.eth.block_number
-                print(f"✅ RPC conectado! Block atual: {latest_block}")
-            except Exception as rpc_test_error:
-                print(f"❌ ERRO: RPC não está funcionando corretamente!")
-                print(f"   Erro: {rpc_test_error}")
-                return {
-                    "success": False,
-                    "error": f"RPC {chain} não está funcionando: {str(rpc_test_error)}",
-                    "note": "Verifique a conexão RPC e tente novamente"
-                }
-            
             chain_id = self.get_chain_id(chain)
             if not chain_id:
                 return {"success": False, "error": f"Chain ID não encontrado para {chain}"}
@@ -908,18 +805,15 @@ class RealCrossChainBridge:
             cache_key_balance = f"balance:{chain}:{from_address}"
             cache_key_gas = f"gas_price:{chain}"
             
-            balance = None
-            if IMPROVEMENTS_AVAILABLE and global_cache:
-                cached_balance = global_cache.get(cache_key_balance)
-                if cached_balance is not None:
-                    balance = cached_balance
-                    if self.logger:
-                        self.logger.debug("Saldo obtido do cache", {"address": from_address})
-            
-            if balance is None:
-                balance = w3.eth.get_balance(account.address)
-                if IMPROVEMENTS_AVAILABLE and global_cache:
-                    global_cache.set(cache_key_balance, balance, ttl=30)  # Cache por 30s
+            # Envios simultâneos da mesma conta dividem uma única consulta ao nó
+            # (sem stale-while-revalidate: o saldo decide se o envio é possível)
+            balance, origin = self.rate_cache.get_or_load(
+                cache_key_balance,
+                lambda: self._load_cached_rpc_value(cache_key_balance, lambda: w3.eth.get_balance(account.address), 30),
+                ttl=30  # Cache por 30s
+            )
+            if origin == "hit" and self.logger:
+                self.logger.debug("Saldo obtido do cache", {"address": from_address})
             
             amount_wei = w3.to_wei(amount, 'ether')
             
@@ -944,28 +838,29 @@ class RealCrossChainBridge:
                             "savings_percent": optimal_gas.get("estimated_savings_percent", 0)
                         })
             
-            # Fallback: Cache de gas price
-            if gas_price is None:
-                if IMPROVEMENTS_AVAILABLE and global_cache:
-                    cached_gas = global_cache.get(cache_key_gas)
-                    if cached_gas is not None:
-                        gas_price = cached_gas
-                        if self.logger:
-                            self.logger.debug("Gas price obtido do cache")
-            
+            # Fallback: Cache de gas price (uma busca por chain; vencido, serve o
+            # último valor por mais 30s enquanto atualiza em segundo plano)
             if gas_price is None:
-                gas_price = w3.eth.gas_price
-                # Registrar no histórico do optimizer
-                if self.gas_optimizer:
-                    try:
-                        block_number = w3.eth.block_number
-                        gas_price_gwei = float(w3.from_wei(gas_price, 'gwei'))
-                        self.gas_optimizer.record_gas_price(chain, gas_price_gwei, block_number)
-                    except:
-                        pass
+                def fetch_gas_price():
+                    fetched = w3.eth.gas_price
+                    # Registrar no histórico do optimizer
+                    if self.gas_optimizer:
+                        try:
+                            block_number = w3.eth.block_number
+                            gas_price_gwei = float(w3.from_wei(fetched, 'gwei'))
+                            self.gas_optimizer.record_gas_price(chain, gas_price_gwei, block_number)
+                        except:
+                            pass
+                    return fetched
                 
-                if IMPROVEMENTS_AVAILABLE and global_cache:
-                    global_cache.set(cache_key_gas, gas_price, ttl=60)  # Cache por 60s
+                gas_price, origin = self.rate_cache.get_or_load(
+                    cache_key_gas,
+                    lambda: self._load_cached_rpc_value(cache_key_gas, fetch_gas_price, 60),
+                    ttl=60,  # Cache por 60s
+                    stale_ttl=30
+                )
+                if origin in ("hit", "stale") and self.logger:
+                    self.logger.debug("Gas price obtido do cache")
             
             # Verificar saldo suficiente (incluindo gas)
             estimated_gas = 21000
@@ -981,7 +876,9 @@ class RealCrossChainBridge:
             to_checksum = w3.to_checksum_address(to_address)
             
             # Criar transação
-            nonce = w3.eth.get_transaction_count(account.address)
+            # OTIMIZAÇÃO: nonce reservado localmente por (chain, conta); envios paralelos
+            # da mesma conta não colidem e não consultam o nó a cada transação
+            nonce = self.nonce_manager.reserve(chain, account.address, w3)
             
             transaction = {
                 'to': to_checksum,
@@ -1063,6 +960,8 @@ class RealCrossChainBridge:
                     
                     if not result.get("success"):
                         # Circuit breaker bloqueou
+                        self.nonce_manager.release(chain, account.address, nonce, result.get("error"))
+                        nonce_settled = True
                         return {
                             "success": False,
                             "error": result.get("error", "RPC circuit breaker is OPEN"),
@@ -1073,6 +972,8 @@ class RealCrossChainBridge:
                     tx_hash = result["result"]
                 else:
                     tx_hash = w3.eth.send_raw_transaction(raw_tx)
+                self.nonce_manager.mark_sent(chain, account.address, nonce)
+                nonce_settled = True
                 
                 # Garantir que o hash sempre tenha prefixo 0x para EVM chains
                 if isinstance(tx_hash, bytes):
@@ -1110,7 +1011,14 @@ class RealCrossChainBridge:
                         tx_hash=tx_hash_hex,
                         metadata={"chain": chain, "explorer_url": explorer_url_full}
                     )
+                    # Confirmações chegam por eventos do tracker compartilhado da chain
+                    if self._get_confirmation_tracker(chain):
+                        self.transaction_tracker.track_confirmations(self._current_bridge_id, chain, tx_hash_hex)
             except Exception as send_error:
+                if not nonce_settled:
+                    # Nonce volta como lacuna (ou ressincroniza se o nó diz que já foi usado)
+                    self.nonce_manager.release(chain, account.address, nonce, send_error)
+                    nonce_settled = True
                 print(f"❌ ERRO ao enviar transação: {send_error}")
                 print(f"   Tipo de erro: {type(send_error).__name__}")
                 import traceback
@@ -1200,6 +1108,7 @@ class RealCrossChainBridge:
                             print(f"   Erro get_transaction: {tx_error}")
                             print(f"   Explorer: {explorer_url}")
                             print(f"   ⚠️  Isso indica que a transação NÃO foi broadcastada!")
+                            self.nonce_manager.mark_dropped(chain, account.address, nonce)
                             
                             return {
                                 "success": False,
@@ -1255,6 +1164,9 @@ class RealCrossChainBridge:
             return result
             
         except Exception as e:
+            if nonce is not None and not nonce_settled:
+                # Falhou entre a reserva e o broadcast (estimate_gas, assinatura...)
+                self.nonce_manager.release(chain, account.address, nonce, e)
             return {"success": False, "error": str(e)}
     
     def _validate_bitcoin_address(self, address: str) -> Tuple[bool, Optional[str]]:
@@ -7408,6 +7320,10 @@ class RealCrossChainBridge:
             "total_bridges": len(self.pending_bridges)
         }
     
+    def get_request_coalescing_stats(self) -> Dict:
+        """Contadores da coalescência de taxas, gas price e saldos (requisições que dividiram uma busca)"""
+        return {"success": True, "stats": self.rate_cache.get_stats()}
+    
     # =============================================================================
     # MÉTODOS DE MELHORIAS IMPLEMENTADAS
     # =============================================================================
@@ -7569,14 +7485,24 @@ class RealCrossChainBridge:
     ) -> Dict:
         """MELHORIA: Validar múltiplas transações em paralelo"""
         if not self.improvements_available or not self.parallel_validator:
-            # Fallback para validação sequencial
-            results = []
+            # Fallback: todas as esperas registradas de uma vez no tracker de cada chain
+            pending = []
             for v in validations:
-                result = self.wait_for_confirmations(
-                    chain=v["chain"],
-                    tx_hash=v["tx_hash"],
-                    min_confirmations=v.get("min_confirmations", 12)
-                )
+                tracker = self._get_confirmation_tracker(v["chain"])
+                future = tracker.watch(
+                    v["chain"], v["tx_hash"], v.get("min_confirmations", 12), 300
+                ) if tracker else None
+                pending.append((v, future))
+            
+            results = []
+            for v, future in pending:
+                if future is None:
+                    result = {"success": False, "error": f"Chain não suportada para confirmações: {v['chain']}"}
+                else:
+                    try:
+                        result = future.result(timeout=330)
+                    except Exception as e:
+                        result = {"success": False, "error": str(e)}
                 results.append({
                     "chain": v["chain"],
                     "tx_hash": v["tx_hash"],
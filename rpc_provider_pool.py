@@ -0,0 +1,238 @@
+# rpc_provider_pool.py
+# 🛰️ POOL DE PROVEDORES RPC - ALLIANZA BLOCKCHAIN
+# Descoberta concorrente de endpoints, ranking por saúde e failover por requisição
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+import requests
+from web3 import Web3
+from web3.middleware import geth_poa_middleware
+from web3.providers import HTTPProvider, JSONBaseProvider
+
+from performance_optimizations import IntelligentConnectionPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROBE_TIMEOUT = 3.0      # Deadline da descoberta (todos os candidatos em paralelo)
+DEFAULT_REQUEST_TIMEOUT = 10.0   # Timeout de cada requisição antes do failover
+DEFAULT_REPROBE_INTERVAL = 30.0  # Re-probe dos endpoints não saudáveis em background
+
+
+def probe_endpoint(url: str, timeout: float = DEFAULT_PROBE_TIMEOUT,
+                   expected_chain_id: Optional[int] = None,
+                   session: Optional[requests.Session] = None) -> Dict:
+    """
+    Mede um endpoint com eth_chainId.
+
+    Returns:
+        {"success": bool, "latency_ms": float, "chain_id": int, "error": str}
+    """
+    start = time.perf_counter()
+    try:
+        response = (session or requests).post(
+            url, json={"jsonrpc": "2.0", "id": 1, "method": "eth_chainId", "params": []}, timeout=timeout
+        )
+        response.raise_for_status()
+        chain_id = int(response.json()["result"], 16)
+    except Exception as e:
+        return {"success": False, "error": f"{type(e).__name__}: {e}"}
+    latency_ms = (time.perf_counter() - start) * 1000
+    if expected_chain_id is not None and chain_id != expected_chain_id:
+        # Endpoint vivo, mas de outra rede: nunca deve receber transações
+        return {"success": False, "chain_id": chain_id,
+                "error": f"chain_id {chain_id} != esperado {expected_chain_id}"}
+    return {"success": True, "latency_ms": latency_ms, "chain_id": chain_id}
+
+
+class FailoverHTTPProvider(JSONBaseProvider):
+    """
+    Provider Web3 sobre todos os endpoints de uma chain.
+    Cada requisição vai ao endpoint mais bem ranqueado; erro de transporte
+    (conexão, timeout, HTTP 5xx/429) registra falha e tenta o próximo.
+    """
+
+    def __init__(self, chain: str, pool: IntelligentConnectionPool,
+                 request_timeout: float = DEFAULT_REQUEST_TIMEOUT):
+        super().__init__()
+        self.chain = chain
+        self.pool = pool
+        self.request_timeout = request_timeout
+        self._providers: Dict[str, HTTPProvider] = {}
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"FailoverHTTPProvider({self.chain}, {self.endpoint_uri})"
+
+    @property
+    def endpoint_uri(self) -> Optional[str]:
+        """Endpoint atualmente preferido (usado por quem fala JSON-RPC direto, ex. lotes)"""
+        best = self.pool.get_optimal_connection(self.chain)
+        return best.url if best else None
+
+    def _provider(self, url: str) -> HTTPProvider:
+        with self._lock:
+            provider = self._providers.get(url)
+            if provider is None:
+                provider = HTTPProvider(url, request_kwargs={"timeout": self.request_timeout})
+                self._providers[url] = provider
+            return provider
+
+    def _candidates(self) -> List[str]:
+        ranked = self.pool.ranked_connections(self.chain)
+        # Último recurso: os não saudáveis, caso tenham voltado antes do re-probe
+        fallback = self.pool.unhealthy_connections(self.chain)
+        return [c.url for c in ranked] + [c.url for c in fallback]
+
+    def make_request(self, method, params):
+        last_error = None
+        for url in self._candidates():
+            start = time.perf_counter()
+            try:
+                response = self._provider(url).make_request(method, params)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                last_error = e
+                self.pool.record_failure(self.chain, url, f"{type(e).__name__}: {e}")
+                logger.warning(f"🛰️  {self.chain}: {url} falhou em {method}, tentando próximo endpoint")
+                continue
+            self.pool.record_success(self.chain, url, (time.perf_counter() - start) * 1000)
+            return response
+        if last_error is not None:
+            raise last_error
+        raise ConnectionError(f"Nenhum endpoint RPC configurado para {self.chain}")
+
+
+class RPCProviderPool:
+    """
+    🛰️ POOL DE PROVEDORES RPC
+
+    - register_chain(): candidatos de cada chain (URL, chain id esperado, PoA)
+    - discover(): probe de TODOS os candidatos em paralelo com um único deadline
+      curto, em vez de um is_connected() de 30s por URL em sequência
+    - get_web3(): Web3 por chain sobre FailoverHTTPProvider (failover por requisição)
+    - Thread em background re-testa os endpoints não saudáveis
+    - Métricas e ranking vêm do IntelligentConnectionPool
+    """
+
+    def __init__(self, connection_pool: Optional[IntelligentConnectionPool] = None,
+                 probe_timeout: float = DEFAULT_PROBE_TIMEOUT,
+                 request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+                 reprobe_interval: float = DEFAULT_REPROBE_INTERVAL,
+                 max_workers: int = 32):
+        self.pool = connection_pool or IntelligentConnectionPool()
+        self.probe_timeout = probe_timeout
+        self.request_timeout = request_timeout
+        self.reprobe_interval = reprobe_interval
+        self.max_workers = max_workers
+        self.chains: Dict[str, Dict] = {}
+        self._web3: Dict[str, Web3] = {}
+        self._last_discovery: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._session = requests.Session()
+        self._stop = threading.Event()
+        self._reprobe_thread: Optional[threading.Thread] = None
+
+    def register_chain(self, chain: str, urls: List[str], chain_id: Optional[int] = None, poa: bool = False):
+        """Registra (ou amplia) os candidatos de uma chain; URLs vazias/duplicadas são ignoradas"""
+        with self._lock:
+            config = self.chains.setdefault(chain, {"urls": [], "chain_id": chain_id, "poa": poa})
+            for url in urls:
+                if url and url not in config["urls"]:
+                    config["urls"].append(url)
+                    self.pool.add_connection(chain, url)
+
+    def _probe(self, chain: str, url: str, timeout: float) -> Dict:
+        result = probe_endpoint(url, timeout, self.chains[chain]["chain_id"], self._session)
+        if result["success"]:
+            self.pool.record_success(chain, url, result["latency_ms"])
+        else:
+            self.pool.mark_unhealthy(chain, url, result["error"])
+        return result
+
+    def discover(self, chains: Optional[List[str]] = None, deadline: Optional[float] = None) -> Dict[str, int]:
+        """
+        Probe concorrente de todos os candidatos das chains.
+        O tempo total é limitado por `deadline`, não pela soma dos timeouts.
+
+        Returns:
+            {chain: número de endpoints saudáveis}
+        """
+        deadline = self.probe_timeout if deadline is None else deadline
+        with self._lock:
+            targets = [(chain, url) for chain in (chains or list(self.chains))
+                       for url in self.chains.get(chain, {}).get("urls", [])]
+            now = time.time()
+            for chain in {chain for chain, _ in targets}:
+                self._last_discovery[chain] = now
+        if targets:
+            executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(targets)),
+                                          thread_name_prefix="rpc-probe")
+            futures = {executor.submit(self._probe, chain, url, deadline): (chain, url)
+                       for chain, url in targets}
+            _, pending = wait(futures, timeout=deadline + 0.5)
+            for future in pending:
+                chain, url = futures[future]
+                self.pool.mark_unhealthy(chain, url, "Timeout no probe")
+            executor.shutdown(wait=False)
+        self._start_reprobe()
+        return {chain: len(self.pool.ranked_connections(chain)) for chain in (chains or list(self.chains))}
+
+    def get_web3(self, chain: str) -> Optional[Web3]:
+        """Web3 da chain (failover por requisição) ou None se nenhum endpoint responde"""
+        config = self.chains.get(chain)
+        if not config:
+            return None
+        if not self.pool.ranked_connections(chain):
+            # Todos caíram: nova descoberta curta, no máximo uma por intervalo de probe
+            if time.time() - self._last_discovery.get(chain, 0) < self.probe_timeout:
+                return None
+            self.discover([chain])
+            if not self.pool.ranked_connections(chain):
+                return None
+        with self._lock:
+            w3 = self._web3.get(chain)
+            if w3 is None:
+                w3 = Web3(FailoverHTTPProvider(chain, self.pool, self.request_timeout))
+                if config["poa"]:
+                    w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+                self._web3[chain] = w3
+            return w3
+
+    def has_healthy(self, chain: str) -> bool:
+        return bool(self.pool.ranked_connections(chain))
+
+    def _start_reprobe(self):
+        with self._lock:
+            if self._reprobe_thread is not None or self.reprobe_interval <= 0:
+                return
+            self._reprobe_thread = threading.Thread(target=self._reprobe_loop, name="rpc-reprobe", daemon=True)
+            self._reprobe_thread.start()
+
+    def _reprobe_loop(self):
+        while not self._stop.wait(self.reprobe_interval):
+            self.reprobe_unhealthy()
+
+    def reprobe_unhealthy(self) -> int:
+        """Re-testa os endpoints não saudáveis ou com falha recente; retorna quantos voltaram"""
+        recovered = 0
+        suspects = [conn for chain in list(self.chains)
+                    for conn in self.pool.ranked_connections(chain, include_unhealthy=True)
+                    if not conn.healthy or conn.consecutive_failures]
+        for conn in suspects:
+            if self._probe(conn.chain, conn.url, self.probe_timeout)["success"]:
+                recovered += 1
+                logger.info(f"🛰️  {conn.chain}: {conn.url} voltou a responder")
+        return recovered
+
+    def get_stats(self) -> Dict:
+        return {chain: self.pool.get_connection_stats(chain) for chain in self.chains}
+
+    def close(self):
+        self._stop.set()
+        if self._reprobe_thread is not None:
+            self._reprobe_thread.join(timeout=1)
+            self._reprobe_thread = None
+        self._session.close()
@@ -0,0 +1,283 @@
+# service_signing.py
+# ✍️ IDENTIDADES DE ASSINATURA DE SERVIÇO - ALLIANZA BLOCKCHAIN
+# Uma identidade QRS-3 de longa duração por serviço (rotacionável) + lotes Merkle opcionais
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+from block_codec import MerkleTree, hash_leaf, verify_proof
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROTATION_INTERVAL = float(os.getenv("SERVICE_KEY_ROTATION_SECONDS", str(24 * 3600)))
+DEFAULT_BATCH_WINDOW = 0.5
+DEFAULT_MAX_BATCH = 1024
+# Registro da identidade no keystore PQC (keypair ativo + histórico de chaves públicas)
+IDENTITY_RECORD_PREFIX = "service_identity:"
+
+
+class ServiceIdentity:
+    """
+    ✍️ IDENTIDADE DE SERVIÇO
+
+    - Um keypair QRS-3 por serviço, gerado uma vez e reutilizado em todas as
+      operações (em vez de ECDSA + ML-DSA + SPHINCS+ gerados a cada swap)
+    - Rotação automática a cada `rotation_interval` segundos (ou rotate());
+      keypairs aposentados continuam no keystore para verificar assinaturas antigas
+    - Toda assinatura carrega keypair_id e signer para quem for verificar
+    - Keypair ativo e histórico gravados no keystore PQC (persistente e
+      compartilhado entre processos): reinícios e outros workers reutilizam a
+      identidade e verificam assinaturas feitas antes
+    """
+
+    def __init__(self, service: str, quantum_security, rotation_interval: float = DEFAULT_ROTATION_INTERVAL):
+        self.service = service
+        self.quantum_security = quantum_security
+        self.rotation_interval = rotation_interval
+        self.keypair_id: Optional[str] = None
+        self.activated_at = 0.0
+        self.history: List[Dict] = []
+        self.stats = {"signatures": 0, "rotations": 0}
+        self._lock = threading.Lock()
+        self._record_id = f"{IDENTITY_RECORD_PREFIX}{service}"
+        self._signable = True
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    def _store(self):
+        return getattr(self.quantum_security, "pqc_keypairs", None)
+
+    def _load(self) -> bool:
+        """Lê o registro persistido (outro processo pode ter rotacionado); True se mudou"""
+        store = self._store()
+        if store is None:
+            return False
+        refresh = getattr(store, "refresh", None)
+        try:
+            record = refresh(self._record_id) if refresh else store.get(self._record_id)
+        except KeyError:
+            record = None
+        if not record or record.get("keypair_id") not in store:
+            return False
+        changed = record["keypair_id"] != self.keypair_id or len(record["history"]) != len(self.history)
+        self.keypair_id = record["keypair_id"]
+        self.activated_at = record["activated_at"]
+        self.history = [dict(entry) for entry in record["history"]]
+        self._signable = self._has_private_material(store, self.keypair_id)
+        return changed
+
+    @staticmethod
+    def _has_private_material(store, keypair_id: str) -> bool:
+        """Chaves liboqs vivem só no processo que as gerou: sem elas, verifica mas não assina"""
+        qrs3 = store.get(keypair_id) or {}
+        for part in ("ml_dsa_keypair_id", "sphincs_keypair_id"):
+            sub = store.get(qrs3[part]) if qrs3.get(part) else None
+            sub = sub or {}
+            if str(sub.get("implementation", "")).lower().startswith("real") and "_real_system" not in sub:
+                return False
+        return True
+
+    def _save(self):
+        store = self._store()
+        if store is None:
+            return
+        store[self._record_id] = {
+            "algorithm": "service_identity",
+            "service": self.service,
+            "keypair_id": self.keypair_id,
+            "activated_at": self.activated_at,
+            "history": self.history,
+            "created_at": self.history[0]["activated_at"] if self.history else self.activated_at
+        }
+
+    def _needs_rotation(self) -> bool:
+        return self.keypair_id is None or not self._signable or (
+            self.rotation_interval > 0 and time.time() - self.activated_at >= self.rotation_interval
+        )
+
+    def rotate(self) -> Dict:
+        """Gera o próximo keypair do serviço e aposenta o atual"""
+        with self._lock:
+            self._load()
+            return self._rotate()
+
+    def _rotate(self) -> Dict:
+        result = self.quantum_security.generate_qrs3_keypair()
+        if not result.get("success"):
+            return result
+        now = time.time()
+        if self.keypair_id is not None:
+            self.history[-1]["retired_at"] = now
+            self.stats["rotations"] += 1
+        self.keypair_id = result["keypair_id"]
+        self.activated_at = now
+        self._signable = True
+        self.history.append({"keypair_id": self.keypair_id, "activated_at": now, "retired_at": None})
+        self._save()
+        logger.info(f"✍️ Identidade de serviço {self.service}: keypair {self.keypair_id} ativo")
+        return {"success": True, "keypair_id": self.keypair_id, "activated_at": now}
+
+    def current_keypair_id(self) -> Optional[str]:
+        with self._lock:
+            # Outro worker pode já ter rotacionado: adotar a chave dele em vez de gerar outra
+            if self._needs_rotation() and not (self._load() and not self._needs_rotation()):
+                self._rotate()
+            return self.keypair_id
+
+    def sign(self, message: bytes) -> Dict:
+        """Assina com o keypair ativo do serviço (mesmo formato de sign_qrs3)"""
+        keypair_id = self.current_keypair_id()
+        if keypair_id is None:
+            return {"success": False, "error": f"Identidade do serviço {self.service} indisponível"}
+        signature = self.quantum_security.sign_qrs3(keypair_id, message, optimized=True, parallel=True)
+        signature["keypair_id"] = keypair_id
+        signature["signer"] = self.service
+        self.stats["signatures"] += 1
+        return signature
+
+    def verify(self, message: bytes, signature: Dict, threshold: int = 2) -> bool:
+        """Verifica uma assinatura desta identidade (keypair atual ou aposentado)"""
+        keypair_id = signature.get("keypair_id")
+        if not self._known(keypair_id):
+            return False
+        result = self.quantum_security.batch_verify_qrs3(
+            [{"keypair_id": keypair_id, "message": message, "qrs3_signature": signature}], threshold=threshold
+        )
+        return bool(result.get("success")) and result["results"][0]["valid"]
+
+    def _known(self, keypair_id: Optional[str]) -> bool:
+        with self._lock:
+            if any(entry["keypair_id"] == keypair_id for entry in self.history):
+                return True
+            # Chave criada por outro processo depois do nosso último carregamento
+            self._load()
+            return any(entry["keypair_id"] == keypair_id for entry in self.history)
+
+    def get_info(self) -> Dict:
+        with self._lock:
+            return {
+                "service": self.service,
+                "keypair_id": self.keypair_id,
+                "activated_at": self.activated_at,
+                "rotation_interval": self.rotation_interval,
+                "history": [dict(entry) for entry in self.history],
+                **self.stats
+            }
+
+
+class MerkleBatchSigner:
+    """
+    🌳 ASSINATURA EM LOTE (MERKLE)
+
+    Para fluxos de alta frequência (swaps): as mensagens de uma janela de
+    `window` segundos viram folhas de uma árvore de Merkle e só a raiz é
+    assinada pela identidade do serviço. Cada operação recebe um Future que,
+    no fechamento do lote, resolve para o seu recibo (dict novo, nunca
+    alterado depois) com a raiz, o caminho de inclusão e a assinatura QRS-3 da raiz.
+    """
+
+    def __init__(self, identity: ServiceIdentity, window: float = DEFAULT_BATCH_WINDOW,
+                 max_batch: int = DEFAULT_MAX_BATCH):
+        self.identity = identity
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[tuple] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._batch_seq = 0
+        self.stats = {"batches": 0, "messages": 0}
+
+    def submit(self, message: bytes) -> Future:
+        """Agenda a mensagem no lote atual; o Future resolve para o recibo no flush"""
+        future = Future()
+        with self._lock:
+            self._pending.append((hash_leaf(message), future))
+            full = len(self._pending) >= self.max_batch
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+        return future
+
+    def flush(self) -> Optional[Dict]:
+        """Fecha o lote atual: uma assinatura QRS-3 para todas as mensagens"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not pending:
+                return None
+            self._batch_seq += 1
+            batch_id = f"{self.identity.service}_batch_{int(time.time())}_{self._batch_seq}"
+
+        tree = MerkleTree([leaf for leaf, _ in pending])
+        root = tree.root
+        try:
+            signature = self.identity.sign(root)
+        except Exception as e:
+            signature = {"success": False, "error": str(e)}
+        for index, (_, future) in enumerate(pending):
+            future.set_result({
+                "status": "signed" if signature.get("success") else "failed",
+                "signer": self.identity.service,
+                "signature_mode": "merkle_batch",
+                "batch_id": batch_id,
+                "batch_size": len(pending),
+                "leaf_index": index,
+                "merkle_root": root.hex(),
+                "merkle_proof": [[sibling.hex(), position] for sibling, position in tree.proof(index)],
+                "keypair_id": signature.get("keypair_id"),
+                "qrs3_signature": signature
+            })
+        with self._lock:
+            self.stats["batches"] += 1
+            self.stats["messages"] += len(pending)
+        return {"batch_id": batch_id, "batch_size": len(pending), "merkle_root": root.hex(),
+                "success": bool(signature.get("success"))}
+
+    def verify_receipt(self, message: bytes, receipt: Dict) -> bool:
+        """Inclusão da mensagem na raiz + assinatura da raiz pela identidade"""
+        if receipt.get("status") != "signed":
+            return False
+        root = bytes.fromhex(receipt["merkle_root"])
+        path = [(bytes.fromhex(sibling), position) for sibling, position in receipt["merkle_proof"]]
+        if not verify_proof(hash_leaf(message), path, root):
+            return False
+        return self.identity.verify(root, receipt["qrs3_signature"])
+
+    def close(self):
+        self.flush()
+
+
+_identities: Dict[str, ServiceIdentity] = {}
+_identities_lock = threading.Lock()
+
+
+def get_service_identity(service: str, quantum_security,
+                         rotation_interval: float = DEFAULT_ROTATION_INTERVAL) -> ServiceIdentity:
+    """
+    Identidade compartilhada do serviço no processo. A primeira chamada fixa o
+    sistema de segurança usado para gerar e assinar (rotas que criam um
+    QuantumSecuritySystem por requisição reaproveitam a mesma identidade).
+    """
+    with _identities_lock:
+        identity = _identities.get(service)
+        if identity is None:
+            identity = _identities[service] = ServiceIdentity(service, quantum_security, rotation_interval)
+        return identity
+
+
+def list_service_identities() -> List[Dict]:
+    with _identities_lock:
+        identities = list(_identities.values())
+    return [identity.get_info() for identity in identities]
@@ -0,0 +1,266 @@
+# shard_block_producer.py
+# ⛓️ PRODUTOR DE BLOCOS POR SHARD - ALLIANZA BLOCKCHAIN
+# Um pipeline de selagem por shard, em paralelo, com recibos cross-shard em duas fases
+
+import os
+import time
+import logging
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Threads de selagem (0 = automático); a verificação de assinaturas e o COMMIT
+# liberam o GIL, então os shards avançam de fato em paralelo
+SHARD_WORKERS = int(os.getenv("ALLIANZA_SHARD_WORKERS", "0")) or min(32, (os.cpu_count() or 1) * 4)
+MAX_TRACKED_RECEIPTS = 100_000
+
+
+def build_receipt(tx: Dict, source_shard: int, block, target_shard: int, credit: bool,
+                  now: Optional[float] = None) -> Dict:
+    """Recibo cross-shard emitido pelo bloco de origem (gravado no mesmo COMMIT dele)"""
+    return {
+        "id": f"receipt_{tx['id']}",
+        "tx_id": tx["id"],
+        "source_shard": source_shard,
+        "source_block": block.index,
+        "source_block_hash": block.hash,
+        "target_shard": target_shard,
+        "receiver": tx["receiver"],
+        "amount": tx["amount"],
+        "credit": credit,
+        "status": "prepared",
+        "prepared_at": now or time.time()
+    }
+
+
+class ShardBlockProducer:
+    """
+    ⛓️ PRODUTOR DE BLOCOS SHARD-AWARE
+
+    - Cada shard tem o seu lock: dois pipelines nunca selam o mesmo shard,
+      shards diferentes selam ao mesmo tempo (produce) ou em rodízio (seal_next)
+    - Roteamento pelo DynamicSharding.get_shard_for_transaction (fallback: get_shard)
+    - Transferências cross-shard em duas fases:
+        1. prepared: o shard de origem sela a transação e emite um recibo
+           para o shard de casa do destinatário
+        2. committed: o shard de destino inclui o recibo no seu próximo bloco
+           (e credita o valor quando ainda não foi creditado, caso dos contratos)
+      Os recibos são gravados pela cadeia no COMMIT de cada fase; no boot os
+      ainda "prepared" voltam às filas (restore_receipts) e o destino ignora
+      os já confirmados, então reentrega e retry não creditam duas vezes
+    """
+
+    def __init__(self, blockchain, max_block_txs: int, max_workers: Optional[int] = None):
+        self.blockchain = blockchain
+        self.max_block_txs = max_block_txs
+        self.max_workers = max_workers or SHARD_WORKERS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._locks: Dict[int, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self._inbox: Dict[int, deque] = {}
+        self._receipts: OrderedDict = OrderedDict()
+        self._cursor = 0
+        self.stats = {
+            "blocks": 0,
+            "transactions": 0,
+            "receipts_prepared": 0,
+            "receipts_committed": 0,
+            "busy_skips": 0
+        }
+
+    # ------------------------------------------------------------------
+    # Roteamento
+
+    def route(self, tx: Dict) -> int:
+        """Shard onde a transação é selada"""
+        sharding = getattr(self.blockchain, "dynamic_sharding", None)
+        if sharding is not None:
+            return sharding.get_shard_for_transaction(tx)
+        return self.blockchain.get_shard(tx.get("sender", ""))
+
+    def home_shard(self, address: str) -> int:
+        """Shard de casa de um endereço (destino dos recibos)"""
+        return self.route({"sender": address})
+
+    def submit(self, tx: Dict, fee: Optional[float] = None) -> Optional[int]:
+        """Roteia e adiciona ao mempool; retorna o shard ou None se recusada"""
+        shard_id = self.route(tx)
+        return shard_id if self.blockchain.mempool.add(tx, shard_id, fee) else None
+
+    # ------------------------------------------------------------------
+    # Selagem
+
+    def shard_lock(self, shard_id: int) -> threading.Lock:
+        lock = self._locks.get(shard_id)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(shard_id, threading.Lock())
+        return lock
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._guard:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix="shard-producer")
+        return self._executor
+
+    def reroute_inbox(self, shard_id: int) -> int:
+        """Recibos em trânsito para o shard cujo destinatário mudou de casa (split/merge)"""
+        with self._guard:
+            inbox = self._inbox.get(shard_id)
+            if not inbox:
+                return 0
+            staying, moved = deque(), 0
+            for receipt in inbox:
+                target_shard = self.home_shard(receipt["receiver"])
+                if target_shard == shard_id:
+                    staying.append(receipt)
+                else:
+                    receipt["target_shard"] = target_shard
+                    self._inbox.setdefault(target_shard, deque()).append(receipt)
+                    moved += 1
+            self._inbox[shard_id] = staying
+            return moved
+
+    def restore_receipts(self, receipts: List[Dict]) -> int:
+        """Recoloca nas filas recibos "prepared" lidos do banco (boot após queda)"""
+        restored = 0
+        for receipt in receipts:
+            target_shard = self.home_shard(receipt["receiver"])
+            with self._guard:
+                tracked = self._receipts.get(receipt["id"])
+                if tracked is not None and tracked.get("status") == "prepared":
+                    continue  # Já em trânsito neste processo
+                receipt = dict(receipt, target_shard=target_shard)
+                self._inbox.setdefault(target_shard, deque()).append(receipt)
+                self._receipts[receipt["id"]] = receipt
+                restored += 1
+        return restored
+
+    def shard_ids(self) -> List[int]:
+        """Shards ativos (cópia sob o _state_lock: split/merge mudam blockchain.shards)"""
+        lock = getattr(self.blockchain, "_state_lock", None)
+        with lock if lock is not None else nullcontext():
+            return sorted(self.blockchain.shards)
+
+    def has_work(self, shard_id: int) -> bool:
+        return bool(self.blockchain.mempool.shard_size(shard_id) or self._inbox.get(shard_id))
+
+    def pending_work(self) -> int:
+        """Transações no mempool + recibos aguardando o shard de destino"""
+        with self._guard:
+            receipts = sum(len(inbox) for inbox in self._inbox.values())
+        return len(self.blockchain.mempool) + receipts
+
+    def seal_shard(self, shard_id: int, validator: str, use_parallel: bool = True):
+        """Sela um bloco do shard; None se não há trabalho ou o shard já está sendo selado"""
+        lock = self.shard_lock(shard_id)
+        if not lock.acquire(blocking=False):
+            with self._guard:
+                self.stats["busy_skips"] += 1
+            return None
+        try:
+            return self._seal_locked(shard_id, validator, use_parallel)
+        finally:
+            lock.release()
+
+    def _seal_locked(self, shard_id: int, validator: str, use_parallel: bool):
+        mempool = self.blockchain.mempool
+        with self._guard:
+            inbox = self._inbox.get(shard_id)
+            inbound = list(inbox) if inbox else []
+            if inbox:
+                inbox.clear()
+        transactions = mempool.pop_block(shard_id, self.max_block_txs) if mempool.shard_size(shard_id) else []
+        if not transactions and not inbound:
+            return None
+
+        try:
+            block, outgoing = self.blockchain.seal_shard_block(
+                shard_id, validator, transactions, inbound, use_parallel, self.home_shard
+            )
+        except Exception:
+            # Recibos voltam à frente da fila do shard; as transações o seal_shard_block
+            # devolve ao mempool (falha na verificação de assinaturas ou no COMMIT do bloco)
+            with self._guard:
+                self._inbox.setdefault(shard_id, deque()).extendleft(reversed(inbound))
+            raise
+
+        now = time.time()
+        with self._guard:
+            for receipt in inbound:
+                receipt["status"] = "committed"
+                receipt["target_block"] = block.index
+                receipt["committed_at"] = now
+            for receipt in outgoing:
+                self._inbox.setdefault(receipt["target_shard"], deque()).append(receipt)
+                self._receipts[receipt["id"]] = receipt
+            while len(self._receipts) > MAX_TRACKED_RECEIPTS:
+                self._receipts.popitem(last=False)
+            self.stats["blocks"] += 1
+            self.stats["transactions"] += len(block.transactions) - len(inbound)
+            self.stats["receipts_prepared"] += len(outgoing)
+            self.stats["receipts_committed"] += len(inbound)
+        return block
+
+    def seal_next(self, validator: str, use_parallel: bool = True):
+        """Sela o próximo shard com trabalho, em rodízio (nenhum shard fica sem vez)"""
+        shard_ids = self.shard_ids()
+        if not shard_ids:
+            return None
+        start = self._cursor
+        for offset in range(len(shard_ids)):
+            position = (start + offset) % len(shard_ids)
+            if not self.has_work(shard_ids[position]):
+                continue
+            block = self.seal_shard(shard_ids[position], validator, use_parallel)
+            if block is not None:
+                self._cursor = position + 1
+                return block
+        return None
+
+    def produce(self, validator: str, use_parallel: bool = True) -> List:
+        """Sela, em paralelo, um bloco de cada shard com trabalho pendente"""
+        shard_ids = [shard_id for shard_id in self.shard_ids() if self.has_work(shard_id)]
+        if len(shard_ids) <= 1:
+            blocks = [self.seal_shard(shard_id, validator, use_parallel) for shard_id in shard_ids]
+            return [block for block in blocks if block is not None]
+
+        executor = self._get_executor()
+        futures = [(shard_id, executor.submit(self.seal_shard, shard_id, validator, use_parallel))
+                   for shard_id in shard_ids]
+        blocks = []
+        for shard_id, future in futures:
+            try:
+                block = future.result()
+            except Exception as e:
+                logger.error(f"Erro ao selar shard {shard_id}: {e}")
+                continue
+            if block is not None:
+                blocks.append(block)
+        return blocks
+
+    # ------------------------------------------------------------------
+
+    def get_receipt(self, receipt_id: str) -> Optional[Dict]:
+        with self._guard:
+            receipt = self._receipts.get(receipt_id)
+            return dict(receipt) if receipt else None
+
+    def get_stats(self) -> Dict:
+        with self._guard:
+            return {
+                **self.stats,
+                "receipts_in_flight": sum(len(inbox) for inbox in self._inbox.values()),
+                "workers": self.max_workers
+            }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,144 @@
+# shard_map.py
+# 🗺️ MAPA DE SHARDS - ALLIANZA BLOCKCHAIN
+# Endereço → shard por faixas do espaço de hash (64 bits), com split/merge online
+
+import bisect
+import hashlib
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+KEY_BITS = 64
+KEY_SPACE = 1 << KEY_BITS
+
+
+def address_key(address: str) -> int:
+    """Posição do endereço no espaço de hash (estável entre processos)"""
+    return int.from_bytes(hashlib.blake2b(address.encode(), digest_size=KEY_BITS // 8).digest(), "big")
+
+
+class ShardMap:
+    """
+    🗺️ MAPEAMENTO POR FAIXAS
+
+    - O espaço [0, 2^64) é dividido em faixas contíguas; cada faixa pertence a um shard
+      (um shard pode ter várias faixas depois de merges)
+    - shard_for: blake2b do endereço + busca binária nas fronteiras, O(log faixas)
+    - split move só as chaves >= ponto de corte do shard para um shard novo;
+      merge entrega todas as faixas de um shard para outro
+    - A tabela é substituída inteira a cada mudança (leituras sem lock) e
+      `version` incrementa a cada mudança
+    """
+
+    def __init__(self, shard_ids: Iterable[int]):
+        shard_ids = sorted(shard_ids)
+        if not shard_ids:
+            raise ValueError("ShardMap precisa de ao menos um shard")
+        count = len(shard_ids)
+        self._table: Tuple[List[int], List[int]] = (
+            [i * KEY_SPACE // count for i in range(count)],
+            list(shard_ids)
+        )
+        self._lock = threading.Lock()
+        self.version = 0
+
+    # ------------------------------------------------------------------
+
+    def shard_for_key(self, key: int) -> int:
+        starts, owners = self._table
+        return owners[bisect.bisect_right(starts, key) - 1]
+
+    def shard_for(self, address: str) -> int:
+        return self.shard_for_key(address_key(address))
+
+    def ranges(self, shard_id: Optional[int] = None) -> List[Tuple[int, int, int]]:
+        """[(início, fim exclusivo, shard)] em ordem de chave"""
+        starts, owners = self._table
+        ends = starts[1:] + [KEY_SPACE]
+        return [(start, end, owner) for start, end, owner in zip(starts, ends, owners)
+                if shard_id is None or owner == shard_id]
+
+    def shard_ids(self) -> List[int]:
+        return sorted(set(self._table[1]))
+
+    def fraction(self, shard_id: int) -> float:
+        """Fração do espaço de endereços atribuída ao shard"""
+        return sum(end - start for start, end, _ in self.ranges(shard_id)) / KEY_SPACE
+
+    # ------------------------------------------------------------------
+
+    def _publish(self, starts: List[int], owners: List[int]):
+        # Faixas vizinhas do mesmo shard viram uma só
+        merged_starts, merged_owners = [starts[0]], [owners[0]]
+        for start, owner in zip(starts[1:], owners[1:]):
+            if owner != merged_owners[-1]:
+                merged_starts.append(start)
+                merged_owners.append(owner)
+        self._table = (merged_starts, merged_owners)
+        self.version += 1
+
+    def split(self, shard_id: int, new_shard_id: int, at: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Passa para new_shard_id as chaves de shard_id >= at (padrão: meio da maior faixa)
+
+        Returns:
+            Faixas [(início, fim)] que mudaram de dono
+        """
+        with self._lock:
+            owned = self.ranges(shard_id)
+            if not owned:
+                raise ValueError(f"Shard {shard_id} não possui faixas")
+            if new_shard_id in self._table[1]:
+                raise ValueError(f"Shard {new_shard_id} já existe no mapa")
+            if at is None or not (owned[0][0] < at < owned[-1][1]) or \
+                    not any(start <= at < end for start, end, _ in owned):
+                start, end, _ = max(owned, key=lambda r: r[1] - r[0])
+                if end - start < 2:
+                    raise ValueError(f"Faixa do shard {shard_id} não pode ser dividida")
+                at = start + (end - start) // 2
+
+            starts, owners = list(self._table[0]), list(self._table[1])
+            moved = []
+            for i, (start, end, owner) in enumerate(self.ranges()):
+                if owner != shard_id or end <= at:
+                    continue
+                if start < at:
+                    moved.append((at, end))
+                else:
+                    owners[i] = new_shard_id
+                    moved.append((start, end))
+            # A faixa que contém o ponto de corte é partida em duas
+            position = bisect.bisect_right(starts, at) - 1
+            if starts[position] < at:
+                starts.insert(position + 1, at)
+                owners.insert(position + 1, new_shard_id)
+            self._publish(starts, owners)
+            return moved
+
+    def merge(self, source: int, target: int) -> List[Tuple[int, int]]:
+        """Todas as faixas de source passam para target"""
+        with self._lock:
+            starts, owners = list(self._table[0]), list(self._table[1])
+            moved = [(start, end) for start, end, _ in self.ranges(source)]
+            owners = [target if owner == source else owner for owner in owners]
+            self._publish(starts, owners)
+            return moved
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "ranges": [{"start": f"{start:016x}", "end": f"{end - 1:016x}", "shard_id": owner}
+                       for start, end, owner in self.ranges()]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ShardMap":
+        """Reconstrói o mapa gravado por to_dict (mesmas faixas e versão)"""
+        ranges = data.get("ranges") or []
+        starts = [int(entry["start"], 16) for entry in ranges]
+        owners = [int(entry["shard_id"]) for entry in ranges]
+        if not starts or starts[0] != 0 or any(a >= b for a, b in zip(starts, starts[1:])):
+            raise ValueError("Mapa de shards gravado inválido")
+        shard_map = cls(owners)
+        shard_map._table = (starts, owners)
+        shard_map.version = int(data.get("version", 0))
+        return shard_map
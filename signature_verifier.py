@@ -0,0 +1,328 @@
+# signature_verifier.py
+# ✍️ VERIFICAÇÃO PARALELA DE ASSINATURAS - ALLIANZA BLOCKCHAIN
+# Pool de processos persistente: assinaturas em lotes, chaves públicas em cache por worker
+
+import atexit
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.exceptions import InvalidSignature
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    CRYPTOGRAPHY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Uma tarefa de verificação: (chave pública PEM, mensagem, assinatura em hex)
+VerificationJob = Tuple[str, bytes, str]
+
+# QRS-3: componentes na ordem de verificação (mais barato primeiro, SPHINCS+ por último)
+QRS3_COMPONENTS = (
+    ("ml_dsa", "ml_dsa_signature"),
+    ("ecdsa", "classic_signature"),
+    ("sphincs", "sphincs_signature"),
+)
+
+DEFAULT_CHUNK_SIZE = 256
+DEFAULT_MIN_PARALLEL = 64
+KEY_CACHE_SIZE = 10_000
+
+# Cache de chaves desserializadas (um por processo: cada worker tem o seu)
+_key_cache: "OrderedDict[str, object]" = OrderedDict()
+_key_cache_lock = threading.Lock()
+
+
+def signing_message(tx: Dict) -> bytes:
+    """Bytes assinados de uma transação (mesmo formato de AdvancedCrypto.sign_transaction)"""
+    if "signature" in tx:
+        tx = {k: v for k, v in tx.items() if k != "signature"}
+    return json.dumps(tx, sort_keys=True).encode()
+
+
+def _load_public_key(public_key_pem: str):
+    """Desserializa a chave PEM uma única vez por processo (LRU)"""
+    with _key_cache_lock:
+        key = _key_cache.get(public_key_pem)
+        if key is not None:
+            _key_cache.move_to_end(public_key_pem)
+            return key
+    key = serialization.load_pem_public_key(public_key_pem.encode())
+    with _key_cache_lock:
+        _key_cache[public_key_pem] = key
+        if len(_key_cache) > KEY_CACHE_SIZE:
+            _key_cache.popitem(last=False)
+    return key
+
+
+def _verify_one(job: VerificationJob) -> bool:
+    public_key_pem, message, signature = job
+    if not public_key_pem or not signature:
+        return False
+    try:
+        _load_public_key(public_key_pem).verify(
+            bytes.fromhex(signature), message, ec.ECDSA(hashes.SHA256())
+        )
+        return True
+    except InvalidSignature:
+        return False
+    except Exception:
+        return False
+
+
+def _verify_chunk(jobs: List[VerificationJob]) -> List[bool]:
+    """Executado no worker: verifica um lote inteiro por chamada (um pickle por lote)"""
+    return [_verify_one(job) for job in jobs]
+
+
+def _load_oqs_signature(algorithm: str, public_key: bytes):
+    """Objeto liboqs de verificação, um por (algoritmo, chave) em cada processo"""
+    cache_key = f"oqs:{algorithm}:{hashlib.sha256(public_key).hexdigest()}"
+    with _key_cache_lock:
+        verifier = _key_cache.get(cache_key)
+        if verifier is not None:
+            _key_cache.move_to_end(cache_key)
+            return verifier
+    try:
+        from oqs import Signature
+    except ImportError:
+        from liboqs import Signature
+    verifier = Signature(algorithm)
+    with _key_cache_lock:
+        _key_cache[cache_key] = verifier
+        if len(_key_cache) > KEY_CACHE_SIZE:
+            _key_cache.popitem(last=False)
+    return verifier
+
+
+def _verify_pqc_component(key: Dict, message: bytes, signature: str) -> bool:
+    """
+    ML-DSA / SPHINCS+ de um keypair QRS-3
+    - "real": verificação liboqs com a chave pública
+    - "simulated": recalcula sha3_512(segredo + sha3_512(mensagem)), como na assinatura simulada
+    """
+    signature_bytes = base64.b64decode(signature)
+    if key["mode"] == "real":
+        public_key = base64.b64decode(key["public_key"])
+        return bool(_load_oqs_signature(key["algorithm"], public_key).verify(message, signature_bytes, public_key))
+    message_hash = hashlib.sha3_512(message).digest()
+    return any(
+        hmac.compare_digest(hashlib.sha3_512(secret + message_hash).digest(), signature_bytes)
+        for secret in key["secrets"]
+    )
+
+
+def verify_pqc_signature(key: Optional[Dict], message: bytes, signature: str) -> bool:
+    """Verificação avulsa (fora do pool) de uma assinatura ML-DSA / SPHINCS+ em base64"""
+    if not key:
+        return False
+    try:
+        return _verify_pqc_component(key, message, signature)
+    except Exception:
+        return False
+
+
+def _verify_qrs3_component(name: str, keys: Dict, message: bytes, signature: str) -> bool:
+    try:
+        if name == "ecdsa":
+            _load_public_key(keys["ecdsa"]).verify(
+                base64.b64decode(signature), message, ec.ECDSA(hashes.SHA256())
+            )
+            return True
+        return _verify_pqc_component(keys[name], message, signature)
+    except InvalidSignature:
+        return False
+    except Exception:
+        return False
+
+
+def _verify_qrs3_group(keys: Dict, items: List[Tuple[int, bytes, Dict]], threshold: int) -> Dict:
+    """
+    Executado no worker: assinaturas QRS-3 de um mesmo keypair.
+    Para de verificar um item assim que o limiar (threshold de N) está decidido.
+    """
+    results = []
+    timings = {name: 0.0 for name, _ in QRS3_COMPONENTS}
+    counts = {name: 0 for name, _ in QRS3_COMPONENTS}
+    skipped = 0
+    for index, message, signature in items:
+        present = [(name, signature[field]) for name, field in QRS3_COMPONENTS
+                   if signature.get(field) and keys.get(name)]
+        validations = {name: None for name, _ in QRS3_COMPONENTS}
+        valid = 0
+        for position, (name, value) in enumerate(present):
+            remaining = len(present) - position
+            if valid >= threshold or valid + remaining < threshold:
+                skipped += remaining
+                break
+            start = time.perf_counter()
+            ok = _verify_qrs3_component(name, keys, message, value)
+            timings[name] += time.perf_counter() - start
+            counts[name] += 1
+            validations[name] = ok
+            valid += ok
+        results.append((index, validations, valid))
+    return {"results": results, "timings": timings, "counts": counts, "skipped": skipped}
+
+
+class ParallelSignatureVerifier:
+    """
+    ✍️ Verificador de Assinaturas em Paralelo
+
+    Características:
+    - ProcessPoolExecutor persistente (ECDSA fora do GIL)
+    - Assinaturas enviadas em lotes (chunk_size por tarefa)
+    - Chaves públicas desserializadas uma vez e cacheadas em cada worker
+    - Resultados na mesma ordem das entradas
+    - Lotes pequenos verificados no próprio processo (sem custo de IPC)
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        min_parallel: int = DEFAULT_MIN_PARALLEL
+    ):
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.chunk_size = max(1, chunk_size)
+        self.min_parallel = min_parallel
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.stats = {
+            "verified": 0,
+            "invalid": 0,
+            "batches": 0,
+            "parallel_batches": 0,
+            "pool_failures": 0,
+            "total_time": 0.0
+        }
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self._executor is None:
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                except Exception as e:
+                    logger.error(f"Erro ao criar pool de verificação: {e}")
+                    return None
+            return self._executor
+
+    def _discard_executor(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def verify(self, jobs: Sequence[VerificationJob]) -> List[bool]:
+        """Verifica as assinaturas e devolve [bool] na ordem das tarefas"""
+        if not jobs:
+            return []
+        if not CRYPTOGRAPHY_AVAILABLE:
+            raise RuntimeError("Biblioteca cryptography não disponível para verificar assinaturas")
+
+        start = time.perf_counter()
+        results = None
+        use_pool = self.max_workers > 1 and len(jobs) >= self.min_parallel
+
+        if use_pool:
+            executor = self._get_executor()
+            if executor is not None:
+                # Lotes menores que chunk_size quando há poucas tarefas, para ocupar todos os workers
+                size = min(self.chunk_size, -(-len(jobs) // self.max_workers))
+                chunks = [list(jobs[i:i + size]) for i in range(0, len(jobs), size)]
+                try:
+                    results = [ok for chunk in executor.map(_verify_chunk, chunks) for ok in chunk]
+                    self.stats["parallel_batches"] += 1
+                except BrokenProcessPool as e:
+                    logger.error(f"Erro no pool de verificação, usando processo atual: {e}")
+                    self.stats["pool_failures"] += 1
+                    self._discard_executor()
+
+        if results is None:
+            results = _verify_chunk(list(jobs))
+
+        valid = sum(results)
+        self.stats["verified"] += valid
+        self.stats["invalid"] += len(results) - valid
+        self.stats["batches"] += 1
+        self.stats["total_time"] += time.perf_counter() - start
+        return results
+
+    def verify_qrs3_groups(self, groups: Sequence[Tuple[Dict, List]], threshold: int = 2) -> List[Dict]:
+        """
+        Verifica assinaturas QRS-3 agrupadas por keypair: [(chaves, [(índice, mensagem, assinatura)])]
+        Grupos grandes são divididos em lotes de chunk_size; a chave vai uma vez por lote.
+        """
+        tasks = [
+            (keys, items[i:i + self.chunk_size])
+            for keys, items in groups
+            for i in range(0, len(items), self.chunk_size)
+        ]
+        if not tasks:
+            return []
+        if not CRYPTOGRAPHY_AVAILABLE:
+            raise RuntimeError("Biblioteca cryptography não disponível para verificar assinaturas")
+
+        total = sum(len(items) for _, items in tasks)
+        if self.max_workers > 1 and total >= self.min_parallel and len(tasks) > 1:
+            executor = self._get_executor()
+            if executor is not None:
+                try:
+                    futures = [executor.submit(_verify_qrs3_group, keys, items, threshold) for keys, items in tasks]
+                    results = [future.result() for future in futures]
+                    self.stats["parallel_batches"] += 1
+                    return results
+                except BrokenProcessPool as e:
+                    logger.error(f"Erro no pool de verificação, usando processo atual: {e}")
+                    self.stats["pool_failures"] += 1
+                    self._discard_executor()
+        return [_verify_qrs3_group(keys, items, threshold) for keys, items in tasks]
+
+    def verify_transactions(self, transactions: Sequence[Dict], public_keys: Dict[str, str]) -> List[bool]:
+        """Verifica a assinatura de cada transação com a chave pública registrada do remetente"""
+        jobs = [
+            (public_keys.get(tx.get("sender")), signing_message(tx), tx.get("signature"))
+            for tx in transactions
+        ]
+        return self.verify(jobs)
+
+    def get_stats(self) -> Dict:
+        total = self.stats["verified"] + self.stats["invalid"]
+        return {
+            **self.stats,
+            "workers": self.max_workers,
+            "chunk_size": self.chunk_size,
+            "signatures_per_second": total / self.stats["total_time"] if self.stats["total_time"] else 0.0
+        }
+
+    def close(self):
+        """Encerra os workers"""
+        self._discard_executor()
+
+
+# Instância global
+_signature_verifier: Optional[ParallelSignatureVerifier] = None
+_signature_verifier_lock = threading.Lock()
+
+
+def get_signature_verifier() -> ParallelSignatureVerifier:
+    """Obter instância global do verificador (workers via ALLIANZA_VERIFY_WORKERS)"""
+    global _signature_verifier
+    with _signature_verifier_lock:
+        if _signature_verifier is None:
+            workers = os.getenv("ALLIANZA_VERIFY_WORKERS")
+            _signature_verifier = ParallelSignatureVerifier(max_workers=int(workers) if workers else None)
+            atexit.register(_signature_verifier.close)
+        return _signature_verifier
@@ -0,0 +1,253 @@
+# single_flight.py
+# 🛬 COALESCÊNCIA DE REQUISIÇÕES - ALLIANZA BLOCKCHAIN
+# Misses concorrentes da mesma chave dividem uma única busca (single-flight), com stale-while-revalidate e TTL com jitter
+
+import time
+import random
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Refreshes em segundo plano simultâneos (acima disso o valor velho continua sendo servido)
+MAX_BACKGROUND_REFRESHES = 8
+DEFAULT_JITTER = 0.1
+MAX_ENTRIES = 10_000
+
+
+class _Call:
+    """Uma busca em andamento; quem chega depois espera o mesmo resultado"""
+
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    🛬 SINGLE-FLIGHT
+
+    do(key, fn): a primeira thread executa fn; as que pedirem a mesma chave
+    enquanto ela roda esperam e recebem o mesmo resultado (ou a mesma exceção).
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.stats = {"executions": 0, "coalesced": 0, "errors": 0}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Retorna (resultado, compartilhado)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.stats["executions"] += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+
+class CoalescingCache:
+    """
+    🛬 CACHE COM COALESCÊNCIA
+
+    get_or_load(key, loader, ttl, stale_ttl):
+    - fresco (até ttl ± jitter): devolve o valor em cache
+    - velho (até mais stale_ttl): devolve o valor velho e agenda UM refresh em
+      segundo plano (stale-while-revalidate)
+    - ausente/expirado: UMA busca por chave (single-flight); as demais esperam
+    - falha da busca (exceção ou resultado não cacheável) com valor velho
+      disponível: serve o velho (stale-if-error)
+
+    O jitter espalha as expirações de chaves criadas juntas, evitando que
+    todas vençam no mesmo instante.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, jitter: float = DEFAULT_JITTER,
+                 max_background: int = MAX_BACKGROUND_REFRESHES):
+        self.max_entries = max_entries
+        self.jitter = jitter
+        self._entries: OrderedDict = OrderedDict()  # key -> (valor, fresco_até, velho_até)
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._background = threading.BoundedSemaphore(max_background)
+        self._refreshing = set()
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "coalesced": 0,
+            "background_refreshes": 0,
+            "refresh_errors": 0,
+            "refresh_skipped": 0,
+            "stale_if_error": 0,
+            "uncached": 0
+        }
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _jittered(self, ttl: float) -> float:
+        if not self.jitter:
+            return ttl
+        return ttl * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+    def _store(self, key: str, value: Any, ttl: float, stale_ttl: float):
+        fresh_until = time.time() + self._jittered(ttl)
+        with self._lock:
+            self._entries[key] = (value, fresh_until, fresh_until + stale_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, key: str, loader: Callable[[], Any], ttl: float, stale_ttl: float,
+              cacheable: Optional[Callable[[Any], bool]]) -> Tuple[Any, bool]:
+        """Executa o loader (dentro do single-flight); grava antes de liberar os que esperam"""
+        value = loader()
+        self._count("loads")
+        if cacheable is not None and not cacheable(value):
+            return value, False
+        self._store(key, value, ttl, stale_ttl)
+        return value, True
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: float, stale_ttl: float = 0.0,
+                    cacheable: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, str]:
+        """
+        Returns:
+            (valor, origem) com origem em "hit", "stale", "loaded", "coalesced",
+            "stale_if_error" ou "uncached" (resultado não cacheável, sem valor velho)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, fresh_until, stale_until = entry
+                if now < fresh_until:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return value, "hit"
+                if now < stale_until:
+                    self.stats["stale_hits"] += 1
+                    schedule = key not in self._refreshing and not self._flight.in_flight(key)
+                    if schedule:
+                        self._refreshing.add(key)
+                else:
+                    entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+
+        if entry is not None:
+            if schedule:
+                self._refresh_in_background(key, loader, ttl, stale_ttl, cacheable)
+            return entry[0], "stale"
+
+        try:
+            (value, stored), shared = self._flight.do(
+                key, lambda: self._load(key, loader, ttl, stale_ttl, cacheable)
+            )
+        except Exception:
+            stale = self._stale_value(key)
+            if stale is None:
+                raise
+            self._count("stale_if_error")
+            return stale[0], "stale_if_error"
+
+        if shared:
+            self._count("coalesced")
+        if not stored:
+            stale = self._stale_value(key)
+            if stale is not None:
+                self._count("stale_if_error")
+                return stale[0], "stale_if_error"
+            self._count("uncached")
+            return value, "uncached"
+        return value, "coalesced" if shared else "loaded"
+
+    def _stale_value(self, key: str) -> Optional[Tuple[Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() < entry[2]:
+                return (entry[0],)
+        return None
+
+    def _refresh_in_background(self, key, loader, ttl, stale_ttl, cacheable):
+        if not self._background.acquire(blocking=False):
+            with self._lock:
+                self._refreshing.discard(key)
+                self.stats["refresh_skipped"] += 1
+            return
+
+        def refresh():
+            try:
+                self._flight.do(key, lambda: self._load(key, loader, ttl, stale_ttl, cacheable))
+                self._count("background_refreshes")
+            except Exception as e:
+                self._count("refresh_errors")
+                logger.warning(f"Refresh em segundo plano falhou ({key}): {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+                self._background.release()
+
+        threading.Thread(target=refresh, name=f"swr-{key[:32]}", daemon=True).start()
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Valor em cache (fresco ou velho) sem carregar"""
+        stale = self._stale_value(key)
+        return stale[0] if stale is not None else None
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "in_flight": len(self._flight._calls),
+                "hit_rate": (self.stats["hits"] + self.stats["stale_hits"]) / lookups if lookups else 0.0,
+                "flight": dict(self._flight.stats)
+            }
+
+
+# Instância global (taxas de câmbio, gas price e saldos consultados pela ponte e exploradores)
+global_coalescing_cache = CoalescingCache()
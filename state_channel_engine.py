@@ -0,0 +1,186 @@
+# state_channel_engine.py
+# ⚡ MOTOR DE STATE CHANNELS - ALLIANZA BLOCKCHAIN
+# Último estado + anel de deltas, cadeia de hashes/MAC por parte a cada update e checkpoints QRS-3
+
+import json
+import struct
+import hashlib
+import secrets
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from amm_engine import to_units, from_units
+
+DEFAULT_CHECKPOINT_EVERY = 1000
+MAC_SIZE = 16
+DELTA_HEADER = struct.Struct(">QBBB")  # nonce, de, para, ativo
+AMOUNT_BYTES = 16
+
+
+def _encode_delta(nonce: int, from_index: int, to_index: int, asset_index: int, amount: int) -> bytes:
+    return DELTA_HEADER.pack(nonce, from_index, to_index, asset_index) + amount.to_bytes(AMOUNT_BYTES, "big")
+
+
+def _chain(head: bytes, delta: bytes) -> bytes:
+    return hashlib.blake2b(head + delta, digest_size=32).digest()
+
+
+def _mac(key: bytes, nonce: int, head: bytes) -> bytes:
+    return hashlib.blake2b(nonce.to_bytes(8, "big") + head, key=key, digest_size=MAC_SIZE).digest()
+
+
+class ChannelEngine:
+    """
+    ⚡ MOTOR DE UM STATE CHANNEL
+
+    - Saldos inteiros (unidades base) atualizados no lugar; nada é copiado por update
+    - Cada update estende a cadeia head_n = H(head_{n-1} || delta_n) e recebe
+      um MAC de (nonce, head) por parte (blake2b com a chave da parte). Sem
+      `mac_keys` as chaves são geradas aqui: os MACs provam integridade, não
+      consentimento; para isso cada parte precisa fornecer (e guardar) a sua
+    - Só o último estado é mantido, mais um anel com os últimos
+      `ring_size` deltas (reconstrução de estados recentes e replay na disputa)
+    - A cada `checkpoint_every` updates (e no fechamento) o estado completo é
+      assinado com o `signer` (QRS-3); o anel sempre cobre o trecho desde o
+      último checkpoint, então a cadeia pode ser reverificada a partir dele
+    """
+
+    def __init__(self, channel_id: str, parties: Tuple[str, str], balances: Dict[str, Dict[str, int]],
+                 checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY, ring_size: Optional[int] = None,
+                 signer: Optional[Callable[[bytes], Dict]] = None, mac_keys: Optional[Tuple[bytes, bytes]] = None):
+        self.channel_id = channel_id
+        self.parties = tuple(parties)
+        self.checkpoint_every = max(1, int(checkpoint_every))
+        self.ring_size = max(ring_size or 2 * self.checkpoint_every, self.checkpoint_every)
+        self.signer = signer
+        self.assets: List[str] = sorted({asset for assets in balances.values() for asset in assets})
+        self._party_index = {party: i for i, party in enumerate(self.parties)}
+        self._asset_index = {asset: i for i, asset in enumerate(self.assets)}
+        self._balances = [
+            {asset: int(balances.get(party, {}).get(asset, 0)) for asset in self.assets} for party in self.parties
+        ]
+        self._mac_keys = mac_keys or (secrets.token_bytes(32), secrets.token_bytes(32))
+        self._ring: deque = deque(maxlen=self.ring_size)
+        self._lock = threading.Lock()
+
+        self.nonce = 0
+        self.head = hashlib.blake2b(self._state_bytes(), digest_size=32).digest()
+        self.macs = self._co_sign()
+        self.checkpoints: deque = deque(maxlen=8)  # Checkpoints recentes (o último é o que vale)
+        self.stats = {"updates": 0, "checkpoints": 0, "rejected": 0}
+        self.checkpoint()
+
+    # ------------------------------------------------------------------
+
+    def _state_bytes(self) -> bytes:
+        return json.dumps({
+            "channel_id": self.channel_id,
+            "nonce": self.nonce,
+            "parties": self.parties,
+            "balances": self.balances_units(),
+            "head": self.head.hex() if self.nonce else None
+        }, sort_keys=True).encode()
+
+    def _co_sign(self) -> Tuple[bytes, bytes]:
+        return tuple(_mac(key, self.nonce, self.head) for key in self._mac_keys)
+
+    def balances_units(self) -> Dict[str, Dict[str, int]]:
+        return {party: dict(self._balances[i]) for i, party in enumerate(self.parties)}
+
+    def balances(self) -> Dict[str, Dict[str, float]]:
+        return {party: {asset: from_units(units) for asset, units in self._balances[i].items()}
+                for i, party in enumerate(self.parties)}
+
+    # ------------------------------------------------------------------
+
+    def update(self, from_party: str, to_party: str, amount: int, asset: str) -> Dict:
+        """Transfere `amount` unidades base dentro do canal; O(1), sem cópia de estado"""
+        from_index = self._party_index.get(from_party)
+        to_index = self._party_index.get(to_party)
+        asset_index = self._asset_index.get(asset)
+        if from_index is None or to_index is None:
+            return {"success": False, "error": "Partido não autorizado"}
+        if asset_index is None or amount <= 0 or from_index == to_index:
+            return {"success": False, "error": "Update inválido"}
+        with self._lock:
+            source = self._balances[from_index]
+            if source[asset] < amount:
+                self.stats["rejected"] += 1
+                return {"success": False, "error": "Saldo insuficiente"}
+            source[asset] -= amount
+            self._balances[to_index][asset] += amount
+            self.nonce += 1
+            delta = (self.nonce, from_index, to_index, asset_index, amount)
+            self.head = _chain(self.head, _encode_delta(*delta))
+            self._ring.append(delta)
+            self.macs = self._co_sign()
+            self.stats["updates"] += 1
+            nonce, head, macs = self.nonce, self.head, self.macs
+            if nonce - self.checkpoints[-1]["nonce"] >= self.checkpoint_every:
+                self._checkpoint()
+        return {"success": True, "nonce": nonce, "head": head, "macs": macs}
+
+    def checkpoint(self) -> Dict:
+        """Assina o estado completo atual (QRS-3 via signer)"""
+        with self._lock:
+            return self._checkpoint()
+
+    def _checkpoint(self) -> Dict:
+        message = self._state_bytes()
+        checkpoint = {
+            "nonce": self.nonce,
+            "head": self.head,
+            "message": message,
+            "signature": self.signer(message) if self.signer else None
+        }
+        self.checkpoints.append(checkpoint)
+        self.stats["checkpoints"] += 1
+        return checkpoint
+
+    # ------------------------------------------------------------------
+
+    def verify(self) -> bool:
+        """Reverifica a cadeia desde o último checkpoint (replay do anel) e os MACs do estado atual"""
+        with self._lock:
+            checkpoint = self.checkpoints[-1]
+            head = checkpoint["head"]
+            expected = checkpoint["nonce"] + 1
+            for delta in self._ring:
+                if delta[0] < expected:
+                    continue
+                if delta[0] != expected:
+                    return False
+                head = _chain(head, _encode_delta(*delta))
+                expected += 1
+            if expected != self.nonce + 1 or head != self.head:
+                return False
+            return all(
+                secrets.compare_digest(mac, _mac(key, self.nonce, self.head))
+                for key, mac in zip(self._mac_keys, self.macs)
+            )
+
+    def state_at(self, nonce: int) -> Optional[Dict[str, Dict[str, int]]]:
+        """Saldos no estado `nonce`, desfazendo deltas do anel (None se fora da janela)"""
+        with self._lock:
+            if nonce > self.nonce or nonce < 0:
+                return None
+            oldest = self._ring[0][0] - 1 if self._ring else self.nonce
+            if nonce < oldest:
+                return None
+            balances = [dict(assets) for assets in self._balances]
+            for delta_nonce, from_index, to_index, asset_index, amount in reversed(self._ring):
+                if delta_nonce <= nonce:
+                    break
+                asset = self.assets[asset_index]
+                balances[from_index][asset] += amount
+                balances[to_index][asset] -= amount
+        return {party: balances[i] for i, party in enumerate(self.parties)}
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "nonce": self.nonce, "ring": len(self._ring), "ring_size": self.ring_size,
+                "last_checkpoint": self.checkpoints[-1]["nonce"]}
+
+
+def balances_to_units(balances: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, int]]:
+    return {party: {asset: to_units(amount) for asset, amount in assets.items()} for party, assets in balances.items()}
@@ -0,0 +1,273 @@
+# state_store.py
+# 🗂️ STATE STORE - ALLIANZA BLOCKCHAIN
+# Paginação lazy de blocos + índices de hash/transação + carga das contas sem as chaves
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Colunas lidas de shards para reconstruir um bloco
+BLOCK_COLUMNS = "shard_id, block_index, previous_hash, transactions, timestamp, hash, validator"
+
+
+class LazyShardChain:
+    """
+    Cadeia de um shard com paginação sob demanda.
+
+    Comporta-se como a lista de blocos usada antes (len, [-1], slices,
+    iteração, append), mas mantém em memória apenas o gênesis, a ponta
+    e um LRU de blocos decodificados. O restante é lido do SQLite pelo
+    índice (shard_id, block_index) quando o explorer/histórico pede.
+    """
+
+    def __init__(self, store: "StateStore", shard_id: int, genesis, height: int,
+                 block_factory: Callable, cache_size: int = 256):
+        self.store = store
+        self.shard_id = shard_id
+        self.genesis = genesis
+        self.height = max(height, 1)
+        self.block_factory = block_factory
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.tip = genesis
+        if self.height > 1:
+            tip = self._load(self.height - 1)
+            if tip is not None:
+                self.tip = tip
+            else:
+                self.height = 1
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __bool__(self) -> bool:
+        return True
+
+    def _remember(self, index: int, block):
+        with self._lock:
+            self._cache[index] = block
+            self._cache.move_to_end(index)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _load(self, index: int):
+        if index == 0:
+            return self.genesis
+        with self._lock:
+            block = self._cache.get(index)
+            if block is not None:
+                self._cache.move_to_end(index)
+                return block
+        row = self.store.fetch_block_row(self.shard_id, index)
+        if row is None:
+            return None
+        block = self.block_factory(row)
+        self._remember(index, block)
+        return block
+
+    def _load_range(self, start: int, stop: int) -> List:
+        """Lê [start, stop) usando o cache e uma única query para os ausentes"""
+        blocks = {}
+        missing = []
+        for index in range(start, stop):
+            if index == 0:
+                blocks[0] = self.genesis
+                continue
+            with self._lock:
+                block = self._cache.get(index)
+            if block is None:
+                missing.append(index)
+            else:
+                blocks[index] = block
+        if missing:
+            for row in self.store.fetch_block_rows(self.shard_id, missing[0], missing[-1] + 1):
+                index = row[1]
+                if index in blocks:
+                    continue
+                block = self.block_factory(row)
+                blocks[index] = block
+                self._remember(index, block)
+        return [blocks[i] for i in range(start, stop) if i in blocks]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self.height)
+            if step != 1:
+                return self._load_range(0, self.height)[item]
+            if stop <= start:
+                return []
+            return self._load_range(start, stop)
+        index = item + self.height if item < 0 else item
+        if index < 0 or index >= self.height:
+            raise IndexError("block index out of range")
+        if index == self.height - 1:
+            return self.tip
+        block = self._load(index)
+        if block is None:
+            raise IndexError(f"bloco {index} do shard {self.shard_id} não encontrado")
+        return block
+
+    def __iter__(self):
+        page = self.store.page_size
+        for start in range(0, self.height, page):
+            for block in self._load_range(start, min(start + page, self.height)):
+                yield block
+
+    def append(self, block):
+        self.tip = block
+        self._remember(self.height, block)
+        self.height += 1
+
+    def cached_blocks(self) -> int:
+        return len(self._cache)
+
+
+class StateStore:
+    """
+    🗂️ STATE STORE
+
+    - Contas: a tabela wallets é a fonte do estado (saldos são gravados na
+      entrada do mempool e créditos de faucet/gênesis nunca entram em blocos),
+      então não há blocos a reexecutar na carga; load_accounts lê só as
+      colunas de saldo/stake, sem as chaves
+    - Blocos ficam no SQLite e são paginados por LazyShardChain
+    - block_transactions localiza a transação selada (shard, bloco, posição)
+      para servir provas de inclusão sem varrer a cadeia
+    - block_hashes localiza o bloco pelo hash (shard, altura); a linha em
+      shards sai pelo índice (shard_id, block_index)
+    """
+
+    def __init__(self, db, block_cache_size: int = 256, page_size: int = 500):
+        self.db = db
+        self.block_cache_size = block_cache_size
+        self.page_size = page_size
+        self._initialize_tables()
+
+    def _initialize_tables(self):
+        """Cria os índices de blocos; remove os snapshots de contas de versões anteriores"""
+        statements = [
+            # Triggers de versionamento custavam dois UPDATEs extras por escrita em wallets
+            ("DROP TRIGGER IF EXISTS wallets_state_version_insert", ()),
+            ("DROP TRIGGER IF EXISTS wallets_state_version_update", ()),
+            ("DROP INDEX IF EXISTS idx_wallets_state_version", ()),
+            ("DROP TABLE IF EXISTS state_snapshot_accounts", ()),
+            ("DROP TABLE IF EXISTS state_snapshots", ()),
+            ("DROP TABLE IF EXISTS state_version", ()),
+            ("CREATE INDEX IF NOT EXISTS idx_shards_shard_block ON shards(shard_id, block_index)", ()),
+            ("""CREATE TABLE IF NOT EXISTS block_transactions (
+                    tx_id TEXT PRIMARY KEY, shard_id INTEGER, block_index INTEGER, position INTEGER
+                )""", ()),
+            ("""CREATE TABLE IF NOT EXISTS block_hashes (
+                    hash TEXT PRIMARY KEY, shard_id INTEGER, block_index INTEGER
+                ) WITHOUT ROWID""", ()),
+        ]
+        if not self.db.execute_many_commit(statements):
+            logger.error("Erro ao inicializar tabelas do state store")
+
+    # ------------------------------------------------------------------
+    # Blocos
+    # ------------------------------------------------------------------
+
+    def fetch_block_row(self, shard_id: int, index: int) -> Optional[Tuple]:
+        rows = self.db.execute_query(
+            f"SELECT {BLOCK_COLUMNS} FROM shards WHERE shard_id = ? AND block_index = ? LIMIT 1",
+            (shard_id, index)
+        )
+        return rows[0] if rows else None
+
+    def fetch_block_rows(self, shard_id: int, start: int, stop: int) -> List[Tuple]:
+        return self.db.execute_query(
+            f"SELECT {BLOCK_COLUMNS} FROM shards WHERE shard_id = ? AND block_index >= ? AND block_index < ? "
+            "ORDER BY block_index",
+            (shard_id, start, stop)
+        )
+
+    def get_shard_height(self, shard_id: int) -> int:
+        """Número de blocos do shard (gênesis incluído) via índice, sem decodificar nada"""
+        rows = self.db.execute_query("SELECT MAX(block_index) FROM shards WHERE shard_id = ?", (shard_id,))
+        if not rows or rows[0][0] is None:
+            return 1
+        return rows[0][0] + 1
+
+    def index_block(self, block) -> bool:
+        """Grava hash → (shard, altura) e as transações do bloco; dentro de db.transaction() entra no COMMIT"""
+        ok = self.db.execute_commit(
+            "INSERT OR REPLACE INTO block_hashes (hash, shard_id, block_index) VALUES (?, ?, ?)",
+            (block.hash, block.shard_id, block.index)
+        )
+        return self.index_block_transactions(block) and ok
+
+    def index_block_transactions(self, block, replace: bool = True) -> bool:
+        """Grava tx_id → (shard, bloco, posição); dentro de db.transaction() entra no COMMIT do bloco"""
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        ok = True
+        for position, tx in enumerate(block.transactions):
+            tx_id = tx.get("id") or tx.get("tx_hash") or tx.get("hash")
+            if tx_id is None:
+                continue
+            ok = self.db.execute_commit(
+                f"{verb} INTO block_transactions (tx_id, shard_id, block_index, position) "
+                "VALUES (?, ?, ?, ?)",
+                (tx_id, block.shard_id, block.index, position)
+            ) and ok
+        return ok
+
+    def locate_block(self, block_hash: str) -> Optional[Tuple[int, int]]:
+        """(shard_id, block_index) do bloco selado, pela chave primária"""
+        rows = self.db.execute_query(
+            "SELECT shard_id, block_index FROM block_hashes WHERE hash = ?", (block_hash,)
+        )
+        return tuple(rows[0]) if rows else None
+
+    def backfill_block_indexes(self, block_factory: Callable) -> int:
+        """
+        Banco anterior aos índices: block_hashes direto de shards (SQL) e
+        block_transactions decodificando cada bloco uma vez, página a página.
+        Só roda enquanto block_hashes estiver vazio.
+        """
+        rows = self.db.execute_query("SELECT 1 FROM block_hashes LIMIT 1")
+        if rows or not self.db.execute_query("SELECT 1 FROM shards LIMIT 1"):
+            return 0
+        indexed = 0
+        for (shard_id,) in self.db.execute_query("SELECT DISTINCT shard_id FROM shards"):
+            start, height = 1, self.get_shard_height(shard_id)
+            while start < height:
+                stop = start + self.page_size
+                with self.db.transaction():
+                    for row in self.fetch_block_rows(shard_id, start, stop):
+                        # Índices gravados na selagem prevalecem (OR IGNORE)
+                        self.index_block_transactions(block_factory(row), replace=False)
+                        indexed += 1
+                start = stop
+        self.db.execute_commit(
+            "INSERT OR IGNORE INTO block_hashes (hash, shard_id, block_index) "
+            "SELECT hash, shard_id, block_index FROM shards WHERE hash IS NOT NULL"
+        )
+        logger.info(f"🗂️ Índices de blocos/transações reconstruídos: {indexed} blocos")
+        return indexed
+
+    def locate_transaction(self, tx_id: str) -> Optional[Tuple[int, int, int]]:
+        """(shard_id, block_index, posição) da transação selada, pela chave primária"""
+        rows = self.db.execute_query(
+            "SELECT shard_id, block_index, position FROM block_transactions WHERE tx_id = ?", (tx_id,)
+        )
+        return tuple(rows[0]) if rows else None
+
+    def open_shard_chain(self, shard_id: int, genesis, block_factory: Callable) -> LazyShardChain:
+        return LazyShardChain(self, shard_id, genesis, self.get_shard_height(shard_id),
+                              block_factory, cache_size=self.block_cache_size)
+
+    # ------------------------------------------------------------------
+    # Contas
+    # ------------------------------------------------------------------
+
+    def load_accounts(self) -> Dict[str, Tuple]:
+        """Contas {address: (vtx, staked_vtx, source, external)} direto de wallets, sem as colunas de chave"""
+        rows = self.db.execute_query(
+            "SELECT address, vtx, staked_vtx, blockchain_source, external_address FROM wallets"
+        )
+        return {address: (vtx, staked, source, external) for address, vtx, staked, source, external in rows}
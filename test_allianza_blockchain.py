@@ -115,6 +115,89 @@ def test_validation(blockchain=None):
         print(f"❌ test_validation: FALHOU - {e}")
         return False
 
+def test_signature_checked_before_balances(blockchain=None):
+    """Chave errada não move saldos; assinatura forjada descartada na selagem devolve a reserva"""
+    from allianza_blockchain import MIN_STAKE, AdvancedCrypto, db_manager
+
+    if blockchain is None:
+        blockchain = get_blockchain()
+    sender_addr, sender_key = blockchain.create_wallet()
+    receiver_addr, _ = blockchain.create_wallet()
+    wrong_key, _ = AdvancedCrypto.generate_keypair()
+
+    for create in (lambda: blockchain.create_transaction(sender_addr, receiver_addr, 10, wrong_key),
+                   lambda: blockchain.create_contract(sender_addr, receiver_addr, 10, 0, wrong_key)):
+        try:
+            create()
+            assert False, "assinatura com chave de outro endereço foi aceita"
+        except ValueError as e:
+            assert "Assinatura inválida" in str(e)
+    assert blockchain.wallets[sender_addr]["ALZ"] == 1000
+    assert receiver_addr in blockchain.wallets and blockchain.wallets[receiver_addr]["ALZ"] == 1000
+    assert len(blockchain.mempool) == 0
+
+    # Assinatura adulterada depois da entrada no mempool: descartada na selagem
+    tx = blockchain.create_transaction(sender_addr, receiver_addr, 10, sender_key)
+    assert blockchain.wallets[sender_addr]["ALZ"] == 990.5
+    blockchain.mempool.get(tx["id"])["signature"] = AdvancedCrypto.sign_transaction(wrong_key, {"forged": True})
+
+    validator_addr, _ = blockchain.create_wallet()
+    blockchain.staking_pool[validator_addr] = MIN_STAKE
+    blocks = blockchain.produce_blocks(validator_addr)
+    assert all(t.get("id") != tx["id"] for block in blocks for t in block.transactions)
+    assert tx["id"] not in blockchain.mempool and tx["id"] not in blockchain._reservations
+    assert blockchain.wallets[sender_addr]["ALZ"] == 1000
+    assert blockchain.wallets[receiver_addr]["ALZ"] == 1000
+    assert not db_manager.execute_query("SELECT 1 FROM transactions_history WHERE id = ?", (tx["id"],))
+    assert db_manager.execute_query("SELECT vtx FROM wallets WHERE address = ?", (sender_addr,))[0][0] == 1000
+    print("✅ test_signature_checked_before_balances: PASSOU")
+    return True
+
+def test_failed_block_commit_applies_nothing(blockchain=None):
+    """COMMIT do bloco falhou: cadeia, recompensa, contrato e estatísticas intactos; transações de volta ao mempool"""
+    from allianza_blockchain import MIN_STAKE, VALIDATION_REWARD, db_manager
+    from db_manager import DBCommitError
+
+    if blockchain is None:
+        blockchain = get_blockchain()
+    sender_addr, sender_key = blockchain.create_wallet()
+    receiver_addr, _ = blockchain.create_wallet()
+    validator_addr, _ = blockchain.create_wallet()
+    blockchain.staking_pool[validator_addr] = MIN_STAKE
+    tx = blockchain.create_transaction(sender_addr, receiver_addr, 10, sender_key)
+    contract = blockchain.create_contract(sender_addr, receiver_addr, 5, 0, sender_key)
+    heights = {shard_id: len(chain) for shard_id, chain in blockchain.shards.items()}
+    sealed = blockchain.network_stats.stats["blocks"]
+
+    def failed_commit(block):
+        raise DBCommitError("disco cheio")
+
+    blockchain.save_block_to_db = failed_commit
+    try:
+        assert blockchain.produce_blocks(validator_addr) == []  # Vários shards: erro registrado por shard
+    except DBCommitError:
+        pass  # Um shard só: o erro chega ao chamador
+    finally:
+        del blockchain.save_block_to_db
+    assert {shard_id: len(chain) for shard_id, chain in blockchain.shards.items()} == heights
+    assert blockchain.wallets[validator_addr]["ALZ"] == 1000 and blockchain.wallets[receiver_addr]["ALZ"] == 1010
+    assert blockchain.network_stats.stats["blocks"] == sealed
+    assert tx["id"] in blockchain.mempool and contract["id"] in blockchain.mempool
+    assert not blockchain.mempool.get(contract["id"]).get("executed")
+
+    blocks = []
+    while blockchain.block_producer.pending_work():  # Contrato cross-shard: o crédito vem num 2º bloco
+        blocks += blockchain.produce_blocks(validator_addr)
+    sealed_ids = {t.get("id") for block in blocks for t in block.transactions}
+    assert {tx["id"], contract["id"]} <= sealed_ids and len(blockchain.mempool) == 0
+    assert blockchain.wallets[validator_addr]["ALZ"] == 1000 + VALIDATION_REWARD * len(blocks)
+    assert blockchain.wallets[receiver_addr]["ALZ"] == 1015
+    for address in (validator_addr, receiver_addr):
+        row = db_manager.execute_query("SELECT vtx FROM wallets WHERE address = ?", (address,))
+        assert row[0][0] == blockchain.wallets[address]["ALZ"]
+    print("✅ test_failed_block_commit_applies_nothing: PASSOU")
+    return True
+
 def main():
     """Executa todos os testes"""
     print("=" * 70)
@@ -128,6 +211,8 @@ def main():
     results.append(("test_create_wallet", test_create_wallet(blockchain)))
     results.append(("test_transaction", test_transaction(blockchain)))
     results.append(("test_validation", test_validation(blockchain)))
+    results.append(("test_signature_checked_before_balances", test_signature_checked_before_balances(blockchain)))
+    results.append(("test_failed_block_commit_applies_nothing", test_failed_block_commit_applies_nothing(blockchain)))
     
     print()
     print("=" * 70)
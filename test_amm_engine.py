@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do motor AMM (x*y=k inteiro, rotas multi-hop, leilão em lote, log colunar)
+Compatível com pytest e execução direta
+"""
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+from amm_engine import AMMEngine, SwapLog, UNIT, get_amount_out, to_units, MODE_BATCH
+
+
+def _engine(log=None):
+    engine = AMMEngine(log if log is not None else SwapLog())
+    engine.create_pool("ALZ", "USDT", 1_000_000 * UNIT, 500_000 * UNIT, pool_id="ALZ-USDT")
+    return engine
+
+
+def test_constant_product_swap():
+    """Reservas mudam a cada swap, k nunca diminui e o limite de slippage é respeitado"""
+    engine = _engine()
+    pool = engine.get_pool("ALZ-USDT")
+    k = pool.reserve0 * pool.reserve1
+
+    first = engine.swap("ALZ-USDT", "ALZ", 10_000 * UNIT)
+    assert first["amount_out"] == get_amount_out(10_000 * UNIT, 1_000_000 * UNIT, 500_000 * UNIT, 30)
+    assert pool.reserve0 == 1_010_000 * UNIT and pool.reserve1 == 500_000 * UNIT - first["amount_out"]
+    assert pool.reserve0 * pool.reserve1 >= k
+
+    second = engine.swap("ALZ-USDT", "ALZ", 10_000 * UNIT)
+    assert second["amount_out"] < first["amount_out"]  # impacto de preço
+    assert second["price_impact"] > 0
+
+    reserves = (pool.reserve0, pool.reserve1)
+    rejected = engine.swap("ALZ-USDT", "USDT", 1_000 * UNIT, min_amount_out=10_000 * UNIT)
+    assert not rejected["success"] and (pool.reserve0, pool.reserve1) == reserves
+    assert not engine.swap("ALZ-USDT", "ETH", UNIT)["success"]
+    assert to_units("0.1") == UNIT // 10 and to_units(1.5) == 3 * UNIT // 2
+    print("✅ test_constant_product_swap: PASSOU")
+
+
+def test_multi_hop_route():
+    """A rota por um pool intermediário mais líquido vence o pool direto raso"""
+    engine = AMMEngine(SwapLog())
+    engine.create_pool("ALZ", "USDT", 1_000 * UNIT, 500 * UNIT, pool_id="raso")
+    engine.create_pool("ALZ", "ETH", 1_000_000 * UNIT, 250 * UNIT, pool_id="alz-eth")
+    engine.create_pool("ETH", "USDT", 1_000 * UNIT, 2_000_000 * UNIT, pool_id="eth-usdt")
+
+    route = engine.find_route("ALZ", "USDT", 500 * UNIT)
+    assert route["pools"] == ["alz-eth", "eth-usdt"] and route["path"] == ["ALZ", "ETH", "USDT"]
+    assert route["amount_out"] > engine.quote("raso", "ALZ", 500 * UNIT)
+    assert engine.find_route("ALZ", "USDT", 500 * UNIT, max_hops=1)["pools"] == ["raso"]
+
+    result = engine.swap_route("ALZ", "USDT", 500 * UNIT)
+    assert result["success"] and result["amount_out"] == route["amount_out"]
+    assert engine.get_pool("alz-eth").reserve0 == 1_000_500 * UNIT
+    assert len(engine.swap_log) == 2
+
+    before = (engine.get_pool("alz-eth").reserve0, engine.get_pool("eth-usdt").reserve1)
+    assert not engine.swap_route("ALZ", "USDT", 500 * UNIT, min_amount_out=10**9 * UNIT)["success"]
+    assert (engine.get_pool("alz-eth").reserve0, engine.get_pool("eth-usdt").reserve1) == before
+    assert not engine.swap_route("ALZ", "BTC", UNIT)["success"]
+    print("✅ test_multi_hop_route: PASSOU")
+
+
+def test_batch_auction_uniform_price():
+    """Fluxos opostos se compensam; todas as ordens saem ao mesmo preço e nada é criado do nada"""
+    engine = _engine()
+    pool = engine.get_pool("ALZ-USDT")
+    r0, r1 = pool.reserve0, pool.reserve1
+    sells_alz = [1_000, 2_500, 4_000, 700]
+    sells_usdt = [900, 1_200]
+    for amount in sells_alz:
+        engine.submit_order("ALZ-USDT", "ALZ", amount * UNIT)
+    for amount in sells_usdt:
+        engine.submit_order("ALZ-USDT", "USDT", amount * UNIT)
+    engine.submit_order("ALZ-USDT", "ALZ", 100 * UNIT, min_amount_out=10**6 * UNIT)  # limite impossível
+
+    [result] = engine.clear_block()
+    assert len(result["filled"]) == 6 and len(result["rejected"]) == 1
+    price = result["clearing_price"]
+    for fill in result["filled"]:
+        if fill["token_in"] == "ALZ":
+            assert abs(fill["amount_out"] / fill["amount_in"] - price) < 1e-12
+        else:
+            assert abs(fill["amount_in"] / fill["amount_out"] - price) < 1e-12
+
+    # Conservação por token: entradas = saídas + variação da reserva
+    alz_in = sum(f["amount_in"] for f in result["filled"] if f["token_in"] == "ALZ")
+    usdt_in = sum(f["amount_in"] for f in result["filled"] if f["token_in"] == "USDT")
+    alz_out = sum(f["amount_out"] for f in result["filled"] if f["token_in"] == "USDT")
+    usdt_out = sum(f["amount_out"] for f in result["filled"] if f["token_in"] == "ALZ")
+    assert alz_in - alz_out == pool.reserve0 - r0
+    assert usdt_in - usdt_out == pool.reserve1 - r1
+    assert pool.reserve0 * pool.reserve1 >= r0 * r1
+
+    # Só o saldo líquido passou pela curva: menos impacto que os mesmos swaps em sequência
+    sequential = _engine()
+    seq_out = sum(sequential.swap("ALZ-USDT", "ALZ", a * UNIT)["amount_out"] for a in sells_alz)
+    assert usdt_out > seq_out
+    assert engine.pending_orders() == 0 and engine.clear_block() == []
+    print("✅ test_batch_auction_uniform_price: PASSOU")
+
+
+def test_columnar_swap_log():
+    """Log colunar persiste entre instâncias e mantém as colunas alinhadas"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = _engine(SwapLog(directory, flush_rows=3))
+        for _ in range(5):
+            engine.swap("ALZ-USDT", "ALZ", 10 * UNIT)
+        engine.submit_order("ALZ-USDT", "USDT", 5 * UNIT)
+        engine.clear_block()
+        engine.swap_log.flush()
+
+        other = AMMEngine(SwapLog(directory))
+        other.create_pool("ETH", "USDT", 10 * UNIT, 20_000 * UNIT, pool_id="ETH-USDT")
+        other.swap("ETH-USDT", "ETH", UNIT)
+        other.swap_log.flush()
+
+        reopened = SwapLog(directory)
+        assert len(reopened) == 7
+        rows = reopened.scan("ALZ-USDT")
+        assert len(rows) == 6 and rows[0]["amount_in"] == 10 * UNIT and rows[-1]["mode"] == MODE_BATCH
+        assert reopened.scan("ETH-USDT")[0]["amount_in"] == UNIT
+        assert reopened.volume("ALZ-USDT") == {0: 50 * UNIT, 1: 5 * UNIT}
+        assert reopened.column("direction") == [0, 0, 0, 0, 0, 1, 0]
+    print("✅ test_columnar_swap_log: PASSOU")
+
+
+def test_swap_log_flushes_by_time_close_and_exit():
+    """Linhas pendentes vão para o disco pelo timer, em close() e na saída do processo"""
+    with tempfile.TemporaryDirectory() as directory:
+        log = SwapLog(directory, flush_interval=0.05)
+        engine = _engine(log)
+        engine.swap("ALZ-USDT", "ALZ", 10 * UNIT)
+        deadline = time.time() + 5
+        while len(SwapLog(directory)) < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(SwapLog(directory)) == 1 and log._buffered == 0
+
+        log.flush_interval = 60
+        engine.swap("ALZ-USDT", "ALZ", 10 * UNIT)
+        assert len(SwapLog(directory)) == 1
+        log.close()
+        assert len(SwapLog(directory)) == 2 and log._timer is None
+
+        script = (
+            "from amm_engine import SwapLog\n"
+            f"log = SwapLog({directory!r}, flush_interval=60)\n"
+            "log.append(log.pool_index('ALZ-USDT'), 0, 1, 1)\n"
+        )
+        subprocess.run([sys.executable, "-c", script], check=True, timeout=60,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert len(SwapLog(directory)) == 3
+    print("✅ test_swap_log_flushes_by_time_close_and_exit: PASSOU")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("🧪 TESTES DO MOTOR AMM")
+    print("=" * 70)
+    test_constant_product_swap()
+    test_multi_hop_route()
+    test_batch_auction_uniform_price()
+    test_columnar_swap_log()
+    test_swap_log_flushes_by_time_close_and_exit()
+    print("\n✅ Todos os testes passaram!")
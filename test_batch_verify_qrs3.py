@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes da verificação em lote QRS-3 (agrupamento por keypair, limiar 2-de-3, tempos)
+Compatível com pytest e execução direta
+"""
+
+import tempfile
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+import signature_verifier
+from signature_verifier import ParallelSignatureVerifier
+from pqc_keystore import PQCKeystore
+from quantum_security import QuantumSecuritySystem
+
+# Keystore em diretório temporário: o teste não grava chaves no repositório nem no diretório de dados
+_keystore_dir = tempfile.TemporaryDirectory()
+_qs = QuantumSecuritySystem(keystore=PQCKeystore(_keystore_dir.name, key=AESGCM.generate_key(bit_length=256),
+                                                 sync=False))
+_keypairs = [_qs.generate_qrs3_keypair()["keypair_id"] for _ in range(3)]
+
+
+def _batch(count):
+    batch = []
+    for i in range(count):
+        keypair_id = _keypairs[i % len(_keypairs)]
+        message = f"mensagem {i}".encode()
+        signed = _qs.sign_qrs3(keypair_id, message)
+        batch.append({
+            "qrs3_signature": {
+                "classic_signature": signed["classic_signature"],
+                "ml_dsa_signature": signed["ml_dsa_signature"],
+                "sphincs_signature": signed.get("sphincs_signature"),
+            },
+            "message": message,
+            "keypair_id": keypair_id,
+        })
+    return batch
+
+
+def test_valid_batch_short_circuits():
+    result = _qs.batch_verify_qrs3(_batch(6))
+    assert result["success"]
+    assert result["valid_count"] == 6
+    assert result["keypairs"] == 3
+    # ML-DSA e ECDSA válidos decidem o limiar: SPHINCS+ nunca é verificado
+    assert result["algorithm_timings_ms"]["sphincs"]["verifications"] == 0
+    assert result["skipped_verifications"] == 6
+    assert all(r["validations"]["sphincs"] is None for r in result["results"])
+    print("✅ test_valid_batch_short_circuits: PASSOU")
+
+
+def test_detects_forgeries():
+    batch = _batch(4)
+    batch[0]["message"] = b"adulterada"
+    batch[1]["qrs3_signature"]["ml_dsa_signature"] = batch[2]["qrs3_signature"]["ml_dsa_signature"]
+    batch.append({"qrs3_signature": {}, "message": b"x", "keypair_id": "inexistente"})
+    result = _qs.batch_verify_qrs3(batch)
+
+    assert [r["valid"] for r in result["results"]] == [False, True, True, True, False]
+    # Adulterada: ML-DSA e ECDSA falham e o limiar fica impossível sem verificar SPHINCS+
+    assert result["results"][0]["validations"] == {"ml_dsa": False, "ecdsa": False, "sphincs": None}
+    # ML-DSA trocada: SPHINCS+ desempata
+    assert result["results"][1]["validations"] == {"ml_dsa": False, "ecdsa": True, "sphincs": True}
+    assert result["results"][4]["error"] == "Keypair não encontrado"
+    print("✅ test_detects_forgeries: PASSOU")
+
+
+def test_process_pool_matches_in_process():
+    batch = _batch(12)
+    batch[5]["message"] = b"adulterada"
+    expected = [r["valid"] for r in _qs.batch_verify_qrs3(batch)["results"]]
+
+    previous = signature_verifier._signature_verifier
+    signature_verifier._signature_verifier = ParallelSignatureVerifier(max_workers=2, chunk_size=2, min_parallel=1)
+    try:
+        result = _qs.batch_verify_qrs3(batch)
+        assert signature_verifier._signature_verifier.get_stats()["parallel_batches"] == 1
+    finally:
+        signature_verifier._signature_verifier.close()
+        signature_verifier._signature_verifier = previous
+
+    assert [r["valid"] for r in result["results"]] == expected
+    assert result["invalid_count"] == 1
+    print("✅ test_process_pool_matches_in_process: PASSOU")
+
+
+if __name__ == "__main__":
+    test_valid_batch_short_circuits()
+    test_detects_forgeries()
+    test_process_pool_matches_in_process()
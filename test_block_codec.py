@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do codec binário canônico (CBOR determinístico, corpo do bloco, cabeçalho)
+Compatível com pytest e execução direta
+"""
+
+import hashlib
+
+import block_codec
+
+
+def _tx(i, **extra):
+    tx = {"id": f"tx{i}", "sender": "alice", "receiver": "bob", "amount": 1.5 * i,
+          "timestamp": 1_760_000_000.25 + i, "type": "transfer", "is_public": True}
+    tx.update(extra)
+    return tx
+
+
+def test_roundtrip_types():
+    value = {"int": 7, "neg": -300, "big": 2 ** 40, "float": 0.1, "half": 1.5, "inf": float("inf"),
+             "none": None, "bool": False, "text": "ação", "bytes": b"\x00\xff", "list": [1, [2, {}]]}
+    assert block_codec.decode(block_codec.encode(value)) == value
+    print("✅ test_roundtrip_types: PASSOU")
+
+
+def test_canonical_independent_of_key_order():
+    tx = _tx(1)
+    reordered = dict(reversed(list(tx.items())))
+    assert block_codec.encode(tx) == block_codec.encode(reordered)
+    # Chaves ordenadas pelos bytes codificados: mais curta primeiro
+    assert block_codec.encode({"bb": 1, "a": 2, "c": 3}) == bytes.fromhex("a361610261630362626201")
+    # Float na menor largura exata
+    assert block_codec.encode(1.5) == bytes.fromhex("f93e00")
+    assert block_codec.encode(0.1) == bytes.fromhex("fb3fb999999999999a")
+    print("✅ test_canonical_independent_of_key_order: PASSOU")
+
+
+def test_body_and_merkle_root():
+    transactions = [_tx(i) for i in range(5)]
+    body, encoded = block_codec.encode_transactions(transactions)
+    assert body == block_codec.encode(transactions)
+    decoded, raw = block_codec.decode_transactions(body)
+    assert decoded == transactions and raw == encoded
+
+    leaves = [block_codec.hash_leaf(tx) for tx in encoded]
+    left = block_codec.hash_node(block_codec.hash_node(leaves[0], leaves[1]),
+                                 block_codec.hash_node(leaves[2], leaves[3]))
+    # Nó ímpar sobe sem duplicação
+    assert block_codec.merkle_root(leaves) == block_codec.hash_node(left, leaves[4])
+    assert block_codec.merkle_root([]) == hashlib.sha256(b"").digest()
+    print("✅ test_body_and_merkle_root: PASSOU")
+
+
+def test_header_and_wire_format():
+    body, encoded = block_codec.encode_transactions([_tx(1)])
+    root = block_codec.merkle_root([block_codec.hash_leaf(tx) for tx in encoded])
+    header = block_codec.encode_block_header(2, 10, "ab" * 32, 1_760_000_000.5, "validator", root, 1)
+    fields = block_codec.decode_block_header(header)
+    assert fields["tx_root"] == root.hex() and fields["index"] == 10 and fields["tx_count"] == 1
+
+    # Mudar qualquer transação muda a raiz e portanto o hash do cabeçalho
+    other_body, other_encoded = block_codec.encode_transactions([_tx(1, amount=2.0)])
+    other_root = block_codec.merkle_root([block_codec.hash_leaf(tx) for tx in other_encoded])
+    other_header = block_codec.encode_block_header(2, 10, "ab" * 32, 1_760_000_000.5, "validator", other_root, 1)
+    assert block_codec.hash_header(header) != block_codec.hash_header(other_header)
+
+    assert block_codec.decode_block(block_codec.encode_block(header, body)) == (header, body)
+    print("✅ test_header_and_wire_format: PASSOU")
+
+
+if __name__ == "__main__":
+    test_roundtrip_types()
+    test_canonical_independent_of_key_order()
+    test_body_and_merkle_root()
+    test_header_and_wire_format()
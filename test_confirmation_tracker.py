@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do confirmation tracker (polling compartilhado por chain, lotes, eventos no TransactionTracker)
+Compatível com pytest e execução direta
+"""
+
+import json
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from confirmation_tracker import ChainConfirmationTracker, ConfirmationTrackerManager, EVMBatchRPC
+from transaction_tracker import TransactionTracker, TransactionStatus
+
+
+class FakeChain:
+    """Nó JSON-RPC local: cabeça avança a cada eth_blockNumber, recibos por hash"""
+
+    def __init__(self, head=100):
+        self.head = head
+        self.mined = {}  # tx_hash -> (block_number, status)
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def handle(self, call):
+        with self.lock:
+            if call["method"] == "eth_blockNumber":
+                self.head += 1
+                for tx_hash, (block, status) in list(self.mined.items()):
+                    if block is None:
+                        self.mined[tx_hash] = (self.head, status)
+                return hex(self.head)
+            block, status = self.mined.get(call["params"][0], (None, 1))
+            if block is None:
+                return None
+            return {"blockNumber": hex(block), "status": hex(status)}
+
+    def serve(self):
+        chain = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                calls = body if isinstance(body, list) else [body]
+                chain.requests.append(len(calls))
+                reply = [{"jsonrpc": "2.0", "id": c["id"], "result": chain.handle(c)} for c in calls]
+                data = json.dumps(reply if isinstance(body, list) else reply[0]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _manager(chain, poll_interval=0.05):
+    server = chain.serve()
+    manager = ConfirmationTrackerManager()
+    manager.register_chain("polygon", EVMBatchRPC(f"http://127.0.0.1:{server.server_port}"), poll_interval)
+    return manager, server
+
+
+def test_batched_polling_resolves_all():
+    chain = FakeChain()
+    for i in range(20):
+        chain.mined[f"0x{i:064x}"] = (None, 1)  # Mineradas no próximo bloco
+    manager, server = _manager(chain)
+    try:
+        futures = [manager.watch("polygon", f"0x{i:064x}", min_confirmations=3, timeout=10) for i in range(20)]
+        results = [f.result(timeout=10) for f in futures]
+        assert all(r["confirmed"] and r["confirmations"] >= 3 for r in results)
+        stats = manager.get_stats()["polygon"]
+        # Uma cabeça por rodada e recibos em lote, nunca uma chamada por transação por rodada
+        assert stats["receipt_batches"] <= stats["polls"]
+        assert len(chain.requests) <= 2 * stats["polls"]
+        assert max(chain.requests) > 1
+        assert stats["pending"] == 0
+    finally:
+        manager.close()
+        server.shutdown()
+    print("✅ test_batched_polling_resolves_all: PASSOU")
+
+
+def test_reverted_and_timeout():
+    chain = FakeChain()
+    chain.mined["0xrevert"] = (None, 0)
+    manager, server = _manager(chain)
+    try:
+        reverted = manager.wait_for_confirmations("polygon", "0xrevert", 2, max_wait_time=5)
+        assert not reverted["confirmed"] and "revertida" in reverted["error"]
+        missing = manager.wait_for_confirmations("polygon", "0xnunca", 1, max_wait_time=0.2)
+        assert not missing["confirmed"] and "Timeout" in missing["error"]
+        assert not manager.wait_for_confirmations("solana", "x", 1, 1)["success"]
+    finally:
+        manager.close()
+        server.shutdown()
+    print("✅ test_reverted_and_timeout: PASSOU")
+
+
+def test_transaction_tracker_events():
+    chain = FakeChain()
+    chain.mined["0xabc"] = (None, 1)
+    manager, server = _manager(chain)
+    tracker = TransactionTracker()
+    seen = []
+    try:
+        tracker.create_transaction("bridge-1", "polygon", "bitcoin", 1.0, "MATIC", required_confirmations=4)
+        tracker.update_status("bridge-1", TransactionStatus.BROADCASTED, tx_hash="0xabc")
+        tracker.subscribe("bridge-1", lambda state: seen.append((state.status, state.confirmations)))
+        tracker.track_confirmations("bridge-1", "polygon", "0xabc", confirmation_tracker=manager).result(timeout=10)
+
+        state = tracker.get_transaction("bridge-1")
+        assert state.status == TransactionStatus.CONFIRMED
+        assert state.confirmations >= 4
+        assert state.metadata["block_number"] == chain.mined["0xabc"][0]
+        assert (TransactionStatus.BROADCASTED, 1) in seen
+        assert tracker.get_chain_statistics("polygon")["confirmed"] == 1
+    finally:
+        manager.close()
+        server.shutdown()
+    print("✅ test_transaction_tracker_events: PASSOU")
+
+
+def test_watch_burst_coalesces_wakeups():
+    """Rajada de watch() durante o polling: poucas rodadas extras, não uma por transação"""
+
+    class CountingRPC:
+        async def get_head(self):
+            await asyncio.sleep(0.002)
+            return 100
+
+        async def get_receipts(self, tx_hashes):
+            return {tx_hash: {"block_number": 100, "status": 1} for tx_hash in tx_hashes}
+
+    async def burst():
+        tracker = ChainConfirmationTracker("polygon", CountingRPC(), poll_interval=30)
+        waits = []
+        for i in range(100):
+            waits.append(asyncio.ensure_future(tracker.watch(f"0x{i:064x}", min_confirmations=1, timeout=10)))
+            await asyncio.sleep(0.001)
+        results = await asyncio.gather(*waits)
+        return tracker, results
+
+    tracker, results = asyncio.run(burst())
+    assert all(r["confirmed"] for r in results)
+    # 100 watches em ~0.1s: rodadas a cada WATCH_COALESCE_SECONDS, não 100
+    assert tracker.stats["polls"] <= 6
+    print("✅ test_watch_burst_coalesces_wakeups: PASSOU")
+
+
+if __name__ == "__main__":
+    test_batched_polling_resolves_all()
+    test_reverted_and_timeout()
+    test_transaction_tracker_events()
+    test_watch_burst_coalesces_wakeups()
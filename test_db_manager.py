@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do DBManager (WAL, conexão por thread, group commit)
+Compatível com pytest e execução direta
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from db_manager import DBCommitError, DBManager
+
+
+def _db_path():
+    directory = tempfile.mkdtemp()
+    return os.path.join(directory, "test.db")
+
+
+def test_wal_enabled():
+    db = DBManager(db_path=_db_path())
+    mode = db.execute_query("PRAGMA journal_mode")[0][0]
+    assert mode.lower() == "wal"
+    db.close()
+    print("✅ test_wal_enabled: PASSOU")
+
+
+def test_transaction_single_commit():
+    db = DBManager(db_path=_db_path())
+    commits_before = db.get_stats()["commits"]
+    with db.transaction():
+        for i in range(4):
+            assert db.execute_commit("INSERT INTO wallets (address, vtx, staked_vtx) VALUES (?, ?, ?)",
+                                     (f"addr_{i}", 10.0, 0.0))
+    assert db.get_stats()["commits"] == commits_before + 1
+    assert db.execute_query("SELECT COUNT(*) FROM wallets")[0][0] == 4
+    db.close()
+    print("✅ test_transaction_single_commit: PASSOU")
+
+
+def test_transaction_rollback_on_error():
+    db = DBManager(db_path=_db_path())
+    try:
+        with db.transaction():
+            db.execute_commit("INSERT INTO wallets (address, vtx, staked_vtx) VALUES (?, ?, ?)", ("a", 1.0, 0.0))
+            raise RuntimeError("falha no meio da transferência")
+    except RuntimeError:
+        pass
+    assert db.execute_query("SELECT COUNT(*) FROM wallets")[0][0] == 0
+    db.close()
+    print("✅ test_transaction_rollback_on_error: PASSOU")
+
+
+def test_failed_statement_returns_false():
+    db = DBManager(db_path=_db_path())
+    assert db.execute_commit("INSERT INTO wallets (address) VALUES (?)", ("dup",))
+    assert not db.execute_commit("INSERT INTO wallets (address) VALUES (?)", ("dup",))
+    db.close()
+    print("✅ test_failed_statement_returns_false: PASSOU")
+
+
+def test_group_commit_concurrent_writers():
+    db = DBManager(db_path=_db_path(), group_commit=True)
+
+    def worker(t):
+        for i in range(50):
+            with db.transaction():
+                db.execute_commit("INSERT INTO wallets (address, vtx, staked_vtx) VALUES (?, ?, ?)",
+                                  (f"w{t}_{i}", 1.0, 0.0))
+                db.execute_commit("INSERT INTO transactions_history (id, sender) VALUES (?, ?)",
+                                  (f"tx{t}_{i}", f"w{t}_{i}"))
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+    assert db.execute_query("SELECT COUNT(*) FROM wallets")[0][0] == 400
+    assert db.execute_query("SELECT COUNT(*) FROM transactions_history")[0][0] == 400
+    stats = db.get_stats()
+    # Todas as escritas passaram pela thread escritora: um COMMIT por grupo drenado
+    assert stats["commits"] == stats["group_batches"] and stats["statements"] == 800
+    db.close()
+    print("✅ test_group_commit_concurrent_writers: PASSOU")
+
+
+def test_group_commit_coalesces_into_one_transaction():
+    """Escritas enfileiradas juntas viram um único COMMIT (conferido pelos frames do WAL)"""
+    path = _db_path()
+    db = DBManager(db_path=path, group_commit=True)
+    db.execute_query("PRAGMA wal_checkpoint(TRUNCATE)")
+    writes = 100
+
+    def worker(i):
+        assert db.execute_commit("INSERT INTO wallets (address, vtx, staked_vtx) VALUES (?, ?, ?)",
+                                 (f"g{i}", 1.0, 0.0))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(writes)]
+    with db._write_lock:  # Escritora parada: as escritas se acumulam na fila
+        for th in threads:
+            th.start()
+        while db._write_queue.unfinished_tasks < writes:  # get() da escritora não desconta
+            time.sleep(0.001)
+    for th in threads:
+        th.join()
+
+    assert db.execute_query("SELECT COUNT(*) FROM wallets")[0][0] == writes
+    stats = db.get_stats()
+    assert stats["commits"] <= 3
+    # Uma transação por escrita gravaria ao menos um frame (página) por COMMIT
+    wal_frames = sqlite3.connect(path).execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()[1]
+    assert 0 < wal_frames < writes // 4
+    db.close()
+    print("✅ test_group_commit_coalesces_into_one_transaction: PASSOU")
+
+
+def test_transaction_commit_failure_raises():
+    for group_commit in (False, True):
+        db = DBManager(db_path=_db_path(), group_commit=group_commit)
+        assert db.execute_commit("INSERT INTO wallets (address) VALUES (?)", ("dup",))
+        try:
+            with db.transaction():
+                db.execute_commit("INSERT INTO wallets (address) VALUES (?)", ("novo",))
+                db.execute_commit("INSERT INTO wallets (address) VALUES (?)", ("dup",))
+            raise AssertionError("COMMIT com falha deveria levantar DBCommitError")
+        except DBCommitError:
+            pass
+        assert db.execute_query("SELECT COUNT(*) FROM wallets")[0][0] == 1
+        db.close()
+    print("✅ test_transaction_commit_failure_raises: PASSOU")
+
+
+def test_thread_connections_closed_when_threads_end():
+    """Threads de requisição efêmeras não acumulam conexões abertas"""
+    db = DBManager(db_path=_db_path())
+    for _ in range(20):
+        th = threading.Thread(target=db.execute_query, args=("SELECT 1",))
+        th.start()
+        th.join()
+    # Thread principal (criou as tabelas) + a última thread, ainda não recolhida
+    assert len(db._connections) <= 2
+    db.close()
+    print("✅ test_thread_connections_closed_when_threads_end: PASSOU")
+
+
+def test_group_commit_isolates_failed_item():
+    db = DBManager(db_path=_db_path(), group_commit=True)
+    assert db.execute_commit("INSERT INTO wallets (address) VALUES (?)", ("dup",))
+    assert not db.execute_many_commit([
+        ("INSERT INTO wallets (address) VALUES (?)", ("novo",)),
+        ("INSERT INTO wallets (address) VALUES (?)", ("dup",)),
+    ])
+    assert db.execute_commit("INSERT INTO wallets (address) VALUES (?)", ("outro",))
+    rows = {r[0] for r in db.execute_query("SELECT address FROM wallets")}
+    assert rows == {"dup", "outro"}
+    db.close()
+    print("✅ test_group_commit_isolates_failed_item: PASSOU")
+
+
+if __name__ == "__main__":
+    test_wal_enabled()
+    test_transaction_single_commit()
+    test_transaction_rollback_on_error()
+    test_failed_statement_returns_false()
+    test_group_commit_concurrent_writers()
+    test_group_commit_coalesces_into_one_transaction()
+    test_transaction_commit_failure_raises()
+    test_thread_connections_closed_when_threads_end()
+    test_group_commit_isolates_failed_item()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes das buscas pontuais do explorer (índices hash → bloco e tx_id → bloco/posição)
+Compatível com pytest e execução direta
+"""
+
+import os
+import json
+import tempfile
+
+from db_manager import DBManager
+from mempool import Mempool
+from state_store import StateStore
+from testnet_explorer import TestnetExplorer as Explorer, lookup_block
+from transaction_history import TransactionHistoryStore
+
+BLOCKS = 600
+
+
+class _Block:
+    def __init__(self, row):
+        self.shard_id, self.index, self.previous_hash, txs, self.timestamp, self.hash, self.validator = row
+        self.transactions = json.loads(txs)
+
+
+def _row(shard_id, index):
+    txs = [{"id": f"tx{shard_id}-{index}-{i}", "sender": "alice", "receiver": "bob", "amount": 1.0,
+            "timestamp": float(index)} for i in range(3)]
+    return (shard_id, index, f"h{shard_id}-{index - 1}", json.dumps(txs), float(index), f"h{shard_id}-{index}", "v")
+
+
+def _genesis(shard_id):
+    return _Block((shard_id, 0, "0", "[]", 0.0, f"genesis{shard_id}", "genesis"))
+
+
+class _Node:
+    """Nó mínimo: shards paginados pelo StateStore + mempool + histórico"""
+
+    def __init__(self, db, store):
+        self.state_store = store
+        self.shards = {shard_id: store.open_shard_chain(shard_id, _genesis(shard_id), _Block) for shard_id in (0, 1)}
+        self.mempool = Mempool(2)
+        self.tx_history = TransactionHistoryStore(db)
+
+    def get_block_by_hash(self, block_hash):
+        location = self.state_store.locate_block(block_hash)
+        if location is None:
+            return next((chain[0] for chain in self.shards.values() if chain[0].hash == block_hash), None)
+        return self.shards[location[0]][location[1]]
+
+    def get_sealed_transaction(self, tx_id):
+        location = self.state_store.locate_transaction(tx_id)
+        if location is None:
+            return None
+        block = self.shards[location[0]][location[1]]
+        return block.transactions[location[2]], block, location[2]
+
+
+def _fill(db, store, shard_id, start, stop, index=True):
+    with db.transaction():
+        for i in range(start, stop):
+            row = _row(shard_id, i)
+            db.execute_commit("INSERT INTO shards VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+            if index:
+                store.index_block(_Block(row))
+
+
+def test_backfill_builds_indexes_once():
+    """Banco sem os índices: backfill preenche hash e tx_id uma vez; depois a selagem mantém"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DBManager(db_path=os.path.join(tmp, "chain.db"))
+        store = StateStore(db, page_size=64)
+        _fill(db, store, 1, 1, 200, index=False)
+
+        assert store.locate_block("h1-5") is None
+        assert store.backfill_block_indexes(_Block) == 199
+        assert store.backfill_block_indexes(_Block) == 0
+        assert store.locate_block("h1-5") == (1, 5) and store.locate_transaction("tx1-150-2") == (1, 150, 2)
+
+        _fill(db, store, 1, 200, 201)
+        assert store.locate_block("h1-200") == (1, 200) and store.locate_transaction("tx1-200-0") == (1, 200, 0)
+        db.close()
+    print("✅ test_backfill_builds_indexes_once: PASSOU")
+
+
+def test_point_lookups_at_any_depth():
+    """Bloco e transação antigos saem por busca pontual, sem carregar os blocos recentes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DBManager(db_path=os.path.join(tmp, "chain.db"))
+        store = StateStore(db, block_cache_size=8)
+        _fill(db, store, 0, 1, BLOCKS)
+        _fill(db, store, 1, 1, 10)
+        node = _Node(db, store)
+        explorer = Explorer(node)
+
+        block = explorer.get_block_by_hash("h0-3")
+        assert block["index"] == 3 and block["shard_id"] == 0 and block["transaction_count"] == 3
+        assert node.shards[0].cached_blocks() <= 2  # Ponta + o bloco pedido
+        assert explorer.get_block_by_hash("genesis1")["index"] == 0
+        assert explorer.get_block_by_hash("inexistente") is None
+        assert explorer.get_block_by_index(50)["shard_id"] == 0
+        assert explorer.get_block_by_index(5, shard_id=1)["hash"] == "h1-5"
+        assert explorer.get_block_by_index(50, shard_id=1) is None
+        assert lookup_block(node, block_index=BLOCKS) is None
+
+        tx = explorer.get_transaction_by_hash("tx0-2-1")
+        assert tx["status"] == "confirmed" and tx["block_number"] == 2 and tx["tx_hash"] == "tx0-2-1"
+
+        node.mempool.add({"id": "pending-1", "sender": "carol", "receiver": "dave", "amount": 2.0}, 1)
+        assert explorer.get_transaction_by_hash("pending-1")["status"] == "pending"
+
+        db.execute_commit("INSERT INTO transactions_history (id, sender, receiver, amount, type, timestamp, "
+                          "network, is_public) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                          ("history-1", "erin", "frank", 3.0, "transfer", 1.0, "allianza", 1))
+        assert explorer.get_transaction_by_hash("history-1")["from"] == "erin"
+        assert explorer.get_transaction_by_hash("inexistente") is None
+        db.close()
+    print("✅ test_point_lookups_at_any_depth: PASSOU")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("🧪 TESTES DAS BUSCAS PONTUAIS DO EXPLORER")
+    print("=" * 70)
+    test_backfill_builds_indexes_once()
+    test_point_lookups_at_any_depth()
+    print("\n✅ Todos os testes passaram!")
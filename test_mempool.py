@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do Mempool (prioridade, nonces, duplicatas, limite de memória)
+Compatível com pytest e execução direta
+"""
+
+from mempool import Mempool, ShardPendingView
+
+
+def _tx(tx_id, sender, fee=0, timestamp=0.0, **extra):
+    tx = {"id": tx_id, "sender": sender, "receiver": "r", "amount": 1, "fee": fee, "timestamp": timestamp}
+    tx.update(extra)
+    return tx
+
+
+def test_priority_fee_then_timestamp():
+    pool = Mempool(2)
+    pool.add(_tx("a", "s1", fee=1, timestamp=3), 0)
+    pool.add(_tx("b", "s2", fee=5, timestamp=2), 0)
+    pool.add(_tx("c", "s3", fee=1, timestamp=1), 0)
+    assert [tx["id"] for tx in pool.pop_block(0, 10)] == ["b", "c", "a"]
+    assert len(pool) == 0
+    print("✅ test_priority_fee_then_timestamp: PASSOU")
+
+
+def test_sender_nonce_order():
+    pool = Mempool(1)
+    # O segundo tx do remetente paga mais, mas não pode passar o primeiro
+    pool.add(_tx("n0", "alice", fee=1, timestamp=1), 0)
+    pool.add(_tx("n1", "alice", fee=100, timestamp=2), 0)
+    pool.add(_tx("x", "bob", fee=10, timestamp=3), 0)
+    assert [tx["id"] for tx in pool.pop_block(0, 10)] == ["x", "n0", "n1"]
+    print("✅ test_sender_nonce_order: PASSOU")
+
+
+def test_nonce_gap_waits():
+    pool = Mempool(1)
+    pool.add(_tx("n0", "alice", nonce=0), 0)
+    pool.add(_tx("n2", "alice", nonce=2), 0)
+    assert [tx["id"] for tx in pool.pop_block(0, 10)] == ["n0"]
+    assert len(pool) == 1
+    pool.add(_tx("n1", "alice", nonce=1), 0)
+    assert [tx["id"] for tx in pool.pop_block(0, 10)] == ["n1", "n2"]
+    print("✅ test_nonce_gap_waits: PASSOU")
+
+
+def test_duplicate_and_replacement():
+    pool = Mempool(1)
+    assert pool.add(_tx("a", "s", nonce=0, fee=1), 0)
+    assert not pool.add(_tx("a", "s", nonce=0, fee=1), 0)
+    assert not pool.add(_tx("b", "s", nonce=0, fee=1), 0)
+    assert pool.add(_tx("c", "s", nonce=0, fee=2), 0)
+    assert "a" not in pool and "c" in pool
+    assert [tx["id"] for tx in pool.pop_block(0, 10)] == ["c"]
+    print("✅ test_duplicate_and_replacement: PASSOU")
+
+
+def test_cap_evicts_lowest_fee():
+    pool = Mempool(1, max_txs_per_shard=3)
+    for i, fee in enumerate([5, 1, 3]):
+        pool.add(_tx(f"t{i}", f"s{i}", fee=fee), 0)
+    assert not pool.add(_tx("cheap", "z", fee=0), 0)
+    assert pool.add(_tx("rich", "y", fee=10), 0)
+    assert "t1" not in pool
+    assert pool.shard_size(0) == 3
+    assert pool.get_stats()["evicted"] == 1
+    print("✅ test_cap_evicts_lowest_fee: PASSOU")
+
+
+def test_byte_cap():
+    pool = Mempool(1, max_bytes=2000)
+    accepted = sum(pool.add(_tx(f"t{i}", f"s{i}", fee=1), 0) for i in range(100))
+    assert pool.total_bytes <= 2000
+    assert accepted == len(pool)
+    print("✅ test_byte_cap: PASSOU")
+
+
+def test_requeue_keeps_order():
+    pool = Mempool(1)
+    for i in range(3):
+        pool.add(_tx(f"a{i}", "alice", timestamp=i), 0)
+    popped = pool.pop_block(0, 2)
+    pool.requeue(popped, 0)
+    assert [tx["id"] for tx in pool.pop_block(0, 10)] == ["a0", "a1", "a2"]
+    print("✅ test_requeue_keeps_order: PASSOU")
+
+
+def test_view_is_list_compatible():
+    pool = Mempool(2)
+    view = pool.views()[1]
+    assert isinstance(view, ShardPendingView)
+    assert not view
+    view.append(_tx("a", "s"))
+    view.extend([_tx("b", "t")])
+    assert len(view) == 2
+    assert [tx["id"] for tx in view] == ["a", "b"]
+    assert view.copy()[0]["id"] == "a"
+    print("✅ test_view_is_list_compatible: PASSOU")
+
+
+def test_evicted_and_replaced_are_reported():
+    """Despejo e substituição chamam on_evict (o nó devolve o débito reservado)"""
+    pool = Mempool(1, max_txs_per_shard=2)
+    released = []
+    pool.on_evict = released.extend
+    pool.add(_tx("low0", "alice", fee=1, timestamp=1), 0)
+    pool.add(_tx("low1", "alice", fee=1, timestamp=2), 0)
+    assert pool.add(_tx("high", "bob", fee=10, timestamp=3), 0)
+    assert [tx["id"] for tx in released] == ["low1"]
+
+    assert pool.add(_tx("bob2", "bob", fee=20, timestamp=4, nonce=0), 0)
+    assert [tx["id"] for tx in released] == ["low1", "high"]
+    print("✅ test_evicted_and_replaced_are_reported: PASSOU")
+
+
+def test_eviction_regaps_sender_nonce():
+    """Nonces despejados voltam a ser atribuídos: a próxima transação do remetente não fica atrás de uma lacuna"""
+    pool = Mempool(1, max_txs_per_shard=3)
+    pool.add(_tx("a0", "alice", fee=5, timestamp=1), 0)
+    pool.add(_tx("a1", "alice", fee=1, timestamp=2), 0)
+    pool.add(_tx("a2", "alice", fee=1, timestamp=3), 0)
+    # A nova transação de alice despeja a2 (menor taxa, mais nova) e ocupa o nonce 2
+    assert pool.add(_tx("a3", "alice", fee=3, timestamp=4), 0)
+    assert [tx["id"] for tx in pool.pop_block(0, 10)] == ["a0", "a1", "a3"]
+    assert len(pool) == 0
+    print("✅ test_eviction_regaps_sender_nonce: PASSOU")
+
+
+def test_remove_reports_successors_and_regaps():
+    """remove passa pelo mesmo on_evict do despejo e libera os nonces do remetente"""
+    pool = Mempool(1)
+    released = []
+    pool.on_evict = released.extend
+    for i in range(3):
+        pool.add(_tx(f"a{i}", "alice", fee=1, timestamp=i), 0)
+    assert pool.remove("a1")["id"] == "a1"
+    assert [tx["id"] for tx in released] == ["a1", "a2"]
+    assert pool.remove("a1") is None and len(released) == 2
+
+    assert pool.add(_tx("a3", "alice", fee=1, timestamp=5), 0)
+    assert [tx["id"] for tx in pool.pop_block(0, 10)] == ["a0", "a3"]
+    print("✅ test_remove_reports_successors_and_regaps: PASSOU")
+
+
+if __name__ == "__main__":
+    test_priority_fee_then_timestamp()
+    test_sender_nonce_order()
+    test_nonce_gap_waits()
+    test_duplicate_and_replacement()
+    test_cap_evicts_lowest_fee()
+    test_byte_cap()
+    test_requeue_keeps_order()
+    test_view_is_list_compatible()
+    test_evicted_and_replaced_are_reported()
+    test_eviction_regaps_sender_nonce()
+    test_remove_reports_successors_and_regaps()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes das provas de inclusão Merkle (árvore com níveis, índice de transações, verificação leve)
+Compatível com pytest e execução direta
+"""
+
+import os
+import tempfile
+
+import block_codec
+import merkle_proofs
+from db_manager import DBManager
+from state_store import StateStore
+from proof_bundle_generator import ProofBundleGenerator
+
+
+def _transactions(count):
+    return [{"id": f"tx{i}", "sender": "alice", "receiver": "bob", "amount": float(i)} for i in range(count)]
+
+
+def _node_proof(transactions, tx_id):
+    """Mesmo formato de Block.merkle_proof, montado direto pelo codec"""
+    _, encoded = block_codec.encode_transactions(transactions)
+    tree = block_codec.MerkleTree([block_codec.hash_leaf(tx) for tx in encoded])
+    header = block_codec.encode_block_header(0, 7, "00" * 32, 1_760_000_000.0, "v", tree.root, len(encoded))
+    position = [tx["id"] for tx in transactions].index(tx_id)
+    path = tree.proof(position)
+    return {
+        "success": True,
+        "tx_id": tx_id,
+        "transaction": transactions[position],
+        "encoded_transaction": encoded[position].hex(),
+        "leaf_hash": tree.leaf(position).hex(),
+        "leaf_index": position,
+        "path": [sibling.hex() for sibling, _ in path],
+        "positions": [side for _, side in path],
+        "tree_depth": tree.depth,
+        "tx_root": tree.root.hex(),
+        "block_hash": block_codec.hash_header(header),
+        "header": header.hex()
+    }
+
+
+def test_tree_proofs_all_sizes():
+    for size in range(1, 34):
+        leaves = [block_codec.hash_leaf(bytes([i])) for i in range(size)]
+        tree = block_codec.MerkleTree(leaves)
+        assert tree.root == block_codec.merkle_root(leaves)
+        for index in range(size):
+            path = tree.proof(index)
+            assert len(path) <= tree.depth
+            assert block_codec.verify_proof(leaves[index], path, tree.root)
+            # Folha de outra posição não passa com o mesmo caminho
+            if size > 1:
+                assert not block_codec.verify_proof(leaves[(index + 1) % size], path, tree.root)
+    print("✅ test_tree_proofs_all_sizes: PASSOU")
+
+
+def test_light_client_verification():
+    transactions = _transactions(11)
+    proof = _node_proof(transactions, "tx6")
+    assert merkle_proofs.verify_inclusion_proof(proof)
+
+    tampered = dict(proof, transaction=dict(proof["transaction"], amount=99.0))
+    assert not merkle_proofs.verify_inclusion_proof(tampered)
+    flipped = dict(proof, positions=[1 - side for side in proof["positions"]])
+    assert not merkle_proofs.verify_inclusion_proof(flipped)
+    # Raiz trocada não bate com o cabeçalho assinado pelo hash do bloco
+    other = _node_proof(_transactions(12), "tx6")
+    assert not merkle_proofs.verify_inclusion_proof(dict(proof, tx_root=other["tx_root"], path=other["path"]))
+    print("✅ test_light_client_verification: PASSOU")
+
+
+def test_state_store_locates_transactions():
+    db = DBManager(db_path=os.path.join(tempfile.mkdtemp(), "proofs.db"))
+    store = StateStore(db)
+
+    class _Block:
+        shard_id, index, transactions = 3, 42, _transactions(5)
+
+    with db.transaction():
+        assert store.index_block_transactions(_Block())
+    assert store.locate_transaction("tx4") == (3, 42, 4)
+    assert store.locate_transaction("inexistente") is None
+    db.close()
+    print("✅ test_state_store_locates_transactions: PASSOU")
+
+
+def test_proof_bundle_uses_node_proof():
+    transactions = _transactions(9)
+    merkle_proofs.register_proof_provider("allianza", lambda tx_id: _node_proof(transactions, tx_id))
+    try:
+        generator = ProofBundleGenerator()
+        merkle_proof = generator.generate_merkle_proof_for_transaction("allianza", "tx8")
+        assert merkle_proof.leaf_index == 8
+        assert generator.verify_merkle_proof(merkle_proof) is True
+        merkle_proof.root = "00" * 32
+        assert generator.verify_merkle_proof(merkle_proof) is False
+        assert generator.generate_merkle_proof_for_transaction("ethereum", "tx8") is None
+    finally:
+        merkle_proofs.unregister_proof_provider("allianza")
+    print("✅ test_proof_bundle_uses_node_proof: PASSOU")
+
+
+if __name__ == "__main__":
+    test_tree_proofs_all_sizes()
+    test_light_client_verification()
+    test_state_store_locates_transactions()
+    test_proof_bundle_uses_node_proof()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do cache de provas endereçado por conteúdo (proof_cache + TestnetProofGenerator)
+Compatível com pytest e execução direta
+"""
+
+import os
+import gzip
+import json
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from flask import Flask
+
+from proof_cache import ProofCache, content_key
+
+BLOCK = {"index": 7, "hash": "ab" * 32, "previous_hash": "cd" * 32, "timestamp": 1700000000.0,
+         "shard_id": 1, "validator": "validator1",
+         "transactions": [{"tx_hash": "tx-1", "from": "alice", "to": "bob", "amount": 1.0}]}
+TX = {"tx_hash": "tx-1", "from": "alice", "to": "bob", "amount": 1.0, "timestamp": 1700000000.0,
+      "status": "confirmed"}
+
+
+@contextmanager
+def _workdir():
+    """TestnetProofGenerator grava em proofs/testnet relativo ao diretório atual"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+def test_single_build_per_key():
+    """Pedidos simultâneos e repetidos da mesma chave geram a prova uma única vez"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ProofCache(tmp)
+        builds = []
+        release = threading.Event()
+
+        def build():
+            builds.append(1)
+            release.wait(5)
+            return b'{"proof": 1}'
+
+        key = content_key("block_proof", "json", {"index": 1})
+        assert key == content_key("block_proof", "json", {"index": 1})
+        assert cache.get_or_build(key, "json", build, wait=0) is None  # Ainda em geração: rota responde 202
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_build(key, "json", build, wait=5)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(builds) == 1 and len({entry.path for entry in results}) == 1
+        entry = cache.get_or_build(key, "json", build)
+        assert len(builds) == 1 and entry.read() == b'{"proof": 1}'
+        assert gzip.decompress(entry.path.read_bytes()) == b'{"proof": 1}'
+        assert cache.get_stats()["builds"] == 1
+    print("✅ test_single_build_per_key: PASSOU")
+
+
+def test_quota_eviction_and_rescan():
+    """Acima da cota saem as menos usadas; o índice é reconstruído do diretório"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ProofCache(tmp, max_bytes=10**9)
+        for i in range(5):
+            cache.put(f"k{i}", "json", os.urandom(1000))  # Incompressível: ~1000 bytes cada
+            time.sleep(0.01)
+        size = cache.get("k0", "json").size
+        cache.max_bytes = 3 * size + size // 2
+        cache.put("k5", "json", os.urandom(1000))
+
+        assert cache.get("k0", "json") is not None  # Acessada por último: sobrevive
+        assert all(cache.get(f"k{i}", "json") is None for i in (1, 2, 3))
+        assert cache.total_bytes <= cache.max_bytes
+        assert sorted(name.split(".")[0] for name in os.listdir(tmp)) == ["k0", "k4", "k5"]
+
+        reopened = ProofCache(tmp, max_bytes=cache.max_bytes)
+        assert reopened.total_bytes == cache.total_bytes
+        assert reopened.get("k5", "json").raw_size == 1000
+    print("✅ test_quota_eviction_and_rescan: PASSOU")
+
+
+def test_generator_keys_by_content():
+    """Mesmo bloco/transação: mesmo arquivo (horário de geração fora da chave); conteúdo igual ao formato antigo"""
+    with _workdir():
+        from testnet_proofs import TestnetProofGenerator
+
+        generator = TestnetProofGenerator()
+        first = generator.block_proof_file(BLOCK, format="json")
+        again = generator.block_proof_file(dict(BLOCK), format="json")
+        assert first.key == again.key and generator.cache.get_stats()["builds"] == 1
+        assert json.loads(first.read())
+
+        changed = generator.block_proof_file(dict(BLOCK, hash="ef" * 32), format="json")
+        assert changed.key != first.key
+
+        txt = generator.transaction_proof_file(TX, format="txt")
+        assert "HASH SHA-512" in txt.read().decode("utf-8") and txt.mimetype == "text/plain"
+        proof = json.loads(generator.transaction_proof_file(TX, format="json").read())
+        assert proof["transaction"]["tx_hash"] == "tx-1" and len(proof["proof_hash"]) == 128
+        assert not list(generator.proofs_dir.glob("tx_*"))  # Só o cache grava
+    print("✅ test_generator_keys_by_content: PASSOU")
+
+
+def test_routes_etag_range_gzip():
+    """Rota: ETag/304, Range/206, gzip sem descomprimir e 202 enquanto gera"""
+    with _workdir():
+        import testnet_routes
+        from testnet_proofs import TestnetProofGenerator
+
+        class _Explorer:
+            def get_block_by_index(self, block_index, shard_id=None):
+                return dict(BLOCK) if block_index == 7 else None
+
+            def get_transaction_by_hash(self, tx_hash):
+                return dict(TX) if tx_hash == "tx-1" else None
+
+        app = Flask(__name__)
+        app.register_blueprint(testnet_routes.testnet_bp)
+        saved = testnet_routes.explorer, testnet_routes.proof_generator
+        testnet_routes.explorer = _Explorer()
+        testnet_routes.proof_generator = generator = TestnetProofGenerator()
+        try:
+            client = app.test_client()
+            response = client.get("/api/proofs/transaction/tx-1")
+            body = response.data
+            etag = response.headers["ETag"]
+            assert response.status_code == 200 and json.loads(body)["transaction"]["tx_hash"] == "tx-1"
+            assert response.headers["Vary"] == "Accept-Encoding"
+
+            assert client.get("/api/proofs/transaction/tx-1", headers={"If-None-Match": etag}).status_code == 304
+            partial = client.get("/api/proofs/transaction/tx-1", headers={"Range": "bytes=0-9"})
+            assert partial.status_code == 206 and partial.data == body[:10]
+            gz = client.get("/api/proofs/transaction/tx-1", headers={"Accept-Encoding": "gzip"})
+            assert gz.headers["Content-Encoding"] == "gzip" and gzip.decompress(gz.data) == body
+            assert gz.content_length == len(gz.data)
+            gz.close()  # Servida pelo handle do arquivo: o servidor WSGI fecha, o cliente de teste não
+            assert generator.cache.get_stats()["builds"] == 1
+
+            assert client.get("/api/proofs/block/99").status_code == 404
+            assert client.get("/api/proofs/transaction/nada").status_code == 404
+
+            release = threading.Event()
+            original = generator._render
+            generator._render = lambda data, fmt: (release.wait(5), original(data, fmt))[1]
+            pending = client.get("/api/proofs/block/7?format=txt&wait=0")
+            assert pending.status_code == 202 and pending.headers["Retry-After"]
+            release.set()
+            ready = client.get("/api/proofs/block/7?format=txt&wait=5")
+            assert ready.status_code == 200 and b"ALLIANZA TESTNET" in ready.data
+        finally:
+            testnet_routes.explorer, testnet_routes.proof_generator = saved
+    print("✅ test_routes_etag_range_gzip: PASSOU")
+
+
+def test_route_survives_eviction_before_send():
+    """Arquivo despejado pela cota entre o get e o envio: 202 e o pedido seguinte gera de novo (não 500)"""
+    with _workdir():
+        import testnet_routes
+        from testnet_proofs import TestnetProofGenerator
+
+        class _Explorer:
+            def get_transaction_by_hash(self, tx_hash):
+                return dict(TX) if tx_hash == "tx-1" else None
+
+        app = Flask(__name__)
+        app.register_blueprint(testnet_routes.testnet_bp)
+        saved = testnet_routes.explorer, testnet_routes.proof_generator
+        testnet_routes.explorer = _Explorer()
+        testnet_routes.proof_generator = generator = TestnetProofGenerator()
+        original = generator.transaction_proof_file
+
+        def evicted_after_get(tx, **kwargs):
+            entry = original(tx, **kwargs)
+            with generator.cache._lock:  # O mesmo que _evict faz num put concorrente acima da cota
+                del generator.cache._index[(entry.key, entry.ext)]
+                generator.cache.total_bytes -= entry.size
+                entry.path.unlink()
+            return entry
+
+        try:
+            client = app.test_client()
+            generator.transaction_proof_file = evicted_after_get
+            for headers in ({}, {"Accept-Encoding": "gzip"}):
+                response = client.get("/api/proofs/transaction/tx-1", headers=headers)
+                assert response.status_code == 202 and response.headers["Retry-After"]
+            generator.transaction_proof_file = original
+            response = client.get("/api/proofs/transaction/tx-1")
+            assert response.status_code == 200 and json.loads(response.data)["transaction"]["tx_hash"] == "tx-1"
+        finally:
+            testnet_routes.explorer, testnet_routes.proof_generator = saved
+    print("✅ test_route_survives_eviction_before_send: PASSOU")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("🧪 TESTES DO CACHE DE PROVAS")
+    print("=" * 70)
+    test_single_build_per_key()
+    test_quota_eviction_and_rescan()
+    test_generator_keys_by_content()
+    test_routes_etag_range_gzip()
+    test_route_survives_eviction_before_send()
+    print("\n✅ Todos os testes passaram!")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes das provas QSS em lote (árvore de Merkle, uma assinatura ML-DSA por lote)
+Compatível com pytest e execução direta
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from flask import Flask
+
+from pqc_keystore import PQCKeystore
+from quantum_security import QuantumSecuritySystem
+
+_directory = tempfile.TemporaryDirectory()
+
+
+@contextmanager
+def _workdir():
+    """A ponte importada por qss_api_service grava banco e log estruturado no diretório atual"""
+    cwd = os.getcwd()
+    os.chdir(_directory.name)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+with _workdir():
+    import qss_api_service
+
+
+class CountingQuantumSecurity(QuantumSecuritySystem):
+    """QuantumSecuritySystem com keystore temporário e contagem de assinaturas ML-DSA"""
+
+    def __init__(self):
+        super().__init__()
+        self.pqc_keypairs = PQCKeystore(_directory.name, key=AESGCM.generate_key(bit_length=256), sync=False)
+        self.ml_dsa_signatures = 0
+
+    def sign_with_ml_dsa(self, keypair_id, message):
+        self.ml_dsa_signatures += 1
+        return super().sign_with_ml_dsa(keypair_id, message)
+
+
+def _setup():
+    if not isinstance(qss_api_service.quantum_system, CountingQuantumSecurity):
+        qss_api_service.quantum_system = CountingQuantumSecurity()
+    app = Flask(__name__)
+    app.register_blueprint(qss_api_service.qss_bp)
+    return qss_api_service.quantum_system, app.test_client()
+
+
+def _items(count):
+    return qss_api_service._normalize_batch_items([
+        {"chain": "Bitcoin" if i % 2 else "ethereum", "tx_hash": f"0x{i:064x}",
+         "metadata": {"block_height": 800_000 + i}}
+        for i in range(count)
+    ])
+
+
+def test_batch_signed_once_and_every_proof_verifies():
+    """1000 itens: uma assinatura, todas as provas aceitas por verify-proof"""
+    qs, client = _setup()
+    signatures = qs.ml_dsa_signatures
+    result = qss_api_service.issue_proof_batch(_items(1000))
+
+    assert result["success"] and qs.ml_dsa_signatures == signatures + 1
+    batch, proofs = result["batch"], result["proofs"]
+    assert batch["size"] == 1000 and batch["tree_depth"] == 10
+    assert all(len(proof["merkle_proof"]) <= 10 and "batch" not in proof for proof in proofs)
+    assert proofs[1]["asset_chain"] == "bitcoin"
+
+    for proof in proofs[::97]:
+        response = client.post("/api/qss/verify-proof", json={"quantum_proof": proof, "batch": batch})
+        body = response.get_json()
+        assert response.status_code == 200 and body["valid"], body
+        assert body["proof_info"]["leaf_index"] == proof["leaf_index"]
+    print("✅ test_batch_signed_once_and_every_proof_verifies: PASSOU")
+
+
+def test_tampering_is_rejected():
+    """Transação trocada, caminho de outro item, raiz ou assinatura adulteradas: inválido"""
+    qs, client = _setup()
+    result = qss_api_service.issue_proof_batch(_items(33), embed_signature=True)
+    proofs = result["proofs"]
+    assert qss_api_service.verify_batch_proof(proofs[5])["valid"]
+
+    swapped = dict(proofs[5], asset_tx="0x" + "f" * 64)
+    details = qss_api_service.verify_batch_proof(swapped)["verification_details"]
+    assert not details["proof_hash_valid"] and not details["merkle_proof_valid"]
+
+    borrowed = dict(proofs[5], merkle_proof=proofs[6]["merkle_proof"])
+    assert not qss_api_service.verify_batch_proof(borrowed)["valid"]
+
+    forged_root = dict(result["batch"], merkle_root="00" * 32)
+    forged = dict(proofs[5], merkle_root=forged_root["merkle_root"], batch=forged_root)
+    assert not qss_api_service.verify_batch_proof(forged)["verification_details"]["signature_valid"]
+
+    other = qss_api_service.issue_proof_batch(_items(2))["batch"]
+    resigned = dict(result["batch"], quantum_signature=other["quantum_signature"])
+    assert not qss_api_service.verify_batch_proof(proofs[5], resigned)["valid"]
+
+    response = client.post("/api/qss/verify-proof", json={"quantum_proof": dict(proofs[5], batch=None)})
+    assert response.status_code == 400
+    print("✅ test_tampering_is_rejected: PASSOU")
+
+
+def test_item_validation_and_key_reuse():
+    """Itens inválidos rejeitados; lotes reutilizam o mesmo keypair ML-DSA"""
+    qs, _ = _setup()
+    for items in ([], [{"chain": "bitcoin"}], [{"chain": "bitcoin", "tx_hash": "a", "metadata": 3}],
+                  [{"chain": "x", "tx_hash": "a"}] * (qss_api_service.MAX_BATCH_ITEMS + 1)):
+        try:
+            qss_api_service._normalize_batch_items(items)
+            assert False, items
+        except ValueError:
+            pass
+
+    first = qss_api_service.issue_proof_batch(_items(3))["batch"]["keypair_id"]
+    second = qss_api_service.issue_proof_batch(_items(3))["batch"]["keypair_id"]
+    assert first == second == qss_api_service._get_ml_dsa_keypair_id()
+    assert qs.pqc_keypairs.ids_by_algorithm("ML-DSA") == [first]
+    print("✅ test_item_validation_and_key_reuse: PASSOU")
+
+
+def test_unencodable_metadata_is_rejected():
+    """Metadata fora do codec (inteiro >= 2^64, chave não-string) é 400 na rota, não 500"""
+    _, client = _setup()
+    for metadata in ({"amount": 10 ** 30}, {"nested": [{1: "a"}]}, {"tags": {"a", "b"}}):
+        try:
+            qss_api_service._normalize_batch_items([{"chain": "bitcoin", "tx_hash": "a", "metadata": metadata}])
+            assert False, metadata
+        except ValueError as e:
+            assert "items[0]" in str(e)
+
+    response = client.post("/api/qss/generate-proof-batch", json={
+        "items": [{"chain": "bitcoin", "tx_hash": "a"},
+                  {"chain": "bitcoin", "tx_hash": "b", "metadata": {"amount": 2 ** 64}}]
+    })
+    assert response.status_code == 400 and "items[1]" in response.get_json()["error"]
+    print("✅ test_unencodable_metadata_is_rejected: PASSOU")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("🧪 TESTES DAS PROVAS QSS EM LOTE")
+    print("=" * 70)
+    test_batch_signed_once_and_every_proof_verifies()
+    test_tampering_is_rejected()
+    test_item_validation_and_key_reuse()
+    test_unencodable_metadata_is_rejected()
+    print("\n✅ Todos os testes passaram!")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do pool de provedores RPC (descoberta concorrente, ranking, failover, re-probe)
+Compatível com pytest e execução direta
+"""
+
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rpc_provider_pool import RPCProviderPool, probe_endpoint
+
+
+class StubNode:
+    """Nó JSON-RPC local com atraso e falha configuráveis"""
+
+    def __init__(self, chain_id=80002, delay=0.0, head=1000):
+        self.chain_id = chain_id
+        self.delay = delay
+        self.head = head
+        self.down = False
+        self.calls = 0
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                node.calls += 1
+                time.sleep(node.delay)
+                if node.down:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                results = {"eth_chainId": hex(node.chain_id), "eth_blockNumber": hex(node.head),
+                           "web3_clientVersion": "stub/1.0"}
+                data = json.dumps({"jsonrpc": "2.0", "id": body["id"],
+                                   "result": results.get(body["method"])}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _dead_url():
+    node = StubNode()
+    node.stop()
+    return node.url
+
+
+def test_concurrent_discovery_and_ranking():
+    fast, medium = StubNode(delay=0.0), StubNode(delay=0.15)
+    hanging = [StubNode(delay=3.0) for _ in range(4)]
+    wrong = StubNode(chain_id=1)
+    pool = RPCProviderPool(probe_timeout=0.6, reprobe_interval=0)
+    pool.register_chain("polygon", [h.url for h in hanging] + [medium.url, _dead_url(), wrong.url, fast.url],
+                        chain_id=80002, poa=True)
+    try:
+        start = time.perf_counter()
+        healthy = pool.discover()
+        elapsed = time.perf_counter() - start
+        # 4 endpoints travados custariam 4 x timeout em sequência; em paralelo, um deadline
+        assert elapsed < 1.5, elapsed
+        assert healthy == {"polygon": 2}
+        ranked = [c.url for c in pool.pool.ranked_connections("polygon")]
+        assert ranked == [fast.url, medium.url]
+        assert "chain_id 1" in probe_endpoint(wrong.url, 1.0, 80002)["error"]
+
+        w3 = pool.get_web3("polygon")
+        assert w3.eth.block_number == 1000
+        assert w3.provider.endpoint_uri == fast.url
+    finally:
+        for node in hanging + [fast, medium, wrong]:
+            node.stop()
+    print("✅ test_concurrent_discovery_and_ranking: PASSOU")
+
+
+def test_per_request_failover():
+    primary, backup = StubNode(head=10), StubNode(delay=0.05, head=10)
+    pool = RPCProviderPool(probe_timeout=1.0, reprobe_interval=0)
+    pool.register_chain("bsc", [primary.url, backup.url], chain_id=80002)
+    try:
+        pool.discover()
+        w3 = pool.get_web3("bsc")
+        assert w3.provider.endpoint_uri == primary.url
+
+        primary.down = True
+        backup_calls = backup.calls
+        # Cada requisição falha no primário e é atendida pelo backup, sem erro para o chamador
+        for _ in range(3):
+            assert w3.eth.block_number == 10
+        assert backup.calls - backup_calls == 3
+        # Uma falha já rebaixa o primário no ranking (taxa de erro), sem novas tentativas nele
+        assert primary.calls == 2  # probe + a única requisição que falhou
+        assert w3.provider.endpoint_uri == backup.url
+
+        # Fora do ar de vez: após `unhealthy_after` falhas seguidas sai do ranking
+        backup.down = True
+        for _ in range(2):
+            failed = False
+            try:
+                w3.eth.block_number
+            except Exception:
+                failed = True
+            assert failed
+        assert not pool.has_healthy("bsc")
+
+        # Re-probe (em background) traz os endpoints de volta
+        primary.down = backup.down = False
+        assert pool.reprobe_unhealthy() == 2
+        assert w3.eth.block_number == 10
+    finally:
+        primary.stop()
+        backup.stop()
+    print("✅ test_per_request_failover: PASSOU")
+
+
+def test_all_endpoints_down():
+    node = StubNode()
+    pool = RPCProviderPool(probe_timeout=0.5, reprobe_interval=0.1)
+    pool.register_chain("base", [node.url, _dead_url()], chain_id=80002)
+    try:
+        node.down = True
+        assert pool.discover() == {"base": 0}
+        assert pool.get_web3("base") is None
+        assert pool.get_web3("solana") is None
+
+        node.down = False
+        deadline = time.time() + 3
+        while not pool.has_healthy("base") and time.time() < deadline:
+            time.sleep(0.05)
+        assert pool.get_web3("base").eth.chain_id == 80002
+    finally:
+        pool.close()
+        node.stop()
+    print("✅ test_all_endpoints_down: PASSOU")
+
+
+if __name__ == "__main__":
+    test_concurrent_discovery_and_ranking()
+    test_per_request_failover()
+    test_all_endpoints_down()
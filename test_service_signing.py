@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes das identidades de assinatura de serviço (reuso, rotação, lotes Merkle, DEX)
+Compatível com pytest e execução direta
+"""
+
+import time
+import tempfile
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from pqc_keystore import PQCKeystore
+from quantum_security import QuantumSecuritySystem
+from quantum_safe_defi import QuantumSafeDEX
+from service_signing import ServiceIdentity, MerkleBatchSigner, get_service_identity
+
+_directory = tempfile.TemporaryDirectory()
+
+
+class CountingQuantumSecurity(QuantumSecuritySystem):
+    """QuantumSecuritySystem com keystore temporário e contagem de geração de chaves"""
+
+    def __init__(self):
+        super().__init__()
+        self.pqc_keypairs = PQCKeystore(_directory.name, key=AESGCM.generate_key(bit_length=256), sync=False)
+        self.keygens = 0
+
+    def generate_qrs3_keypair(self):
+        self.keygens += 1
+        return super().generate_qrs3_keypair()
+
+
+_qs = None
+
+
+def _quantum_security():
+    global _qs
+    if _qs is None:
+        _qs = CountingQuantumSecurity()
+    return _qs
+
+
+def test_identity_reused_and_rotated():
+    """Uma geração de chave para muitas assinaturas; rotação mantém as antigas verificáveis"""
+    qs = _quantum_security()
+    identity = ServiceIdentity("teste_rotacao", qs, rotation_interval=0)
+    keygens = qs.keygens
+
+    signatures = [identity.sign(f"op {i}".encode()) for i in range(20)]
+    assert qs.keygens == keygens + 1
+    assert all(sig["success"] and sig["keypair_id"] == identity.keypair_id for sig in signatures)
+    assert identity.verify(b"op 3", signatures[3])
+    assert not identity.verify(b"op adulterada", signatures[3])
+
+    old_keypair = identity.keypair_id
+    assert identity.rotate()["success"]
+    assert identity.keypair_id != old_keypair
+    assert identity.get_info()["history"][0]["retired_at"] is not None
+    assert identity.verify(b"op 3", signatures[3])
+    assert identity.sign(b"nova")["keypair_id"] == identity.keypair_id
+
+    # Rotação automática por tempo
+    identity.rotation_interval = 0.05
+    current = identity.keypair_id
+    time.sleep(0.06)
+    assert identity.sign(b"depois do intervalo")["keypair_id"] != current
+    print("✅ test_identity_reused_and_rotated: PASSOU")
+
+
+def test_merkle_batch_receipts():
+    """Lote de mensagens assinado uma vez; cada recibo prova a inclusão da sua mensagem"""
+    qs = _quantum_security()
+    identity = ServiceIdentity("teste_lote", qs, rotation_interval=0)
+    batcher = MerkleBatchSigner(identity, window=60, max_batch=1000)
+    messages = [f"swap {i}".encode() for i in range(37)]
+    futures = [batcher.submit(message) for message in messages]
+    assert not any(future.done() for future in futures)
+
+    signatures_before = identity.stats["signatures"]
+    summary = batcher.flush()
+    assert summary["batch_size"] == 37 and summary["success"]
+    receipts = [future.result(timeout=0) for future in futures]
+    assert identity.stats["signatures"] == signatures_before + 1
+    assert len({receipt["merkle_root"] for receipt in receipts}) == 1
+
+    assert batcher.verify_receipt(messages[0], receipts[0])
+    assert batcher.verify_receipt(messages[36], receipts[36])
+    assert not batcher.verify_receipt(messages[1], receipts[0])
+
+    # Fechamento pela janela de tempo
+    timed = MerkleBatchSigner(identity, window=0.05)
+    receipt = timed.submit(b"sozinho").result(timeout=10)
+    assert receipt["status"] == "signed" and receipt["batch_size"] == 1
+    assert timed.verify_receipt(b"sozinho", receipt)
+    print("✅ test_merkle_batch_receipts: PASSOU")
+
+
+def test_dex_swaps_do_not_generate_keys():
+    """Swaps do DEX usam a identidade do serviço (e o lote, se configurado)"""
+    qs = _quantum_security()
+    get_service_identity("dex", qs)
+    dex = QuantumSafeDEX(qs, swap_log_path=None)
+    pool_id = dex.create_pool("ALZ", "USDT", {"ALZ": 1000.0, "USDT": 500.0})["pool_id"]
+    keygens = qs.keygens
+    for _ in range(10):
+        result = dex.swap(pool_id, "ALZ", "USDT", 1.0)
+        assert result["success"] and result["swap"]["qrs3_signature"]["signer"] == "dex"
+    assert qs.keygens == keygens
+
+    batched = QuantumSafeDEX(qs, batch_window=60, swap_log_path=None)
+    pool_id = batched.create_pool("ALZ", "USDT", {"ALZ": 1000.0, "USDT": 500.0})["pool_id"]
+    swaps = [batched.swap(pool_id, "ALZ", "USDT", 2.0)["swap"] for _ in range(5)]
+    assert batched.get_signature_receipt(swaps[0]["swap_id"])["status"] == "pending"
+    batched.swap_batcher.flush()
+    # A resposta já devolvida não muda depois do flush; o recibo é consultado à parte
+    assert all(swap["qrs3_signature"] == {"status": "pending", "signer": "dex", "signature_mode": "merkle_batch"}
+               for swap in swaps)
+    receipts = [batched.get_signature_receipt(swap["swap_id"]) for swap in swaps]
+    assert all(receipt["status"] == "signed" for receipt in receipts)
+    assert len({receipt["batch_id"] for receipt in receipts}) == 1
+    assert qs.keygens == keygens
+    print("✅ test_dex_swaps_do_not_generate_keys: PASSOU")
+
+
+def test_identity_survives_restart_and_other_workers():
+    """Identidade e histórico ficam no keystore: novo processo/worker reutiliza e verifica assinaturas antigas"""
+    with tempfile.TemporaryDirectory() as tmp:
+        key = AESGCM.generate_key(bit_length=256)
+        first_qs = QuantumSecuritySystem(keystore=PQCKeystore(tmp, key=key, sync=False))
+        first = ServiceIdentity("teste_reinicio", first_qs, rotation_interval=0)
+        before_rotation = first.sign(b"antes da rotacao")
+        first.rotate()
+        after_rotation = first.sign(b"depois da rotacao")
+
+        # "Reinício": outro keystore sobre o mesmo diretório
+        restarted_qs = QuantumSecuritySystem(keystore=PQCKeystore(tmp, key=key, sync=False))
+        restarted = ServiceIdentity("teste_reinicio", restarted_qs, rotation_interval=0)
+        assert restarted.keypair_id == first.keypair_id and len(restarted.history) == 2
+        assert restarted.verify(b"antes da rotacao", before_rotation)
+        assert restarted.verify(b"depois da rotacao", after_rotation)
+        assert restarted.sign(b"x")["keypair_id"] == first.keypair_id  # Sem gerar chave nova
+
+        # Worker concorrente rotaciona: o primeiro passa a verificar a chave nova
+        restarted.rotate()
+        newer = restarted.sign(b"chave do outro worker")
+        assert first.verify(b"chave do outro worker", newer)
+        assert first.keypair_id == restarted.keypair_id and len(first.history) == 3
+    print("✅ test_identity_survives_restart_and_other_workers: PASSOU")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("🧪 TESTES DAS IDENTIDADES DE SERVIÇO")
+    print("=" * 70)
+    test_identity_reused_and_rotated()
+    test_merkle_batch_receipts()
+    test_dex_swaps_do_not_generate_keys()
+    test_identity_survives_restart_and_other_workers()
+    print("\n✅ Todos os testes passaram!")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do verificador paralelo de assinaturas (pool de processos, ordem, cache de chaves)
+Compatível com pytest e execução direta
+"""
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+import signature_verifier
+from signature_verifier import ParallelSignatureVerifier, signing_message
+
+
+def _keypair():
+    private_key = ec.generate_private_key(ec.SECP256K1())
+    pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_key, pem
+
+
+def _signed_tx(private_key, sender, i):
+    tx = {"id": f"tx{i}", "sender": sender, "receiver": "r", "amount": i, "type": "transfer"}
+    tx["signature"] = private_key.sign(signing_message(tx), ec.ECDSA(hashes.SHA256())).hex()
+    return tx
+
+
+def _transactions(count):
+    keys = {f"s{n}": _keypair() for n in range(3)}
+    txs = [_signed_tx(keys[f"s{i % 3}"][0], f"s{i % 3}", i) for i in range(count)]
+    return txs, {sender: pem for sender, (_, pem) in keys.items()}
+
+
+def test_signing_message_ignores_signature():
+    tx = {"b": 1, "a": 2}
+    assert signing_message(tx) == signing_message({**tx, "signature": "ff"}) == b'{"a": 2, "b": 1}'
+    print("✅ test_signing_message_ignores_signature: PASSOU")
+
+
+def test_in_process_detects_tampering():
+    txs, public_keys = _transactions(6)
+    txs[2]["amount"] = 1000
+    txs[4]["signature"] = "00"
+    public_keys.pop("s2")  # txs[2] e txs[5] ficam sem chave registrada
+    verifier = ParallelSignatureVerifier(max_workers=1)
+    assert verifier.verify_transactions(txs, public_keys) == [True, True, False, True, False, False]
+    assert verifier.get_stats()["parallel_batches"] == 0
+    print("✅ test_in_process_detects_tampering: PASSOU")
+
+
+def test_process_pool_keeps_order():
+    txs, public_keys = _transactions(40)
+    for i in (3, 17, 39):
+        txs[i]["receiver"] = "attacker"
+    verifier = ParallelSignatureVerifier(max_workers=2, chunk_size=7, min_parallel=1)
+    try:
+        results = verifier.verify_transactions(txs, public_keys)
+        assert results == [i not in (3, 17, 39) for i in range(40)]
+        stats = verifier.get_stats()
+        assert stats["parallel_batches"] == 1
+        assert stats["verified"] == 37 and stats["invalid"] == 3
+    finally:
+        verifier.close()
+    print("✅ test_process_pool_keeps_order: PASSOU")
+
+
+def test_public_keys_cached():
+    txs, public_keys = _transactions(9)
+    signature_verifier._key_cache.clear()
+    ParallelSignatureVerifier(max_workers=1).verify_transactions(txs, public_keys)
+    assert set(signature_verifier._key_cache) == set(public_keys.values())
+    print("✅ test_public_keys_cached: PASSOU")
+
+
+if __name__ == "__main__":
+    test_signing_message_ignores_signature()
+    test_in_process_detects_tampering()
+    test_process_pool_keeps_order()
+    test_public_keys_cached()
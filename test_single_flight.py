@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes da coalescência de requisições (single-flight, stale-while-revalidate, jitter)
+Compatível com pytest e execução direta
+"""
+
+import time
+import threading
+
+from single_flight import SingleFlight, CoalescingCache
+
+
+class _Upstream:
+    """API lenta que conta quantas vezes foi chamada"""
+
+    def __init__(self, delay=0.05, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("API fora do ar")
+        return {"rate": call}
+
+
+def _concurrent(fn, threads=20):
+    results, errors = [], []
+    barrier = threading.Barrier(threads)
+
+    def run():
+        barrier.wait()
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results, errors
+
+
+def test_concurrent_misses_share_one_fetch():
+    """20 misses simultâneos da mesma chave: 1 chamada à API, mesmo resultado para todos"""
+    cache = CoalescingCache()
+    upstream = _Upstream()
+    results, errors = _concurrent(lambda: cache.get_or_load("exchange_rates", upstream, ttl=60))
+
+    assert not errors and upstream.calls == 1
+    assert {value["rate"] for value, _ in results} == {1}
+    origins = [origin for _, origin in results]
+    assert origins.count("loaded") + origins.count("hit") + origins.count("coalesced") == 20
+    stats = cache.get_stats()
+    assert stats["loads"] == 1 and stats["coalesced"] + stats["hits"] == 19
+    print("✅ test_concurrent_misses_share_one_fetch: PASSOU")
+
+
+def test_errors_are_shared_not_retried():
+    """Falha da busca chega a todos que esperavam, com uma única chamada"""
+    flight = SingleFlight()
+    upstream = _Upstream(fail=True)
+    results, errors = _concurrent(lambda: flight.do("gas_price:polygon", upstream), threads=10)
+    assert not results and len(errors) == 10 and upstream.calls == 1
+    assert flight.stats["errors"] == 1 and flight.stats["coalesced"] == 9
+    print("✅ test_errors_are_shared_not_retried: PASSOU")
+
+
+def test_stale_while_revalidate_and_stale_if_error():
+    """Vencido: serve o velho na hora e atualiza em segundo plano; API fora: mantém o velho"""
+    cache = CoalescingCache(jitter=0.0)
+    upstream = _Upstream(delay=0.1)
+    cache.get_or_load("gas_price:bsc", upstream, ttl=0.05, stale_ttl=5)
+    time.sleep(0.06)
+
+    start = time.perf_counter()
+    results, _ = _concurrent(lambda: cache.get_or_load("gas_price:bsc", upstream, ttl=0.05, stale_ttl=5),
+                             threads=10)
+    assert time.perf_counter() - start < 0.1
+    assert all(origin == "stale" and value["rate"] == 1 for value, origin in results)
+    time.sleep(0.2)
+    assert upstream.calls == 2 and cache.peek("gas_price:bsc")["rate"] == 2
+    assert cache.get_stats()["background_refreshes"] == 1
+
+    upstream.fail = True
+    time.sleep(0.06)
+    value, origin = cache.get_or_load("gas_price:bsc", upstream, ttl=0.05, stale_ttl=5)
+    assert value["rate"] == 2 and origin == "stale"
+    time.sleep(0.2)
+    assert cache.get_stats()["refresh_errors"] == 1
+    print("✅ test_stale_while_revalidate_and_stale_if_error: PASSOU")
+
+
+def test_uncacheable_results_and_jitter():
+    """Resultado de erro não é guardado; TTL com jitter espalha as expirações"""
+    cache = CoalescingCache(jitter=0.2)
+    value, origin = cache.get_or_load("balance:x", lambda: {"success": False}, ttl=60,
+                                      cacheable=lambda result: result["success"])
+    assert origin == "uncached" and cache.peek("balance:x") is None
+
+    for i in range(200):
+        cache.get_or_load(f"balance:{i}", lambda: {"success": True}, ttl=100)
+    expiries = [entry[1] for entry in cache._entries.values()]
+    spread = max(expiries) - min(expiries)
+    assert 20 < spread <= 41
+    print("✅ test_uncacheable_results_and_jitter: PASSOU")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("🧪 TESTES DA COALESCÊNCIA DE REQUISIÇÕES")
+    print("=" * 70)
+    test_concurrent_misses_share_one_fetch()
+    test_errors_are_shared_not_retried()
+    test_stale_while_revalidate_and_stale_if_error()
+    test_uncacheable_results_and_jitter()
+    print("\n✅ Todos os testes passaram!")
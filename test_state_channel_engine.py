@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do motor de state channels (cadeia de hashes + MAC, anel de deltas, checkpoints QRS-3)
+Compatível com pytest e execução direta
+"""
+
+import json
+import secrets
+import tempfile
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from amm_engine import UNIT
+from state_channel_engine import ChannelEngine, _mac
+from pqc_keystore import PQCKeystore
+from quantum_security import QuantumSecuritySystem
+from quantum_safe_state_channels import QuantumSafeStateChannel
+
+
+class _Signer:
+    def __init__(self):
+        self.messages = []
+
+    def __call__(self, message):
+        self.messages.append(message)
+        return {"success": True, "n": len(self.messages)}
+
+
+def _engine(**kwargs):
+    return ChannelEngine("canal", ("alice", "bob"), {"alice": {"ALZ": 100 * UNIT}, "bob": {"ALZ": 50 * UNIT}}, **kwargs)
+
+
+def test_updates_checkpoint_every_n():
+    """Só 1 assinatura a cada N updates; anel limitado; saldos conservados"""
+    signer = _Signer()
+    engine = _engine(checkpoint_every=10, ring_size=16, signer=signer)
+    assert len(signer.messages) == 1  # estado inicial
+
+    for i in range(35):
+        result = engine.update("alice" if i % 2 else "bob", "bob" if i % 2 else "alice", UNIT, "ALZ")
+        assert result["success"] and result["nonce"] == i + 1
+    assert len(signer.messages) == 4 and engine.checkpoints[-1]["nonce"] == 30
+    assert engine.get_stats()["ring"] == 16
+    balances = engine.balances_units()
+    assert balances["alice"]["ALZ"] + balances["bob"]["ALZ"] == 150 * UNIT
+    assert balances["alice"]["ALZ"] == 101 * UNIT  # 17 de alice, 18 de bob
+
+    assert not engine.update("alice", "bob", 1000 * UNIT, "ALZ")["success"]
+    assert not engine.update("alice", "carol", UNIT, "ALZ")["success"]
+    assert not engine.update("alice", "bob", UNIT, "ETH")["success"]
+    assert engine.nonce == 35 and engine.verify()
+    print("✅ test_updates_checkpoint_every_n: PASSOU")
+
+
+def test_chain_detects_tampering_and_rebuilds_states():
+    """Replay do anel recompõe a cadeia; delta adulterado é detectado; estados recentes reconstruídos"""
+    engine = _engine(checkpoint_every=100)
+    engine.update("alice", "bob", 10 * UNIT, "ALZ")
+    engine.update("bob", "alice", 3 * UNIT, "ALZ")
+    engine.update("alice", "bob", 1 * UNIT, "ALZ")
+    assert engine.verify()
+
+    assert engine.state_at(0) == {"alice": {"ALZ": 100 * UNIT}, "bob": {"ALZ": 50 * UNIT}}
+    assert engine.state_at(2) == {"alice": {"ALZ": 93 * UNIT}, "bob": {"ALZ": 57 * UNIT}}
+    assert engine.state_at(3) == engine.balances_units()
+    assert engine.state_at(4) is None
+
+    nonce, from_index, to_index, asset_index, amount = engine._ring[1]
+    engine._ring[1] = (nonce, from_index, to_index, asset_index, amount + 1)
+    assert not engine.verify()
+    print("✅ test_chain_detects_tampering_and_rebuilds_states: PASSOU")
+
+
+def _quantum_security(directory):
+    return QuantumSecuritySystem(keystore=PQCKeystore(directory, key=AESGCM.generate_key(bit_length=256), sync=False))
+
+
+def test_quantum_safe_channel_close():
+    """Canal QRS-3: muitos updates, poucas assinaturas, fechamento verifica checkpoints"""
+    keystore_dir = tempfile.TemporaryDirectory()
+    qs = _quantum_security(keystore_dir.name)
+    signatures = []
+    sign_qrs3 = qs.sign_qrs3
+    qs.sign_qrs3 = lambda *args, **kwargs: signatures.append(1) or sign_qrs3(*args, **kwargs)
+
+    channel = QuantumSafeStateChannel("canal_qs", "alice", "bob",
+                                      {"alice": {"ALZ": 500.0}, "bob": {"ALZ": 500.0}}, qs, checkpoint_every=50)
+    for _ in range(120):
+        result = channel.update_state("alice", "bob", 0.1)
+        assert result["success"]
+    assert result["state"]["state_number"] == 120 and len(result["state"]["party_macs"]) == 2
+    assert len(signatures) == 3  # inicial + 50 + 100
+    assert channel.get_channel_info()["balance"] == {"alice": {"ALZ": 488.0}, "bob": {"ALZ": 512.0}}
+
+    closed = channel.close_channel()
+    assert closed["success"] and closed["total_transactions"] == 120
+    assert closed["batch_verification"]["valid_count"] == 4
+    assert closed["final_state"]["balance"]["bob"]["ALZ"] == 512.0
+    assert not channel.update_state("alice", "bob", 1.0)["success"]
+    print("✅ test_quantum_safe_channel_close: PASSOU")
+
+
+def test_close_publishes_only_signed_latest_state():
+    """Estado antigo não é publicado com a assinatura do último; quantia inválida vira erro; MACs das partes"""
+    with tempfile.TemporaryDirectory() as keystore_dir:
+        qs = _quantum_security(keystore_dir)
+        keys = (secrets.token_bytes(32), secrets.token_bytes(32))
+        channel = QuantumSafeStateChannel("canal_final", "alice", "bob",
+                                          {"alice": {"ALZ": 10.0}, "bob": {"ALZ": 10.0}}, qs,
+                                          checkpoint_every=100, mac_keys=keys)
+        assert channel.update_state("alice", "bob", -1.0) == {"success": False,
+                                                               "error": "Quantia inválida: Quantia negativa: -1.0"}
+        assert not channel.update_state("alice", "bob", "abc")["success"]
+        state = channel.update_state("alice", "bob", 4.0)["state"]
+        assert state["party_keys"] == "parties"
+        # Cada parte confere o próprio MAC com a chave que forneceu
+        assert bytes.fromhex(state["party_macs"][1]) == _mac(keys[1], 1, bytes.fromhex(state["state_hash"]))
+        channel.update_state("bob", "alice", 1.0)
+
+        old = channel.close_channel(final_state_number=1)
+        assert not old["success"] and channel.is_open
+
+        closed = channel.close_channel()
+        final = closed["final_state"]
+        assert closed["success"] and final["state_number"] == 2
+        signed = json.loads(final["signed_message"])
+        assert signed["nonce"] == 2 and signed["balances"]["bob"]["ALZ"] == 13 * UNIT
+        assert final["balance"] == {"alice": {"ALZ": 7.0}, "bob": {"ALZ": 13.0}}
+        verification = qs.batch_verify_qrs3([{"keypair_id": channel.qrs3_keypair_id,
+                                              "message": final["signed_message"].encode(),
+                                              "qrs3_signature": final["qrs3_signature"]}])
+        assert verification["success"] and verification["invalid_count"] == 0
+    print("✅ test_close_publishes_only_signed_latest_state: PASSOU")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("🧪 TESTES DO MOTOR DE STATE CHANNELS")
+    print("=" * 70)
+    test_updates_checkpoint_every_n()
+    test_chain_detects_tampering_and_rebuilds_states()
+    test_quantum_safe_channel_close()
+    test_close_publishes_only_signed_latest_state()
+    print("\n✅ Todos os testes passaram!")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do StateStore (paginação lazy de blocos + carga das contas)
+Compatível com pytest e execução direta
+"""
+
+import os
+import json
+import tempfile
+
+from db_manager import DBManager
+from state_store import StateStore
+
+
+class _Block:
+    def __init__(self, row):
+        self.shard_id, self.index, self.previous_hash, txs, self.timestamp, self.hash, self.validator = row
+        self.transactions = json.loads(txs)
+
+
+def _db():
+    return DBManager(db_path=os.path.join(tempfile.mkdtemp(), "state.db"))
+
+
+def _save_block(db, shard_id, index):
+    db.execute_commit("INSERT INTO shards VALUES (?, ?, ?, ?, ?, ?, ?)",
+                      (shard_id, index, f"h{index - 1}", json.dumps([{"id": f"tx{index}"}]),
+                       float(index), f"h{index}", "validator"))
+
+
+def test_lazy_chain_pages_blocks():
+    db = _db()
+    store = StateStore(db, block_cache_size=8, page_size=16)
+    for i in range(1, 50):
+        _save_block(db, 0, i)
+    genesis = _Block((0, 0, "0", "[]", 0.0, "genesis_hash", "genesis"))
+    chain = store.open_shard_chain(0, genesis, _Block)
+
+    assert len(chain) == 50
+    assert chain[-1].hash == "h49"
+    assert chain[0] is genesis
+    assert chain.cached_blocks() == 1
+    assert [b.index for b in chain[-5:]] == [45, 46, 47, 48, 49]
+    assert chain[10].transactions == [{"id": "tx10"}]
+    assert chain.cached_blocks() <= 8
+    assert [b.index for b in chain] == list(range(50))
+    db.close()
+    print("✅ test_lazy_chain_pages_blocks: PASSOU")
+
+
+def test_append_updates_tip():
+    db = _db()
+    store = StateStore(db)
+    genesis = _Block((1, 0, "0", "[]", 0.0, "g", "genesis"))
+    chain = store.open_shard_chain(1, genesis, _Block)
+    block = _Block((1, 1, "g", "[]", 1.0, "h1", "v"))
+    chain.append(block)
+    assert len(chain) == 2
+    assert chain[-1] is block
+    db.close()
+    print("✅ test_append_updates_tip: PASSOU")
+
+
+def test_accounts_loaded_from_wallets_without_snapshots():
+    """Contas saem direto de wallets; tabelas/triggers de snapshot de versões anteriores são removidos"""
+    db = _db()
+    db.execute_many_commit([
+        ("CREATE TABLE state_snapshots (snapshot_id INTEGER PRIMARY KEY)", ()),
+        ("CREATE TRIGGER wallets_state_version_update AFTER UPDATE OF vtx ON wallets "
+         "BEGIN SELECT 1; END", ()),
+    ])
+    store = StateStore(db)
+    for i in range(10):
+        db.execute_commit("INSERT INTO wallets (address, vtx, staked_vtx, private_key) VALUES (?, ?, ?, ?)",
+                          (f"a{i}", 100.0, 0.0, "segredo"))
+    db.execute_commit("UPDATE wallets SET vtx = ?, staked_vtx = ? WHERE address = ?", (50.0, 1000.0, "a1"))
+
+    accounts = store.load_accounts()
+    assert len(accounts) == 10
+    assert accounts["a1"] == (50.0, 1000.0, None, None)
+    assert "segredo" not in accounts["a2"]
+    leftovers = db.execute_query(
+        "SELECT name FROM sqlite_master WHERE name LIKE 'state_snapshot%' OR name LIKE 'wallets_state_version%'"
+    )
+    assert leftovers == []
+    db.close()
+    print("✅ test_accounts_loaded_from_wallets_without_snapshots: PASSOU")
+
+
+if __name__ == "__main__":
+    test_lazy_chain_pages_blocks()
+    test_append_updates_tip()
+    test_accounts_loaded_from_wallets_without_snapshots()
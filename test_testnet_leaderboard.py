@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do leaderboard da testnet (log só de acréscimo, compactação, índice de ranking, vários processos)
+Compatível com pytest e execução direta
+"""
+
+import os
+import json
+import random
+import tempfile
+import multiprocessing
+
+from testnet_leaderboard import TestnetLeaderboard as Leaderboard, ScoreIndex, get_leaderboard
+
+
+def _worker(data_dir, worker_id, events):
+    leaderboard = Leaderboard(data_dir, compact_every=50)
+    for i in range(events):
+        leaderboard.add_activity("qss_request", f"10.0.{worker_id}.{i % 7}")
+
+
+def test_score_index_matches_sorted_order():
+    """rank e top(k) do treap batem com a ordenação completa"""
+    rng = random.Random(3)
+    index, points = ScoreIndex(), {}
+    for step in range(3000):
+        user = f"u{rng.randrange(400)}"
+        points[user] = points.get(user, 0) + rng.choice((5, 10, 15, 20, 50))
+        order = int(user[1:])
+        index.update(user, points[user], order)
+
+    ordered = sorted(points, key=lambda u: (-points[u], int(u[1:])))
+    assert index.top(25) == ordered[:25] and len(index) == len(points)
+    for user in rng.sample(list(points), 50):
+        assert index.rank(user) == 1 + sum(1 for other in points.values() if other > points[user])
+    print("✅ test_score_index_matches_sorted_order: PASSOU")
+
+
+def test_append_only_log_and_compaction():
+    """Cada atividade é uma linha nova; compactação gera snapshot e log novo sem perder nada"""
+    with tempfile.TemporaryDirectory() as tmp:
+        leaderboard = Leaderboard(tmp, compact_every=10)
+        for i in range(9):
+            leaderboard.add_activity("test_run", "alice" if i % 3 else "bob")
+        with open(os.path.join(tmp, "events.0.log")) as f:
+            assert len(f.readlines()) == 9
+        assert not os.path.exists(os.path.join(tmp, "leaderboard.json"))
+
+        leaderboard.add_activity("proof_generated", "carol")
+        assert leaderboard.stats["compactions"] == 1 and leaderboard.generation == 1
+        assert not os.path.exists(os.path.join(tmp, "events.0.log"))
+        assert os.path.getsize(os.path.join(tmp, "events.1.log")) == 0
+
+        leaderboard.add_activity("test_run", "bob")
+        reopened = Leaderboard(tmp)
+        alice = reopened.get_user_stats("alice")
+        assert alice["tests_run"] == 6 and alice["points"] == 60 and alice["rank"] == 1
+        assert reopened.get_user_stats("bob")["points"] == 40
+        assert reopened.get_user_stats("carol")["badges"][0]["type"] == "first_proof"
+        assert reopened.get_stats_summary()["total_points"] == 115
+        assert reopened.get_recent_activities(limit=1)[0]["type"] == "test_run"
+    print("✅ test_append_only_log_and_compaction: PASSOU")
+
+
+def test_processes_do_not_clobber_each_other():
+    """4 processos escrevendo no mesmo diretório (com compactações no meio): nenhum evento perdido"""
+    with tempfile.TemporaryDirectory() as tmp:
+        context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+        workers = [context.Process(target=_worker, args=(tmp, n, 120)) for n in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert all(worker.exitcode == 0 for worker in workers)
+
+        summary = Leaderboard(tmp).get_stats_summary()
+        assert summary["total_qss_requests"] == 4 * 120
+        assert summary["total_points"] == 4 * 120 * 5 and summary["total_users"] == 4 * 7
+    print("✅ test_processes_do_not_clobber_each_other: PASSOU")
+
+
+def test_legacy_files_and_shared_instance():
+    """Arquivos JSON antigos viram o snapshot inicial; get_leaderboard devolve a mesma instância"""
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_user = {"name": "User_legacy", "points": 500, "tests_run": 50, "proofs_generated": 0,
+                       "qss_requests": 0, "first_seen": "2025-01-01T00:00:00",
+                       "last_active": "2025-01-01T00:00:00", "badges": []}
+        with open(os.path.join(tmp, "leaderboard.json"), "w") as f:
+            json.dump({"users": {"legacy": legacy_user}, "last_updated": "2025-01-01T00:00:00"}, f, indent=2)
+
+        leaderboard = get_leaderboard(tmp)
+        assert get_leaderboard(tmp) is leaderboard
+        leaderboard.add_activity("test_run", "newcomer")
+        assert leaderboard.get_top_users(1)[0]["name"] == "User_legacy"
+        assert leaderboard.get_user_stats("newcomer")["rank"] == 2
+        assert leaderboard.get_stats_summary()["total_tests"] == 51
+    print("✅ test_legacy_files_and_shared_instance: PASSOU")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("🧪 TESTES DO LEADERBOARD DA TESTNET")
+    print("=" * 70)
+    test_score_index_matches_sorted_order()
+    test_append_only_log_and_compaction()
+    test_processes_do_not_clobber_each_other()
+    test_legacy_files_and_shared_instance()
+    print("\n✅ Todos os testes passaram!")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do histórico de transações indexado (triggers, paginação por cursor, pool de leitura)
+Compatível com pytest e execução direta
+"""
+
+import os
+import tempfile
+import threading
+
+from db_manager import DBManager, get_db_manager
+from transaction_history import TransactionHistoryStore
+
+INSERT = ("INSERT INTO transactions_history (id, sender, receiver, amount, type, timestamp, network, is_public) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+def _db():
+    return DBManager(db_path=os.path.join(tempfile.mkdtemp(), "history.db"))
+
+
+def _insert(db, count, addresses=("alice", "bob", "carol")):
+    with db.transaction():
+        for i in range(count):
+            sender = addresses[i % len(addresses)]
+            receiver = addresses[(i + 1) % len(addresses)]
+            # Timestamps repetidos de propósito: o desempate é pelo id
+            db.execute_commit(INSERT, (f"tx{i:05d}", sender, receiver, float(i), "transfer",
+                                       1_760_000_000.0 + i // 4, "allianza", 1))
+
+
+def _all_pages(store, address=None, limit=7):
+    seen, cursor = [], None
+    while True:
+        page = store.get_page(address, limit, cursor)
+        seen.extend(tx["id"] for tx in page["transactions"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+def test_index_written_on_insert():
+    db = _db()
+    store = TransactionHistoryStore(db)
+    _insert(db, 30)
+    db.execute_commit(INSERT, ("self", "dave", "dave", 1.0, "transfer", 1.0, None, None))
+
+    assert db.execute_query("SELECT COUNT(*) FROM address_transactions")[0][0] == 61
+    assert [tx["id"] for tx in store.get_page("dave")["transactions"]] == ["self"]
+    assert store.get_transaction("self")["network"] == "allianza"
+
+    db.execute_commit("DELETE FROM transactions_history WHERE id = ?", ("self",))
+    assert store.get_page("dave")["transactions"] == []
+    db.close()
+    print("✅ test_index_written_on_insert: PASSOU")
+
+
+def test_keyset_pagination_matches_full_order():
+    db = _db()
+    store = TransactionHistoryStore(db)
+    _insert(db, 100)
+
+    rows = db.execute_query("SELECT id FROM transactions_history WHERE sender = ? OR receiver = ? "
+                            "ORDER BY timestamp DESC, id DESC", ("alice", "alice"))
+    assert _all_pages(store, "alice") == [row[0] for row in rows]
+
+    rows = db.execute_query("SELECT id FROM transactions_history ORDER BY timestamp DESC, id DESC")
+    assert _all_pages(store, None, limit=9) == [row[0] for row in rows]
+
+    # Escritas entre páginas não duplicam nem pulam itens antigos
+    first = store.get_page("bob", 5)
+    db.execute_commit(INSERT, ("novo", "bob", "x", 1.0, "transfer", 2_000_000_000.0, "allianza", 1))
+    rest = _all_pages_from(store, "bob", first["next_cursor"])
+    ids = [tx["id"] for tx in first["transactions"]] + rest
+    assert "novo" not in ids and len(ids) == len(set(ids))
+    db.close()
+    print("✅ test_keyset_pagination_matches_full_order: PASSOU")
+
+
+def _all_pages_from(store, address, cursor):
+    seen = []
+    while cursor:
+        page = store.get_page(address, 5, cursor)
+        seen.extend(tx["id"] for tx in page["transactions"])
+        cursor = page["next_cursor"]
+    return seen
+
+
+def test_backfill_existing_history():
+    path = os.path.join(tempfile.mkdtemp(), "legacy.db")
+    db = DBManager(db_path=path)
+    _insert(db, 12)  # Antes do índice existir
+    store = TransactionHistoryStore(db)
+    assert len(_all_pages(store, "carol")) == 8
+    db.close()
+    print("✅ test_backfill_existing_history: PASSOU")
+
+
+def test_shared_read_pool():
+    db = DBManager(db_path=os.path.join(tempfile.mkdtemp(), "pool.db"), read_pool_size=2)
+    store = TransactionHistoryStore(db)
+    _insert(db, 50)
+    errors = []
+
+    def reader():
+        try:
+            for _ in range(20):
+                assert len(store.get_page("alice", 10)["transactions"]) == 10
+        except Exception as e:
+            errors.append(e)
+
+    # Threads efêmeras (como requisições Flask) compartilham as mesmas 2 conexões
+    threads = [threading.Thread(target=reader) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert db._read_pool_open <= 2
+    assert db.get_stats()["pool_reads"] == 160
+    db.close()
+
+    path = os.path.join(tempfile.mkdtemp(), "shared.db")
+    assert get_db_manager(path) is get_db_manager(path)
+    get_db_manager(path).close()
+    print("✅ test_shared_read_pool: PASSOU")
+
+
+if __name__ == "__main__":
+    test_index_written_on_insert()
+    test_keyset_pagination_matches_full_order()
+    test_backfill_existing_history()
+    test_shared_read_pool()
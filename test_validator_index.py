@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do índice de validadores (stake × score incremental, top 3 sem varrer carteiras)
+Compatível com pytest e execução direta
+"""
+
+import random
+
+from validator_index import ValidatorIndex
+from advanced_adaptive_consensus import AdvancedAdaptiveConsensus
+
+
+def _scan_top(wallets, scores, min_stake, k=3):
+    """Seleção antiga: varre todas as carteiras e ordena"""
+    candidates = [(address, wallet["staked"] * scores.get(address, 1.0))
+                  for address, wallet in wallets.items() if wallet["staked"] >= min_stake]
+    candidates.sort(key=lambda x: x[1], reverse=True)
+    return [address for address, _ in candidates[:k]]
+
+
+def test_incremental_matches_scan():
+    rng = random.Random(3)
+    wallets = {f"addr{i}": {"staked": rng.choice([0, 0, 500, 1000, 2500, 4000])} for i in range(300)}
+    scores = {}
+    index = ValidatorIndex(1000)
+    index.rebuild(((a, w["staked"]) for a, w in wallets.items()), scores)
+
+    for _ in range(2000):
+        address = f"addr{rng.randrange(300)}"
+        if rng.random() < 0.5:
+            wallets[address]["staked"] = rng.choice([0, 900, 1000, 1500, 3000, 7000]) + rng.random()
+            index.update_stake(address, wallets[address]["staked"])
+        else:
+            scores[address] = rng.uniform(0.1, 3.0)
+            index.update_score(address, scores[address])
+        assert [a for a, _ in index.top(3)] == _scan_top(wallets, scores, 1000)
+
+    eligible = sum(1 for w in wallets.values() if w["staked"] >= 1000)
+    assert len(index) == eligible
+    # Entradas obsoletas são compactadas
+    assert index.get_stats()["heap_entries"] <= max(64, 2 * eligible) + 1
+    print("✅ test_incremental_matches_scan: PASSOU")
+
+
+def test_select_and_removal():
+    index = ValidatorIndex(1000)
+    assert index.select() is None
+    for i, stake in enumerate([5000, 4000, 3000, 2000]):
+        index.update_stake(f"v{i}", stake)
+    assert {index.select() for _ in range(200)} == {"v0", "v1", "v2"}
+
+    index.update_score("v3", 3.0)  # 2000 * 3 = 6000 passa à frente
+    assert index.top(1) == [("v3", 6000)]
+    index.update_stake("v3", 0)    # Unstake: sai do índice
+    assert "v3" not in index and index.top(1)[0][0] == "v0"
+    print("✅ test_select_and_removal: PASSOU")
+
+
+class _Chain:
+    def __init__(self, wallets):
+        self.wallets = wallets
+
+
+def test_adaptive_consensus_uses_index():
+    wallets = {"a": {"staked": 2000}, "b": {"staked": 1500}, "c": {"staked": 10}, "d": {"staked": 1200},
+               "e": {"staked": 1100}}
+    consensus = AdvancedAdaptiveConsensus(_Chain(wallets))
+    assert consensus._select_stake_validator(0) in {"a", "b", "d"}
+
+    # Scores em dict (base + qrs3) não quebram a seleção PoS
+    for _ in range(10):
+        consensus.update_validator_score("e", True, "qrs3")
+    wallets["c"]["staked"] = 5000
+    consensus.update_stake("c", 5000)
+    assert [a for a, _ in consensus.validator_index.top(2)] == ["c", "e"]  # 5000, 1100 * 2.59
+    print("✅ test_adaptive_consensus_uses_index: PASSOU")
+
+
+if __name__ == "__main__":
+    test_incremental_matches_scan()
+    test_select_and_removal()
+    test_adaptive_consensus_uses_index()
@@ -7,10 +7,106 @@ Versão melhorada com informações detalhadas de cross-chain, PQC e métricas a
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import time
+from mempool import ShardPendingView
+
+
+def _tx_id(tx: Dict):
+    return tx.get("id") or tx.get("tx_hash") or tx.get("hash")
+
+
+def sealed_transaction_view(tx: Dict, block, position: int, height: Optional[int] = None) -> Dict:
+    """Cópia da transação selada com a localização (bloco, shard, posição) e confirmações"""
+    view = dict(tx)
+    tx_id = _tx_id(tx)
+    view.setdefault("tx_hash", tx_id)
+    view.setdefault("hash", tx_id)
+    view.update({
+        "status": "confirmed",
+        "block_number": block.index,
+        "block_hash": block.hash,
+        "shard_id": block.shard_id,
+        "position": position,
+    })
+    if height is not None:
+        view["confirmations"] = max(height - block.index, 1)
+    return view
+
+
+def lookup_transaction(blockchain, history_store, tx_hash: str) -> Optional[Dict]:
+    """
+    Busca pontual de uma transação em qualquer profundidade do histórico:
+    mempool (dicionário por id) → block_transactions (bloco selado) →
+    transactions_history (chave primária). None se não estiver em nenhum.
+    """
+    mempool = getattr(blockchain, "mempool", None)
+    if mempool is not None:
+        tx = mempool.get(tx_hash)
+        if tx is not None:
+            return dict(tx, status=tx.get("status", "pending"))
+    else:
+        # Nó sem mempool: pendentes em lista ou {shard: lista}
+        pending = getattr(blockchain, "pending_transactions", None) or []
+        for shard_pending in (pending.values() if isinstance(pending, dict) else [pending]):
+            for tx in shard_pending:
+                if isinstance(tx, dict) and tx_hash in (tx.get("id"), tx.get("tx_hash"), tx.get("hash")):
+                    return dict(tx, status=tx.get("status", "pending"))
+
+    if hasattr(blockchain, "get_sealed_transaction"):
+        sealed = blockchain.get_sealed_transaction(tx_hash)
+        if sealed is not None:
+            tx, block, position = sealed
+            return sealed_transaction_view(tx, block, position, len(blockchain.shards[block.shard_id]))
+
+    if history_store is not None:
+        tx = history_store.get_transaction(tx_hash)
+        if tx:
+            tx["hash"] = tx["tx_hash"] = tx["id"]
+            tx.setdefault("status", "confirmed")
+            return tx
+    return None
+
+
+def lookup_block(blockchain, block_hash: Optional[str] = None, block_index: Optional[int] = None,
+                 shard_id: Optional[int] = None):
+    """
+    Bloco pelo hash (índice block_hashes) ou pela altura. A altura é por
+    shard: sem shard_id, o primeiro shard (em ordem) que já chegou a ela.
+    """
+    if block_hash is not None:
+        if hasattr(blockchain, "get_block_by_hash"):
+            return blockchain.get_block_by_hash(block_hash)
+        for block in getattr(blockchain, "chain", []):
+            current = block.get("hash") if isinstance(block, dict) else getattr(block, "hash", None)
+            if current == block_hash:
+                return block
+        return None
+
+    shards = getattr(blockchain, "shards", None)
+    if shards is not None and block_index is not None and block_index >= 0:
+        candidates = [shard_id] if shard_id is not None else sorted(shards)
+        for candidate in candidates:
+            chain = shards.get(candidate)
+            if chain is not None and block_index < len(chain):
+                return chain[block_index]
+        return None
+    chain = getattr(blockchain, "chain", [])
+    return chain[block_index] if block_index is not None and 0 <= block_index < len(chain) else None
+
 
 class TestnetExplorer:
     def __init__(self, blockchain_instance):
         self.blockchain = blockchain_instance
+        self._tx_history = None
+    
+    def _history_store(self):
+        """Histórico indexado do nó (ou um sobre o DBManager compartilhado)"""
+        if self._tx_history is None:
+            self._tx_history = getattr(self.blockchain, "tx_history", None)
+            if self._tx_history is None:
+                from db_manager import get_db_manager
+                from transaction_history import TransactionHistoryStore
+                self._tx_history = TransactionHistoryStore(get_db_manager())
+        return self._tx_history
     
     def get_recent_blocks(self, limit: int = 20) -> List[Dict]:
         """Retorna blocos recentes"""
@@ -56,15 +152,16 @@ class TestnetExplorer:
     def get_block_by_hash(self, block_hash: str) -> Optional[Dict]:
         """Retorna um bloco específico pelo hash"""
         try:
-            if hasattr(self.blockchain, 'chain'):
-                for block in self.blockchain.chain:
-                    if isinstance(block, dict):
-                        if block.get("hash") == block_hash:
-                            return self._format_block(block)
-                    elif hasattr(block, 'hash'):
-                        if block.hash == block_hash:
-                            return self._format_block(block)
+            block = lookup_block(self.blockchain, block_hash=block_hash)
+            return self._format_block(block) if block is not None else None
+        except Exception:
             return None
+    
+    def get_block_by_index(self, block_index: int, shard_id: Optional[int] = None) -> Optional[Dict]:
+        """Retorna um bloco pela altura (no shard informado ou no primeiro que a tem)"""
+        try:
+            block = lookup_block(self.blockchain, block_index=block_index, shard_id=shard_id)
+            return self._format_block(block) if block is not None else None
         except Exception:
             return None
     
@@ -78,33 +175,15 @@ class TestnetExplorer:
                 if isinstance(self.blockchain.pending_transactions, dict):
                     # pending_transactions é um dicionário por shard: {0: [], 1: [], ...}
                     for shard_id, shard_pending in self.blockchain.pending_transactions.items():
-                        if isinstance(shard_pending, list):
+                        if isinstance(shard_pending, (list, ShardPendingView)):
                             transactions.extend(shard_pending)
                 elif isinstance(self.blockchain.pending_transactions, list):
                     # Fallback: se for lista (compatibilidade)
                     transactions.extend(self.blockchain.pending_transactions)
             
-            # 2. Obter transações do banco de dados (transactions_history)
+            # 2. Obter transações do banco de dados: uma página do feed indexado
             try:
-                from db_manager import DBManager
-                db_manager = DBManager()
-                db_txs = db_manager.execute_query(
-                    "SELECT id, sender, receiver, amount, type, timestamp, network, is_public FROM transactions_history ORDER BY timestamp DESC LIMIT ?",
-                    (limit * 2,)  # Buscar mais para ter opções
-                )
-                
-                for tx_row in db_txs:
-                    tx_id, sender, receiver, amount, tx_type, timestamp, network, is_public = tx_row
-                    transactions.append({
-                        "id": tx_id,
-                        "sender": sender,
-                        "receiver": receiver,
-                        "amount": amount,
-                        "type": tx_type,
-                        "timestamp": timestamp,
-                        "network": network or "allianza",
-                        "is_public": bool(is_public) if is_public is not None else True
-                    })
+                transactions.extend(self._history_store().get_page(limit=limit)["transactions"])
             except Exception as db_err:
                 # Se falhar ao buscar do banco, continuar sem essas transações
                 pass
@@ -139,28 +218,26 @@ class TestnetExplorer:
     def get_transaction_by_hash(self, tx_hash: str) -> Optional[Dict]:
         """Retorna uma transação específica pelo hash"""
         try:
-            # Procurar em transações pendentes
-            if hasattr(self.blockchain, 'pending_transactions'):
-                for tx in self.blockchain.pending_transactions:
-                    if isinstance(tx, dict):
-                        if tx.get("tx_hash") == tx_hash or tx.get("hash") == tx_hash:
-                            return self._format_transaction(tx)
-            
-            # Procurar nos blocos
-            blocks = self.get_recent_blocks(limit=100)
-            for block in blocks:
-                transactions = block.get("transactions", [])
-                for tx in transactions:
-                    if isinstance(tx, dict):
-                        if tx.get("tx_hash") == tx_hash or tx.get("hash") == tx_hash:
-                            return self._format_transaction(tx)
-            
-            return None
+            tx = lookup_transaction(self.blockchain, self._history_store(), tx_hash)
+            return self._format_transaction(tx) if tx is not None else None
         except Exception:
             return None
-    
+
+    def _pending_count(self) -> int:
+        mempool = getattr(self.blockchain, "mempool", None)
+        if mempool is not None:
+            return len(mempool)
+        pending = getattr(self.blockchain, "pending_transactions", None)
+        if isinstance(pending, dict):
+            return sum(len(shard_pending) for shard_pending in pending.values())
+        return len(pending) if pending is not None else 0
+
     def get_network_stats(self) -> Dict:
         """Retorna estatísticas detalhadas da rede"""
+        # Nó com agregador incremental: contadores prontos, sem varrer blocos/transações
+        aggregator = getattr(self.blockchain, "network_stats", None)
+        if aggregator is not None:
+            return aggregator.get_stats(pending_transactions=self._pending_count())
         try:
             blocks = self.get_recent_blocks(limit=1000)
             transactions = self.get_recent_transactions(limit=1000)
@@ -211,7 +288,7 @@ class TestnetExplorer:
             return {
                 "total_blocks": len(blocks) if blocks else 0,
                 "total_transactions": len(transactions) if transactions else 0,
-                "pending_transactions": len(self.blockchain.pending_transactions) if hasattr(self.blockchain, 'pending_transactions') else 0,
+                "pending_transactions": self._pending_count(),
                 "tps_current": round(tps_current, 2),
                 "tps_24h_avg": round(tps_24h, 2),
                 "latency_avg_ms": round(avg_latency * 1000, 2) if avg_latency else 0,
@@ -477,7 +554,60 @@ class TestnetExplorer:
             valid_count += 1
         
         return valid_count >= 2
-    
+
+    def _get_relative_time(self, timestamp: float) -> str:
+        """Retorna tempo relativo (ex: 'há 2 minutos')"""
+        if not timestamp:
+            return "unknown"
+
+        try:
+            delta = (datetime.now() - datetime.fromtimestamp(timestamp)).total_seconds()
+            if delta < 60:
+                return f"há {int(delta)}s"
+            elif delta < 3600:
+                return f"há {int(delta / 60)}min"
+            elif delta < 86400:
+                return f"há {int(delta / 3600)}h"
+            return f"há {int(delta / 86400)}d"
+        except Exception:
+            return "unknown"
+
+    def _format_amount(self, amount: float) -> str:
+        """Formata valor de forma legível"""
+        if amount >= 1_000_000:
+            return f"{amount / 1_000_000:.2f}M"
+        elif amount >= 1_000:
+            return f"{amount / 1_000:.2f}K"
+        else:
+            return f"{amount:.6f}"
+
+    def _get_status_color(self, status: str) -> str:
+        """Retorna cor do status"""
+        colors = {
+            "confirmed": "green",
+            "pending": "yellow",
+            "failed": "red",
+            "error": "red"
+        }
+        return colors.get(status.lower(), "gray")
+
+    def _get_explorer_url(self, tx_hash: str, chain: str = None) -> Optional[str]:
+        """Retorna URL do explorer externo"""
+        if not chain:
+            return None
+        
+        explorers = {
+            "polygon": f"https://amoy.polygonscan.com/tx/{tx_hash}",
+            "ethereum": f"https://sepolia.etherscan.io/tx/{tx_hash}",
+            "bsc": f"https://testnet.bscscan.com/tx/{tx_hash}",
+            "bitcoin": f"https://blockstream.info/testnet/tx/{tx_hash}",
+            "solana": f"https://explorer.solana.com/tx/{tx_hash}?cluster=testnet",
+            "base": f"https://sepolia.basescan.org/tx/{tx_hash}",
+            "avalanche": f"https://testnet.snowtrace.io/tx/{tx_hash}"
+        }
+        
+        return explorers.get(chain.lower())
+
     def _get_blocks_from_db(self, limit: int) -> List[Dict]:
         """Tenta obter blocos do banco de dados"""
         try:
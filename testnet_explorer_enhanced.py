@@ -8,6 +8,8 @@ Versão aprimorada com informações detalhadas de cross-chain, PQC, e métricas
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import time
+from mempool import ShardPendingView
+from testnet_explorer import lookup_block, lookup_transaction
 
 class EnhancedTestnetExplorer:
     """Explorer melhorado com informações detalhadas"""
@@ -21,6 +23,17 @@ class EnhancedTestnetExplorer:
         self._stats_cache = {}
         self._cache_timestamp = 0
         self._cache_ttl = 30  # 30 segundos
+        self._tx_history = None
+    
+    def _history_store(self):
+        """Histórico indexado do nó (ou um sobre o DBManager compartilhado)"""
+        if self._tx_history is None:
+            self._tx_history = getattr(self.blockchain, "tx_history", None)
+            if self._tx_history is None:
+                from db_manager import get_db_manager
+                from transaction_history import TransactionHistoryStore
+                self._tx_history = TransactionHistoryStore(get_db_manager())
+        return self._tx_history
     
     # =========================================================================
     # MÉTODOS MELHORADOS DE BLOCOS
@@ -128,6 +141,22 @@ class EnhancedTestnetExplorer:
                 "transactions": []
             }
     
+    def get_block_by_hash(self, block_hash: str) -> Optional[Dict]:
+        """Retorna um bloco pelo hash (índice block_hashes)"""
+        try:
+            block = lookup_block(self.blockchain, block_hash=block_hash)
+            return self._format_block_enhanced(block) if block is not None else None
+        except Exception:
+            return None
+    
+    def get_block_by_index(self, block_index: int, shard_id: Optional[int] = None) -> Optional[Dict]:
+        """Retorna um bloco pela altura (no shard informado ou no primeiro que a tem)"""
+        try:
+            block = lookup_block(self.blockchain, block_index=block_index, shard_id=shard_id)
+            return self._format_block_enhanced(block) if block is not None else None
+        except Exception:
+            return None
+    
     # =========================================================================
     # MÉTODOS MELHORADOS DE TRANSAÇÕES
     # =========================================================================
@@ -135,60 +164,9 @@ class EnhancedTestnetExplorer:
     def get_transaction_by_hash(self, tx_hash: str) -> Optional[Dict]:
         """Retorna uma transação específica pelo hash"""
         try:
-            # 1. Procurar em transações pendentes de todos os shards
-            if hasattr(self.blockchain, 'pending_transactions'):
-                if isinstance(self.blockchain.pending_transactions, dict):
-                    # pending_transactions é um dicionário por shard
-                    for shard_id, shard_pending in self.blockchain.pending_transactions.items():
-                        if isinstance(shard_pending, list):
-                            for tx in shard_pending:
-                                if isinstance(tx, dict):
-                                    if tx.get("id") == tx_hash or tx.get("tx_hash") == tx_hash or tx.get("hash") == tx_hash:
-                                        return self._format_transaction_enhanced(tx)
-                elif isinstance(self.blockchain.pending_transactions, list):
-                    # Fallback: se for lista
-                    for tx in self.blockchain.pending_transactions:
-                        if isinstance(tx, dict):
-                            if tx.get("id") == tx_hash or tx.get("tx_hash") == tx_hash or tx.get("hash") == tx_hash:
-                                return self._format_transaction_enhanced(tx)
-            
-            # 2. Procurar no banco de dados
-            try:
-                from db_manager import DBManager
-                db_manager = DBManager()
-                db_txs = db_manager.execute_query(
-                    "SELECT id, sender, receiver, amount, type, timestamp, network, is_public FROM transactions_history WHERE id = ?",
-                    (tx_hash,)
-                )
-                if db_txs:
-                    tx_id, sender, receiver, amount, tx_type, timestamp, network, is_public = db_txs[0]
-                    tx = {
-                        "id": tx_id,
-                        "hash": tx_id,
-                        "tx_hash": tx_id,
-                        "sender": sender,
-                        "receiver": receiver,
-                        "amount": amount,
-                        "type": tx_type,
-                        "timestamp": timestamp,
-                        "network": network or "allianza",
-                        "is_public": bool(is_public) if is_public is not None else True
-                    }
-                    return self._format_transaction_enhanced(tx)
-            except Exception as db_err:
-                pass
-            
-            # 3. Procurar nos blocos
-            blocks = self.get_recent_blocks(limit=100)
-            for block in blocks:
-                transactions = block.get("transactions", [])
-                if isinstance(transactions, list):
-                    for tx in transactions:
-                        if isinstance(tx, dict):
-                            if tx.get("id") == tx_hash or tx.get("tx_hash") == tx_hash or tx.get("hash") == tx_hash:
-                                return self._format_transaction_enhanced(tx)
-            
-            return None
+            # Buscas pontuais: mempool → bloco selado (block_transactions) → histórico
+            tx = lookup_transaction(self.blockchain, self._history_store(), tx_hash)
+            return self._format_transaction_enhanced(tx) if tx is not None else None
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -204,35 +182,17 @@ class EnhancedTestnetExplorer:
                 if isinstance(self.blockchain.pending_transactions, dict):
                     # pending_transactions é um dicionário por shard: {0: [], 1: [], ...}
                     for shard_id, shard_pending in self.blockchain.pending_transactions.items():
-                        if isinstance(shard_pending, list):
+                        if isinstance(shard_pending, (list, ShardPendingView)):
                             transactions.extend(shard_pending)
                 elif isinstance(self.blockchain.pending_transactions, list):
                     # Fallback: se for lista (compatibilidade)
                     transactions.extend(self.blockchain.pending_transactions)
             
-            # 2. Obter transações do banco de dados (transactions_history)
+            # 2. Obter transações do banco de dados: uma página do feed indexado
             try:
-                from db_manager import DBManager
-                db_manager = DBManager()
-                db_txs = db_manager.execute_query(
-                    "SELECT id, sender, receiver, amount, type, timestamp, network, is_public FROM transactions_history ORDER BY timestamp DESC LIMIT ?",
-                    (limit * 2,)  # Buscar mais para ter opções
-                )
-                
-                for tx_row in db_txs:
-                    tx_id, sender, receiver, amount, tx_type, timestamp, network, is_public = tx_row
-                    transactions.append({
-                        "id": tx_id,
-                        "hash": tx_id,
-                        "tx_hash": tx_id,
-                        "sender": sender,
-                        "receiver": receiver,
-                        "amount": amount,
-                        "type": tx_type,
-                        "timestamp": timestamp,
-                        "network": network or "allianza",
-                        "is_public": bool(is_public) if is_public is not None else True
-                    })
+                for tx in self._history_store().get_page(limit=limit)["transactions"]:
+                    tx["hash"] = tx["tx_hash"] = tx["id"]
+                    transactions.append(tx)
             except Exception as db_err:
                 # Se falhar ao buscar do banco, continuar sem essas transações
                 pass
@@ -379,6 +339,14 @@ class EnhancedTestnetExplorer:
         if (now - self._cache_timestamp) < self._cache_ttl and self._stats_cache:
             return self._stats_cache
         
+        # Nó com agregador incremental: O(1), sem o cache de 30s
+        aggregator = getattr(self.blockchain, "network_stats", None)
+        if aggregator is not None:
+            mempool = getattr(self.blockchain, "mempool", None)
+            stats = aggregator.get_stats(pending_transactions=len(mempool) if mempool is not None else 0)
+            stats["chains_supported"] = self._get_supported_chains()
+            return stats
+        
         try:
             blocks = self.get_recent_blocks(limit=1000)
             transactions = self.get_recent_transactions(limit=1000)
@@ -433,11 +401,7 @@ class EnhancedTestnetExplorer:
             # Contar total real de transações do banco de dados
             total_transactions_real = 0
             try:
-                from db_manager import DBManager
-                db_manager = DBManager()
-                result = db_manager.execute_query("SELECT COUNT(*) FROM transactions_history", ())
-                if result:
-                    total_transactions_real = result[0][0] if isinstance(result[0], tuple) else result[0]
+                total_transactions_real = self._history_store().count()
             except Exception as db_err:
                 # Se falhar, usar contagem das transações recentes
                 total_transactions_real = len(transactions) if transactions else 0
@@ -446,7 +410,7 @@ class EnhancedTestnetExplorer:
             pending_count = 0
             if hasattr(self.blockchain, 'pending_transactions'):
                 if isinstance(self.blockchain.pending_transactions, dict):
-                    pending_count = sum(len(shard_pending) for shard_pending in self.blockchain.pending_transactions.values() if isinstance(shard_pending, list))
+                    pending_count = sum(len(shard_pending) for shard_pending in self.blockchain.pending_transactions.values() if isinstance(shard_pending, (list, ShardPendingView)))
                 elif isinstance(self.blockchain.pending_transactions, list):
                     pending_count = len(self.blockchain.pending_transactions)
             
@@ -648,6 +612,13 @@ class EnhancedTestnetExplorer:
     def search_block(self, query: str) -> Optional[Dict]:
         """Busca bloco por hash ou índice"""
         try:
+            # Hash completo ou altura: busca pontual
+            block = self.get_block_by_hash(query.lower())
+            if block is None and query.isdigit():
+                block = self.get_block_by_index(int(query))
+            if block is not None:
+                return block
+            
             # Tentar como índice
             if query.isdigit():
                 index = int(query)
@@ -669,6 +640,10 @@ class EnhancedTestnetExplorer:
     def search_transaction(self, query: str) -> Optional[Dict]:
         """Busca transação por hash"""
         try:
+            # Hash completo: busca pontual; prefixo: transações recentes
+            tx = self.get_transaction_by_hash(query)
+            if tx is not None:
+                return tx
             transactions = self.get_recent_transactions(limit=10000)
             for tx in transactions:
                 tx_hash = tx.get("tx_hash", "")
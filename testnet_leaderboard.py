@@ -3,208 +3,468 @@
 """
 🏆 Leaderboard de Contribuições - Allianza Testnet
 Sistema de gamificação para desenvolvedores
+
+Persistência: log de eventos só de acréscimo (events.<geração>.log, uma
+atividade JSON por linha) + snapshot compactado (leaderboard.json e
+activities.json). O estado em memória é sempre o replay do log, então os
+workers do gunicorn que escrevem no mesmo diretório convergem para o mesmo
+placar sem sobrescrever as escritas uns dos outros.
 """
 
+import contextlib
 import json
 import os
+import random
+import threading
+import time
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import hashlib
 
+try:
+    import fcntl
+except ImportError:  # Windows: só o lock em processo
+    fcntl = None
+
+DEFAULT_DATA_DIR = "proofs/testnet/leaderboard"
+MAX_ACTIVITIES = 100
+ACTIVITY_RETENTION = timedelta(days=7)
+COMPACT_EVERY = 1000           # Eventos no log antes de gravar um novo snapshot
+REFRESH_INTERVAL = 1.0         # Leituras olham o log de outros processos no máximo a cada N segundos
+
+# Pontos por tipo de atividade
+POINTS_MAP = {
+    "test_run": 10,
+    "test_success": 20,
+    "proof_generated": 15,
+    "qss_request": 5,
+    "first_test": 50,  # Bônus para primeiro teste
+    "first_proof": 50,  # Bônus para primeira prova
+    "all_tests_passed": 100,  # Bônus para passar todos os testes
+}
+
+BADGES_MAP = {
+    "first_test": {"name": "Primeiro Teste", "icon": "🎯", "color": "blue"},
+    "first_proof": {"name": "Primeira Prova", "icon": "🔐", "color": "green"},
+    "all_tests_passed": {"name": "Mestre dos Testes", "icon": "🏆", "color": "gold"},
+    "qss_master": {"name": "Mestre QSS", "icon": "⚡", "color": "purple"},
+    "power_user": {"name": "Power User", "icon": "💪", "color": "red"},
+}
+
+
+class _Node:
+    __slots__ = ("key", "priority", "size", "left", "right")
+
+    def __init__(self, key):
+        self.key = key
+        self.priority = random.random()
+        self.size = 1
+        self.left = None
+        self.right = None
+
+
+def _size(node) -> int:
+    return node.size if node else 0
+
+
+def _merge(a, b):
+    if not a or not b:
+        return a or b
+    if a.priority > b.priority:
+        a.right = _merge(a.right, b)
+        a.size = 1 + _size(a.left) + _size(a.right)
+        return a
+    b.left = _merge(a, b.left)
+    b.size = 1 + _size(b.left) + _size(b.right)
+    return b
+
+
+def _split(node, key):
+    """(chaves < key, chaves >= key)"""
+    if not node:
+        return None, None
+    if node.key < key:
+        left, right = _split(node.right, key)
+        node.right = left
+        node.size = 1 + _size(node.left) + _size(node.right)
+        return node, right
+    left, right = _split(node.left, key)
+    node.left = right
+    node.size = 1 + _size(node.left) + _size(node.right)
+    return left, node
+
+
+class ScoreIndex:
+    """
+    🌲 ÍNDICE DE PONTUAÇÃO (árvore de estatística de ordem)
+
+    Treap com tamanho de subárvore, chaves (-pontos, ordem de chegada):
+    a ordem em-ordem é o placar (empates pela ordem em que o usuário apareceu).
+    rank e inserção/remoção em O(log n); top(k) em O(k + log n).
+    """
+
+    def __init__(self):
+        self._root = None
+        self._keys: Dict[str, Tuple[int, int]] = {}
+        self._users: Dict[Tuple[int, int], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def update(self, user_id: str, points: int, order: int):
+        """Insere ou move o usuário para a nova pontuação"""
+        old = self._keys.get(user_id)
+        if old is not None:
+            left, rest = _split(self._root, old)
+            _, right = _split(rest, (old[0], old[1] + 1))
+            self._root = _merge(left, right)
+            del self._users[old]
+        key = (-points, order)
+        left, right = _split(self._root, key)
+        self._root = _merge(_merge(left, _Node(key)), right)
+        self._keys[user_id] = key
+        self._users[key] = user_id
+
+    def count_above(self, points: int) -> int:
+        """Quantidade de usuários com pontuação estritamente maior"""
+        probe = (-points, -1)
+        node, count = self._root, 0
+        while node:
+            if node.key < probe:
+                count += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return count
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """Posição do usuário (empatados dividem a mesma posição)"""
+        key = self._keys.get(user_id)
+        if key is None:
+            return None
+        return self.count_above(-key[0]) + 1
+
+    def top(self, limit: int) -> List[str]:
+        """IDs dos `limit` primeiros do placar"""
+        result, stack, node = [], [], self._root
+        while (stack or node) and len(result) < limit:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            result.append(self._users[node.key])
+            node = node.right
+        return result
+
+
 class TestnetLeaderboard:
     """Sistema de leaderboard para gamificar contribuições"""
-    
-    def __init__(self, data_dir: str = "proofs/testnet/leaderboard"):
+
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, compact_every: int = COMPACT_EVERY,
+                 refresh_interval: float = REFRESH_INTERVAL):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.leaderboard_file = self.data_dir / "leaderboard.json"
         self.activities_file = self.data_dir / "activities.json"
-        
+        self.lock_file = self.data_dir / ".lock"
+        self.compact_every = compact_every
+        self.refresh_interval = refresh_interval
+        self.stats = {"events_appended": 0, "events_replayed": 0, "compactions": 0, "reloads": 0}
+        self._lock = threading.RLock()
+
         # Carregar dados existentes
-        self.leaderboard = self._load_leaderboard()
-        self.activities = self._load_activities()
-    
-    def _load_leaderboard(self) -> Dict:
-        """Carregar leaderboard do arquivo"""
+        with self._lock, self._file_lock(exclusive=False):
+            self._load_snapshot()
+            self._tail_events()
+
+    # ------------------------------------------------------------------
+    # Persistência: snapshot + log de eventos
+    # ------------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def _file_lock(self, exclusive: bool, blocking: bool = True):
+        """flock no arquivo .lock: compartilhado para ler o log, exclusivo para escrever/compactar"""
+        with open(self.lock_file, "a+") as lock_file:  # Fechar libera o flock
+            if fcntl:
+                flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                try:
+                    fcntl.flock(lock_file.fileno(), flags if blocking else flags | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+            yield True
+
+    def _events_file(self, generation: int) -> Path:
+        return self.data_dir / f"events.{generation}.log"
+
+    def _snapshot_signature(self):
+        try:
+            stat = os.stat(self.leaderboard_file)
+            return stat.st_ino, stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def _load_snapshot(self):
+        """Carregar snapshot (formato antigo, sem geração, vira a geração 0)"""
+        self.leaderboard = {"users": {}, "last_updated": datetime.now().isoformat()}
+        self.activities = deque(maxlen=MAX_ACTIVITIES)
+        self.generation = 0
+        self._signature = self._snapshot_signature()
         if self.leaderboard_file.exists():
             try:
                 with open(self.leaderboard_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
+                    snapshot = json.load(f)
+                self.leaderboard = {"users": snapshot.get("users", {}),
+                                    "last_updated": snapshot.get("last_updated", datetime.now().isoformat())}
+                self.generation = snapshot.get("generation", 0)
+            except Exception:
                 pass
-        return {"users": {}, "last_updated": datetime.now().isoformat()}
-    
-    def _load_activities(self) -> List[Dict]:
-        """Carregar atividades recentes"""
         if self.activities_file.exists():
             try:
                 with open(self.activities_file, 'r', encoding='utf-8') as f:
-                    activities = json.load(f)
-                    # Filtrar atividades antigas (manter apenas últimas 100)
-                    cutoff = datetime.now() - timedelta(days=7)
-                    return [
-                        a for a in activities 
-                        if datetime.fromisoformat(a.get('timestamp', '2000-01-01')) > cutoff
-                    ][:100]
-            except:
+                    self.activities.extend(json.load(f)[-MAX_ACTIVITIES:])
+            except Exception:
                 pass
-        return []
-    
-    def _save_leaderboard(self):
-        """Salvar leaderboard"""
-        self.leaderboard["last_updated"] = datetime.now().isoformat()
-        with open(self.leaderboard_file, 'w', encoding='utf-8') as f:
-            json.dump(self.leaderboard, f, indent=2, ensure_ascii=False)
-    
-    def _save_activities(self):
-        """Salvar atividades"""
-        # Manter apenas últimas 100 atividades
-        self.activities = self.activities[-100:]
-        with open(self.activities_file, 'w', encoding='utf-8') as f:
-            json.dump(self.activities, f, indent=2, ensure_ascii=False)
-    
+
+        self._order = {user_id: order for order, user_id in enumerate(self.leaderboard["users"])}
+        self._index = ScoreIndex()
+        self._totals = {"points": 0, "tests_run": 0, "proofs_generated": 0, "qss_requests": 0}
+        for user_id, user in self.leaderboard["users"].items():
+            self._index.update(user_id, user["points"], self._order[user_id])
+            for field in self._totals:
+                self._totals[field] += user.get(field, 0)
+        self._offset = 0
+        self._pending_events = 0
+        self._last_refresh = time.monotonic()
+
+    def _tail_events(self):
+        """Aplicar as linhas novas do log (de qualquer processo), em ordem de arquivo"""
+        if self._snapshot_signature() != self._signature:
+            # Outro processo compactou: recomeçar do snapshot novo
+            self._load_snapshot()
+            self.stats["reloads"] += 1
+        try:
+            with open(self._events_file(self.generation), 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        end = data.rfind(b"\n") + 1  # Linha incompleta fica para a próxima leitura
+        for line in data[:end].splitlines():
+            if line.strip():
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError):
+                    continue
+        self._offset += end
+        self._last_refresh = time.monotonic()
+
+    def _refresh(self, force: bool = False):
+        if not force and time.monotonic() - self._last_refresh < self.refresh_interval:
+            return
+        with self._file_lock(exclusive=False):
+            self._tail_events()
+
+    def _compact(self):
+        """Snapshot do estado atual na geração seguinte; o log antigo é descartado"""
+        with self._file_lock(exclusive=True, blocking=False) as acquired:
+            if not acquired:
+                return  # Outro processo já está compactando
+            self._tail_events()
+            generation = self.generation + 1
+            self._events_file(generation).touch()
+
+            self._write_json(self.activities_file, list(self.activities))
+            self._write_json(self.leaderboard_file, {
+                "generation": generation,
+                "users": self.leaderboard["users"],
+                "last_updated": self.leaderboard["last_updated"]
+            })
+            try:
+                self._events_file(self.generation).unlink()
+            except FileNotFoundError:
+                pass
+            self.generation = generation
+            self._offset = 0
+            self._pending_events = 0
+            self._signature = self._snapshot_signature()
+            self.stats["compactions"] += 1
+
+    @staticmethod
+    def _write_json(path: Path, data):
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    # ------------------------------------------------------------------
+    # Estado
+    # ------------------------------------------------------------------
+
     def _get_user_id(self, identifier: str) -> str:
         """Gerar ID único para usuário baseado em identificador"""
         # Usar hash do identificador para privacidade
         return hashlib.sha256(identifier.encode()).hexdigest()[:16]
-    
-    def _get_or_create_user(self, identifier: str, name: Optional[str] = None) -> str:
-        """Obter ou criar usuário no leaderboard"""
-        user_id = self._get_user_id(identifier)
-        
-        if user_id not in self.leaderboard["users"]:
-            self.leaderboard["users"][user_id] = {
-                "name": name or f"User_{user_id[:8]}",
+
+    def _apply(self, activity: Dict):
+        """Aplicar uma atividade do log ao estado em memória (replay determinístico)"""
+        user_id = activity["user_id"]
+        timestamp = activity["timestamp"]
+        activity_type = activity["type"]
+        points = activity["points"]
+
+        users = self.leaderboard["users"]
+        is_new = user_id not in users
+        if is_new:
+            users[user_id] = {
+                "name": activity.get("user_name") or f"User_{user_id[:8]}",
                 "points": 0,
                 "tests_run": 0,
                 "proofs_generated": 0,
                 "qss_requests": 0,
-                "first_seen": datetime.now().isoformat(),
-                "last_active": datetime.now().isoformat(),
+                "first_seen": timestamp,
+                "last_active": timestamp,
                 "badges": []
             }
-        
-        self.leaderboard["users"][user_id]["last_active"] = datetime.now().isoformat()
-        return user_id
-    
-    def add_activity(self, activity_type: str, identifier: str, details: Dict = None):
-        """Adicionar atividade ao leaderboard"""
-        user_id = self._get_or_create_user(identifier)
-        user = self.leaderboard["users"][user_id]
-        
-        # Pontos por tipo de atividade
-        points_map = {
-            "test_run": 10,
-            "test_success": 20,
-            "proof_generated": 15,
-            "qss_request": 5,
-            "first_test": 50,  # Bônus para primeiro teste
-            "first_proof": 50,  # Bônus para primeira prova
-            "all_tests_passed": 100,  # Bônus para passar todos os testes
-        }
-        
-        points = points_map.get(activity_type, 0)
+            self._order[user_id] = len(self._order)
+        user = users[user_id]
+        user["last_active"] = timestamp
         user["points"] += points
-        
+        self._totals["points"] += points
+
         # Atualizar contadores
         if activity_type == "test_run":
             user["tests_run"] += 1
+            self._totals["tests_run"] += 1
             if user["tests_run"] == 1:
-                self._add_badge(user_id, "first_test")
+                self._add_badge(user_id, "first_test", timestamp)
         elif activity_type == "proof_generated":
             user["proofs_generated"] += 1
+            self._totals["proofs_generated"] += 1
             if user["proofs_generated"] == 1:
-                self._add_badge(user_id, "first_proof")
+                self._add_badge(user_id, "first_proof", timestamp)
         elif activity_type == "qss_request":
             user["qss_requests"] += 1
-        
-        # Adicionar à lista de atividades
+            self._totals["qss_requests"] += 1
+
+        if points or is_new:
+            self._index.update(user_id, user["points"], self._order[user_id])
+        self.activities.append(activity)
+        self.leaderboard["last_updated"] = timestamp
+        self._pending_events += 1
+        self.stats["events_replayed"] += 1
+
+    def add_activity(self, activity_type: str, identifier: str, details: Dict = None):
+        """Adicionar atividade ao leaderboard (uma linha acrescentada ao log)"""
+        user_id = self._get_user_id(identifier)
+        points = POINTS_MAP.get(activity_type, 0)
         activity = {
             "timestamp": datetime.now().isoformat(),
             "user_id": user_id,
-            "user_name": user["name"],
+            "user_name": f"User_{user_id[:8]}",
             "type": activity_type,
             "points": points,
             "details": details or {}
         }
-        self.activities.append(activity)
-        
-        # Salvar
-        self._save_leaderboard()
-        self._save_activities()
-        
+        line = (json.dumps(activity, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+
+        with self._lock:
+            with self._file_lock(exclusive=True):
+                self._tail_events()
+                fd = os.open(self._events_file(self.generation), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+                self._tail_events()  # Aplica a própria linha na ordem do arquivo
+            self.stats["events_appended"] += 1
+            if self._pending_events >= self.compact_every:
+                self._compact()
+
         return points
-    
-    def _add_badge(self, user_id: str, badge_type: str):
+
+    def compact(self):
+        """Forçar compactação (snapshot + novo log)"""
+        with self._lock:
+            self._compact()
+
+    def _add_badge(self, user_id: str, badge_type: str, earned_at: Optional[str] = None):
         """Adicionar badge ao usuário"""
         if user_id not in self.leaderboard["users"]:
             return
-        
-        badges_map = {
-            "first_test": {"name": "Primeiro Teste", "icon": "🎯", "color": "blue"},
-            "first_proof": {"name": "Primeira Prova", "icon": "🔐", "color": "green"},
-            "all_tests_passed": {"name": "Mestre dos Testes", "icon": "🏆", "color": "gold"},
-            "qss_master": {"name": "Mestre QSS", "icon": "⚡", "color": "purple"},
-            "power_user": {"name": "Power User", "icon": "💪", "color": "red"},
-        }
-        
-        badge = badges_map.get(badge_type)
+
+        badge = BADGES_MAP.get(badge_type)
         if badge and badge_type not in [b["type"] for b in self.leaderboard["users"][user_id]["badges"]]:
             self.leaderboard["users"][user_id]["badges"].append({
                 "type": badge_type,
                 "name": badge["name"],
                 "icon": badge["icon"],
                 "color": badge["color"],
-                "earned_at": datetime.now().isoformat()
+                "earned_at": earned_at or datetime.now().isoformat()
             })
-    
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
     def get_top_users(self, limit: int = 10) -> List[Dict]:
         """Obter top usuários por pontos"""
-        users = list(self.leaderboard["users"].values())
-        users.sort(key=lambda u: u["points"], reverse=True)
-        return users[:limit]
-    
+        with self._lock:
+            self._refresh()
+            return [self.leaderboard["users"][user_id] for user_id in self._index.top(limit)]
+
     def get_recent_activities(self, limit: int = 20) -> List[Dict]:
-        """Obter atividades recentes"""
-        return self.activities[-limit:][::-1]  # Reverter para mostrar mais recentes primeiro
-    
+        """Obter atividades recentes (últimos 7 dias)"""
+        with self._lock:
+            self._refresh()
+            cutoff = (datetime.now() - ACTIVITY_RETENTION).isoformat()
+            recent = [a for a in self.activities if a.get('timestamp', '') > cutoff]
+        return recent[-limit:][::-1]  # Reverter para mostrar mais recentes primeiro
+
     def get_user_stats(self, identifier: str) -> Optional[Dict]:
         """Obter estatísticas de um usuário"""
         user_id = self._get_user_id(identifier)
-        if user_id in self.leaderboard["users"]:
-            user = self.leaderboard["users"][user_id].copy()
-            user["rank"] = self._get_user_rank(user_id)
-            return user
+        with self._lock:
+            self._refresh()
+            if user_id in self.leaderboard["users"]:
+                user = self.leaderboard["users"][user_id].copy()
+                user["rank"] = self._get_user_rank(user_id)
+                return user
         return None
-    
+
     def _get_user_rank(self, user_id: str) -> int:
-        """Obter ranking do usuário"""
-        users = list(self.leaderboard["users"].values())
-        users.sort(key=lambda u: u["points"], reverse=True)
-        
-        for idx, user in enumerate(users, 1):
-            if self._get_user_id(user.get("name", "")) == user_id:
-                return idx
-        
-        return len(users) + 1
-    
+        """Obter ranking do usuário (O(log n) no índice de pontuação)"""
+        rank = self._index.rank(user_id)
+        return rank if rank is not None else len(self._index) + 1
+
     def get_stats_summary(self) -> Dict:
-        """Obter resumo de estatísticas"""
-        users = self.leaderboard["users"]
-        total_users = len(users)
-        total_points = sum(u["points"] for u in users.values())
-        total_tests = sum(u["tests_run"] for u in users.values())
-        total_proofs = sum(u["proofs_generated"] for u in users.values())
-        total_qss = sum(u["qss_requests"] for u in users.values())
-        
-        return {
-            "total_users": total_users,
-            "total_points": total_points,
-            "total_tests": total_tests,
-            "total_proofs": total_proofs,
-            "total_qss_requests": total_qss,
-            "avg_points_per_user": total_points / total_users if total_users > 0 else 0,
-            "last_updated": self.leaderboard.get("last_updated", datetime.now().isoformat())
-        }
+        """Obter resumo de estatísticas (totais mantidos incrementalmente)"""
+        with self._lock:
+            self._refresh()
+            total_users = len(self.leaderboard["users"])
+            total_points = self._totals["points"]
+            return {
+                "total_users": total_users,
+                "total_points": total_points,
+                "total_tests": self._totals["tests_run"],
+                "total_proofs": self._totals["proofs_generated"],
+                "total_qss_requests": self._totals["qss_requests"],
+                "avg_points_per_user": total_points / total_users if total_users > 0 else 0,
+                "last_updated": self.leaderboard.get("last_updated", datetime.now().isoformat())
+            }
+
+
+_leaderboards: Dict[str, TestnetLeaderboard] = {}
+_leaderboards_lock = threading.Lock()
+
 
+def get_leaderboard(data_dir: str = DEFAULT_DATA_DIR) -> TestnetLeaderboard:
+    """Leaderboard compartilhado no processo (um por diretório de dados)"""
+    key = os.path.abspath(data_dir)
+    with _leaderboards_lock:
+        leaderboard = _leaderboards.get(key)
+        if leaderboard is None:
+            leaderboard = _leaderboards[key] = TestnetLeaderboard(data_dir)
+        return leaderboard
@@ -3,16 +3,26 @@
 Gera provas em JSON, TXT e PDF (futuro)
 """
 
+import os
 import json
 import hashlib
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+
+from proof_cache import CachedProof, ProofCache, content_key
+
+# Quanto a rota espera a geração antes de responder 202 (a prova continua sendo gerada)
+PROOF_WAIT_SECONDS = float(os.getenv("TESTNET_PROOF_WAIT_SECONDS", "10"))
+# Muda a chave de todas as provas quando o formato gerado mudar
+PROOF_CACHE_VERSION = 1
 
 class TestnetProofGenerator:
     def __init__(self, blockchain_instance=None, quantum_security_instance=None):
         self.proofs_dir = Path("proofs/testnet")
         self.proofs_dir.mkdir(parents=True, exist_ok=True)
+        # Provas de bloco/transação: geradas uma vez por conteúdo, gzip, LRU com cota
+        self.cache = ProofCache(self.proofs_dir / "cache")
         # Usar gerador profissional se disponível (importação lazy para evitar circular)
         self.blockchain_instance = blockchain_instance
         self.quantum_security_instance = quantum_security_instance
@@ -43,7 +53,28 @@ class TestnetProofGenerator:
                 print(f"⚠️  Erro ao gerar prova profissional, usando fallback: {e}")
         
         # Fallback para versão básica
-        proof_data = {
+        proof_data = self._block_proof_data(block)
+        
+        if format == "json":
+            return self._save_json_proof(proof_data, f"block_{block.get('index')}")
+        elif format == "txt":
+            return self._save_txt_proof(proof_data, f"block_{block.get('index')}")
+        else:
+            return proof_data
+    
+    def generate_transaction_proof(self, tx: Dict, format: str = "json") -> Dict:
+        """Gera prova de uma transação"""
+        proof_data = self._transaction_proof_data(tx)
+        
+        if format == "json":
+            return self._save_json_proof(proof_data, f"tx_{tx.get('tx_hash', 'unknown')[:16]}")
+        elif format == "txt":
+            return self._save_txt_proof(proof_data, f"tx_{tx.get('tx_hash', 'unknown')[:16]}")
+        else:
+            return proof_data
+    
+    def _block_proof_data(self, block: Dict) -> Dict:
+        return {
             "type": "block_proof",
             "timestamp": datetime.utcnow().isoformat(),
             "block": {
@@ -62,17 +93,9 @@ class TestnetProofGenerator:
                 "version": "1.0.0"
             }
         }
-        
-        if format == "json":
-            return self._save_json_proof(proof_data, f"block_{block.get('index')}")
-        elif format == "txt":
-            return self._save_txt_proof(proof_data, f"block_{block.get('index')}")
-        else:
-            return proof_data
     
-    def generate_transaction_proof(self, tx: Dict, format: str = "json") -> Dict:
-        """Gera prova de uma transação"""
-        proof_data = {
+    def _transaction_proof_data(self, tx: Dict) -> Dict:
+        return {
             "type": "transaction_proof",
             "timestamp": datetime.utcnow().isoformat(),
             "transaction": {
@@ -90,13 +113,52 @@ class TestnetProofGenerator:
                 "version": "1.0.0"
             }
         }
+    
+    # =========================================================================
+    # ARQUIVOS DE PROVA EM CACHE (bloco / transação)
+    # =========================================================================
+    
+    def _cached_proof(self, kind: str, proof_data: Dict, format: str, build, wait: Optional[float],
+                      professional: bool = False) -> Optional[CachedProof]:
+        # Chave: conteúdo da prova sem o horário de geração
+        content = {k: v for k, v in proof_data.items() if k != "timestamp"}
+        key = content_key(kind, format, professional, PROOF_CACHE_VERSION, content)
+        return self.cache.get_or_build(key, format, build, wait=wait)
+    
+    def _render(self, proof_data: Dict, format: str) -> bytes:
+        if format == "txt":
+            return self._txt_proof_bytes(proof_data)[0]
+        return self._json_proof_bytes(proof_data)[0]
+    
+    def block_proof_file(self, block: Dict, format: str = "json",
+                         wait: Optional[float] = PROOF_WAIT_SECONDS) -> Optional[CachedProof]:
+        """
+        Arquivo de prova do bloco (json/txt), gerado uma vez por conteúdo em
+        segundo plano. None se não ficou pronto em `wait` segundos.
+        """
+        proof_data = self._block_proof_data(block)
+        professional = format == "json" and self.professional is not None
         
-        if format == "json":
-            return self._save_json_proof(proof_data, f"tx_{tx.get('tx_hash', 'unknown')[:16]}")
-        elif format == "txt":
-            return self._save_txt_proof(proof_data, f"tx_{tx.get('tx_hash', 'unknown')[:16]}")
-        else:
-            return proof_data
+        def build() -> bytes:
+            if professional:
+                try:
+                    result = self.professional.generate_professional_block_proof(block, format)
+                    path = Path(result["filepath"])
+                    data = path.read_bytes()
+                    path.unlink()  # O cache guarda a cópia comprimida
+                    return data
+                except Exception as e:
+                    print(f"⚠️  Erro ao gerar prova profissional, usando fallback: {e}")
+            return self._render(proof_data, format)
+        
+        return self._cached_proof("block_proof", proof_data, format, build, wait, professional)
+    
+    def transaction_proof_file(self, tx: Dict, format: str = "json",
+                               wait: Optional[float] = PROOF_WAIT_SECONDS) -> Optional[CachedProof]:
+        """Arquivo de prova da transação (json/txt), gerado uma vez por conteúdo"""
+        proof_data = self._transaction_proof_data(tx)
+        return self._cached_proof("transaction_proof", proof_data, format,
+                                  lambda: self._render(proof_data, format), wait)
     
     def generate_test_proof(self, test_name: str, test_results: Dict, format: str = "json") -> Dict:
         """Gera prova de um teste"""
@@ -251,17 +313,21 @@ class TestnetProofGenerator:
                 "data": proof_data
             }
     
-    def _save_json_proof(self, proof_data: Dict, filename: str) -> Dict:
-        """Salva prova em formato JSON"""
-        # Adicionar hash SHA-512
+    def _json_proof_bytes(self, proof_data: Dict) -> Tuple[bytes, str]:
+        """JSON da prova com proof_hash (SHA-512 do JSON sem o hash)"""
         proof_json = json.dumps(proof_data, indent=2)
         proof_hash = hashlib.sha512(proof_json.encode()).hexdigest()
         proof_data["proof_hash"] = proof_hash
+        return json.dumps(proof_data, indent=2, ensure_ascii=False).encode("utf-8"), proof_hash
+    
+    def _save_json_proof(self, proof_data: Dict, filename: str) -> Dict:
+        """Salva prova em formato JSON"""
+        content, proof_hash = self._json_proof_bytes(proof_data)
         
         # Salvar arquivo
         filepath = self.proofs_dir / f"{filename}.json"
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(proof_data, f, indent=2, ensure_ascii=False)
+        with open(filepath, "wb") as f:
+            f.write(content)
         
         return {
             "success": True,
@@ -271,8 +337,8 @@ class TestnetProofGenerator:
             "data": proof_data
         }
     
-    def _save_txt_proof(self, proof_data: Dict, filename: str) -> Dict:
-        """Salva prova em formato TXT"""
+    def _txt_proof_bytes(self, proof_data: Dict) -> Tuple[bytes, str]:
+        """Texto da prova com a linha HASH SHA-512"""
         lines = []
         lines.append("=" * 80)
         lines.append(f"ALLIANZA TESTNET - PROVA CRIPTOGRÁFICA")
@@ -318,10 +384,16 @@ class TestnetProofGenerator:
         proof_hash = hashlib.sha512(txt_content.encode()).hexdigest()
         lines.insert(-2, f"HASH SHA-512: {proof_hash}")
         
+        return "\n".join(lines).encode("utf-8"), proof_hash
+    
+    def _save_txt_proof(self, proof_data: Dict, filename: str) -> Dict:
+        """Salva prova em formato TXT"""
+        content, proof_hash = self._txt_proof_bytes(proof_data)
+        
         # Salvar arquivo
         filepath = self.proofs_dir / f"{filename}.txt"
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write("\n".join(lines))
+        with open(filepath, "wb") as f:
+            f.write(content)
         
         return {
             "success": True,
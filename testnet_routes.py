@@ -5,6 +5,8 @@ Faucet, Explorer, Verificador QRS-3, Testes Públicos
 
 from flask import Blueprint, jsonify, request, render_template, send_file, make_response, Response
 from pathlib import Path
+import gzip
+import io
 import json
 import os
 from datetime import datetime
@@ -17,7 +19,7 @@ from testnet_wallet_generator import TestnetWalletGenerator
 from testnet_status import TestnetStatusPage
 from testnet_quantum_dashboard import QuantumSecurityDashboard
 from testnet_public_tests_interface import PublicTestsInterface
-from testnet_leaderboard import TestnetLeaderboard
+from testnet_leaderboard import get_leaderboard
 # Importar ALZ-NIEV (substitui testnet_interoperability)
 try:
     from alz_niev_interoperability import ALZNIEV
@@ -137,7 +139,7 @@ def init_testnet_routes(app, blockchain_instance, quantum_security_instance, bri
         status_page = TestnetStatusPage(blockchain_instance)
         quantum_dashboard = QuantumSecurityDashboard(quantum_security_instance, blockchain_instance)
         public_tests = PublicTestsInterface(blockchain_instance, quantum_security_instance)
-        leaderboard = TestnetLeaderboard()
+        leaderboard = get_leaderboard()
         
         # Inicializar ALZ-NIEV (substitui testnet_interoperability)
         if ALZ_NIEV_AVAILABLE and ALZNIEV:
@@ -708,6 +710,52 @@ def api_network_stats():
 # API - PROVAS
 # =============================================================================
 
+PROOF_FILE_FORMATS = ("json", "txt")
+
+def _proof_wait():
+    """?wait=N: quanto esperar a geração antes do 202 (0 = só consulta o cache)"""
+    wait = request.args.get('wait', type=float)
+    return None if wait is None else max(0.0, min(wait, 60.0))
+
+def _send_cached_proof(entry, download_name):
+    """
+    Serve uma prova do cache: ETag = chave do conteúdo (304 em If-None-Match)
+    e Range. Cliente que aceita gzip recebe o arquivo do cache sem descomprimir.
+    """
+    if entry is None:
+        # Geração continua em segundo plano; o cliente repete o pedido
+        response = jsonify({"success": False, "status": "pending",
+                            "error": "Prova em geração, tente novamente"})
+        response.status_code = 202
+        response.headers['Retry-After'] = '2'
+        return response
+    
+    try:
+        # Aberto uma vez e servido por este handle: um despejo pela cota depois daqui não o afeta
+        handle = open(entry.path, "rb")
+    except FileNotFoundError:
+        # Despejado entre o get do cache e o envio: o próximo pedido gera de novo
+        return _send_cached_proof(None, download_name)
+    
+    if 'gzip' in request.headers.get('Accept-Encoding', '') and not request.range:
+        response = send_file(handle, mimetype=entry.mimetype, as_attachment=True,
+                             download_name=download_name, etag=f"{entry.key}-gz",
+                             conditional=True, last_modified=entry.mtime)
+        response.headers['Content-Encoding'] = 'gzip'
+        if response.status_code == 200:
+            # Handle em vez de caminho: send_file não sabe o tamanho
+            response.content_length = os.fstat(handle.fileno()).st_size
+    else:
+        with handle, gzip.GzipFile(fileobj=handle) as f:
+            data = f.read()
+        response = send_file(io.BytesIO(data), mimetype=entry.mimetype, as_attachment=True,
+                             download_name=download_name, etag=entry.key,
+                             conditional=True, last_modified=entry.mtime)
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Mesmo conteúdo, mesma chave: a prova não muda
+    response.headers['Cache-Control'] = 'public, max-age=86400, immutable'
+    return response
+
 @testnet_bp.route('/api/proofs/block/<int:block_index>', methods=['GET'])
 def api_block_proof(block_index):
     """Gera e retorna prova de um bloco"""
@@ -716,24 +764,22 @@ def api_block_proof(block_index):
     if not explorer:
         return jsonify({"error": "Explorer não inicializado"}), 500
     
-    blocks = explorer.get_recent_blocks(limit=block_index + 10)
-    block = None
-    for b in blocks:
-        if b.get("index") == block_index:
-            block = b
-            break
+    # Altura é por shard: ?shard=N escolhe o shard (padrão: o primeiro que a tem)
+    block = explorer.get_block_by_index(block_index, shard_id=request.args.get('shard', type=int))
     
     if not block:
         return jsonify({"error": "Bloco não encontrado"}), 404
     
-    proof = proof_generator.generate_block_proof(block, format=format_type) if proof_generator else None
+    if not proof_generator:
+        return jsonify(None), 200
     
-    if proof and format_type == "json":
-        return send_file(proof["filepath"], mimetype='application/json')
-    elif proof and format_type == "txt":
-        return send_file(proof["filepath"], mimetype='text/plain')
-    else:
-        return jsonify(proof), 200
+    if format_type in PROOF_FILE_FORMATS:
+        wait = _proof_wait()
+        entry = (proof_generator.block_proof_file(block, format=format_type) if wait is None
+                 else proof_generator.block_proof_file(block, format=format_type, wait=wait))
+        return _send_cached_proof(entry, f"block_proof_{block.get('shard_id')}_{block_index}.{format_type}")
+    
+    return jsonify(proof_generator.generate_block_proof(block, format=format_type)), 200
 
 @testnet_bp.route('/api/proofs/transaction/<tx_hash>', methods=['GET'])
 def api_transaction_proof(tx_hash):
@@ -744,37 +790,11 @@ def api_transaction_proof(tx_hash):
         if not explorer:
             return jsonify({"error": "Explorer não inicializado"}), 500
         
-        # Buscar transação
+        # Buscas pontuais: mempool, bloco selado (block_transactions) e histórico
         tx = explorer.get_transaction_by_hash(tx_hash)
         if not tx:
-            # Tentar buscar do banco de dados como fallback
-            try:
-                from db_manager import DBManager
-                db_manager = DBManager()
-                db_txs = db_manager.execute_query(
-                    "SELECT id, sender, receiver, amount, type, timestamp, network, is_public FROM transactions_history WHERE id = ?",
-                    (tx_hash,)
-                )
-                if db_txs:
-                    tx_id, sender, receiver, amount, tx_type, timestamp, network, is_public = db_txs[0]
-                    tx = {
-                        "id": tx_id,
-                        "hash": tx_id,
-                        "tx_hash": tx_id,
-                        "sender": sender,
-                        "receiver": receiver,
-                        "amount": amount,
-                        "type": tx_type,
-                        "timestamp": timestamp,
-                        "network": network or "allianza",
-                        "is_public": bool(is_public) if is_public is not None else True
-                    }
-                else:
-                    return jsonify({"error": "Transação não encontrada"}), 404
-            except Exception as db_err:
-                return jsonify({"error": f"Transação não encontrada: {str(db_err)}"}), 404
+            return jsonify({"error": "Transação não encontrada"}), 404
         
-        # Gerar prova
         if not proof_generator:
             # Se não tem proof_generator, retornar JSON simples da transação
             response = make_response(jsonify({
@@ -786,51 +806,13 @@ def api_transaction_proof(tx_hash):
             response.headers['Content-Disposition'] = f'attachment; filename=transaction_proof_{tx_hash}.json'
             return response
         
-        proof = proof_generator.generate_transaction_proof(tx, format=format_type)
+        if format_type in PROOF_FILE_FORMATS:
+            wait = _proof_wait()
+            entry = (proof_generator.transaction_proof_file(tx, format=format_type) if wait is None
+                     else proof_generator.transaction_proof_file(tx, format=format_type, wait=wait))
+            return _send_cached_proof(entry, f"transaction_proof_{tx_hash}.{format_type}")
         
-        if not proof:
-            # Fallback: retornar JSON da transação
-            response = make_response(jsonify({
-                "transaction": tx,
-                "proof_type": "simple",
-                "generated_at": datetime.utcnow().isoformat()
-            }))
-            response.headers['Content-Type'] = 'application/json'
-            response.headers['Content-Disposition'] = f'attachment; filename=transaction_proof_{tx_hash}.json'
-            return response
-        
-        # Verificar se é download de arquivo ou JSON direto
-        if format_type == "json":
-            if isinstance(proof, dict) and "filepath" in proof:
-                proof_path = Path(proof["filepath"])
-                if proof_path.exists():
-                    return send_file(
-                        str(proof_path),
-                        mimetype='application/json',
-                        as_attachment=True,
-                        download_name=f"transaction_proof_{tx_hash}.json"
-                    )
-                else:
-                    # Arquivo não existe, retornar JSON direto
-                    return jsonify(proof), 200
-            else:
-                # Proof é dict direto, retornar como JSON
-                response = make_response(jsonify(proof))
-                response.headers['Content-Type'] = 'application/json'
-                response.headers['Content-Disposition'] = f'attachment; filename=transaction_proof_{tx_hash}.json'
-                return response
-        elif format_type == "txt":
-            if isinstance(proof, dict) and "filepath" in proof:
-                proof_path = Path(proof["filepath"])
-                if proof_path.exists():
-                    return send_file(
-                        str(proof_path),
-                        mimetype='text/plain',
-                        as_attachment=True,
-                        download_name=f"transaction_proof_{tx_hash}.txt"
-                    )
-            # Fallback para JSON
-            return jsonify(proof), 200
+        return jsonify(proof_generator.generate_transaction_proof(tx, format=format_type)), 200
         
     except Exception as e:
         import traceback
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💱 Microbenchmark do Motor AMM
+Vazão (swaps/s) da execução de swaps, sem a assinatura QRS-3:
+- ANTES: taxa float liquidity[to]/liquidity[from] + dict anexado a uma lista
+- DEPOIS: AMMEngine (x*y=k inteiro) com SwapLog colunar em disco,
+          rota de 2 pools e leilão em lote por bloco
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from amm_engine import AMMEngine, SwapLog, UNIT
+
+SWAPS = 100_000
+BLOCK_ORDERS = 5_000
+
+
+def legacy_swaps(count):
+    liquidity = {"ALZ": 1_000_000.0, "USDT": 500_000.0}
+    swaps = []
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for i in range(count):
+        amount = rng.uniform(1, 100)
+        rate = liquidity.get("USDT", 0) / liquidity.get("ALZ", 1)
+        swaps.append({
+            "swap_id": f"swap_{i}", "pool_id": "pool", "from_token": "ALZ", "to_token": "USDT",
+            "amount_in": amount, "amount_out": amount * rate * 0.997, "timestamp": time.time()
+        })
+    return time.perf_counter() - start
+
+
+def _engine(directory):
+    engine = AMMEngine(SwapLog(directory))
+    engine.create_pool("ALZ", "USDT", 1_000_000_000 * UNIT, 500_000_000 * UNIT, pool_id="ALZ-USDT")
+    engine.create_pool("ALZ", "ETH", 1_000_000_000 * UNIT, 250_000 * UNIT, pool_id="ALZ-ETH")
+    engine.create_pool("ETH", "USDT", 250_000 * UNIT, 500_000_000 * UNIT, pool_id="ETH-USDT")
+    return engine
+
+
+def _amounts(count):
+    rng = random.Random(1)
+    return [rng.randrange(1, 100) * UNIT for _ in range(count)], [rng.random() < 0.5 for _ in range(count)]
+
+
+def engine_swaps(directory, count):
+    engine = _engine(directory)
+    amounts, sides = _amounts(count)
+    start = time.perf_counter()
+    for amount, sell_alz in zip(amounts, sides):
+        engine.swap("ALZ-USDT", "ALZ" if sell_alz else "USDT", amount)
+    engine.swap_log.flush()
+    return time.perf_counter() - start, engine
+
+
+def routed_swaps(directory, count):
+    engine = _engine(directory)
+    amounts, _ = _amounts(count)
+    start = time.perf_counter()
+    for amount in amounts:
+        engine.swap_route("ALZ", "USDT", amount, max_hops=2)
+    engine.swap_log.flush()
+    return time.perf_counter() - start
+
+
+def batched_swaps(directory, count):
+    engine = _engine(directory)
+    amounts, sides = _amounts(count)
+    start = time.perf_counter()
+    for i, (amount, sell_alz) in enumerate(zip(amounts, sides), 1):
+        engine.submit_order("ALZ-USDT", "ALZ" if sell_alz else "USDT", amount)
+        if i % BLOCK_ORDERS == 0:
+            engine.clear_block()
+    engine.clear_block()
+    engine.swap_log.flush()
+    return time.perf_counter() - start
+
+
+def main(count=SWAPS):
+    print("=" * 70)
+    print("💱 MICROBENCHMARK DO MOTOR AMM")
+    print("=" * 70)
+    print(f"   Swaps: {count:,}  Ordens por bloco (lote): {BLOCK_ORDERS:,}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_s = legacy_swaps(count)
+        swap_s, engine = engine_swaps(os.path.join(directory, "swap"), count)
+        route_s = routed_swaps(os.path.join(directory, "route"), count)
+        batch_s = batched_swaps(os.path.join(directory, "batch"), count)
+        log_bytes = sum(os.path.getsize(os.path.join(directory, "swap", name))
+                        for name in os.listdir(os.path.join(directory, "swap")))
+        logged = len(engine.swap_log)
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "swaps": count,
+        "legacy_float_swaps_per_s": round(count / legacy_s),
+        "engine_swaps_per_s": round(count / swap_s),
+        "routed_2hop_swaps_per_s": round(count / route_s),
+        "batch_auction_swaps_per_s": round(count / batch_s),
+        "swap_log_bytes_per_swap": round(log_bytes / logged, 1)
+    }
+    print(f"   Legado (float, sem reservas):  {results['legacy_float_swaps_per_s']:>10,} swaps/s")
+    print(f"   AMMEngine.swap:                {results['engine_swaps_per_s']:>10,} swaps/s")
+    print(f"   Rota 2 pools:                  {results['routed_2hop_swaps_per_s']:>10,} swaps/s")
+    print(f"   Leilão em lote:                {results['batch_auction_swaps_per_s']:>10,} swaps/s")
+    print(f"   Log colunar:                   {results['swap_log_bytes_per_swap']:>10} bytes/swap")
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📦 Microbenchmark do Codec de Blocos
+Custo de hash + persistência de um bloco com 1.000 transações:
+- ANTES: json.dumps(sort_keys=True) do bloco inteiro para o hash
+         + json.dumps(transactions) de novo para o TEXT em shards
+- DEPOIS: cada transação codificada uma vez em CBOR canônico,
+          hash = SHA-256(cabeçalho + raiz de Merkle), corpo gravado como BLOB
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+from uuid import uuid4
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import block_codec
+from db_manager import DBManager
+
+TXS_PER_BLOCK = 1000
+
+
+def _make_transactions(count, seed):
+    base = 1_760_000_000.0
+    return [{
+        "id": str(uuid4()),
+        "sender": f"ALZ1sender{(seed * count + i) % 5000:031d}",
+        "receiver": f"ALZ1receiver{i % 977:029d}",
+        "amount": float(1 + i % 50),
+        "timestamp": base + seed + i * 1e-3,
+        "type": "transfer",
+        "is_public": True,
+        "network": "allianza",
+        "signature": hashlib.sha512(f"{seed}-{i}".encode()).hexdigest() * 2,
+    } for i in range(count)]
+
+
+def legacy_block(shard_id, index, previous_hash, transactions, timestamp, validator):
+    """Block.calculate_hash + save_block_to_db antes do codec"""
+    block_data = {
+        "shard_id": shard_id,
+        "index": index,
+        "previous_hash": previous_hash,
+        "transactions": transactions,
+        "timestamp": timestamp,
+        "validator": validator
+    }
+    block_hash = hashlib.sha256(json.dumps(block_data, sort_keys=True).encode()).hexdigest()
+    return block_hash, json.dumps(transactions)
+
+
+def codec_block(shard_id, index, previous_hash, transactions, timestamp, validator):
+    """Block.calculate_hash + body_bytes com o codec"""
+    body, encoded = block_codec.encode_transactions(transactions)
+    tx_root = block_codec.merkle_root([block_codec.hash_leaf(tx) for tx in encoded])
+    header = block_codec.encode_block_header(shard_id, index, previous_hash, timestamp,
+                                             validator, tx_root, len(transactions))
+    return block_codec.hash_header(header), body
+
+
+def bench(directory, name, build, blocks):
+    db = DBManager(db_path=os.path.join(directory, name))
+    hash_time = persist_time = 0.0
+    stored_bytes = 0
+    previous_hash = "0"
+    for index in range(1, blocks + 1):
+        transactions = _make_transactions(TXS_PER_BLOCK, index)
+        timestamp = time.time()
+
+        start = time.perf_counter()
+        block_hash, payload = build(0, index, previous_hash, transactions, timestamp, "validator")
+        hash_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        db.execute_commit("INSERT INTO shards VALUES (?, ?, ?, ?, ?, ?, ?)",
+                          (0, index, previous_hash, payload, timestamp, block_hash, "validator"))
+        persist_time += time.perf_counter() - start
+
+        stored_bytes += len(payload)
+        previous_hash = block_hash
+
+    start = time.perf_counter()
+    for (payload,) in db.execute_query("SELECT transactions FROM shards"):
+        if isinstance(payload, bytes):
+            block_codec.decode_transactions(payload)
+        else:
+            json.loads(payload)
+    load_time = time.perf_counter() - start
+    db.close()
+
+    return {
+        "hash_ms_per_block": round(1000 * hash_time / blocks, 2),
+        "persist_ms_per_block": round(1000 * persist_time / blocks, 2),
+        "total_ms_per_block": round(1000 * (hash_time + persist_time) / blocks, 2),
+        "load_ms_per_block": round(1000 * load_time / blocks, 2),
+        "bytes_per_block": stored_bytes // blocks,
+    }
+
+
+def main(blocks=50):
+    print("=" * 70)
+    print("📦 MICROBENCHMARK DO CODEC DE BLOCOS")
+    print("=" * 70)
+    print(f"   Blocos: {blocks}  Transações por bloco: {TXS_PER_BLOCK:,}")
+    print()
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy = bench(directory, "json.db", legacy_block, blocks)
+        codec = bench(directory, "codec.db", codec_block, blocks)
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "blocks": blocks,
+        "txs_per_block": TXS_PER_BLOCK,
+        "json": legacy,
+        "codec": codec,
+        "speedup_hash_persist": round(legacy["total_ms_per_block"] / max(codec["total_ms_per_block"], 1e-6), 2),
+        "size_reduction_percent": round(100 * (1 - codec["bytes_per_block"] / legacy["bytes_per_block"]), 1),
+    }
+
+    print(f"   {'':<8} {'hash':>9} {'persist':>9} {'total':>9} {'load':>9} {'bytes':>10}")
+    for label, row in (("ANTES", legacy), ("DEPOIS", codec)):
+        print(f"   {label:<8} {row['hash_ms_per_block']:>7.2f}ms {row['persist_ms_per_block']:>7.2f}ms "
+              f"{row['total_ms_per_block']:>7.2f}ms {row['load_ms_per_block']:>7.2f}ms {row['bytes_per_block']:>10,}")
+    print(f"   Speedup hash+persist: {results['speedup_hash_persist']}x  "
+          f"Redução de tamanho: {results['size_reduction_percent']}%")
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💾 Benchmark de Persistência - DBManager
+Transferências/segundo em um arquivo SQLite local:
+- ANTES: journal padrão + um COMMIT por statement (4 por transferência)
+- DEPOIS: WAL + transaction() (1 COMMIT por transferência)
+- DEPOIS: WAL + group commit com várias threads (1 COMMIT por lote)
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+from uuid import uuid4
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from db_manager import DBManager
+
+NUM_WALLETS = 1000
+RESERVE = "allianza_reserve"
+
+
+def _seed(db):
+    statements = [("INSERT OR REPLACE INTO wallets (address, vtx, staked_vtx) VALUES (?, ?, ?)",
+                   (f"wallet_{i}", 1000.0, 0.0)) for i in range(NUM_WALLETS)]
+    statements.append(("INSERT OR REPLACE INTO wallets (address, vtx, staked_vtx) VALUES (?, ?, ?)",
+                       (RESERVE, 1_000_000_000.0, 0.0)))
+    db.execute_many_commit(statements)
+
+
+def _transfer_statements(i):
+    """As mesmas 4 escritas de AllianzaBlockchain.create_transaction"""
+    sender = f"wallet_{i % NUM_WALLETS}"
+    receiver = f"wallet_{(i * 7 + 1) % NUM_WALLETS}"
+    return [
+        ("UPDATE wallets SET vtx = ? WHERE address = ?", (999.0, sender)),
+        ("UPDATE wallets SET vtx = ? WHERE address = ?", (1001.0, receiver)),
+        ("UPDATE wallets SET vtx = ? WHERE address = ?", (1e9, RESERVE)),
+        ("INSERT INTO transactions_history (id, sender, receiver, amount, type, timestamp, network, is_public) "
+         "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+         (str(uuid4()), sender, receiver, 1.0, "transfer", time.time(), "allianza", True)),
+    ]
+
+
+def _new_db(directory, name, **kwargs):
+    db = DBManager(db_path=os.path.join(directory, name), **kwargs)
+    _seed(db)
+    return db
+
+
+def bench_per_statement(directory, transfers):
+    """ANTES: um COMMIT por statement, sem WAL"""
+    db = _new_db(directory, "before.db", wal=False)
+    start = time.perf_counter()
+    for i in range(transfers):
+        for query, params in _transfer_statements(i):
+            db.execute_commit(query, params)
+    elapsed = time.perf_counter() - start
+    stats = db.get_stats()
+    db.close()
+    return elapsed, stats
+
+
+def bench_wal_transaction(directory, transfers):
+    """DEPOIS: WAL + um COMMIT por transferência"""
+    db = _new_db(directory, "wal.db")
+    start = time.perf_counter()
+    for i in range(transfers):
+        with db.transaction():
+            for query, params in _transfer_statements(i):
+                db.execute_commit(query, params)
+    elapsed = time.perf_counter() - start
+    stats = db.get_stats()
+    db.close()
+    return elapsed, stats
+
+
+def bench_group_commit(directory, transfers, threads):
+    """DEPOIS: WAL + group commit com várias threads produtoras"""
+    db = _new_db(directory, f"group_{threads}.db", group_commit=True)
+    per_thread = transfers // threads
+
+    def worker(offset):
+        for i in range(offset, offset + per_thread):
+            with db.transaction():
+                for query, params in _transfer_statements(i):
+                    db.execute_commit(query, params)
+
+    workers = [threading.Thread(target=worker, args=(t * per_thread,)) for t in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    stats = db.get_stats()
+    db.close()
+    return elapsed, stats, per_thread * threads
+
+
+def main(transfers=2000):
+    print("=" * 70)
+    print("💾 BENCHMARK DE PERSISTÊNCIA - DBManager")
+    print("=" * 70)
+    print(f"   Transferências: {transfers} (4 escritas cada)")
+    print()
+
+    results = {"timestamp": datetime.now().isoformat(), "transfers": transfers, "modes": []}
+
+    with tempfile.TemporaryDirectory() as directory:
+        elapsed, stats = bench_per_statement(directory, transfers)
+        results["modes"].append({"mode": "per_statement_commit", "tps": transfers / elapsed,
+                                 "commits": stats["commits"]})
+
+        elapsed, stats = bench_wal_transaction(directory, transfers)
+        results["modes"].append({"mode": "wal_transaction", "tps": transfers / elapsed,
+                                 "commits": stats["commits"]})
+
+        for threads in (4, 16):
+            elapsed, stats, done = bench_group_commit(directory, transfers, threads)
+            results["modes"].append({"mode": f"wal_group_commit_{threads}_threads", "tps": done / elapsed,
+                                     "commits": stats["commits"],
+                                     "statements_per_commit": round(stats["statements_per_commit"], 1)})
+
+    baseline = results["modes"][0]["tps"]
+    for mode in results["modes"]:
+        mode["speedup"] = round(mode["tps"] / baseline, 2)
+        mode["tps"] = round(mode["tps"], 1)
+        print(f"   {mode['mode']:<32} {mode['tps']:>10.1f} transf/s   "
+              f"commits={mode['commits']:<6} speedup={mode['speedup']}x")
+
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔎 Benchmark das buscas do explorer (bloco por hash/altura, transação por id)
+Cadeia com SHARDS shards de BLOCKS_PER_SHARD blocos no SQLite (paginação lazy):
+- ANTES: transação = varredura dos 100 blocos mais recentes (não acha nada
+         mais antigo); prova de bloco = get_recent_blocks(block_index + 10)
+- DEPOIS: block_hashes (hash → shard, altura) e block_transactions
+          (tx_id → bloco, posição) gravados na selagem: buscas pontuais
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from db_manager import DBManager
+from state_store import StateStore
+from testnet_explorer import TestnetExplorer
+
+SHARDS = 4
+BLOCKS_PER_SHARD = 5_000
+TXS_PER_BLOCK = 10
+LOOKUPS = 200
+
+
+class BenchBlock:
+    def __init__(self, row):
+        self.shard_id, self.index, self.previous_hash, txs, self.timestamp, self.hash, self.validator = row
+        self.transactions = json.loads(txs)
+
+
+class BenchNode:
+    """Shards paginados + as mesmas buscas de AllianzaBlockchain"""
+
+    def __init__(self, db, store):
+        self.state_store = store
+        genesis = {shard_id: BenchBlock((shard_id, 0, "0", "[]", 0.0, f"genesis{shard_id}", "genesis"))
+                   for shard_id in range(SHARDS)}
+        self.shards = {shard_id: store.open_shard_chain(shard_id, genesis[shard_id], BenchBlock)
+                       for shard_id in range(SHARDS)}
+        self.pending_transactions = {shard_id: [] for shard_id in range(SHARDS)}
+        self.tx_history = None
+
+    def get_block_by_hash(self, block_hash):
+        location = self.state_store.locate_block(block_hash)
+        return self.shards[location[0]][location[1]] if location else None
+
+    def get_sealed_transaction(self, tx_id):
+        location = self.state_store.locate_transaction(tx_id)
+        if location is None:
+            return None
+        block = self.shards[location[0]][location[1]]
+        return block.transactions[location[2]], block, location[2]
+
+
+def legacy_transaction(explorer, tx_id):
+    for block in explorer.get_recent_blocks(limit=100):
+        for tx in block.get("transactions", []):
+            if tx.get("tx_hash") == tx_id:
+                return tx
+    return None
+
+
+def legacy_block_proof_lookup(explorer, block_index):
+    for block in explorer.get_recent_blocks(limit=block_index + 10):
+        if block.get("index") == block_index:
+            return block
+    return None
+
+
+def main():
+    print("=" * 70)
+    print("🔎 BENCHMARK DAS BUSCAS DO EXPLORER")
+    print("=" * 70)
+    print(f"   Shards: {SHARDS}  Blocos: {SHARDS * BLOCKS_PER_SHARD:,}  Txs: {SHARDS * BLOCKS_PER_SHARD * TXS_PER_BLOCK:,}")
+    rng = random.Random(3)
+    results = {"timestamp": datetime.now().isoformat(), "cpu_count": os.cpu_count()}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DBManager(db_path=os.path.join(tmp, "bench.db"))
+        store = StateStore(db)
+        for shard_id in range(SHARDS):
+            with db.transaction():
+                for index in range(1, BLOCKS_PER_SHARD):
+                    txs = [{"id": f"tx{shard_id}-{index}-{i}", "tx_hash": f"tx{shard_id}-{index}-{i}",
+                            "sender": "a", "receiver": "b", "amount": 1.0, "timestamp": float(index)}
+                           for i in range(TXS_PER_BLOCK)]
+                    row = (shard_id, index, f"h{shard_id}-{index - 1}", json.dumps(txs), float(index),
+                           f"h{shard_id}-{index}", "v")
+                    db.execute_commit("INSERT INTO shards VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+                    store.index_block(BenchBlock(row))
+
+        node = BenchNode(db, store)
+        explorer = TestnetExplorer(node)
+        targets = [(rng.randrange(SHARDS), rng.randrange(1, BLOCKS_PER_SHARD), rng.randrange(TXS_PER_BLOCK))
+                   for _ in range(LOOKUPS)]
+
+        start = time.perf_counter()
+        legacy_found = sum(legacy_transaction(explorer, f"tx{s}-{b}-{i}") is not None for s, b, i in targets[:20])
+        legacy_tx_ms = (time.perf_counter() - start) / 20 * 1000
+        start = time.perf_counter()
+        legacy_block_proof_lookup(explorer, BLOCKS_PER_SHARD // 2)
+        legacy_block_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        found = sum(explorer.get_transaction_by_hash(f"tx{s}-{b}-{i}") is not None for s, b, i in targets)
+        tx_ms = (time.perf_counter() - start) / LOOKUPS * 1000
+        start = time.perf_counter()
+        blocks = sum(explorer.get_block_by_hash(f"h{s}-{b}") is not None for s, b, _ in targets)
+        hash_ms = (time.perf_counter() - start) / LOOKUPS * 1000
+        start = time.perf_counter()
+        for s, b, _ in targets:
+            explorer.get_block_by_index(b, shard_id=s)
+        index_ms = (time.perf_counter() - start) / LOOKUPS * 1000
+        db.close()
+
+    results["transaction_by_id"] = {"legacy_ms": round(legacy_tx_ms, 2), "legacy_found": f"{legacy_found}/20",
+                                    "indexed_ms": round(tx_ms, 3), "indexed_found": f"{found}/{LOOKUPS}"}
+    results["block_by_hash_ms"] = round(hash_ms, 3)
+    results["block_proof_lookup_ms"] = {"legacy_recent_scan": round(legacy_block_ms, 1),
+                                        "indexed": round(index_ms, 3)}
+    print(f"   Transação por id: antes {legacy_tx_ms:.2f}ms ({legacy_found}/20 achadas)  "
+          f"depois {tx_ms:.3f}ms ({found}/{LOOKUPS} achadas)")
+    print(f"   Bloco por hash: {hash_ms:.3f}ms | bloco da prova: antes {legacy_block_ms:.1f}ms depois {index_ms:.3f}ms")
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💾 Benchmark do Cache Hierárquico
+- Hit ratio do L1 com tráfego Zipf + varreduras periódicas de chaves únicas:
+  ANTES: OrderedDict LRU sem lock | DEPOIS: stripes com admissão W-TinyLFU
+- Vazão de get/set com 1 e 8 threads (o antes não é thread-safe: só 1 thread)
+- Serializador do L2: JSON (antes) x CBOR binário (padrão) x pickle, tamanho e tempo
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import threading
+import contextlib
+import io
+from collections import OrderedDict
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hierarchical_cache import HierarchicalCache, SERIALIZERS
+
+CAPACITY = 2_000
+KEYS = 50_000
+OPERATIONS = 200_000
+SCAN_EVERY = 20_000
+SCAN_LENGTH = 5_000
+
+
+class LegacyLRU:
+    """L1 antigo: OrderedDict + move_to_end, expulsa o menos recente (mesmas estatísticas)"""
+
+    def __init__(self, max_size):
+        self.data = OrderedDict()
+        self.max_size = max_size
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+
+    def get(self, key):
+        item = self.data.get(key)
+        if item is not None:
+            if time.time() < item["expires_at"]:
+                self.data.move_to_end(key)
+                self.stats["hits"] += 1
+                return item["value"]
+            del self.data[key]
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, key, value, ttl=60):
+        self.data[key] = {"value": value, "expires_at": time.time() + ttl}
+        self.data.move_to_end(key)
+        if len(self.data) > self.max_size:
+            del self.data[next(iter(self.data))]
+            self.stats["evictions"] += 1
+        self.stats["sets"] += 1
+
+
+def _workload(seed=11):
+    """Chaves Zipf (s≈1) com varreduras periódicas de chaves nunca repetidas"""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(KEYS)]
+    zipf = rng.choices(range(KEYS), weights=weights, k=OPERATIONS)
+    keys, scan = [], 0
+    for i, rank in enumerate(zipf):
+        if i and i % SCAN_EVERY == 0:
+            keys.extend(f"scan_{scan + j}" for j in range(SCAN_LENGTH))
+            scan += SCAN_LENGTH
+        keys.append(f"balance_{rank}")
+    return keys
+
+
+def hit_ratio(cache, keys):
+    hits = 0
+    for key in keys:
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.set(key, {"key": key, "amount": 1.5}, ttl=600)
+    return hits / len(keys)
+
+
+def throughput(cache, keys, threads):
+    per_thread = len(keys) // threads
+
+    def worker(chunk):
+        for key in chunk:
+            if cache.get(key) is None:
+                cache.set(key, {"key": key, "amount": 1.5}, ttl=600)
+
+    workers = [threading.Thread(target=worker, args=(keys[n * per_thread:(n + 1) * per_thread],))
+               for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def serializer_costs(samples=20_000):
+    value = {"address": "0x" + "ab" * 20, "balance": 1234.5678, "nonce": 42,
+             "tokens": [{"symbol": "ALZ", "amount": 10.5}, {"symbol": "USDT", "amount": 3.0}]}
+    results = {}
+    for name in ("json", "cbor", "pickle"):
+        serializer = SERIALIZERS[name]
+        blob = serializer.dumps(value)
+        start = time.perf_counter()
+        for _ in range(samples):
+            serializer.loads(serializer.dumps(value))
+        results[name] = {"bytes": len(blob),
+                         "roundtrip_us": round((time.perf_counter() - start) / samples * 1e6, 2)}
+    return results
+
+
+def main():
+    print("=" * 70)
+    print("💾 BENCHMARK DO CACHE HIERÁRQUICO")
+    print("=" * 70)
+    keys = _workload()
+    print(f"   Capacidade L1: {CAPACITY:,}  Chaves: {KEYS:,}  Acessos: {len(keys):,} "
+          f"(varredura de {SCAN_LENGTH:,} a cada {SCAN_EVERY:,})")
+
+    def new_cache():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return HierarchicalCache(l1_max_size=CAPACITY, enable_l2=False)
+
+    legacy_ratio = hit_ratio(LegacyLRU(CAPACITY), keys)
+    cache = new_cache()
+    new_ratio = hit_ratio(cache, keys)
+    print(f"\n   Hit ratio L1: antes {legacy_ratio:.1%}  depois {new_ratio:.1%}")
+
+    legacy_ops = throughput(LegacyLRU(CAPACITY), keys, 1)
+    single_ops = throughput(new_cache(), keys, 1)
+    multi_ops = throughput(new_cache(), keys, 8)
+    print(f"   Vazão: antes {legacy_ops:,.0f} ops/s (1 thread, sem lock)  "
+          f"depois {single_ops:,.0f} ops/s (1 thread), {multi_ops:,.0f} ops/s (8 threads)")
+
+    serializers = serializer_costs()
+    print(f"   Serializador L2: JSON {serializers['json']}  CBOR {serializers['cbor']}  "
+          f"pickle {serializers['pickle']}")
+
+    stats = cache.get_stats()["l1"]
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "cpu_count": os.cpu_count(),
+        "capacity": CAPACITY,
+        "accesses": len(keys),
+        "hit_ratio": {"legacy_lru": round(legacy_ratio, 4), "w_tinylfu": round(new_ratio, 4)},
+        "ops_per_sec": {"legacy_1_thread": round(legacy_ops), "new_1_thread": round(single_ops),
+                        "new_8_threads": round(multi_ops)},
+        "l1_latency_us": stats["latency_us"],
+        "admission_rejects": stats["admission_rejects"],
+        "serializers": serializers
+    }
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
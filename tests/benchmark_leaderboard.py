@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🏆 Benchmark do leaderboard da testnet
+Placar com USERS usuários:
+- ANTES: cada atividade regrava leaderboard.json e activities.json inteiros
+         (indent=2); ranking ordena todos os usuários a cada consulta;
+         uma instância nova (recarregando o JSON) por requisição QSS
+- DEPOIS: uma linha acrescentada ao log por atividade, compactação periódica,
+          ranking no índice de estatística de ordem, instância compartilhada
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from testnet_leaderboard import TestnetLeaderboard
+
+USERS = 10_000
+EVENTS = 500
+RANK_QUERIES = 2_000
+
+
+class LegacyLeaderboard:
+    """Persistência e ranking antigos (mesmos arquivos, regravados por inteiro)"""
+
+    def __init__(self, data_dir):
+        self.leaderboard_file = os.path.join(data_dir, "legacy_leaderboard.json")
+        self.activities_file = os.path.join(data_dir, "legacy_activities.json")
+        self.leaderboard = {"users": {}}
+        self.activities = []
+        if os.path.exists(self.leaderboard_file):
+            with open(self.leaderboard_file) as f:
+                self.leaderboard = json.load(f)
+
+    def add_activity(self, user_id, points):
+        user = self.leaderboard["users"].setdefault(user_id, {"name": user_id, "points": 0, "badges": []})
+        user["points"] += points
+        self.activities = (self.activities + [{"user_id": user_id, "points": points,
+                                               "timestamp": datetime.now().isoformat()}])[-100:]
+        with open(self.leaderboard_file, "w") as f:
+            json.dump(self.leaderboard, f, indent=2)
+        with open(self.activities_file, "w") as f:
+            json.dump(self.activities, f, indent=2)
+
+    def rank(self, user_id):
+        users = sorted(self.leaderboard["users"].items(), key=lambda item: item[1]["points"], reverse=True)
+        return next(i for i, (uid, _) in enumerate(users, 1) if uid == user_id)
+
+
+def main():
+    print("=" * 70)
+    print("🏆 BENCHMARK DO LEADERBOARD DA TESTNET")
+    print("=" * 70)
+    print(f"   Usuários: {USERS:,}  Atividades: {EVENTS:,}  Consultas de ranking: {RANK_QUERIES:,}")
+    rng = random.Random(5)
+    results = {"timestamp": datetime.now().isoformat(), "cpu_count": os.cpu_count(), "users": USERS}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = LegacyLeaderboard(tmp)
+        for i in range(USERS):
+            legacy.leaderboard["users"][f"user{i}"] = {"name": f"user{i}", "points": rng.randrange(1000),
+                                                       "badges": []}
+        legacy.add_activity("user0", 5)
+
+        start = time.perf_counter()
+        for i in range(EVENTS):
+            LegacyLeaderboard(tmp).add_activity(f"user{rng.randrange(USERS)}", 5)  # Instância por requisição
+        legacy_add = (time.perf_counter() - start) / EVENTS
+        start = time.perf_counter()
+        for i in range(RANK_QUERIES // 20):
+            legacy.rank(f"user{rng.randrange(USERS)}")
+        legacy_rank = (time.perf_counter() - start) / (RANK_QUERIES // 20)
+
+        leaderboard = TestnetLeaderboard(os.path.join(tmp, "new"))
+        for i in range(USERS):
+            leaderboard.add_activity("test_run", f"user{i}")
+        leaderboard.compact()
+
+        start = time.perf_counter()
+        for i in range(EVENTS):
+            leaderboard.add_activity("qss_request", f"user{rng.randrange(USERS)}")
+        new_add = (time.perf_counter() - start) / EVENTS
+        start = time.perf_counter()
+        for i in range(RANK_QUERIES):
+            leaderboard.get_user_stats(f"user{rng.randrange(USERS)}")
+        new_rank = (time.perf_counter() - start) / RANK_QUERIES
+
+        start = time.perf_counter()
+        TestnetLeaderboard(os.path.join(tmp, "new"))
+        reload_ms = (time.perf_counter() - start) * 1000
+
+    results["add_activity_ms"] = {"legacy": round(legacy_add * 1000, 3), "append_log": round(new_add * 1000, 3)}
+    results["rank_ms"] = {"legacy_sort": round(legacy_rank * 1000, 3), "order_statistics": round(new_rank * 1000, 4)}
+    results["cold_start_ms"] = round(reload_ms, 1)
+    print(f"   add_activity: antes {results['add_activity_ms']['legacy']}ms  "
+          f"depois {results['add_activity_ms']['append_log']}ms")
+    print(f"   ranking:      antes {results['rank_ms']['legacy_sort']}ms  "
+          f"depois {results['rank_ms']['order_statistics']}ms")
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
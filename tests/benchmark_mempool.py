@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📥 Microbenchmark do Mempool
+Construção de blocos a partir de um mempool com 1M transações:
+- ANTES: lista por shard, copy() + validar tudo + reconstruir remaining
+- DEPOIS: Mempool.pop_block(N) (heap por shard, sem cópia)
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import resource
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mempool import Mempool
+
+NUM_SHARDS = 8
+BLOCK_SIZE = 5000
+
+
+def _make_transactions(total, senders):
+    rng = random.Random(42)
+    base = time.time()
+    for i in range(total):
+        yield {
+            "id": f"tx-{i}",
+            "sender": f"sender-{rng.randrange(senders)}",
+            "receiver": f"receiver-{rng.randrange(senders)}",
+            "amount": 1,
+            "fee": rng.randrange(100),
+            "timestamp": base + i * 1e-6,
+            "type": "transfer",
+        }
+
+
+def _rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _validate_structure(tx):
+    return all(k in tx for k in ("sender", "receiver", "amount"))
+
+
+def bench_legacy(transactions, blocks):
+    """Simula o caminho antigo: dict[int, list] + copy + rebuild"""
+    pending = {i: [] for i in range(NUM_SHARDS)}
+    start = time.perf_counter()
+    for tx in transactions:
+        pending[hash(tx["sender"]) % NUM_SHARDS].append(tx)
+    fill = time.perf_counter() - start
+
+    times = []
+    for b in range(blocks):
+        shard_id = b % NUM_SHARDS
+        start = time.perf_counter()
+        snapshot = pending[shard_id].copy()
+        validated, remaining = [], []
+        for tx in snapshot:
+            # O caminho antigo valida todas as pendentes do shard a cada bloco
+            # (aqui só a checagem estrutural, sem ThreadPoolExecutor nem saldo)
+            if _validate_structure(tx) and len(validated) < BLOCK_SIZE:
+                validated.append(tx)
+            else:
+                remaining.append(tx)
+        pending[shard_id] = remaining
+        times.append(time.perf_counter() - start)
+    return fill, times
+
+
+def bench_mempool(transactions, blocks):
+    pool = Mempool(NUM_SHARDS, max_txs_per_shard=10_000_000, max_bytes=1 << 40)
+    start = time.perf_counter()
+    for tx in transactions:
+        pool.add(tx, hash(tx["sender"]) % NUM_SHARDS)
+    fill = time.perf_counter() - start
+
+    times = []
+    for b in range(blocks):
+        shard_id = b % NUM_SHARDS
+        start = time.perf_counter()
+        block = pool.pop_block(shard_id, BLOCK_SIZE)
+        times.append(time.perf_counter() - start)
+        assert len(block) <= BLOCK_SIZE
+    return fill, times, pool.get_stats()
+
+
+def main(total=1_000_000, senders=200_000, blocks=16):
+    print("=" * 70)
+    print("📥 MICROBENCHMARK DO MEMPOOL")
+    print("=" * 70)
+    print(f"   Transações: {total:,}  Remetentes: {senders:,}  Blocos: {blocks} x {BLOCK_SIZE}")
+    print()
+
+    transactions = list(_make_transactions(total, senders))
+    rss_base = _rss_mb()
+
+    legacy_fill, legacy_times = bench_legacy(transactions, blocks)
+    fill, times, stats = bench_mempool(transactions, blocks)
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "transactions": total,
+        "block_size": BLOCK_SIZE,
+        "legacy": {
+            "fill_s": round(legacy_fill, 3),
+            "avg_block_build_ms": round(1000 * sum(legacy_times) / len(legacy_times), 2),
+        },
+        "mempool": {
+            "fill_s": round(fill, 3),
+            "add_per_s": round(total / fill),
+            "avg_block_build_ms": round(1000 * sum(times) / len(times), 2),
+            "estimated_bytes": stats["bytes"],
+            "max_rss_delta_mb": round(_rss_mb() - rss_base, 1),
+        },
+    }
+    results["speedup_block_build"] = round(
+        results["legacy"]["avg_block_build_ms"] / max(results["mempool"]["avg_block_build_ms"], 1e-6), 1
+    )
+
+    print(f"   ANTES  (copy+rebuild): {results['legacy']['avg_block_build_ms']:>9.2f} ms/bloco")
+    print(f"   DEPOIS (pop_block):    {results['mempool']['avg_block_build_ms']:>9.2f} ms/bloco")
+    print(f"   Inserção no mempool:   {results['mempool']['add_per_s']:>9,} tx/s")
+    print(f"   Speedup na construção: {results['speedup_block_build']}x")
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark de /api/network/stats
+Nó com SHARDS shards de BLOCKS_PER_SHARD blocos e HISTORY transações no histórico:
+- ANTES: cada chamada formata 1000 blocos recentes + 1000 transações e recalcula
+         TPS, tempo entre blocos, volume cross-chain e % PQC com list comprehensions
+- DEPOIS: NetworkStatsAggregator alimentado pelo mempool e pela selagem;
+          a consulta lê as somas dos anéis (1s/1m/1h/24h) e os totais
+Também mede o custo por evento (record_transaction / record_block).
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from db_manager import DBManager
+from mempool import Mempool
+from network_stats import NetworkStatsAggregator
+from testnet_explorer import TestnetExplorer
+from transaction_history import TransactionHistoryStore
+
+SHARDS = 8
+BLOCKS_PER_SHARD = 2_000
+TXS_PER_BLOCK = 20
+HISTORY = 20_000
+QUERIES = 20
+EVENTS = 50_000
+
+
+class BenchNode:
+    """Nó mínimo com o que o explorer lê: shards, mempool, histórico"""
+
+    def __init__(self, db, rng, network_stats=None):
+        now = time.time() - BLOCKS_PER_SHARD * 5
+        self.shards = {
+            shard_id: [{"shard_id": shard_id, "index": index, "timestamp": now + index * 5,
+                        "hash": f"{shard_id:02x}{index:062x}", "previous_hash": "0" * 64,
+                        "validator": f"validator{rng.randrange(21)}",
+                        "transactions": [{"id": f"{shard_id}-{index}-{i}", "sender": "a", "receiver": "b",
+                                          "amount": 1.0, "timestamp": now + index * 5} for i in range(TXS_PER_BLOCK)]}
+                       for index in range(BLOCKS_PER_SHARD)]
+            for shard_id in range(SHARDS)
+        }
+        self.mempool = Mempool(SHARDS)
+        self.pending_transactions = self.mempool.views()
+        self.tx_history = TransactionHistoryStore(db)
+        if network_stats is not None:
+            self.network_stats = network_stats
+
+
+def main():
+    print("=" * 70)
+    print("📊 BENCHMARK DAS ESTATÍSTICAS DE REDE")
+    print("=" * 70)
+    print(f"   Shards: {SHARDS}  Blocos: {SHARDS * BLOCKS_PER_SHARD:,}  Histórico: {HISTORY:,} txs")
+    rng = random.Random(11)
+    results = {"timestamp": datetime.now().isoformat(), "cpu_count": os.cpu_count()}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DBManager(db_path=os.path.join(tmp, "bench.db"))
+        now = time.time()
+        db.execute_many_commit([
+            ("INSERT INTO transactions_history (id, sender, receiver, amount, type, timestamp, network, is_public) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+             (f"h{i}", f"addr{rng.randrange(1000)}", f"addr{rng.randrange(1000)}", 1.0,
+              "cross_chain_polygon" if i % 10 == 0 else "transfer", now - i, "allianza", 1))
+            for i in range(HISTORY)
+        ])
+
+        legacy = TestnetExplorer(BenchNode(db, rng))
+        start = time.perf_counter()
+        for _ in range(QUERIES):
+            legacy.get_network_stats()
+        legacy_ms = (time.perf_counter() - start) / QUERIES * 1000
+
+        stats = NetworkStatsAggregator(db)
+        node = BenchNode(db, rng, network_stats=stats)
+        start = time.perf_counter()
+        for i in range(EVENTS):
+            stats.record_transaction({"id": f"e{i}", "amount": 1.0, "is_cross_chain": i % 10 == 0})
+        tx_us = (time.perf_counter() - start) / EVENTS * 1e6
+        blocks = [block for chain in node.shards.values() for block in chain[-100:]]
+        start = time.perf_counter()
+        for block in blocks:
+            stats.record_block(type("B", (), block)())
+        block_us = (time.perf_counter() - start) / len(blocks) * 1e6
+
+        explorer = TestnetExplorer(node)
+        start = time.perf_counter()
+        for _ in range(QUERIES * 100):
+            explorer.get_network_stats()
+        aggregator_ms = (time.perf_counter() - start) / (QUERIES * 100) * 1000
+        rollup_rows = db.execute_query("SELECT COUNT(*) FROM network_stats_rollup")[0][0]
+        db.close()
+
+    results["get_network_stats_ms"] = {"legacy_scan": round(legacy_ms, 2), "aggregator": round(aggregator_ms, 4)}
+    results["record_us"] = {"transaction": round(tx_us, 2), "block": round(block_us, 2)}
+    results["rollup_rows"] = rollup_rows
+    print(f"   get_network_stats: antes {results['get_network_stats_ms']['legacy_scan']}ms  "
+          f"depois {results['get_network_stats_ms']['aggregator']}ms")
+    print(f"   Custo por evento: tx {results['record_us']['transaction']}µs  "
+          f"bloco {results['record_us']['block']}µs  | rollup: {rollup_rows} linhas")
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
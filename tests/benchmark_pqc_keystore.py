@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗝️ Microbenchmark do Keystore PQC
+100k keypairs (metade ML-DSA-65 com tamanhos reais, metade QRS-3 com PEM ECDSA real):
+- ANTES: dict em memória com todos os keypairs (e perdido no reinício)
+- DEPOIS: PQCKeystore (registros criptografados via mmap + índice SQLite + LRU)
+Cada cenário roda em um processo próprio para medir o RSS isoladamente.
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import random
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from pqc_keystore import PQCKeystore
+
+KEYPAIRS = 100_000
+LOOKUPS = 10_000
+CACHE_SIZE = 4096
+HOT_SET = 1_000
+
+
+def _rss_mb() -> float:
+    """Memória anônima residente (as páginas do mmap são do page cache, compartilhadas entre workers)"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _keypairs(count):
+    """Registros no formato de generate_ml_dsa_keypair / generate_qrs3_keypair"""
+    created_at = datetime.now().isoformat()
+    for i in range(count):
+        if i % 2 == 0:
+            yield f"ml_dsa_{i}", {
+                "keypair_id": f"ml_dsa_{i}",
+                "algorithm": "ML-DSA",
+                "security_level": 3,
+                "private_key": base64.b64encode(os.urandom(4032)).decode(),
+                "public_key": base64.b64encode(os.urandom(1952)).decode(),
+                "created_at": created_at,
+                "nist_standard": True,
+                "quantum_resistant": True,
+                "key_size": 1952
+            }
+        else:
+            private = ec.generate_private_key(ec.SECP256K1())
+            yield f"qrs3_{i}", {
+                "keypair_id": f"qrs3_{i}",
+                "algorithm": "QRS-3 (Tripla Redundância Quântica)",
+                "classic_private_key": private.private_bytes(
+                    serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                    serialization.NoEncryption()).decode(),
+                "classic_public_key": private.public_key().public_bytes(
+                    serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo).decode(),
+                "ml_dsa_keypair_id": f"ml_dsa_{i - 1}",
+                "sphincs_keypair_id": f"sphincs_{i}",
+                "created_at": created_at,
+                "quantum_resistant": True,
+                "redundancy_level": 3
+            }
+
+
+def _ids(count):
+    return [f"ml_dsa_{i}" if i % 2 == 0 else f"qrs3_{i}" for i in range(count)]
+
+
+def _timed_lookups(func, ids):
+    samples = []
+    for keypair_id in ids:
+        start = time.perf_counter()
+        func(keypair_id)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return round(statistics.median(samples), 2), round(sorted(samples)[int(len(samples) * 0.99)], 2)
+
+
+def run_dict(directory, key, count):
+    """Cenário legado: todos os keypairs em um dict (carregados do keystore para um número justo)"""
+    base = _rss_mb()
+    store = PQCKeystore(directory, key=key, cache_size=1)
+    start = time.perf_counter()
+    keypairs = dict(store.items())
+    load_s = time.perf_counter() - start
+    rss = _rss_mb() - base
+    ids = random.Random(3).sample(_ids(count), LOOKUPS)
+    p50, p99 = _timed_lookups(keypairs.__getitem__, ids)
+    return {"rss_mb": round(rss, 1), "startup_s": round(load_s, 2), "lookup_p50_us": p50, "lookup_p99_us": p99}
+
+
+def run_keystore(directory, key, count):
+    base = _rss_mb()
+    start = time.perf_counter()
+    store = PQCKeystore(directory, key=key, cache_size=CACHE_SIZE)
+    len(store)
+    open_ms = (time.perf_counter() - start) * 1000
+    rng = random.Random(3)
+    ids = _ids(count)
+
+    cold_p50, cold_p99 = _timed_lookups(store.__getitem__, rng.sample(ids, LOOKUPS))
+    hot = rng.sample(ids, HOT_SET)
+    for keypair_id in hot:
+        store[keypair_id]
+    hot_p50, hot_p99 = _timed_lookups(store.__getitem__, [rng.choice(hot) for _ in range(LOOKUPS)])
+    return {
+        "rss_mb": round(_rss_mb() - base, 1),
+        "startup_ms": round(open_ms, 2),
+        "cold_load_p50_us": cold_p50,
+        "cold_load_p99_us": cold_p99,
+        "cached_p50_us": hot_p50,
+        "cached_p99_us": hot_p99,
+        "stats": store.get_stats()
+    }
+
+
+def _child(mode, directory, count):
+    key = bytes.fromhex(os.environ["BENCH_KEYSTORE_KEY"])
+    result = (run_dict if mode == "dict" else run_keystore)(directory, key, count)
+    print(json.dumps(result))
+
+
+def main(count=KEYPAIRS):
+    print("=" * 70)
+    print("🗝️ MICROBENCHMARK DO KEYSTORE PQC")
+    print("=" * 70)
+    print(f"   Keypairs: {count:,}  Consultas: {LOOKUPS:,}  LRU: {CACHE_SIZE:,}")
+
+    key = AESGCM.generate_key(bit_length=256)
+    env = {**os.environ, "BENCH_KEYSTORE_KEY": key.hex()}
+    with tempfile.TemporaryDirectory() as directory:
+        store = PQCKeystore(directory, key=key, cache_size=1)
+        # Só a gravação é cronometrada (gerar as chaves EC domina o tempo total)
+        write_s = 0.0
+        batch = []
+        for n, item in enumerate(_keypairs(count), 1):
+            batch.append(item)
+            if len(batch) == 1000 or n == count:
+                start = time.perf_counter()
+                store.update(batch)
+                write_s += time.perf_counter() - start
+                batch = []
+        data_mb = store.get_stats()["data_bytes"] / 1024 / 1024
+        store.close()
+
+        scenarios = {}
+        for mode in ("dict", "keystore"):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode, directory, str(count)],
+                env=env, capture_output=True, text=True, check=True).stdout
+            scenarios[mode] = json.loads(output.strip().splitlines()[-1])
+
+    legacy, keystore = scenarios["dict"], scenarios["keystore"]
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "keypairs": count,
+        "write_s": round(write_s, 2),
+        "data_file_mb": round(data_mb, 1),
+        "dict": legacy,
+        "keystore": keystore
+    }
+    print(f"   Gravação (lotes de 1000):     {write_s:8.2f} s  ({data_mb:.1f} MB em disco)")
+    print(f"   RSS dict:                     {legacy['rss_mb']:8.1f} MB")
+    print(f"   RSS keystore:                 {keystore['rss_mb']:8.1f} MB")
+    print(f"   Abertura do keystore:         {keystore['startup_ms']:8.2f} ms")
+    print(f"   Carga a frio (p50/p99):       {keystore['cold_load_p50_us']:8.2f} / {keystore['cold_load_p99_us']:.2f} µs")
+    print(f"   Carga em cache (p50/p99):     {keystore['cached_p50_us']:8.2f} / {keystore['cached_p99_us']:.2f} µs")
+    print(f"   Consulta dict (p50/p99):      {legacy['lookup_p50_us']:8.2f} / {legacy['lookup_p99_us']:.2f} µs")
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗃️ Benchmark das provas de bloco/transação (/api/proofs/...)
+- ANTES: cada download regenera a prova (tentativa profissional + fallback),
+         grava proofs/testnet/<nome>.json e devolve o arquivo
+- DEPOIS: ProofCache endereçado por conteúdo: a primeira chamada gera (em
+          segundo plano), as seguintes leem o .gz do índice LRU
+Também compara o espaço em disco (bruto vs gzip) das provas geradas.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+BLOCKS = 200
+REQUESTS = 2_000
+
+
+def _block(index):
+    return {"index": index, "hash": f"{index:064x}", "previous_hash": f"{index - 1:064x}",
+            "timestamp": 1700000000.0 + index, "shard_id": index % 4, "validator": f"validator{index % 21}",
+            "transactions": [{"tx_hash": f"tx{index}-{i}", "from": "alice", "to": "bob", "amount": 1.0}
+                             for i in range(20)]}
+
+
+def _tx(index):
+    return {"tx_hash": f"tx{index}", "from": "alice", "to": "bob", "amount": 1.0,
+            "timestamp": 1700000000.0 + index, "status": "confirmed",
+            "signature": {"r": "ab" * 32, "s": "cd" * 32}, "qrs3_signature": {"ml_dsa": "ef" * 1200}}
+
+
+def main():
+    print("=" * 70)
+    print("🗃️ BENCHMARK DO CACHE DE PROVAS")
+    print("=" * 70)
+    print(f"   Blocos/transações distintos: {BLOCKS}  Downloads: {REQUESTS:,}")
+    results = {"timestamp": datetime.now().isoformat(), "cpu_count": os.cpu_count()}
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            from testnet_proofs import TestnetProofGenerator
+            generator = TestnetProofGenerator()
+            blocks = [_block(i) for i in range(1, BLOCKS + 1)]
+            txs = [_tx(i) for i in range(BLOCKS)]
+
+            legacy = {}
+            for name, items, method in (("block", blocks, generator.generate_block_proof),
+                                        ("transaction", txs, generator.generate_transaction_proof)):
+                start = time.perf_counter()
+                for i in range(REQUESTS // 10):
+                    with open(method(items[i % BLOCKS], format="json")["filepath"], "rb") as f:
+                        f.read()
+                legacy[name] = (time.perf_counter() - start) / (REQUESTS // 10) * 1000
+            raw_bytes = sum(path.stat().st_size for path in generator.proofs_dir.glob("*.json"))
+
+            cached = {}
+            for name, items, method in (("block", blocks, generator.block_proof_file),
+                                        ("transaction", txs, generator.transaction_proof_file)):
+                start = time.perf_counter()
+                for item in items:
+                    method(item, format="json")
+                first_ms = (time.perf_counter() - start) / BLOCKS * 1000
+                start = time.perf_counter()
+                for i in range(REQUESTS):
+                    method(items[i % BLOCKS], format="json").path.read_bytes()
+                cached[name] = {"first_ms": round(first_ms, 3),
+                                "hit_ms": round((time.perf_counter() - start) / REQUESTS * 1000, 3)}
+            stats = generator.cache.get_stats()
+        finally:
+            os.chdir(cwd)
+
+    for name in ("block", "transaction"):
+        results[f"{name}_proof_ms"] = {"legacy_regenerate": round(legacy[name], 3), **cached[name]}
+        print(f"   Prova de {name}: antes {legacy[name]:.3f}ms/download  "
+              f"depois {cached[name]['first_ms']}ms (1ª) / {cached[name]['hit_ms']}ms (cache)")
+    results["cache"] = stats
+    results["disk_bytes"] = {"legacy_json": raw_bytes, "cache_gzip": stats["total_bytes"]}
+    print(f"   Disco: {raw_bytes:,} bytes JSON (só os {BLOCKS * 2} nomes sobrescritos) vs "
+          f"{stats['total_bytes']:,} bytes gzip | gerações: {stats['builds']}")
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🌳 Benchmark das provas QSS em lote
+N transações externas (exchange ancorando saques):
+- ANTES: uma prova por tx = varredura do keystore atrás do ML-DSA + uma assinatura
+- DEPOIS: um lote = árvore de Merkle + UMA assinatura ML-DSA da raiz
+Também mede a verificação (assinatura da raiz verificada uma vez por lote).
+Sem liboqs a assinatura ML-DSA é simulada (hash); com liboqs a diferença cresce.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+import contextlib
+import io
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+import qss_api_service
+from pqc_keystore import PQCKeystore
+from quantum_security import QuantumSecuritySystem
+
+ITEMS = 5_000
+KEYSTORE_KEYPAIRS = 200  # keypairs de outros serviços no keystore
+
+
+class BenchQuantumSecurity(QuantumSecuritySystem):
+    def __init__(self, path):
+        super().__init__()
+        self.pqc_keypairs = PQCKeystore(path, key=AESGCM.generate_key(bit_length=256), sync=False)
+        self.ml_dsa_signatures = 0
+
+    def sign_with_ml_dsa(self, keypair_id, message):
+        self.ml_dsa_signatures += 1
+        return super().sign_with_ml_dsa(keypair_id, message)
+
+
+def legacy_per_item(qs, items):
+    """Caminho de generate-proof: varre o keystore e assina cada tx"""
+    for chain, tx_hash, metadata, _ in items:
+        keypair_id = None
+        for kp_id, kp_data in qs.pqc_keypairs.items():
+            if isinstance(kp_data, dict) and kp_data.get("algorithm") == "ML-DSA":
+                keypair_id = kp_id
+                break
+        message = json.dumps({"chain": chain, "tx_hash": tx_hash, "metadata": metadata,
+                              "timestamp": time.time()}, sort_keys=True)
+        qs.sign_with_ml_dsa(keypair_id, hashlib.sha256(message.encode()).digest())
+
+
+def main():
+    print("=" * 70)
+    print("🌳 BENCHMARK DAS PROVAS QSS EM LOTE")
+    print("=" * 70)
+    print(f"   Itens: {ITEMS:,}  Keypairs no keystore: {KEYSTORE_KEYPAIRS + 1}")
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        qs = BenchQuantumSecurity(tmp)
+        for _ in range(KEYSTORE_KEYPAIRS):
+            qs.generate_ml_kem_keypair()
+        qs.generate_ml_dsa_keypair()
+        qss_api_service.quantum_system = qs
+        items = qss_api_service._normalize_batch_items(
+            [{"chain": "bitcoin", "tx_hash": f"{i:064x}", "metadata": {"block_height": 800_000 + i}}
+             for i in range(ITEMS)]
+        )
+
+        start = time.perf_counter()
+        legacy_per_item(qs, items)
+        legacy_seconds = time.perf_counter() - start
+        legacy_signatures, qs.ml_dsa_signatures = qs.ml_dsa_signatures, 0
+
+        start = time.perf_counter()
+        result = qss_api_service.issue_proof_batch(items)
+        batch_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        valid = sum(qss_api_service.verify_batch_proof(proof, result["batch"])["valid"]
+                    for proof in result["proofs"])
+        verify_seconds = time.perf_counter() - start
+
+    proof_bytes = len(json.dumps(result["proofs"][0]))
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "cpu_count": os.cpu_count(),
+        "items": ITEMS,
+        "legacy": {"ml_dsa_signatures": legacy_signatures,
+                   "us_per_proof": round(legacy_seconds / ITEMS * 1e6, 1)},
+        "batch": {"ml_dsa_signatures": qs.ml_dsa_signatures,
+                  "us_per_proof": round(batch_seconds / ITEMS * 1e6, 1),
+                  "tree_depth": result["batch"]["tree_depth"],
+                  "proof_bytes": proof_bytes},
+        "verify": {"valid": valid, "us_per_proof": round(verify_seconds / ITEMS * 1e6, 1)}
+    }
+    print(f"   ANTES:  {legacy_signatures:,} assinaturas | {results['legacy']['us_per_proof']}µs por prova")
+    print(f"   DEPOIS: {qs.ml_dsa_signatures} assinatura | {results['batch']['us_per_proof']}µs por prova "
+          f"| prova de {proof_bytes} bytes")
+    print(f"   Verificação: {valid:,}/{ITEMS:,} válidas | {results['verify']['us_per_proof']}µs por prova")
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⛓️ Microbenchmark do Produtor de Blocos por Shard
+Transações seladas por segundo (assinaturas ECDSA, validação, bloco + COMMIT)
+com 4, 16 e 64 shards:
+- ANTES: validate_block_parallel sela um shard por chamada
+- DEPOIS: produce_blocks sela todos os shards com trabalho em paralelo
+          (um pipeline por shard), recibos cross-shard incluídos
+Cada cenário roda em um processo filho com banco próprio em diretório temporário.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+import subprocess
+from datetime import datetime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+SHARD_COUNTS = (4, 16, 64)
+TRANSACTIONS = 20_000
+SENDERS = 256
+
+
+def _child(shards, count):
+    import contextlib
+    import io
+    with contextlib.redirect_stdout(io.StringIO()):
+        import allianza_blockchain as ab
+        logging.disable(logging.INFO)
+        ab.NUM_SHARDS = shards
+        blockchain = ab.AllianzaBlockchain()
+        wallets = [blockchain.create_wallet() for _ in range(SENDERS)]
+        validator = wallets[0][0]
+        blockchain.wallets[validator]["staked"] = ab.MIN_STAKE
+        blockchain.staking_pool[validator] = ab.MIN_STAKE
+        for address, _ in wallets:
+            blockchain.wallets[address]["ALZ"] = 10 ** 9
+
+    def submit(prefix):
+        for i in range(count):
+            sender, key = wallets[i % SENDERS]
+            receiver = wallets[(i * 7 + 3) % SENDERS][0]
+            tx = {"id": f"{prefix}-{i}", "sender": sender, "receiver": receiver, "amount": 1,
+                  "timestamp": time.time(), "type": "transfer"}
+            tx["signature"] = ab.AdvancedCrypto.sign_transaction(key, tx)
+            blockchain.block_producer.submit(tx)
+
+    producer = blockchain.block_producer
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        submit("seq")
+        start = time.perf_counter()
+        blocks = 0
+        while producer.pending_work():
+            blocks += blockchain.validate_block_parallel(validator, None, None) is not None
+        results["sequential"] = {"seconds": time.perf_counter() - start, "blocks": blocks}
+
+        submit("par")
+        start = time.perf_counter()
+        blocks = rounds = 0
+        while producer.pending_work():
+            blocks += len(blockchain.produce_blocks(validator))
+            rounds += 1
+        results["concurrent"] = {"seconds": time.perf_counter() - start, "blocks": blocks, "rounds": rounds}
+    results["stats"] = producer.get_stats()
+    producer.close()
+    print(json.dumps(results))
+
+
+def main(count=TRANSACTIONS):
+    print("=" * 70)
+    print("⛓️  MICROBENCHMARK DO PRODUTOR DE BLOCOS POR SHARD")
+    print("=" * 70)
+    print(f"   Transações por cenário: {count:,}  Remetentes: {SENDERS}  CPUs: {os.cpu_count()}")
+
+    results = {"timestamp": datetime.now().isoformat(), "transactions": count, "shards": {}}
+    for shards in SHARD_COUNTS:
+        with tempfile.TemporaryDirectory() as directory:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", str(shards), str(count)],
+                cwd=directory, capture_output=True, text=True, check=True).stdout
+        child = json.loads(output.strip().splitlines()[-1])
+        sequential, concurrent = child["sequential"], child["concurrent"]
+        results["shards"][shards] = {
+            "sequential_tx_per_s": round(count / sequential["seconds"]),
+            "concurrent_tx_per_s": round(count / concurrent["seconds"]),
+            "speedup": round(sequential["seconds"] / concurrent["seconds"], 2),
+            "sequential_blocks": sequential["blocks"],
+            "concurrent_blocks": concurrent["blocks"],
+            "concurrent_rounds": concurrent["rounds"],
+            "receipts_committed": child["stats"]["receipts_committed"]
+        }
+        row = results["shards"][shards]
+        print(f"   {shards:>2} shards: um shard por chamada {row['sequential_tx_per_s']:>8,} tx/s | "
+              f"paralelo {row['concurrent_tx_per_s']:>8,} tx/s ({row['speedup']}x)")
+
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(int(sys.argv[2]), int(sys.argv[3]))
+    else:
+        main(*[int(arg) for arg in sys.argv[1:]])
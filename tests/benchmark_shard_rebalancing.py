@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔀 Teste de carga do Sharding Dinâmico (tráfego enviesado)
+Cada tick chegam N transações, 70% vindas de contas concentradas na faixa de
+endereços de um único shard; cada shard sela no máximo CAPACITY transações
+por tick (limite de bloco). Compara:
+- ESTÁTICO: 4 shards fixos (o shard quente acumula fila para sempre)
+- DINÂMICO: adapt_shards a cada tick (split do shard quente com migração
+            online das pendentes; merge de shards frios)
+"""
+
+import os
+import sys
+import json
+import random
+import statistics
+import contextlib
+import io
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mempool import Mempool
+from dynamic_sharding import DynamicSharding
+from shard_block_producer import ShardBlockProducer
+
+INITIAL_SHARDS = 4
+ACCOUNTS = 20_000
+TICKS = 60
+ARRIVALS = 2_000
+CAPACITY = 300
+HOT_SHARE = 0.7
+
+
+class LoadTestChain:
+    """Cadeia em memória: selar = retirar até CAPACITY transações do shard"""
+
+    def __init__(self, shards):
+        self.wallets = {}
+        self.shards = {i: [self.create_genesis_block(i)] for i in range(shards)}
+        self.mempool = Mempool(shards)
+        self.pending_transactions = self.mempool.views()
+        self.dynamic_sharding = None
+
+    def create_genesis_block(self, shard_id):
+        return {"shard_id": shard_id, "index": 0, "transactions": []}
+
+    def get_shard(self, address):
+        return self.dynamic_sharding.shard_for_address(address)
+
+    def seal_shard_block(self, shard_id, validator, transactions, receipts, use_parallel, home_shard):
+        chain = self.shards[shard_id]
+        block = type("Block", (), {"index": len(chain), "hash": f"{shard_id}:{len(chain)}",
+                                   "transactions": transactions})()
+        chain.append(block)
+        return block, []
+
+
+def _traffic(seed):
+    rng = random.Random(seed)
+    accounts = [f"conta{i}" for i in range(ACCOUNTS)]
+    return rng, accounts
+
+
+def run(dynamic, ticks=TICKS):
+    with contextlib.redirect_stdout(io.StringIO()):
+        chain = LoadTestChain(INITIAL_SHARDS)
+        sharding = DynamicSharding(chain, min_shards=INITIAL_SHARDS, max_shards=64)
+        chain.dynamic_sharding = sharding
+        producer = ShardBlockProducer(chain, max_block_txs=CAPACITY)
+        chain.block_producer = producer
+
+        rng, accounts = _traffic(7)
+        hot_accounts = [a for a in accounts if sharding.shard_for_address(a) == 0][:1000]
+        for address in accounts:
+            chain.wallets[address] = {"ALZ": 10 ** 9}
+
+        timeline = []
+        tx_id = 0
+        for tick in range(ticks):
+            for _ in range(ARRIVALS):
+                sender = rng.choice(hot_accounts) if rng.random() < HOT_SHARE else rng.choice(accounts)
+                producer.submit({"id": f"tx{tx_id}", "sender": sender, "receiver": sender,
+                                 "amount": 1, "timestamp": tick})
+                tx_id += 1
+            sealed = sum(len(block.transactions) for block in producer.produce("validador"))
+            if dynamic:
+                sharding.adapt_shards()
+            backlog = [chain.mempool.shard_size(shard_id) for shard_id in chain.shards]
+            timeline.append({
+                "tick": tick,
+                "shards": len(chain.shards),
+                "sealed": sealed,
+                "backlog_total": sum(backlog),
+                "backlog_max": max(backlog),
+                "backlog_stdev": round(statistics.pstdev(backlog), 1)
+            })
+        producer.close()
+    return timeline, list(sharding.migrations)
+
+
+def _summary(timeline):
+    tail = timeline[-10:]
+    return {
+        "shards_final": timeline[-1]["shards"],
+        "sealed_per_tick_last10": round(statistics.mean(t["sealed"] for t in tail)),
+        "backlog_total_final": timeline[-1]["backlog_total"],
+        "backlog_max_final": timeline[-1]["backlog_max"],
+        "backlog_stdev_final": timeline[-1]["backlog_stdev"]
+    }
+
+
+def main(ticks=TICKS):
+    print("=" * 70)
+    print("🔀 TESTE DE CARGA DO SHARDING DINÂMICO (TRÁFEGO ENVIESADO)")
+    print("=" * 70)
+    print(f"   Ticks: {ticks}  Chegadas/tick: {ARRIVALS:,}  Capacidade/shard/tick: {CAPACITY}  "
+          f"Tráfego no shard quente: {HOT_SHARE:.0%}")
+
+    static, _ = run(False, ticks)
+    dynamic, migrations = run(True, ticks)
+
+    print()
+    print("   tick | estático: sel/tick  fila máx | dinâmico: shards  sel/tick  fila máx  desvio")
+    for s, d in zip(static, dynamic):
+        if s["tick"] % 5 == 4:
+            print(f"   {s['tick'] + 1:>4} | {s['sealed']:>17,} {s['backlog_max']:>9,} | "
+                  f"{d['shards']:>15} {d['sealed']:>9,} {d['backlog_max']:>9,} {d['backlog_stdev']:>7}")
+
+    splits = [m for m in migrations if m["action"] == "split"]
+    merges = [m for m in migrations if m["action"] == "merge"]
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "ticks": ticks,
+        "arrivals_per_tick": ARRIVALS,
+        "capacity_per_shard": CAPACITY,
+        "static": _summary(static),
+        "dynamic": _summary(dynamic),
+        "splits": len(splits),
+        "merges": len(merges),
+        "pending_migrated": sum(m["pending_moved"] for m in migrations),
+        "split_ms_max": max((m["duration_ms"] for m in splits), default=0.0)
+    }
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+✍️ Microbenchmark da Verificação de Assinaturas
+Assinaturas ECDSA (secp256k1) verificadas por segundo em um bloco:
+- ANTES: ThreadPoolExecutor(8) chamando a verificação tx a tx
+- DEPOIS: ParallelSignatureVerifier (pool de processos persistente, lotes,
+  chaves públicas em cache por worker) com 1..N workers
+"""
+
+import os
+import sys
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from signature_verifier import ParallelSignatureVerifier, signing_message
+
+BLOCK_SIZE = 5000
+SENDERS = 500
+
+
+def _make_block(total, senders):
+    keys = []
+    for _ in range(senders):
+        private_key = ec.generate_private_key(ec.SECP256K1())
+        pem = private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+        keys.append((private_key, pem))
+
+    transactions, public_keys = [], {}
+    for i in range(total):
+        private_key, pem = keys[i % senders]
+        sender = f"sender-{i % senders}"
+        public_keys[sender] = pem
+        tx = {"id": f"tx-{i}", "sender": sender, "receiver": "r", "amount": 1,
+              "timestamp": 1_700_000_000 + i, "type": "transfer"}
+        tx["signature"] = private_key.sign(signing_message(tx), ec.ECDSA(hashes.SHA256())).hex()
+        transactions.append(tx)
+    return transactions, public_keys
+
+
+def bench_threads(transactions, public_keys, workers=8):
+    """Caminho antigo: uma tarefa por transação em threads, chave desserializada a cada vez"""
+    def verify(tx):
+        key = serialization.load_pem_public_key(public_keys[tx["sender"]].encode())
+        try:
+            key.verify(bytes.fromhex(tx["signature"]), signing_message(tx), ec.ECDSA(hashes.SHA256()))
+            return True
+        except Exception:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(verify, transactions))
+    elapsed = time.perf_counter() - start
+    assert all(results)
+    return elapsed
+
+
+def bench_pool(transactions, public_keys, workers, rounds):
+    verifier = ParallelSignatureVerifier(max_workers=workers)
+    try:
+        # Aquecimento: sobe os workers e popula o cache de chaves
+        verifier.verify_transactions(transactions, public_keys)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            results = verifier.verify_transactions(transactions, public_keys)
+        elapsed = (time.perf_counter() - start) / rounds
+        assert all(results)
+        return elapsed
+    finally:
+        verifier.close()
+
+
+def main(total=BLOCK_SIZE, rounds=3):
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({w for w in (1, 2, 4, 8, 16, cpus) if w <= cpus})
+
+    print("=" * 70)
+    print("✍️  MICROBENCHMARK DA VERIFICAÇÃO DE ASSINATURAS")
+    print("=" * 70)
+    print(f"   Assinaturas por bloco: {total:,}  Remetentes: {SENDERS}  CPUs: {cpus}")
+    print()
+
+    transactions, public_keys = _make_block(total, SENDERS)
+
+    threads_s = bench_threads(transactions, public_keys)
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "signatures": total,
+        "cpus": cpus,
+        "threads_8": {"block_ms": round(threads_s * 1000, 1), "sigs_per_s": round(total / threads_s)},
+        "process_pool": {},
+    }
+    print(f"   ANTES  ThreadPoolExecutor(8): {results['threads_8']['sigs_per_s']:>9,} sig/s")
+
+    for workers in worker_counts:
+        elapsed = bench_pool(transactions, public_keys, workers, rounds)
+        results["process_pool"][workers] = {
+            "block_ms": round(elapsed * 1000, 1),
+            "sigs_per_s": round(total / elapsed),
+        }
+        print(f"   DEPOIS pool com {workers:>2} worker(s):  {results['process_pool'][workers]['sigs_per_s']:>9,} sig/s")
+
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else BLOCK_SIZE)
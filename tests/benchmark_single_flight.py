@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🛬 Benchmark de coalescência (stampede de cache)
+N threads pedem a mesma chave (ex.: gas_price:polygon) continuamente; a API
+leva LATENCY segundos e o TTL vence várias vezes durante o teste.
+- ANTES: get → miss → busca → set (padrão do global_cache): toda thread que
+         chega no miss vai à API
+- SINGLE-FLIGHT: misses simultâneos dividem uma busca
+- SWR: single-flight + stale-while-revalidate (ninguém espera depois do 1º load)
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from single_flight import CoalescingCache
+
+THREADS = 50
+DURATION = 2.0
+TTL = 0.25
+LATENCY = 0.05
+
+
+class Upstream:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def fetch(self):
+        with self.lock:
+            self.calls += 1
+        time.sleep(LATENCY)
+        return 30_000_000_000
+
+
+class LegacyTTLCache:
+    """global_cache em memória: (valor, expira_em), sem coordenação entre threads"""
+
+    def __init__(self):
+        self.data = {}
+
+    def lookup(self, key, fetch):
+        item = self.data.get(key)
+        if item is not None and time.time() < item[1]:
+            return item[0]
+        value = fetch()
+        self.data[key] = (value, time.time() + TTL)
+        return value
+
+
+def run(mode):
+    upstream = Upstream()
+    legacy = LegacyTTLCache()
+    cache = CoalescingCache(jitter=0.1)
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.time() + DURATION
+
+    def worker():
+        local = []
+        while time.time() < deadline:
+            start = time.perf_counter()
+            if mode == "legacy":
+                legacy.lookup("gas_price:polygon", upstream.fetch)
+            else:
+                cache.get_or_load("gas_price:polygon", upstream.fetch, ttl=TTL,
+                                  stale_ttl=TTL if mode == "swr" else 0.0)
+            local.append(time.perf_counter() - start)
+            time.sleep(0.005)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    stats = cache.get_stats() if mode != "legacy" else {}
+    return {
+        "requests": len(latencies),
+        "upstream_calls": upstream.calls,
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+        "coalesced": stats.get("coalesced", 0),
+        "stale_hits": stats.get("stale_hits", 0)
+    }
+
+
+def main():
+    print("=" * 70)
+    print("🛬 BENCHMARK DE COALESCÊNCIA (STAMPEDE)")
+    print("=" * 70)
+    print(f"   Threads: {THREADS}  Duração: {DURATION}s  TTL: {TTL}s  Latência da API: {LATENCY * 1000:.0f}ms")
+    print(f"   Ideal: ~{DURATION / TTL:.0f} chamadas à API")
+
+    results = {"timestamp": datetime.now().isoformat(), "cpu_count": os.cpu_count()}
+    for mode in ("legacy", "single_flight", "swr"):
+        results[mode] = run(mode)
+        r = results[mode]
+        print(f"   {mode:>13}: {r['upstream_calls']:>5} chamadas à API | {r['requests']:,} requisições | "
+              f"p50 {r['p50_ms']}ms p99 {r['p99_ms']}ms | coalescidas {r['coalesced']:,}")
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⚡ Microbenchmark de State Channels
+Vazão (updates/s) de um único canal:
+- ANTES: cópia do balance + JSON do estado inteiro + sign_qrs3 por update + histórico sem limite
+- DEPOIS: ChannelEngine (hash-chain + MAC das duas partes por update, anel de deltas)
+          com checkpoint QRS-3 a cada N updates
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from pqc_keystore import PQCKeystore
+from quantum_security import QuantumSecuritySystem
+from quantum_safe_state_channels import QuantumSafeStateChannel
+
+UPDATES = 50_000
+LEGACY_UPDATES = 500
+CHECKPOINT_EVERY = 1000
+
+
+def legacy_updates(qs, keypair_id, count):
+    """Caminho antigo de update_state (uma assinatura QRS-3 por update)"""
+    balance = {"alice": {"ALZ": 1_000_000.0}, "bob": {"ALZ": 1_000_000.0}}
+    history = []
+    start = time.perf_counter()
+    for i in range(count):
+        from_party, to_party = ("alice", "bob") if i % 2 else ("bob", "alice")
+        balance[from_party]["ALZ"] -= 0.5
+        balance[to_party]["ALZ"] += 0.5
+        state = {
+            "channel_id": "legado", "state_number": len(history) + 1, "from": from_party, "to": to_party,
+            "amount": 0.5, "asset": "ALZ", "balance": {p: dict(a) for p, a in balance.items()},
+            "timestamp": time.time()
+        }
+        state["qrs3_signature"] = qs.sign_qrs3(keypair_id, json.dumps(state, sort_keys=True).encode(),
+                                               optimized=True, parallel=True)
+        history.append(state)
+    return time.perf_counter() - start
+
+
+def _run(channel, count):
+    for i in range(count):
+        if i % 2:
+            channel.update_state("alice", "bob", 0.5)
+        else:
+            channel.update_state("bob", "alice", 0.5)
+
+
+def _channel(qs, checkpoint_every):
+    return QuantumSafeStateChannel("bench", "alice", "bob",
+                                   {"alice": {"ALZ": 1_000_000.0}, "bob": {"ALZ": 1_000_000.0}}, qs,
+                                   checkpoint_every=checkpoint_every)
+
+
+def channel_updates(qs, count, checkpoint_every):
+    channel = _channel(qs, checkpoint_every)
+    start = time.perf_counter()
+    _run(channel, count)
+    elapsed = time.perf_counter() - start
+
+    close_start = time.perf_counter()
+    closed = channel.close_channel()
+    assert closed["success"] and closed["total_transactions"] == count
+    return elapsed, time.perf_counter() - close_start, channel.engine.get_stats()
+
+
+def channel_memory(qs, count, checkpoint_every):
+    """Memória retida pelo canal após `count` updates (independe de count além do anel)"""
+    tracemalloc.start()
+    channel = _channel(qs, checkpoint_every)
+    _run(channel, count)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained
+
+
+def main(count=UPDATES, checkpoint_every=CHECKPOINT_EVERY):
+    print("=" * 70)
+    print("⚡ MICROBENCHMARK DE STATE CHANNELS")
+    print("=" * 70)
+    print(f"   Updates: {count:,}  Checkpoint QRS-3 a cada: {checkpoint_every:,}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        qs = QuantumSecuritySystem(keystore=PQCKeystore(directory, key=AESGCM.generate_key(bit_length=256),
+                                                        sync=False))
+        keypair_id = qs.generate_qrs3_keypair()["keypair_id"]
+
+        legacy_s = legacy_updates(qs, keypair_id, LEGACY_UPDATES)
+        update_s, close_s, stats = channel_updates(qs, count, checkpoint_every)
+        retained = channel_memory(qs, count, checkpoint_every)
+        qs.pqc_keypairs.close()
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "updates": count,
+        "checkpoint_every": checkpoint_every,
+        "legacy_updates_per_s": round(LEGACY_UPDATES / legacy_s),
+        "engine_updates_per_s": round(count / update_s),
+        "engine_update_us": round(update_s / count * 1e6, 2),
+        "checkpoints": stats["checkpoints"],
+        "ring_deltas": stats["ring"],
+        "retained_kb": round(retained / 1024, 1),
+        "close_ms": round(close_s * 1000, 2)
+    }
+    print(f"   Legado (QRS-3 por update):   {results['legacy_updates_per_s']:>10,} updates/s")
+    print(f"   ChannelEngine:               {results['engine_updates_per_s']:>10,} updates/s "
+          f"({results['engine_update_us']} µs/update)")
+    print(f"   Checkpoints QRS-3:           {results['checkpoints']:>10,}")
+    print(f"   Memória retida pelo canal:   {results['retained_kb']:>10} KB")
+    print(f"   Fechamento (replay + batch): {results['close_ms']:>10} ms")
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📜 Microbenchmark do Histórico de Transações
+Latência de uma página de histórico por endereço conforme a tabela cresce:
+- ANTES: WHERE sender = ? OR receiver = ? ORDER BY timestamp DESC LIMIT ?
+         sem índice; feed global paginado com OFFSET
+- DEPOIS: address_transactions (address, timestamp, id) + cursor (keyset)
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import statistics
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from db_manager import DBManager
+from transaction_history import TransactionHistoryStore
+
+ADDRESSES = 100_000
+PAGE = 50
+QUERIES = 50
+DEEP_PAGE = 200  # Página do feed global lida a partir do cursor / OFFSET
+
+
+def _fill(db, start, stop):
+    rng = random.Random(start)
+    rows = []
+    for i in range(start, stop):
+        rows.append((f"tx{i:09d}", f"addr{rng.randrange(ADDRESSES)}", f"addr{rng.randrange(ADDRESSES)}",
+                     1.0, "transfer", 1_760_000_000.0 + i * 0.01, "allianza", 1))
+    with db._write_lock:
+        db.conn.executemany(
+            "INSERT INTO transactions_history (id, sender, receiver, amount, type, timestamp, network, is_public) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        db.conn.commit()
+
+
+def _p50_ms(func, queries):
+    samples = []
+    for address in queries:
+        start = time.perf_counter()
+        func(address)
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def main(sizes=(10_000, 100_000, 1_000_000)):
+    print("=" * 70)
+    print("📜 MICROBENCHMARK DO HISTÓRICO DE TRANSAÇÕES")
+    print("=" * 70)
+    print(f"   Endereços: {ADDRESSES:,}  Página: {PAGE}  Consultas por ponto: {QUERIES}")
+    print()
+
+    results = {"timestamp": datetime.now().isoformat(), "page": PAGE, "points": []}
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as directory:
+        db = DBManager(db_path=os.path.join(directory, "history.db"))
+        store = TransactionHistoryStore(db)
+        filled = 0
+        print(f"   {'linhas':>10} {'endereço antes':>15} {'endereço depois':>16} "
+              f"{'pág. ' + str(DEEP_PAGE) + ' OFFSET':>15} {'pág. ' + str(DEEP_PAGE) + ' cursor':>15}")
+        for size in sizes:
+            _fill(db, filled, size)
+            filled = size
+            queries = [f"addr{rng.randrange(ADDRESSES)}" for _ in range(QUERIES)]
+
+            def legacy(address):
+                return db.execute_read(
+                    "SELECT * FROM transactions_history WHERE sender = ? OR receiver = ? "
+                    "ORDER BY timestamp DESC LIMIT ?", (address, address, PAGE))
+
+            def legacy_deep(_):
+                return db.execute_read(
+                    "SELECT * FROM transactions_history ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+                    (PAGE, DEEP_PAGE * PAGE))
+
+            cursor = None
+            for _ in range(DEEP_PAGE):
+                cursor = store.get_page(None, PAGE, cursor)["next_cursor"]
+
+            # Varredura completa: poucas amostras nos tamanhos grandes
+            legacy_queries = queries[:5] if size > 100_000 else queries
+            point = {
+                "rows": size,
+                "legacy_address_ms": _p50_ms(legacy, legacy_queries),
+                "indexed_address_ms": _p50_ms(lambda a: store.get_page(a, PAGE), queries),
+                "legacy_offset_page_ms": _p50_ms(legacy_deep, queries[:5]),
+                "cursor_page_ms": _p50_ms(lambda _: store.get_page(None, PAGE, cursor), queries),
+            }
+            results["points"].append(point)
+            print(f"   {size:>10,} {point['legacy_address_ms']:>13.2f}ms {point['indexed_address_ms']:>14.3f}ms "
+                  f"{point['legacy_offset_page_ms']:>13.2f}ms {point['cursor_page_ms']:>13.3f}ms")
+        db.close()
+
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    sizes = tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 1_000_000)
+    main(sizes)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🏅 Microbenchmark da Seleção de Validadores
+Custo de select_validator por bloco com 1M carteiras e 10k validadores:
+- ANTES: varre todas as carteiras, filtra por MIN_STAKE, ordena e pega o top 3
+- DEPOIS: ValidatorIndex (heap stake × score mantido em stake()/update_validator_score)
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import statistics
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from validator_index import ValidatorIndex
+
+MIN_STAKE = 1000
+WALLETS = 1_000_000
+VALIDATORS = 10_000
+BLOCKS = 20
+UPDATES = 100_000
+
+
+def legacy_select(wallets, scores):
+    candidates = []
+    for address, wallet in wallets.items():
+        if wallet["staked"] >= MIN_STAKE:
+            candidates.append((address, wallet["staked"] * scores.get(address, 1.0)))
+    if not candidates:
+        return None
+    candidates.sort(key=lambda x: x[1], reverse=True)
+    return random.choice(candidates[:3])[0]
+
+
+def _median_ms(func, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(wallet_count=WALLETS, validator_count=VALIDATORS):
+    print("=" * 70)
+    print("🏅 MICROBENCHMARK DA SELEÇÃO DE VALIDADORES")
+    print("=" * 70)
+    print(f"   Carteiras: {wallet_count:,}  Validadores: {validator_count:,}")
+
+    rng = random.Random(11)
+    wallets = {f"addr{i}": {"ALZ": 100, "staked": 0} for i in range(wallet_count)}
+    validators = rng.sample(sorted(wallets), validator_count)
+    for address in validators:
+        wallets[address]["staked"] = rng.randrange(MIN_STAKE, 100_000)
+    scores = {address: rng.uniform(0.1, 3.0) for address in validators}
+
+    index = ValidatorIndex(MIN_STAKE)
+    start = time.perf_counter()
+    index.rebuild(((a, w["staked"]) for a, w in wallets.items()), scores)
+    rebuild_ms = (time.perf_counter() - start) * 1000
+
+    legacy_ms = _median_ms(lambda: legacy_select(wallets, scores), BLOCKS)
+    indexed_ms = _median_ms(lambda: index.select(3), 1000)
+
+    # Atualizações por bloco: score do validador + stakes novos
+    start = time.perf_counter()
+    for _ in range(UPDATES):
+        address = rng.choice(validators)
+        if rng.random() < 0.5:
+            index.update_score(address, rng.uniform(0.1, 3.0))
+        else:
+            index.update_stake(address, rng.randrange(0, 100_000))
+    update_us = (time.perf_counter() - start) / UPDATES * 1e6
+    after_updates_ms = _median_ms(lambda: index.select(3), 1000)
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "wallets": wallet_count,
+        "validators": validator_count,
+        "legacy_select_ms": round(legacy_ms, 3),
+        "indexed_select_ms": round(indexed_ms, 4),
+        "indexed_select_after_updates_ms": round(after_updates_ms, 4),
+        "speedup": round(legacy_ms / indexed_ms, 1) if indexed_ms else None,
+        "index_rebuild_ms": round(rebuild_ms, 1),
+        "update_us": round(update_us, 2),
+        "index": index.get_stats()
+    }
+    print(f"   Seleção (varredura):  {legacy_ms:10.3f} ms/bloco")
+    print(f"   Seleção (índice):     {indexed_ms:10.4f} ms/bloco ({results['speedup']}x)")
+    print(f"   Após {UPDATES:,} updates: {after_updates_ms:10.4f} ms/bloco")
+    print(f"   Update stake/score:   {update_us:10.2f} µs")
+    print(f"   Reconstrução (carga): {rebuild_ms:10.1f} ms")
+    print()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
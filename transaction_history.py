@@ -0,0 +1,139 @@
+# transaction_history.py
+# 📜 HISTÓRICO DE TRANSAÇÕES INDEXADO - ALLIANZA BLOCKCHAIN
+# Índice endereço → transação + paginação por cursor (keyset), sem OFFSET
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HISTORY_COLUMNS = "id, sender, receiver, amount, type, timestamp, network, is_public"
+JOINED_COLUMNS = "h.id, h.sender, h.receiver, h.amount, h.type, h.timestamp, h.network, h.is_public"
+
+
+def encode_cursor(timestamp: float, tx_id: str) -> str:
+    """Cursor opaco: posição (timestamp, id) da última transação da página"""
+    return f"{float(timestamp)!r}:{tx_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    timestamp, _, tx_id = cursor.partition(":")
+    return float(timestamp), tx_id
+
+
+def row_to_transaction(row) -> Dict:
+    tx_id, sender, receiver, amount, tx_type, timestamp, network, is_public = row
+    return {
+        "id": tx_id,
+        "sender": sender,
+        "receiver": receiver,
+        "amount": amount,
+        "type": tx_type,
+        "timestamp": timestamp,
+        "network": network or "allianza",
+        "is_public": bool(is_public) if is_public is not None else True
+    }
+
+
+class TransactionHistoryStore:
+    """
+    📜 HISTÓRICO DE TRANSAÇÕES
+
+    - address_transactions (address, timestamp, tx_id) é a chave primária de
+      uma tabela WITHOUT ROWID, mantida por triggers em transactions_history:
+      todo INSERT (de qualquer rota) indexa remetente e destinatário
+    - Histórico de um endereço = busca por faixa na chave primária
+    - Paginação por cursor (timestamp, id): cada página custa O(log n + limit),
+      independente de quantas linhas vieram antes ou do tamanho da tabela
+    - Leituras pelo pool de leitura compartilhado do DBManager
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._initialize_tables()
+
+    def _initialize_tables(self):
+        statements = [
+            ("""CREATE TABLE IF NOT EXISTS address_transactions (
+                    address TEXT NOT NULL, timestamp REAL NOT NULL, tx_id TEXT NOT NULL,
+                    PRIMARY KEY (address, timestamp, tx_id)
+                ) WITHOUT ROWID""", ()),
+            # Feed global (sem endereço) pelo mesmo esquema de cursor
+            ("CREATE INDEX IF NOT EXISTS idx_transactions_history_ts_id ON transactions_history(timestamp, id)", ()),
+            ("""CREATE TRIGGER IF NOT EXISTS transactions_history_index_insert AFTER INSERT ON transactions_history
+                BEGIN
+                    INSERT OR IGNORE INTO address_transactions (address, timestamp, tx_id)
+                    SELECT NEW.sender, COALESCE(NEW.timestamp, 0), NEW.id WHERE NEW.sender IS NOT NULL;
+                    INSERT OR IGNORE INTO address_transactions (address, timestamp, tx_id)
+                    SELECT NEW.receiver, COALESCE(NEW.timestamp, 0), NEW.id WHERE NEW.receiver IS NOT NULL;
+                END""", ()),
+            ("""CREATE TRIGGER IF NOT EXISTS transactions_history_index_delete AFTER DELETE ON transactions_history
+                BEGIN
+                    DELETE FROM address_transactions
+                    WHERE address IN (OLD.sender, OLD.receiver) AND timestamp = COALESCE(OLD.timestamp, 0)
+                      AND tx_id = OLD.id;
+                END""", ()),
+        ]
+        if not self.db.execute_many_commit(statements):
+            logger.error("Erro ao inicializar índice de histórico de transações")
+            return
+        self._backfill()
+
+    def _backfill(self):
+        """Bancos anteriores ao índice: indexa o histórico existente uma única vez"""
+        if self.db.execute_query("SELECT 1 FROM address_transactions LIMIT 1"):
+            return
+        if not self.db.execute_query("SELECT 1 FROM transactions_history LIMIT 1"):
+            return
+        ok = self.db.execute_many_commit([
+            ("INSERT OR IGNORE INTO address_transactions (address, timestamp, tx_id) "
+             "SELECT sender, COALESCE(timestamp, 0), id FROM transactions_history WHERE sender IS NOT NULL", ()),
+            ("INSERT OR IGNORE INTO address_transactions (address, timestamp, tx_id) "
+             "SELECT receiver, COALESCE(timestamp, 0), id FROM transactions_history WHERE receiver IS NOT NULL", ()),
+        ])
+        if ok:
+            logger.info("📜 Índice de histórico de transações reconstruído a partir de transactions_history")
+
+    def get_page(self, address: Optional[str] = None, limit: int = 100,
+                 cursor: Optional[str] = None) -> Dict:
+        """
+        Página do histórico (mais recente primeiro).
+
+        Returns:
+            {"transactions": [...], "next_cursor": str ou None}
+        """
+        limit = max(1, min(int(limit), 1000))
+        params: List = []
+        if address:
+            query = (f"SELECT {JOINED_COLUMNS}, a.timestamp "
+                     "FROM address_transactions a JOIN transactions_history h ON h.id = a.tx_id "
+                     "WHERE a.address = ?")
+            params.append(address)
+            if cursor:
+                query += " AND (a.timestamp, a.tx_id) < (?, ?)"
+                params.extend(decode_cursor(cursor))
+            query += " ORDER BY a.timestamp DESC, a.tx_id DESC LIMIT ?"
+        else:
+            query = f"SELECT {HISTORY_COLUMNS}, timestamp FROM transactions_history"
+            if cursor:
+                query += " WHERE (timestamp, id) < (?, ?)"
+                params.extend(decode_cursor(cursor))
+            query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        # Uma linha a mais diz se existe próxima página sem COUNT(*)
+        params.append(limit + 1)
+
+        rows = self.db.execute_read(query, tuple(params))
+        transactions = [row_to_transaction(row[:-1]) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last[-1] or 0, last[0])
+        return {"transactions": transactions, "next_cursor": next_cursor}
+
+    def get_transaction(self, tx_id: str) -> Optional[Dict]:
+        rows = self.db.execute_read(f"SELECT {HISTORY_COLUMNS} FROM transactions_history WHERE id = ?", (tx_id,))
+        return row_to_transaction(rows[0]) if rows else None
+
+    def count(self) -> int:
+        rows = self.db.execute_read("SELECT COUNT(*) FROM transactions_history")
+        return rows[0][0] if rows else 0
@@ -13,6 +13,8 @@ from enum import Enum
 from dataclasses import dataclass, asdict
 from collections import defaultdict, deque
 
+from confirmation_tracker import global_confirmation_tracker
+
 class TransactionStatus(Enum):
     """Status de uma transação"""
     PENDING = "pending"
@@ -140,7 +142,7 @@ class TransactionTracker:
             state.metadata.update(metadata)
         
         # Atualizar estatísticas
-        self._update_stats(old_status, state.status, state.source_chain)
+        self._update_stats(tx_id, old_status, state.status, state.source_chain)
         
         # Calcular estimativa de conclusão
         if status == TransactionStatus.BROADCASTED:
@@ -155,6 +157,46 @@ class TransactionTracker:
         
         return True
     
+    def track_confirmations(
+        self,
+        tx_id: str,
+        chain: str,
+        tx_hash: str,
+        timeout: float = 600,
+        confirmation_tracker=None
+    ):
+        """
+        Acompanhar confirmações pelo confirmation tracker compartilhado da chain.
+        O status é atualizado por eventos (nova profundidade, confirmação,
+        reversão, timeout) em vez de um loop de polling por transação.
+        """
+        state = self.transactions.get(tx_id)
+        tracker = confirmation_tracker or global_confirmation_tracker
+        if not state or not tracker.has_chain(chain):
+            return None
+        
+        def on_update(confirmations: int):
+            self.update_status(tx_id, TransactionStatus.BROADCASTED, confirmations=confirmations)
+        
+        def on_done(result: Dict):
+            if result.get("confirmed"):
+                self.update_status(
+                    tx_id, TransactionStatus.CONFIRMED,
+                    confirmations=result.get("confirmations"),
+                    metadata={"block_number": result.get("block_number")}
+                )
+            else:
+                self.update_status(
+                    tx_id, TransactionStatus.FAILED,
+                    confirmations=result.get("confirmations"),
+                    error=result.get("error")
+                )
+        
+        return tracker.watch(
+            chain, tx_hash, state.required_confirmations, timeout,
+            on_update=on_update, on_done=on_done
+        )
+    
     def get_transaction(self, tx_id: str) -> Optional[TransactionState]:
         """Obter estado de uma transação"""
         return self.transactions.get(tx_id)
@@ -183,7 +225,7 @@ class TransactionTracker:
             except Exception as e:
                 print(f"⚠️  Erro ao notificar subscriber: {e}")
     
-    def _update_stats(self, old_status: TransactionStatus, new_status: TransactionStatus, chain: str):
+    def _update_stats(self, tx_id: str, old_status: TransactionStatus, new_status: TransactionStatus, chain: str):
         """Atualizar estatísticas"""
         stats = self.chain_stats[chain]
         
@@ -0,0 +1,128 @@
+# validator_index.py
+# 🏅 ÍNDICE DE VALIDADORES - ALLIANZA BLOCKCHAIN
+# Conjunto de validadores mantido incrementalmente, ordenado por stake × score
+
+import heapq
+import random
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ValidatorIndex:
+    """
+    🏅 ÍNDICE DE VALIDADORES
+
+    - Só endereços com stake >= min_stake entram no índice (não todas as carteiras)
+    - Heap de máximo por peso (stake × score) com remoção preguiçosa: cada
+      alteração de stake/score empurra uma entrada nova e invalida a antiga
+    - top(k) custa O(k log V) amortizado; o heap é compactado quando as
+      entradas obsoletas passam do dobro das válidas
+    """
+
+    def __init__(self, min_stake: float, default_score: float = 1.0):
+        self.min_stake = min_stake
+        self.default_score = default_score
+        self._stakes: Dict[str, float] = {}
+        self._scores: Dict[str, float] = {}
+        self._weights: Dict[str, float] = {}  # Somente validadores elegíveis
+        self._versions: Dict[str, int] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._weights)
+
+    def __contains__(self, address):
+        return address in self._weights
+
+    def weight(self, address: str) -> Optional[float]:
+        return self._weights.get(address)
+
+    def score(self, address: str) -> float:
+        return self._scores.get(address, self.default_score)
+
+    def update_stake(self, address: str, staked: float):
+        """Chamado a cada stake/unstake e na carga das carteiras"""
+        with self._lock:
+            if staked:
+                self._stakes[address] = staked
+            else:
+                self._stakes.pop(address, None)
+            self._reindex(address)
+
+    def update_score(self, address: str, score: float):
+        """Chamado a cada update_validator_score"""
+        with self._lock:
+            self._scores[address] = score
+            self._reindex(address)
+
+    def rebuild(self, stakes: Iterable[Tuple[str, float]], scores: Optional[Dict[str, float]] = None):
+        """Reconstrói o índice inteiro em O(W) (carga do banco): heapify em vez de V pushes"""
+        with self._lock:
+            self._stakes = {address: staked for address, staked in stakes if staked}
+            if scores is not None:
+                self._scores = dict(scores)
+            self._weights.clear()
+            self._versions.clear()
+            self._heap = []
+            for address, staked in self._stakes.items():
+                if staked >= self.min_stake:
+                    weight = staked * self.score(address)
+                    self._seq += 1
+                    self._weights[address] = weight
+                    self._versions[address] = self._seq
+                    self._heap.append((-weight, self._seq, address))
+            heapq.heapify(self._heap)
+
+    def _reindex(self, address: str):
+        staked = self._stakes.get(address, 0)
+        if staked < self.min_stake:
+            # Entrada antiga (se existir) fica obsoleta no heap
+            if self._weights.pop(address, None) is not None:
+                self._versions.pop(address, None)
+                self._maybe_compact()
+            return
+        weight = staked * self.score(address)
+        self._seq += 1
+        self._weights[address] = weight
+        self._versions[address] = self._seq
+        # Desempate no mesmo peso: a atualização mais antiga vem primeiro
+        heapq.heappush(self._heap, (-weight, self._seq, address))
+        self._maybe_compact()
+
+    def _is_live(self, entry) -> bool:
+        return self._versions.get(entry[2]) == entry[1]
+
+    def _maybe_compact(self):
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._weights):
+            self._heap = [entry for entry in self._heap if self._is_live(entry)]
+            heapq.heapify(self._heap)
+
+    def top(self, k: int = 3) -> List[Tuple[str, float]]:
+        """Os k validadores de maior peso, do maior para o menor"""
+        with self._lock:
+            heap = self._heap
+            taken = []
+            while heap and len(taken) < k:
+                entry = heapq.heappop(heap)
+                if self._is_live(entry):
+                    taken.append(entry)
+            for entry in taken:
+                heapq.heappush(heap, entry)
+            return [(entry[2], -entry[0]) for entry in taken]
+
+    def select(self, k: int = 3, rng=random) -> Optional[str]:
+        """Escolhe aleatoriamente entre os top k (descentralização)"""
+        candidates = self.top(k)
+        if not candidates:
+            return None
+        return rng.choice(candidates)[0]
+
+    def get_stats(self) -> Dict:
+        return {
+            "validators": len(self._weights),
+            "tracked_stakes": len(self._stakes),
+            "heap_entries": len(self._heap),
+            "min_stake": self.min_stake
+        }